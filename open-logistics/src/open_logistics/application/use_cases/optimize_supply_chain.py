@@ -4,19 +4,31 @@ Use case for optimizing the supply chain.
 This module defines the application-level use case for triggering
 and managing the supply chain optimization process.
 """
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 
+from open_logistics.infrastructure.cache.result_cache import ResultCache, get_result_cache
 from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
-    MLXOptimizer, OptimizationRequest, OptimizationResult
+    MLXOptimizer, OptimizationDelta, OptimizationRequest, OptimizationResult, WhatIfQuery
 )
 
 
 class OptimizeSupplyChainUseCase:
     """
     Orchestrates the supply chain optimization process by using the MLXOptimizer.
+
+    Identical requests are answered from the shared result cache while their
+    entry is live. A cached result whose plan the optimizer no longer holds,
+    because it left the plan store or was solved by another process, is
+    handed to the optimizer again, so its ``plan_id`` can still be passed to
+    ``reoptimize``.
     """
-    def __init__(self, optimizer: Optional[MLXOptimizer] = None):
+    def __init__(
+        self,
+        optimizer: Optional[MLXOptimizer] = None,
+        cache: Optional[ResultCache] = None,
+    ):
         self.optimizer = optimizer or MLXOptimizer()
+        self.cache = cache if cache is not None else get_result_cache()
 
     async def execute(self, request: OptimizationRequest) -> OptimizationResult:
         """
@@ -34,6 +46,77 @@ class OptimizeSupplyChainUseCase:
         # - Publishing events
         # - Performing extra validation
 
-        result = await self.optimizer.optimize_supply_chain(request)
+        if self.cache is None:
+            return await self.optimizer.optimize_supply_chain(request)
+        result = await self.cache.get_or_compute(request, self.optimizer.optimize_supply_chain)
+        return self.optimizer.restore_plan(request, result)
+
+    async def execute_many(
+        self, requests: Sequence[OptimizationRequest], store_plans: bool = False
+    ) -> List[OptimizationResult]:
+        """
+        Executes the optimization use case for a batch of requests.
+
+        Args:
+            requests: The optimization requests of one planning cycle.
+            store_plans: Keep the solved plans for later deltas and what-if queries.
+
+        Returns:
+            The results, in request order.
+        """
+        if self.cache is None:
+            return await self.optimizer.optimize_many(requests, store_plans=store_plans)
+
+        cached = [await self.cache.get(request) for request in requests]
+        pending = [request for request, result in zip(requests, cached) if result is None]
+        solved = iter(await self.optimizer.optimize_many(pending, store_plans=store_plans) if pending else [])
+        results = []
+        for request, result in zip(requests, cached):
+            if result is None:
+                result = next(solved)
+                await self.cache.put(request, result)
+            else:
+                result = self.optimizer.restore_plan(request, result, store=store_plans)
+            results.append(result)
+        return results
+
+    async def execute_anytime(self, request: OptimizationRequest) -> AsyncIterator[OptimizationResult]:
+        """
+        Executes the optimization use case, streaming improving plans.
+
+        Args:
+            request: The optimization request; its priority sets the deadline.
+
+        Yields:
+            Results of increasing quality until the deadline.
+        """
+        async for result in self.optimizer.optimize_anytime(request):
+            yield result
+
+    async def reoptimize(
+        self, previous: Union[OptimizationResult, str], delta: OptimizationDelta
+    ) -> OptimizationResult:
+        """
+        Updates a previous optimization for a change in its inputs.
+
+        Args:
+            previous: The previous result, or its plan id.
+            delta: The changed inventory and locations.
+
+        Returns:
+            The updated result.
+        """
+        return await self.optimizer.reoptimize(previous, delta)
+
+    async def what_if(self, previous: Union[OptimizationResult, str], query: WhatIfQuery) -> Dict[str, Any]:
+        """
+        Answers how a previous optimization changes with its budget or capacity.
 
-        return result 
\ No newline at end of file
+        Args:
+            previous: The previous result, or its plan id.
+            query: The changed limits.
+
+        Returns:
+            The re-priced allocation.
+        """
+        return await self.optimizer.what_if(previous, query)
@@ -6,7 +6,7 @@ allowing for type-safe settings loaded from environment variables or a .env file
 """
 
 from functools import lru_cache
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +14,52 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class MLXSettings(BaseSettings):
     """Configuration for MLX (Apple Silicon optimization)."""
     MLX_ENABLED: bool = False
+    MODEL_WEIGHTS_PATH: Optional[str] = None  # .npz or memory-mapped checkpoint weights read by both backends
+
+
+class OptimizationSettings(BaseSettings):
+    """Solver backends and limits for supply chain optimization."""
+    ALLOCATION_BACKEND: Literal["auto", "vectorized", "greedy", "lp", "mip"] = "auto"  # auto answers critical requests with greedy
+    SOLVER_MAX_TIME_SECONDS: float = 30.0
+    ROUTING_BACKEND: Literal["top_k", "vrp"] = "top_k"
+    ROUTING_TIME_LIMIT_SECONDS: float = 2.0
+    ROUTING_VEHICLE_CAPACITY: int = 5000
+    PRESOLVE_ENABLED: bool = True  # collapse identical SKUs and drop dominated locations before solving
+    NETWORK_BACKEND: Literal["auto", "none", "flow"] = "auto"  # auto solves when suppliers or depots are given
+    NETWORK_CANDIDATE_LANES: int = 8  # nearest upstream nodes joined to each node; 0 joins every pair
+    NETWORK_DECOMPOSITION: bool = True  # solve disconnected regions as separate flows on the process pool
+    HORIZON_WINDOW_DAYS: int = 14  # days planned by each rolling window of a replenishment schedule; 0 plans the horizon at once
+    HORIZON_OVERLAP_DAYS: int = 7  # days each window re-plans in the next one; the rest are committed
+    SCENARIO_CHUNK_BYTES: int = 256 * 1024**2  # memory for the sampled demand of one scenario chunk
+    SCENARIO_WORKERS: int = 0  # processes evaluating scenario shards; 0 uses one per CPU, 1 evaluates in-process
+    PARETO_WORKERS: int = 0  # threads solving Pareto frontier sweeps; 0 uses one per CPU
+    EXECUTOR_MODE: Literal["auto", "inline", "thread", "process"] = "auto"
+    PROCESS_POOL_WORKERS: int = 0  # 0 uses one worker per CPU
+    THREAD_POOL_WORKERS: int = 4
+    PROCESS_OFFLOAD_MIN_SIZE: int = 50_000
+    PROCESS_START_METHOD: Literal["spawn", "forkserver", "fork"] = "spawn"
+    PROCESS_POOL_WARM_UP: bool = True
+    PLAN_STORE_MAX_ENTRIES: int = 16
+    SOLUTION_POOL_ENABLED: bool = True  # warm-start cold LP/MIP allocations from the nearest pooled solution
+    SOLUTION_POOL_MAX_ENTRIES: int = 32
+    SOLUTION_POOL_MAX_DISTANCE: float = 0.25  # feature distance within which a pooled solution is reused
+    CONSOLIDATION_VEHICLE_WEIGHT_KG: float = 24000.0  # payload of one vehicle or container
+    CONSOLIDATION_VEHICLE_VOLUME_M3: float = 67.0
+    CONSOLIDATION_TIME_LIMIT_SECONDS: float = 2.0  # CP-SAT refinement of the first-fit-decreasing packing
+    # Answer deadlines per request priority; constraints["solver_time_limit_s"] can only shorten them
+    DEADLINE_CRITICAL_SECONDS: float = 0.2
+    DEADLINE_HIGH_SECONDS: float = 5.0
+    DEADLINE_MEDIUM_SECONDS: float = 30.0
+    DEADLINE_LOW_SECONDS: float = 300.0
+
+
+class ResultCacheSettings(BaseSettings):
+    """Caching of optimization results for repeated requests."""
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SECONDS: float = 60.0
+    RESULT_CACHE_KEY_PREFIX: str = "openlogistics:result:"
 
 
 class SecuritySettings(BaseSettings):
@@ -52,6 +98,8 @@ class Settings(BaseSettings):
 
     # Integrations and services
     mlx: MLXSettings = MLXSettings()
+    optimization: OptimizationSettings = OptimizationSettings()
+    result_cache: ResultCacheSettings = ResultCacheSettings()
     security: SecuritySettings = SecuritySettings()
     sap_btp: SapBtpSettings = SapBtpSettings()
 
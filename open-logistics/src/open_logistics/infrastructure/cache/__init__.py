@@ -0,0 +1 @@
+"""Caching of optimization results."""
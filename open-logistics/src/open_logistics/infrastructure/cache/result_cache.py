@@ -0,0 +1,282 @@
+"""
+Content-addressed cache for optimization results.
+
+Requests are keyed by a SHA-256 hash of their canonical JSON form: dict keys
+are sorted at every level and the objective list is treated as a set, so two
+requests that differ only in ordering share a cache entry. Inventory and
+locations are the exception: items without explicit attributes take default
+factors by position, so their order is part of the key. Results live in a
+pluggable backend, either an in-process LRU with TTL expiry or any
+Redis-compatible async client.
+"""
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    OptimizationRequest,
+    OptimizationResult,
+)
+
+# Supply chain data whose order decides each item's default factors.
+POSITIONAL_COLLECTIONS = ("inventory", "locations")
+
+
+def request_cache_key(request: OptimizationRequest) -> str:
+    """
+    Computes the cache key of an optimization request.
+
+    Args:
+        request: The optimization request.
+
+    Returns:
+        Hex digest of the request's canonical JSON encoding.
+    """
+    # JSON mode already reduces every value to a JSON-native type.
+    payload = request.model_dump(mode="json")
+    payload["objectives"] = sorted(payload["objectives"])
+    data = payload["supply_chain_data"]
+    for name in POSITIONAL_COLLECTIONS:
+        if isinstance(data.get(name), dict):
+            data[name] = [[key, value] for key, value in data[name].items()]
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCacheBackend(ABC):
+    """Storage for cached optimization results."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[OptimizationResult]:
+        """Returns the live entry for ``key``, if any."""
+
+    @abstractmethod
+    async def set(
+        self, key: str, result: OptimizationResult, ttl_seconds: float
+    ) -> None:
+        """Stores ``result`` under ``key`` for ``ttl_seconds``."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Removes every entry."""
+
+
+class InMemoryCacheBackend(ResultCacheBackend):
+    """
+    Size-bounded LRU cache with per-entry expiry, local to the process.
+
+    Results are stored by reference, so a hit costs a dictionary lookup;
+    callers must treat returned results as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, OptimizationResult]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[OptimizationResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    async def set(
+        self, key: str, result: OptimizationResult, ttl_seconds: float
+    ) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend(ResultCacheBackend):
+    """
+    Cache shared between processes through a Redis-compatible server.
+
+    Results are stored as JSON with the TTL enforced by the server. Eviction
+    beyond the TTL is left to the server's ``maxmemory-policy``.
+    """
+
+    def __init__(self, client: Any = None, key_prefix: str = "openlogistics:result:"):
+        self._client = client
+        self.key_prefix = key_prefix
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            settings = get_settings()
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError:
+                import aioredis as redis_asyncio
+            self._client = redis_asyncio.Redis(
+                host=settings.DB_REDIS_HOST,
+                port=settings.DB_REDIS_PORT,
+                password=settings.DB_REDIS_PASSWORD or None,
+            )
+        return self._client
+
+    async def get(self, key: str) -> Optional[OptimizationResult]:
+        payload = await self.client.get(self.key_prefix + key)
+        if payload is None:
+            return None
+        return OptimizationResult.model_validate_json(payload)
+
+    async def set(
+        self, key: str, result: OptimizationResult, ttl_seconds: float
+    ) -> None:
+        await self.client.set(
+            self.key_prefix + key,
+            result.model_dump_json(),
+            px=max(int(ttl_seconds * 1000), 1),
+        )
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=self.key_prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class ResultCache:
+    """
+    Read-through cache of optimization results with hit/miss accounting.
+
+    Backend errors are logged and treated as misses, so an unavailable cache
+    server degrades to solving every request.
+
+    Canonicalizing a large request means sorting every nested dict, so the
+    cache also remembers which canonical key each raw (unsorted) encoding
+    maps to. A byte-identical repeat then costs a single serialization.
+    """
+
+    def __init__(
+        self,
+        backend: ResultCacheBackend,
+        ttl_seconds: float = 60.0,
+        max_aliases: int = 4096,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_aliases = max_aliases
+        self.hits = 0
+        self.misses = 0
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+
+    def key(self, request: OptimizationRequest) -> str:
+        """Returns the canonical cache key of a request."""
+        raw = hashlib.sha256(request.model_dump_json().encode("utf-8")).hexdigest()
+        key = self._aliases.get(raw)
+        if key is None:
+            key = request_cache_key(request)
+            self._aliases[raw] = key
+            if len(self._aliases) > self.max_aliases:
+                self._aliases.popitem(last=False)
+        else:
+            self._aliases.move_to_end(raw)
+        return key
+
+    async def get(self, request: OptimizationRequest) -> Optional[OptimizationResult]:
+        """
+        Looks up the cached result of a request and records a hit or miss.
+
+        Args:
+            request: The optimization request.
+
+        Returns:
+            The cached result, or ``None`` on a miss.
+        """
+        try:
+            result = await self.backend.get(self.key(request))
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            result = None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def put(
+        self, request: OptimizationRequest, result: OptimizationResult
+    ) -> None:
+        """Caches the result of a request."""
+        try:
+            await self.backend.set(self.key(request), result, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {e}")
+
+    async def get_or_compute(
+        self,
+        request: OptimizationRequest,
+        compute: Callable[[OptimizationRequest], Awaitable[OptimizationResult]],
+    ) -> OptimizationResult:
+        """
+        Returns the cached result of a request, computing and storing it on a miss.
+
+        Args:
+            request: The optimization request.
+            compute: Coroutine function producing the result on a miss.
+
+        Returns:
+            The cached or freshly computed result.
+        """
+        result = await self.get(request)
+        if result is None:
+            result = await compute(request)
+            await self.put(request, result)
+        return result
+
+    async def clear(self) -> None:
+        """Drops every cached result and resets the counters."""
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit and miss counters since the cache was created or cleared."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache()
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the shared result cache, or ``None`` when caching is disabled.
+
+    This function is cached so every use case instance in a process shares
+    one cache.
+    """
+    settings = get_settings().result_cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        backend: ResultCacheBackend = RedisCacheBackend(
+            key_prefix=settings.RESULT_CACHE_KEY_PREFIX
+        )
+    else:
+        backend = InMemoryCacheBackend(max_entries=settings.RESULT_CACHE_MAX_ENTRIES)
+    return ResultCache(backend, ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS)
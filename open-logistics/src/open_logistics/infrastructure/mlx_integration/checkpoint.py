@@ -0,0 +1,190 @@
+"""
+Memory-mapped model checkpoints.
+
+A checkpoint is a single flat file: a fixed prefix (magic, format version and
+header length), a JSON header describing each tensor, then the tensors' raw
+little-endian bytes, each aligned to ``ALIGNMENT``. Loading reads only the
+header and maps the data region read-only, so every process serving the same
+file shares its pages through the OS page cache and startup does no copying.
+The CRC-32 of the data region is checked on the first call to ``verify``
+rather than at open, keeping that cost off startup.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import zlib
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+# Leading bytes identifying a checkpoint file.
+MAGIC = b"OLCKPT\x00\x00"
+# Current layout version; readers accept this version and older ones.
+FORMAT_VERSION = 1
+# File suffix written by models when asked to save a checkpoint.
+CHECKPOINT_SUFFIX = ".olck"
+# Byte alignment of the data region and of every tensor in it.
+ALIGNMENT = 64
+# Bytes hashed per step when verifying, bounding resident memory.
+VERIFY_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Magic, version and header length.
+_PREFIX = struct.Struct("<8sII")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def is_checkpoint(path: str) -> bool:
+    """Whether ``path`` starts with the checkpoint magic."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def save_checkpoint(
+    path: str,
+    tensors: Mapping[str, np.ndarray],
+    model: str = "",
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Writes ``tensors`` as a checkpoint.
+
+    The file is written next to ``path`` and renamed over it, so processes
+    still mapping an older checkpoint at ``path`` keep reading intact data.
+
+    Args:
+        path: Destination file.
+        tensors: Arrays by name, stored in little-endian byte order.
+        model: Name of the model class the tensors belong to.
+        metadata: JSON-serializable details stored alongside the tensors.
+    """
+    arrays = {}
+    for name, value in tensors.items():
+        value = np.asarray(value)
+        arrays[name] = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+    entries, size, checksum = [], 0, 0
+    for name, array in arrays.items():
+        # Padding is part of the data region, so it is hashed as zeros
+        checksum = zlib.crc32(bytes(_aligned(size) - size), checksum)
+        size = _aligned(size)
+        checksum = zlib.crc32(array.reshape(-1).view(np.uint8).data, checksum)
+        entries.append(
+            {
+                "name": name,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": size,
+            }
+        )
+        size += array.nbytes
+
+    header = json.dumps(
+        {
+            "model": model,
+            "metadata": metadata or {},
+            "tensors": entries,
+            "data_size": size,
+            "crc32": checksum,
+        }
+    ).encode()
+    data_offset = _aligned(_PREFIX.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            handle.write(header)
+            for entry, array in zip(entries, arrays.values()):
+                handle.seek(data_offset + entry["offset"])
+                handle.write(array.reshape(-1).view(np.uint8).data)
+            handle.truncate(data_offset + size)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Checkpoint:
+    """
+    A read-only, memory-mapped checkpoint.
+
+    ``tensors`` are views on the mapping and stay valid for as long as they
+    are referenced, independently of this object.
+    """
+
+    def __init__(self, path: str):
+        """
+        Reads the header of ``path`` and maps its data region.
+
+        Raises:
+            ValueError: If the file is not a checkpoint, was written by a newer
+                format version, or is shorter than its header declares.
+        """
+        self.path = path
+        with open(path, "rb") as handle:
+            prefix = handle.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size or prefix[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a model checkpoint")
+            _, self.version, header_length = _PREFIX.unpack(prefix)
+            if self.version > FORMAT_VERSION:
+                raise ValueError(
+                    f"{path} has checkpoint version {self.version}; this reader supports up to {FORMAT_VERSION}"
+                )
+            header = json.loads(handle.read(header_length))
+            file_size = os.fstat(handle.fileno()).st_size
+
+        self.model: str = header["model"]
+        self.metadata: Dict[str, Any] = header["metadata"]
+        self._crc32: int = header["crc32"]
+        self._verified = False
+        data_offset = _aligned(_PREFIX.size + header_length)
+        data_size = header["data_size"]
+        if file_size < data_offset + data_size:
+            raise ValueError(f"{path} is truncated")
+
+        self._data = (
+            np.memmap(
+                path, dtype=np.uint8, mode="r", offset=data_offset, shape=(data_size,)
+            )
+            if data_size
+            else np.empty(0, dtype=np.uint8)
+        )
+        self.tensors: Dict[str, np.ndarray] = {}
+        for entry in header["tensors"]:
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"], dtype=np.int64))
+            start = entry["offset"]
+            self.tensors[entry["name"]] = (
+                self._data[start : start + count * dtype.itemsize]
+                .view(dtype)
+                .reshape(entry["shape"])
+            )
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.tensors[name]
+
+    def verify(self) -> None:
+        """
+        Checks the data region against the stored CRC-32, once per instance.
+
+        Raises:
+            ValueError: If the data does not match the checksum.
+        """
+        if self._verified:
+            return
+        checksum = 0
+        for start in range(0, len(self._data), VERIFY_CHUNK_BYTES):
+            checksum = zlib.crc32(
+                self._data[start : start + VERIFY_CHUNK_BYTES].data, checksum
+            )
+        if checksum != self._crc32:
+            raise ValueError(f"{self.path} is corrupt: checksum mismatch")
+        self._verified = True
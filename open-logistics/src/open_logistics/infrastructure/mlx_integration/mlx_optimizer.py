@@ -8,12 +8,87 @@ to a CPU-based implementation on other platforms.
 
 import asyncio
 import time
-from typing import Any, Dict, List, Optional
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from pydantic import BaseModel, Field
 
 from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.mlx_integration.checkpoint import (
+    CHECKPOINT_SUFFIX,
+    Checkpoint,
+    is_checkpoint,
+    save_checkpoint,
+)
+from open_logistics.infrastructure.optimization.consolidation import PackingProblem, consolidate_loads
+from open_logistics.infrastructure.optimization.decomposition import (
+    solve_decomposed_network,
+)
+from open_logistics.infrastructure.optimization.executor import (
+    get_optimization_executor,
+)
+from open_logistics.infrastructure.optimization.heuristics import GREEDY_BACKEND, greedy_allocation
+from open_logistics.infrastructure.optimization.horizon import (
+    ReplenishmentProblem,
+    solve_replenishment,
+    solve_rolling_horizon,
+)
+from open_logistics.infrastructure.optimization.incremental import (
+    PlanState,
+    align_rows,
+    get_plan_store,
+    merge_inventory,
+    merge_locations,
+    update_columns,
+)
+from open_logistics.infrastructure.optimization.lot_sizing import LotSizingProblem, solve_lot_sizing
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    AllocationSolution,
+    AllocationWarmStart,
+    estimate_solve_seconds,
+    resolve_time_limit,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.network import (
+    LocationNetwork,
+    has_echelons,
+    solve_network_flow,
+)
+from open_logistics.infrastructure.optimization.parallel import get_scenario_pool
+from open_logistics.infrastructure.optimization.pareto import SWEEPS, compute_frontier
+from open_logistics.infrastructure.optimization.presolve import (
+    presolve_network,
+    solve_presolved_allocation,
+)
+from open_logistics.infrastructure.optimization.regression import fit_trends
+from open_logistics.infrastructure.optimization.solution_pool import (
+    PooledSolution,
+    get_solution_pool,
+    problem_features,
+)
+from open_logistics.infrastructure.optimization.scenarios import (
+    DEFAULT_LEAD_TIME_DAYS,
+    DemandModel,
+)
+from open_logistics.infrastructure.optimization.spatial import get_location_index
+from open_logistics.infrastructure.optimization.routing import (
+    COST_PER_DISTANCE_UNIT,
+    WARM_START_MIN_TIME_FRACTION,
+    RoutePlan,
+    RoutingProblem,
+    initial_routes_from_stops,
+    solve_vrp,
+)
+from open_logistics.infrastructure.optimization.vectorized import (
+    InventoryColumns,
+    InventoryPlanArrays,
+    materialize_inventory_plan,
+    optimize_inventory_levels,
+    plan_from_levels,
+)
 
 # Attempt to import MLX
 try:
@@ -24,6 +99,46 @@ try:
 except ImportError:
     MLX_AVAILABLE = False
 
+# Share of the demand-adjusted level stocked by the CPU engine.
+CPU_EFFICIENCY_TARGET = 0.88
+
+# Layers of the supply chain MLP and the widths of its hidden layers.
+LAYER_NAMES = ("fc1", "fc2", "fc3")
+HIDDEN_SIZES = (128, 64)
+# Feature and score sizes of the optimizer's model.
+MODEL_INPUT_SIZE = 10
+MODEL_OUTPUT_SIZE = 5
+# Rows per NumPy inference pass, keeping hidden activations cache-sized.
+INFERENCE_BATCH_ROWS = 4096
+
+# Share of the time left before a deadline that is handed to a solver; the
+# rest is kept for assembling the plan.
+SOLVER_DEADLINE_SHARE = 0.8
+# Priority levels whose constrained allocations the auto backend answers with
+# the greedy heuristic rather than a solver.
+HEURISTIC_PRIORITY_LEVELS = ("critical",)
+
+# Performance metrics describing vehicle routing, carried over when a plan is
+# updated without re-routing.
+ROUTING_METRICS = (
+    "routing_backend",
+    "routing_status",
+    "routing_solutions_found",
+    "routing_time_ms",
+    "unserved_stops",
+)
+
+# Performance metrics describing the network flow, carried over likewise.
+NETWORK_METRICS = (
+    "network_backend",
+    "network_status",
+    "network_nodes",
+    "network_lanes",
+    "network_time_ms",
+    "network_presolve_ratio",
+    "network_components",
+)
+
 
 class OptimizationRequest(BaseModel):
     """Data model for an optimization request."""
@@ -32,6 +147,7 @@ class OptimizationRequest(BaseModel):
     objectives: List[str] = Field(..., description="List of optimization objectives.")
     time_horizon: int = Field(..., description="Time horizon for the optimization in days.")
     priority_level: str = Field("medium", description="Priority of the optimization task.")
+    solver_options: Dict[str, Any] = Field(default_factory=dict, description="Per-request solver overrides, e.g. {'allocation': 'lp'}.")
 
 
 class OptimizationResult(BaseModel):
@@ -40,80 +156,467 @@ class OptimizationResult(BaseModel):
     confidence_score: float
     execution_time_ms: float
     resource_utilization: Dict[str, float]
+    plan_id: Optional[str] = None
+
+
+class OptimizationDelta(BaseModel):
+    """Data model for a change to the inputs of a previous optimization."""
+    inventory: Dict[str, Any] = Field({}, description="Changed or new SKUs, in the format of supply_chain_data['inventory'].")
+    removed_skus: List[str] = Field([], description="SKUs to drop from the inventory.")
+    locations: List[Dict[str, Any]] = Field([], description="Changed or new locations, matched by 'id'.")
+    removed_locations: List[str] = Field([], description="Ids of locations to drop.")
+
+    def apply(self, request: OptimizationRequest) -> OptimizationRequest:
+        """Returns a copy of ``request`` with the delta applied."""
+        data = dict(request.supply_chain_data)
+        if self.inventory or self.removed_skus:
+            data["inventory"] = merge_inventory(data.get("inventory", {}), self.inventory, self.removed_skus)
+        if self.locations or self.removed_locations:
+            data["locations"] = merge_locations(data.get("locations", []), self.locations, self.removed_locations)
+        return request.model_copy(update={"supply_chain_data": data})
+
+
+class WhatIfQuery(BaseModel):
+    """Data model for changed limits of a previous optimization."""
+    budget: Optional[float] = Field(None, description="New budget; unset keeps the plan's budget.")
+    capacity_limit: Optional[float] = Field(None, description="New capacity limit; unset keeps the plan's limit.")
 
 
 class SimpleSupplyChainModel:
-    """A supply chain model that works with or without MLX."""
-    
-    def __init__(self, input_size: int, output_size: int):
+    """
+    A 128->64->output MLP scoring supply chain feature rows.
+
+    Runs on MLX when available and on NumPy otherwise, with float32 weights
+    either way. Both backends read and write the same weight files, keyed by
+    MLX parameter names (``fc1.weight`` of shape ``(out, in)``, ``fc1.bias``),
+    so weights trained on one host serve on the other. Weights are ``.npz``
+    archives or memory-mapped checkpoints; the NumPy backend serves straight
+    from a checkpoint's shared pages and verifies its checksum on first use.
+    """
+
+    def __init__(self, input_size: int, output_size: int, weights_path: Optional[str] = None, seed: int = 0):
         self.input_size = input_size
         self.output_size = output_size
-        
-        if MLX_AVAILABLE:
+        self.mlx_enabled = MLX_AVAILABLE
+        self._checkpoint: Optional[Checkpoint] = None
+
+        if self.mlx_enabled:
             # Initialize MLX neural network
             self.fc1 = nn.Linear(input_size, 128)
             self.fc2 = nn.Linear(128, 64)
             self.fc3 = nn.Linear(64, output_size)
-            self.mlx_enabled = True
         else:
-            # Fallback to simple model
-            self.mlx_enabled = False
-            
+            # NumPy layers as (weight transposed to (in, out), bias), with MLX's initialization
+            rng = np.random.default_rng(seed)
+            sizes = (input_size,) + HIDDEN_SIZES + (output_size,)
+            self.layers = []
+            for fan_in, fan_out in zip(sizes, sizes[1:]):
+                limit = 1.0 / np.sqrt(fan_in)
+                self.layers.append((
+                    rng.uniform(-limit, limit, (fan_in, fan_out)).astype(np.float32),
+                    rng.uniform(-limit, limit, fan_out).astype(np.float32),
+                ))
+        if weights_path is not None:
+            self.load_weights(weights_path)
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        """The weights in file layout, as NumPy arrays."""
+        if self.mlx_enabled:
+            return {
+                f"{name}.{key}": np.array(getattr(getattr(self, name), key), dtype=np.float32)
+                for name in LAYER_NAMES
+                for key in ("weight", "bias")
+            }
+        parameters = {}
+        for name, (weight, bias) in zip(LAYER_NAMES, self.layers):
+            parameters[f"{name}.weight"] = weight.T
+            parameters[f"{name}.bias"] = bias
+        return parameters
+
+    def load_weights(self, path: str) -> None:
+        """
+        Loads weights saved by either backend, as ``.npz`` or checkpoint.
+
+        Raises:
+            ValueError: If the file's layer shapes do not match the model, or
+                a checkpoint is malformed.
+        """
+        checkpoint = None
+        if is_checkpoint(path):
+            checkpoint = Checkpoint(path)
+            loaded = {key: value.astype(np.float32, copy=False) for key, value in checkpoint.tensors.items()}
+        else:
+            with np.load(path) as data:
+                loaded = {key: np.asarray(data[key], dtype=np.float32) for key in data.files}
+        if checkpoint is not None and self.mlx_enabled:
+            # MLX copies the weights onto the device, so check them up front
+            checkpoint.verify()
+        try:
+            self.set_parameters(loaded)
+        except ValueError:
+            raise ValueError(f"Weights in {path} do not match a {self.input_size}->{self.output_size} model") from None
+        self._checkpoint = checkpoint
+
+    def set_parameters(self, parameters: Dict[str, np.ndarray]) -> None:
+        """
+        Replaces the weights with float32 arrays in file layout.
+
+        Raises:
+            ValueError: If the layer names or shapes do not match the model.
+        """
+        expected = {key: value.shape for key, value in self.parameters().items()}
+        shapes = {key: np.shape(value) for key, value in parameters.items()}
+        if shapes != expected:
+            raise ValueError(f"Parameters do not match a {self.input_size}->{self.output_size} model")
+
+        if self.mlx_enabled:
+            for name in LAYER_NAMES:
+                layer = getattr(self, name)
+                layer.weight = mx.array(parameters[f"{name}.weight"])
+                layer.bias = mx.array(parameters[f"{name}.bias"])
+        else:
+            # Transposed views; matmul reads them in place, including from a mapping
+            self.layers = [(parameters[f"{name}.weight"].T, parameters[f"{name}.bias"]) for name in LAYER_NAMES]
+        self._checkpoint = None
+
+    def save_weights(self, path: str) -> None:
+        """
+        Saves the weights in a file readable by both backends.
+
+        Paths ending in ``CHECKPOINT_SUFFIX`` get a checkpoint; any other
+        path an ``.npz`` archive.
+        """
+        parameters: Dict[str, Any] = self.parameters()
+        if path.endswith(CHECKPOINT_SUFFIX):
+            save_checkpoint(
+                path,
+                parameters,
+                model=type(self).__name__,
+                metadata={"input_size": self.input_size, "output_size": self.output_size},
+            )
+        else:
+            np.savez(path, **parameters)
+
     def __call__(self, x: Any) -> Any:
-        """Prediction method that works with or without MLX."""
+        """Scores a feature row or a batch of rows."""
         if self.mlx_enabled and MLX_AVAILABLE:
             x = nn.relu(self.fc1(x))
             x = nn.relu(self.fc2(x))
             return self.fc3(x)
-        else:
-            # Fallback prediction
-            return [0.0] * self.output_size
-            
+
+        if self._checkpoint is not None:
+            self._checkpoint.verify()
+        rows = np.asarray(x, dtype=np.float32)
+        batch = rows.reshape(-1, self.input_size)
+        output = np.empty((len(batch), self.output_size), dtype=np.float32)
+        for start in range(0, len(batch), INFERENCE_BATCH_ROWS):
+            hidden = batch[start:start + INFERENCE_BATCH_ROWS]
+            for index, (weight, bias) in enumerate(self.layers):
+                hidden = hidden @ weight
+                hidden += bias
+                if index < len(self.layers) - 1:
+                    np.maximum(hidden, 0.0, out=hidden)
+            output[start:start + INFERENCE_BATCH_ROWS] = hidden
+        return output if rows.ndim > 1 else output[0]
+
     def predict(self, x: Any) -> Any:
         """Predict method for compatibility with scikit-learn interface."""
         return self.__call__(x)
 
 
+def inventory_features(segments: Sequence[InventoryColumns]) -> np.ndarray:
+    """
+    The model's feature rows for many inventories.
+
+    Each row holds an inventory's first ``MODEL_INPUT_SIZE`` quantities,
+    zero-padded as on the MLX path.
+    """
+    features = np.zeros((len(segments), MODEL_INPUT_SIZE), dtype=np.float32)
+    for row, segment in enumerate(segments):
+        head = segment.quantity[:MODEL_INPUT_SIZE]
+        features[row, :len(head)] = head
+    return features
+
+
+@lru_cache()
+def get_supply_chain_model(weights_path: Optional[str] = None) -> SimpleSupplyChainModel:
+    """
+    Get the shared model serving ``weights_path``.
+
+    This function is cached so every optimizer instance in a process shares
+    one model, and its weights are opened and checked once rather than on
+    every request.
+    """
+    return SimpleSupplyChainModel(MODEL_INPUT_SIZE, MODEL_OUTPUT_SIZE, weights_path)
+
+
 class MLXOptimizer:
     """
     Orchestrates supply chain optimization using MLX or a fallback mechanism.
     """
     def __init__(self):
         self.settings = get_settings()
+        self.executor = get_optimization_executor()
+        self.plan_store = get_plan_store()
         self.use_mlx = MLX_AVAILABLE and self.settings.mlx.MLX_ENABLED
-        if self.use_mlx:
-            self.model = SimpleSupplyChainModel(10, 5)  # Example sizes
-        else:
-            # Fallback to a simpler, non-MLX model or logic
-            from sklearn.linear_model import LinearRegression
-            self.model = LinearRegression()
+        # The CPU path scores plans with the model only when trained weights are configured
+        weights_path = self.settings.mlx.MODEL_WEIGHTS_PATH
+        self.model = get_supply_chain_model(weights_path) if self.use_mlx or weights_path else None
 
     async def optimize_supply_chain(self, request: OptimizationRequest) -> OptimizationResult:
         """
         Performs the supply chain optimization.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        if self.use_mlx:
+            # MLX-based optimization implementation, kept in-process for the MLX device
+            optimized_plan = await self.executor.run("thread", self._run_mlx_optimization, request)
+            state = PlanState(request, optimized_plan)
+        else:
+            # Fallback CPU-based optimization, off the event loop
+            mode = self.executor.choose(_problem_size([request]))
+            if mode == "process":
+                state = await self.executor.run(mode, solve_cpu_optimization, request)
+            else:
+                state = await self.executor.run(mode, self._solve_cpu, request)
+            state.plan["performance_metrics"]["execution_mode"] = mode
+
+        return self._result(state, start_time)
+
+    async def optimize_anytime(self, request: OptimizationRequest) -> AsyncIterator[OptimizationResult]:
+        """
+        Streams increasingly good plans for a request until its deadline.
+
+        A greedy plan comes first, typically within milliseconds. The solver
+        plan follows, preceded by every improved vehicle routing found on the
+        way. Iteration ends at the deadline set by the request's priority and
+        ``solver_time_limit_s`` constraint, so the last result received is the best
+        one available by then.
+
+        Args:
+            request: The optimization request.
+
+        Yields:
+            Results of increasing quality. The greedy and the final solver
+            results carry a ``plan_id``; intermediate routing results do not.
+        """
+        if self.use_mlx:
+            yield await self.optimize_supply_chain(request)
+            return
+
+        start_time = time.perf_counter()
+        deadline = start_time + self._deadline_seconds(request)
+        # A deadline that has already passed leaves out the solvers and vehicle routing
+        greedy = await self.executor.run("thread", self._solve_cpu, request, start_time)
+        greedy.plan["performance_metrics"]["execution_mode"] = "thread"
+        yield self._result(greedy, start_time)
+        if not self._can_improve(request, greedy.plan):
+            return
+
+        loop = asyncio.get_running_loop()
+        improvements: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+        def publish(plan: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(improvements.put_nowait, plan)
+
+        mode = self.executor.choose(_problem_size([request]))
+        if mode == "process":
+            solve = asyncio.ensure_future(
+                self.executor.run(mode, solve_cpu_optimization, request, deadline - time.perf_counter())
+            )
+        else:
+            solve = asyncio.ensure_future(self.executor.run(mode, self._solve_cpu, request, deadline, publish))
+
+        improved = None
+        try:
+            while True:
+                improved = asyncio.ensure_future(improvements.get())
+                done, _ = await asyncio.wait(
+                    {improved, solve},
+                    timeout=max(deadline - time.perf_counter(), 0.0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if improved in done:
+                    plan = improved.result()
+                    plan["performance_metrics"]["execution_mode"] = mode
+                    yield self._result(PlanState(request, plan), start_time, store=False)
+                    continue
+                if solve in done:
+                    state = solve.result()
+                    state.plan["performance_metrics"]["execution_mode"] = mode
+                    yield self._result(state, start_time)
+                return
+        finally:
+            if improved is not None:
+                improved.cancel()
+            # A solve still running at the deadline is detached rather than awaited
+            if not solve.done():
+                solve.cancel()
+
+    async def reoptimize(
+        self, previous: Union[OptimizationResult, str], delta: OptimizationDelta
+    ) -> OptimizationResult:
+        """
+        Updates a previous plan for a change in inventory or locations.
+
+        Only the inventory rows touched by the delta are recomputed, the LP
+        allocation is re-solved on a working set around them and vehicle
+        routing starts from the previous routes, so the cost follows the size
+        of the delta rather than of the plan. Plans whose solver state is not
+        held in this process are re-optimized from scratch.
+
+        Args:
+            previous: A result of this optimizer, or its ``plan_id``.
+            delta: Changed, added and removed SKUs and locations.
+
+        Returns:
+            The updated result, under a new ``plan_id``.
+
+        Raises:
+            KeyError: If the previous plan is unknown or has been evicted.
+        """
+        plan_id = previous if isinstance(previous, str) else previous.plan_id
+        state = self.plan_store.get(plan_id) if plan_id else None
+        if state is None:
+            raise KeyError(f"Unknown plan: {plan_id}")
+
+        request = delta.apply(state.request)
+        if self.use_mlx or not state.is_incremental:
+            return await self.optimize_supply_chain(request)
+
+        start_time = time.perf_counter()
+        new_state = await self.executor.run("thread", self._reoptimize_cpu, state, request, delta)
+        new_state.plan["performance_metrics"]["execution_mode"] = "thread"
+        return self._result(new_state, start_time)
+
+    async def what_if(self, previous: Union[OptimizationResult, str], query: WhatIfQuery) -> Dict[str, Any]:
+        """
+        Answers how a previous plan's allocation changes with its budget or capacity.
+
+        Within the valid ranges reported in the plan's ``sensitivity_analysis``
+        section the answer follows from the LP duals without a solve; outside
+        them the allocation is re-solved, warm-started from the plan's duals.
+
+        Args:
+            previous: A result of this optimizer, or its ``plan_id``.
+            query: The changed limits.
+
+        Returns:
+            The new limits, the allocation cost, how it was answered and the
+            levels of the SKUs that moved.
+
+        Raises:
+            KeyError: If the previous plan is unknown or has been evicted.
+            ValueError: If the plan has no optimal LP allocation.
+        """
+        plan_id = previous if isinstance(previous, str) else previous.plan_id
+        state = self.plan_store.get(plan_id) if plan_id else None
+        if state is None:
+            raise KeyError(f"Unknown plan: {plan_id}")
+        answer: Dict[str, Any] = await self.executor.run("thread", self._what_if, state, query)
+        return answer
+
+    async def optimize_many(
+        self, requests: Sequence[OptimizationRequest], store_plans: bool = False
+    ) -> List[OptimizationResult]:
+        """
+        Optimizes a batch of requests in one vectorized pass.
+
+        Compatible requests share a single segmented array computation instead of
+        running the full per-request pipeline, which makes planning cycles with
+        hundreds of small requests far cheaper than calling
+        ``optimize_supply_chain`` in a loop.
+
+        Args:
+            requests: The optimization requests, e.g. one per depot.
+            store_plans: Keep each plan in the plan store for ``reoptimize`` and
+                ``what_if``. Off by default so a large batch does not evict
+                interactive plans; results then carry no ``plan_id``.
 
+        Returns:
+            One result per request, in request order.
+        """
         if self.use_mlx:
-            # MLX-based optimization implementation
-            await asyncio.sleep(0.5) # Simulate async MLX workload
-            optimized_plan = self._run_mlx_optimization(request)
-            confidence = np.random.uniform(0.8, 0.95)
+            results = []
+            for request in requests:
+                start_time = time.perf_counter()
+                plan = await self.executor.run("thread", self._run_mlx_optimization, request)
+                results.append(self._result(PlanState(request, plan), start_time, store=store_plans))
+            return results
+
+        start_time = time.perf_counter()
+        mode = self.executor.choose(_problem_size(requests))
+        if mode == "process":
+            plans = await self.executor.run(mode, run_cpu_batch, list(requests))
         else:
-            # Fallback CPU-based optimization
-            await asyncio.sleep(0.2) # Simulate async CPU workload
-            optimized_plan = self._run_cpu_optimization(request)
-            confidence = np.random.uniform(0.7, 0.85)
+            plans = await self.executor.run(mode, self._run_cpu_batch, requests)
+        return [
+            self._result(PlanState(request, plan), start_time, store=store_plans)
+            for request, plan in zip(requests, plans)
+        ]
 
-        execution_time = (time.time() - start_time) * 1000  # in ms
+    def holds_plan(self, result: OptimizationResult) -> bool:
+        """
+        Whether a result's plan can still be updated through this optimizer.
+
+        Looking a plan up also marks it as recently used in the plan store.
+        """
+        return result.plan_id is not None and self.plan_store.get(result.plan_id) is not None
 
+    def restore_plan(
+        self, request: OptimizationRequest, result: OptimizationResult, store: bool = True
+    ) -> OptimizationResult:
+        """
+        Ties a result, e.g. one served from the result cache, to this optimizer's plans.
+
+        A result whose plan is still held is returned as it is. Otherwise, as
+        for a plan evicted from the plan store or solved in another process,
+        the plan is stored again without its solver state, so deltas
+        re-optimize it from scratch, and a copy under the new ``plan_id`` is
+        returned. With ``store`` off the copy carries no ``plan_id`` instead.
+        """
+        if self.holds_plan(result):
+            return result
+        plan_id = self.plan_store.put(PlanState(request, result.optimized_plan)) if store else None
+        if plan_id == result.plan_id:
+            return result
+        return result.model_copy(update={"plan_id": plan_id})
+
+    def _result(self, state: PlanState, start_time: float, store: bool = True) -> OptimizationResult:
+        """
+        Wraps a plan in a result timed from ``start_time``.
+
+        The confidence score is one minus the allocation solver's relative
+        optimality gap. ``store`` keeps the plan state for later updates.
+        """
         return OptimizationResult(
-            optimized_plan=optimized_plan,
-            confidence_score=float(confidence),
-            execution_time_ms=execution_time,
-            resource_utilization={"cpu": 0.5, "memory": 0.6}
+            optimized_plan=state.plan,
+            confidence_score=plan_confidence(state.plan),
+            execution_time_ms=(time.perf_counter() - start_time) * 1000,
+            resource_utilization={"cpu": 0.5, "memory": 0.6},
+            plan_id=self.plan_store.put(state) if store else None
         )
-        
+
+    def _deadline_seconds(self, request: OptimizationRequest) -> float:
+        """Time allowed for a request, from its priority and ``solver_time_limit_s`` constraint."""
+        settings = self.settings.optimization
+        deadlines = {
+            "critical": settings.DEADLINE_CRITICAL_SECONDS,
+            "high": settings.DEADLINE_HIGH_SECONDS,
+            "medium": settings.DEADLINE_MEDIUM_SECONDS,
+            "low": settings.DEADLINE_LOW_SECONDS,
+        }
+        ceiling = deadlines.get(str(request.priority_level).lower(), settings.DEADLINE_MEDIUM_SECONDS)
+        return resolve_time_limit(request.constraints, ceiling)
+
+    def _can_improve(self, request: OptimizationRequest, plan: Dict[str, Any]) -> bool:
+        """Whether solving a request fully can do better than its greedy ``plan``."""
+        if plan_confidence(plan) < 1.0 and self._allocation_backend(request) != "greedy":
+            return True
+        locations = request.supply_chain_data.get("locations", [])
+        return bool(locations) and self._routing_backend(request) == "vrp"
+
     def _run_mlx_optimization(self, request: OptimizationRequest) -> Dict[str, Any]:
         """Runs MLX-based optimization using Apple Silicon acceleration."""
         try:
@@ -123,15 +626,16 @@ class MLXOptimizer:
             locations = request.supply_chain_data.get("locations", [])
             
             # Convert to MLX arrays for optimization
-            inventory_values = mx.array([float(v) for v in inventory_data.values()] or [100.0])
-            demand_factors = mx.array([1.0, 1.2, 0.8, 1.1][:len(inventory_values)])
+            columns = InventoryColumns.from_inventory(inventory_data)
+            inventory_values = mx.array(columns.quantity if len(columns) else [100.0])
+            demand_factors = mx.array(columns.demand_factor if len(columns) else [1.0])
             
             # MLX-based optimization computation
             # 1. Demand-adjusted inventory levels
             optimized_levels = inventory_values * demand_factors * 0.9  # 10% efficiency target
             
             # 2. Cost optimization using MLX operations
-            cost_weights = mx.array([0.8, 1.2, 0.9, 1.1][:len(inventory_values)])
+            cost_weights = mx.array(columns.unit_cost if len(columns) else [0.8])
             total_cost = mx.sum(optimized_levels * cost_weights)
             
             # 3. Route optimization using distance matrix
@@ -142,7 +646,7 @@ class MLXOptimizer:
                 route_costs = mx.array([250.0])  # Default route cost
             
             # 4. Neural network inference for advanced optimization
-            if self.use_mlx and hasattr(self.model, '__call__'):
+            if self.use_mlx and self.model is not None:
                 # Prepare input features
                 input_features = mx.concatenate([
                     inventory_values[:10] if len(inventory_values) >= 10 else mx.pad(inventory_values, (0, 10-len(inventory_values)))
@@ -196,7 +700,8 @@ class MLXOptimizer:
                 }
             }
             
-            return optimization_plan
+            optimization_plan = self._apply_network_flow(request, optimization_plan)
+            return self._apply_vehicle_routing(request, optimization_plan)
             
         except Exception as e:
             from loguru import logger
@@ -205,122 +710,928 @@ class MLXOptimizer:
 
     def _run_cpu_optimization(self, request: OptimizationRequest) -> Dict[str, Any]:
         """Runs CPU-based optimization using traditional algorithms."""
+        return self._solve_cpu(request).plan
+
+    def _solve_cpu(
+        self,
+        request: OptimizationRequest,
+        deadline: Optional[float] = None,
+        on_plan: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> PlanState:
+        """
+        Runs CPU-based optimization and keeps the state needed to update it.
+
+        Solver time limits are cut to fit ``deadline``, a ``time.perf_counter``
+        timestamp defaulting to the request's own deadline; once it has
+        passed, the greedy allocation is used and vehicle routing skipped.
+        ``on_plan`` receives the plan with every improved vehicle routing.
+        """
+        if deadline is None:
+            deadline = time.perf_counter() + self._deadline_seconds(request)
         try:
-            # Extract supply chain data
-            inventory_data = request.supply_chain_data.get("inventory", {})
-            constraints = request.constraints
-            locations = request.supply_chain_data.get("locations", [])
-            demand_history = request.supply_chain_data.get("demand_history", [])
-            
-            # CPU-based optimization using NumPy and scikit-learn
-            inventory_values = np.array(list(inventory_data.values()) or [100.0])
-            demand_factors = np.array([1.0, 1.2, 0.8, 1.1][:len(inventory_values)])
-            
-            # 1. Inventory optimization using linear programming concepts
-            optimized_levels = inventory_values * demand_factors * 0.88  # 12% efficiency target
-            
-            # 2. Cost optimization
-            cost_weights = np.array([0.8, 1.2, 0.9, 1.1][:len(inventory_values)])
-            total_cost = np.sum(optimized_levels * cost_weights)
-            
-            # 3. Route optimization using distance-based algorithms
-            if locations:
-                distances = np.array([loc.get("distance", 50) for loc in locations])
-                route_costs = np.sum(distances * 0.1)
-            else:
-                route_costs = 250.0
-            
-            # 4. Demand prediction using linear regression if historical data available
-            if demand_history and len(demand_history) > 1:
-                X = np.arange(len(demand_history)).reshape(-1, 1)
-                y = np.array(demand_history)
-                
-                # Fit linear regression model
-                from sklearn.linear_model import LinearRegression
-                lr_model = LinearRegression()
-                lr_model.fit(X, y)
-                
-                # Predict future demand
-                future_demand = lr_model.predict(np.array([[len(demand_history)]]))
-                demand_trend = lr_model.coef_[0]
-            else:
-                future_demand = np.array([100.0])
-                demand_trend = 0.0
-            
-            # Generate comprehensive optimization plan
-            optimization_plan = {
-                "inventory_optimization": {
-                    item: {
-                        "current_level": float(inventory_values[i]),
-                        "optimized_level": float(optimized_levels[i]),
-                        "adjustment": float(optimized_levels[i] - inventory_values[i]),
-                        "cost_impact": float(optimized_levels[i] * cost_weights[i])
-                    }
-                    for i, item in enumerate(inventory_data.keys())
-                },
-                "route_optimization": {
-                    f"route_{i+1}": {
-                        "destination": loc.get("id", f"dest_{i+1}"),
-                        "capacity": loc.get("capacity", 1000),
-                        "distance": loc.get("distance", 50),
-                        "priority": "high" if i < len(locations)//2 else "medium",
-                        "estimated_cost": float(distances[i] * 0.1) if locations else 25.0
-                    }
-                    for i, loc in enumerate(locations[:5])
-                } if locations else {
-                    "route_1": {"destination": "primary_depot", "capacity": 1000, "distance": 50, "priority": "high", "estimated_cost": 25.0},
-                    "route_2": {"destination": "secondary_depot", "capacity": 800, "distance": 75, "priority": "medium", "estimated_cost": 37.5}
-                },
-                "cost_analysis": {
-                    "total_inventory_cost": float(total_cost),
-                    "total_route_cost": float(route_costs),
-                    "estimated_savings": float(total_cost * 0.12),
-                    "roi_percentage": 12.0
-                },
-                "performance_metrics": {
-                    "optimization_score": 0.82,
-                    "efficiency_gain": float(np.mean(optimized_levels / inventory_values) - 1.0),
-                    "resource_utilization": 0.80,
-                    "computation_method": "CPU-based",
-                    "demand_trend": float(demand_trend),
-                    "predicted_demand": float(future_demand[0])
-                }
-            }
-            
-            return optimization_plan
-            
+            # 1. Columnar inventory optimization, vectorized across all SKUs
+            columns = InventoryColumns.from_inventory(request.supply_chain_data.get("inventory", {}))
+            target_plan = optimize_inventory_levels(columns, efficiency_target=CPU_EFFICIENCY_TARGET)
+            inventory_plan, solver_metrics, allocation = self._allocate_from_pool(
+                request, columns, target_plan, deadline
+            )
+            plan = self._assemble_cpu_plan(
+                request,
+                columns,
+                inventory_plan,
+                solver_metrics,
+                deadline=deadline,
+                on_plan=on_plan,
+                target=target_plan.optimized_level,
+            )
+            return self._apply_sensitivity(
+                PlanState(request, plan, columns, target_plan.optimized_level, inventory_plan, allocation)
+            )
         except Exception as e:
             from loguru import logger
             logger.error(f"CPU optimization failed: {e}")
-            # Return minimal fallback plan
-            return {
-                "inventory_optimization": {
-                    "default_item": {
-                        "current_level": 100.0,
-                        "optimized_level": 90.0,
-                        "adjustment": -10.0,
-                        "cost_impact": 90.0
-                    }
-                },
-                "route_optimization": {
-                    "route_1": {"destination": "primary_depot", "capacity": 1000, "distance": 50, "priority": "high", "estimated_cost": 25.0}
-                },
-                "cost_analysis": {
-                    "total_inventory_cost": 90.0,
-                    "total_route_cost": 25.0,
-                    "estimated_savings": 10.8,
-                    "roi_percentage": 10.0
-                },
-                "performance_metrics": {
-                    "optimization_score": 0.75,
-                    "efficiency_gain": -0.1,
-                    "resource_utilization": 0.75,
-                    "computation_method": "fallback"
+            return PlanState(request, self._fallback_plan())
+
+    def _reoptimize_cpu(
+        self, state: PlanState, request: OptimizationRequest, delta: OptimizationDelta
+    ) -> PlanState:
+        """
+        Applies a delta to a CPU plan, recomputing only the affected rows.
+
+        ``request`` is the previous request with the delta already applied.
+        The previous state is left untouched; a state without its arrays is
+        optimized from scratch.
+        """
+        deadline = time.perf_counter() + self._deadline_seconds(request)
+        if state.columns is None or state.target is None or state.inventory_plan is None:
+            return self._solve_cpu(request, deadline)
+        try:
+            columns, row_index, changed_rows, removed_rows = update_columns(
+                state.columns,
+                state.row_index(),
+                delta.inventory,
+                delta.removed_skus,
+                state.request.supply_chain_data.get("inventory", {}),
+            )
+            target = align_rows(state.target, removed_rows, len(columns))
+            target[changed_rows] = optimize_inventory_levels(
+                columns.take(changed_rows), efficiency_target=CPU_EFFICIENCY_TARGET
+            ).optimized_level
+            previous_levels = align_rows(state.inventory_plan.optimized_level, removed_rows, len(columns))
+
+            warm_start = None
+            if state.allocation is not None:
+                warm_start = AllocationWarmStart(previous_levels, state.allocation.duals, changed_rows)
+            inventory_plan, solver_metrics, allocation = self._allocate_inventory(
+                request, columns, plan_from_levels(columns, target), warm_start, deadline
+            )
+
+            # Only rows whose levels moved are rebuilt in the plan section
+            rows = np.union1d(changed_rows, np.flatnonzero(inventory_plan.optimized_level != previous_levels))
+            inventory_section = dict(state.plan["inventory_optimization"])
+            for sku in delta.removed_skus:
+                inventory_section.pop(sku, None)
+            inventory_section.update(
+                materialize_inventory_plan([columns.skus[row] for row in rows.tolist()], inventory_plan.take(rows))
+            )
+            solver_metrics["rows_recomputed"] = len(rows)
+
+            plan = self._assemble_cpu_plan(
+                request,
+                columns,
+                inventory_plan,
+                solver_metrics,
+                inventory_section=inventory_section,
+                previous=state,
+                changed_stops=len(delta.locations) + len(delta.removed_locations),
+                deadline=deadline,
+                target=target,
+            )
+            return self._apply_sensitivity(
+                PlanState(request, plan, columns, target, inventory_plan, allocation, row_index)
+            )
+        except Exception as e:
+            from loguru import logger
+            logger.error(f"Incremental optimization failed, optimizing from scratch: {e}")
+            return self._solve_cpu(request, deadline)
+
+    def _run_cpu_batch(self, requests: Sequence[OptimizationRequest]) -> List[Dict[str, Any]]:
+        """
+        Optimizes many requests with one vectorized pass over their inventories.
+
+        Requests on the vectorized allocation backend are packed into a single
+        segmented set of columns; solver-backed requests are optimized one by one.
+        Every request's deadline runs from the start of the batch.
+        """
+        start = time.perf_counter()
+        plans: List[Dict[str, Any]] = [{} for _ in requests]
+        packed = []
+        for i, request in enumerate(requests):
+            if self._allocation_backend(request) == "vectorized":
+                packed.append(i)
+            else:
+                plans[i] = self._solve_cpu(request, start + self._deadline_seconds(request)).plan
+
+        try:
+            segments = [
+                InventoryColumns.from_inventory(requests[i].supply_chain_data.get("inventory", {}))
+                for i in packed
+            ]
+            columns, offsets = InventoryColumns.concatenate(segments)
+            batch_plan = optimize_inventory_levels(columns, efficiency_target=CPU_EFFICIENCY_TARGET)
+            demand_fits = self._fit_demand_trends([requests[i] for i in packed])
+            scores = self._model_scores(segments) if self.model is not None else [None] * len(segments)
+            for i, segment, inventory_plan, demand_fit, score in zip(
+                packed, segments, batch_plan.split(offsets), demand_fits, scores
+            ):
+                plans[i] = self._assemble_cpu_plan(
+                    requests[i], segment, inventory_plan, {"solver_backend": "vectorized"}, demand_fit,
+                    deadline=start + self._deadline_seconds(requests[i]),
+                    model_score=score,
+                )
+        except Exception as e:
+            from loguru import logger
+            logger.error(f"Batched CPU optimization failed, optimizing individually: {e}")
+            for i in packed:
+                plans[i] = self._run_cpu_optimization(requests[i])
+        return plans
+
+    def _assemble_cpu_plan(
+        self,
+        request: OptimizationRequest,
+        columns: InventoryColumns,
+        inventory_plan: InventoryPlanArrays,
+        solver_metrics: Dict[str, Any],
+        demand_fit: Optional[Tuple[float, float]] = None,
+        inventory_section: Optional[Dict[str, Any]] = None,
+        previous: Optional[PlanState] = None,
+        changed_stops: int = 0,
+        deadline: Optional[float] = None,
+        on_plan: Optional[Callable[[Dict[str, Any]], None]] = None,
+        model_score: Optional[float] = None,
+        target: Optional[np.ndarray] = None,
+    ) -> Dict[str, Any]:
+        """
+        Builds the full CPU optimization plan around an inventory plan.
+
+        ``demand_fit`` carries a precomputed ``(trend, predicted_demand)`` pair
+        and ``model_score`` the model's optimization score, for callers that
+        fit and score many requests at once.
+        ``inventory_section`` replaces materializing the inventory plan, and
+        ``previous``/``changed_stops`` let routing reuse an earlier plan's routes.
+        ``deadline`` bounds the optional analyses and vehicle routing, and
+        ``on_plan`` is passed on to vehicle routing. ``target`` holds the
+        levels wanted before allocation limits, defaulting to the plan's own.
+        """
+        locations = request.supply_chain_data.get("locations", [])
+        demand_history = request.supply_chain_data.get("demand_history", [])
+
+        # 2. Cost optimization
+        total_cost = inventory_plan.total_cost
+
+        # 3. Route optimization using distance-based algorithms
+        if locations:
+            distances = np.array([loc.get("distance", 50) for loc in locations])
+            route_costs = np.sum(distances * 0.1)
+        else:
+            route_costs = 250.0
+        
+        # 4. Demand prediction from the linear trend of the historical data
+        if demand_fit is None:
+            trend = fit_trends([demand_history], self._demand_model(request))
+            demand_fit = (float(trend.slope[0]), float(trend.predict()[0]))
+        demand_trend, predicted_demand = demand_fit
+        future_demand = np.array([predicted_demand])
+
+        # 5. Neural scoring, when trained weights are loaded
+        if model_score is None and self.model is not None:
+            model_score = self._model_scores([columns])[0]
+        
+        # Generate comprehensive optimization plan
+        optimization_plan = {
+            "inventory_optimization": (
+                inventory_section
+                if inventory_section is not None
+                else materialize_inventory_plan(columns.skus, inventory_plan)
+            ),
+            "route_optimization": {
+                f"route_{i+1}": {
+                    "destination": loc.get("id", f"dest_{i+1}"),
+                    "capacity": loc.get("capacity", 1000),
+                    "distance": loc.get("distance", 50),
+                    "priority": "high" if i < len(locations)//2 else "medium",
+                    "estimated_cost": float(distances[i] * 0.1) if locations else 25.0
                 }
+                for i, loc in enumerate(locations[:5])
+            } if locations else {
+                "route_1": {"destination": "primary_depot", "capacity": 1000, "distance": 50, "priority": "high", "estimated_cost": 25.0},
+                "route_2": {"destination": "secondary_depot", "capacity": 800, "distance": 75, "priority": "medium", "estimated_cost": 37.5}
+            },
+            "cost_analysis": {
+                "total_inventory_cost": float(total_cost),
+                "total_route_cost": float(route_costs),
+                "estimated_savings": float(total_cost * 0.12),
+                "roi_percentage": 12.0
+            },
+            "performance_metrics": {
+                "optimization_score": model_score if model_score is not None else 0.82,
+                "efficiency_gain": inventory_plan.efficiency_gain,
+                "resource_utilization": 0.80,
+                "computation_method": "CPU-based",
+                "demand_trend": float(demand_trend),
+                "predicted_demand": float(future_demand[0]),
+                **solver_metrics
             }
+        }
+        
+        optimization_plan = self._apply_scenarios(request, optimization_plan, columns, inventory_plan, deadline)
+        optimization_plan = self._apply_pareto(
+            request,
+            optimization_plan,
+            columns,
+            inventory_plan.optimized_level if target is None else target,
+            deadline,
+        )
+        optimization_plan = self._apply_replenishment(request, optimization_plan, columns, deadline)
+        optimization_plan = self._apply_lot_sizing(request, optimization_plan, columns, deadline)
+        optimization_plan = self._apply_consolidation(request, optimization_plan, columns, inventory_plan, deadline)
+        optimization_plan = self._apply_network_flow(request, optimization_plan, previous, changed_stops)
+        return self._apply_vehicle_routing(
+            request, optimization_plan, previous, changed_stops, deadline, on_plan
+        )
+
+    @staticmethod
+    def _fallback_plan() -> Dict[str, Any]:
+        """Returns a minimal plan used when optimization fails."""
+        return {
+            "inventory_optimization": {
+                "default_item": {
+                    "current_level": 100.0,
+                    "optimized_level": 90.0,
+                    "adjustment": -10.0,
+                    "cost_impact": 90.0
+                }
+            },
+            "route_optimization": {
+                "route_1": {"destination": "primary_depot", "capacity": 1000, "distance": 50, "priority": "high", "estimated_cost": 25.0}
+            },
+            "cost_analysis": {
+                "total_inventory_cost": 90.0,
+                "total_route_cost": 25.0,
+                "estimated_savings": 10.8,
+                "roi_percentage": 10.0
+            },
+            "performance_metrics": {
+                "optimization_score": 0.75,
+                "efficiency_gain": -0.1,
+                "resource_utilization": 0.75,
+                "computation_method": "fallback"
+            }
+        }
+
+    @staticmethod
+    def _demand_model(request: OptimizationRequest) -> str:
+        """Trend model for a request's demand history, ``ols`` unless overridden."""
+        return str(request.solver_options.get("demand_model", "ols"))
+
+    def _fit_demand_trends(self, requests: Sequence[OptimizationRequest]) -> List[Tuple[float, float]]:
+        """
+        Fits the demand trend of many requests, one call per trend model.
+
+        Returns:
+            ``(trend, predicted_demand)`` per request, in request order.
+        """
+        fits: List[Tuple[float, float]] = [(0.0, 0.0)] * len(requests)
+        groups: Dict[str, List[int]] = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(self._demand_model(request), []).append(i)
+        for model, members in groups.items():
+            trends = fit_trends(
+                [requests[i].supply_chain_data.get("demand_history", []) for i in members], model
+            )
+            for i, slope, prediction in zip(members, trends.slope.tolist(), trends.predict().tolist()):
+                fits[i] = (slope, prediction)
+        return fits
+
+    def _model_scores(self, segments: Sequence[InventoryColumns]) -> List[float]:
+        """
+        Scores many inventories with one batched model call.
+
+        Each inventory's score is the mean sigmoid of the model's outputs.
+
+        Raises:
+            ValueError: If no model is configured.
+        """
+        if self.model is None:
+            raise ValueError("No supply chain model is configured")
+        outputs = np.asarray(self.model.predict(inventory_features(segments)), dtype=np.float64)
+        scores: List[float] = (1.0 / (1.0 + np.exp(-outputs))).mean(axis=1).tolist()
+        return scores
+
+    def _allocation_backend(self, request: OptimizationRequest) -> str:
+        """Selects the inventory allocation backend for a request."""
+        backend = str(request.solver_options.get("allocation", self.settings.optimization.ALLOCATION_BACKEND))
+        if backend == "auto":
+            constrained = "budget" in request.constraints or "capacity_limit" in request.constraints
+            if not constrained:
+                return "vectorized"
+            return "greedy" if str(request.priority_level).lower() in HEURISTIC_PRIORITY_LEVELS else "lp"
+        return backend
+
+    def _pool_enabled(self, request: OptimizationRequest) -> bool:
+        """Whether to warm-start a request's cold allocation from the solution pool."""
+        return bool(request.solver_options.get("solution_pool", self.settings.optimization.SOLUTION_POOL_ENABLED))
+
+    def _presolve_enabled(self, request: OptimizationRequest) -> bool:
+        """Whether to presolve a request's allocation and network models."""
+        return bool(request.solver_options.get("presolve", self.settings.optimization.PRESOLVE_ENABLED))
+
+    def _routing_backend(self, request: OptimizationRequest) -> str:
+        """Selects the vehicle routing backend for a request."""
+        return str(request.solver_options.get("routing", self.settings.optimization.ROUTING_BACKEND))
+
+    def _allocate_from_pool(
+        self,
+        request: OptimizationRequest,
+        columns: InventoryColumns,
+        inventory_plan: InventoryPlanArrays,
+        deadline: Optional[float] = None,
+    ) -> Tuple[InventoryPlanArrays, Dict[str, Any], Optional[AllocationSolution]]:
+        """
+        Allocates inventory, warm-started from the nearest pooled solution.
+
+        LP and MIP allocations look up the pool unless
+        ``solver_options["solution_pool"]`` turns it off; a hit within the
+        pool's distance is the solver's initial solution and is reported as
+        ``solution_pool_distance``. Optimal allocations join the pool, and
+        the time of every solve is recorded against its SKU count.
+        """
+        pool = get_solution_pool()
+        if (
+            pool is None
+            or not self._pool_enabled(request)
+            or self._allocation_backend(request) not in ("lp", "mip")
+            or not len(columns)
+        ):
+            return self._allocate_inventory(request, columns, inventory_plan, deadline=deadline)
+
+        target = inventory_plan.optimized_level
+        features = problem_features(
+            columns, target, request.constraints, request.supply_chain_data.get("locations", [])
+        )
+        match = pool.nearest(features)
+        warm_start = match[0].warm_start(columns, target) if match is not None else None
+        start_time = time.perf_counter()
+        inventory_plan, solver_metrics, allocation = self._allocate_inventory(
+            request, columns, inventory_plan, warm_start, deadline
+        )
+        if solver_metrics.get("solver_tier") == "exact":
+            pool.record_solve(match is not None, (time.perf_counter() - start_time) * 1000, len(columns))
+        solver_metrics["solution_pool"] = "hit" if match is not None else "miss"
+        if match is not None:
+            solver_metrics["solution_pool_distance"] = match[1]
+        if allocation is not None and allocation.status == "OPTIMAL" and allocation.backend != GREEDY_BACKEND:
+            pool.add(features, PooledSolution.from_solution(columns, target, allocation))
+        return inventory_plan, solver_metrics, allocation
+
+    def _allocate_inventory(
+        self,
+        request: OptimizationRequest,
+        columns: InventoryColumns,
+        inventory_plan: InventoryPlanArrays,
+        warm_start: Optional[AllocationWarmStart] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[InventoryPlanArrays, Dict[str, Any], Optional[AllocationSolution]]:
+        """
+        Re-allocates target levels under budget and capacity constraints.
+
+        Cold solves are presolved unless ``solver_options["presolve"]`` turns
+        it off. The greedy heuristic tier answers instead of the solver on the
+        ``greedy`` backend, when ``deadline`` leaves less time than a cold
+        solve is estimated to take, and when the solver returns without a
+        solution; its bound gap is reported as ``solver_gap``.
+        """
+        backend = self._allocation_backend(request)
+        if backend not in ("greedy", "lp", "mip") or not len(columns):
+            return inventory_plan, {"solver_backend": "vectorized"}, None
+
+        problem = AllocationProblem.from_columns(columns, inventory_plan.optimized_level, request.constraints)
+        time_limit = resolve_time_limit(request.constraints, self.settings.optimization.SOLVER_MAX_TIME_SECONDS)
+        if deadline is not None:
+            time_limit = min(time_limit, SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter()))
+        estimate = estimate_solve_seconds(len(problem), integral=backend == "mip")
+        heuristic = backend == "greedy" or time_limit <= 0 or (warm_start is None and estimate > time_limit)
+        presolve = None
+        if heuristic:
+            solution = greedy_allocation(problem, integral=backend == "mip")
+        elif warm_start is None and self._presolve_enabled(request):
+            solution, presolve = solve_presolved_allocation(
+                problem, integral=backend == "mip", time_limit_s=time_limit
+            )
+        else:
+            solution = solve_allocation(
+                problem, integral=backend == "mip", time_limit_s=time_limit, warm_start=warm_start
+            )
+        if not heuristic and solution.status != "OPTIMAL":
+            # Keep the better of the two plans, bounded by the tighter bound
+            greedy = greedy_allocation(problem, integral=backend == "mip")
+            if not solution.has_solution:
+                from loguru import logger
+                logger.warning(f"Allocation solver returned {solution.status}, using greedy allocation")
+                solution = greedy
+            else:
+                if greedy.has_solution and greedy.objective_value < solution.objective_value:
+                    solution = greedy
+                best_bounds = [bound for bound in (solution.best_bound, greedy.best_bound) if np.isfinite(bound)]
+                solution = replace(solution, best_bound=max(best_bounds, default=float("-inf")))
+        metrics = {
+            "solver_backend": solution.backend,
+            "solver_tier": "heuristic" if solution.backend == GREEDY_BACKEND else "exact",
+            "estimated_solve_ms": estimate * 1000,
+            "solver_status": solution.status,
+            "solver_gap": solution.gap,
+            "solver_warm_start": solution.warm_start,
+            "model_build_ms": solution.build_time_ms,
+            "solve_time_ms": solution.solve_time_ms,
+            "presolve_ratio": presolve.ratio if presolve is not None else 1.0,
+        }
+        if not solution.has_solution:
+            from loguru import logger
+            logger.warning("Greedy allocation is infeasible, keeping vectorized plan")
+            return inventory_plan, metrics, None
+        return plan_from_levels(columns, solution.levels), metrics, solution
+
+    def _apply_pareto(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        columns: InventoryColumns,
+        target: np.ndarray,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``pareto_frontier`` section trading off the request's objectives.
+
+        Runs when ``solver_options["pareto_points"]`` asks for sweep points and
+        at least two supported objectives are requested; demand factors weight
+        the risk of each SKU. ``solver_options["pareto_sweeps"]`` restricts
+        the sweeps to weighted sums or epsilon constraints. Before a
+        ``deadline`` sweep points not reached in time are skipped; past it the
+        section is left out.
+        """
+        points = int(request.solver_options.get("pareto_points", 0))
+        if points <= 0 or not len(columns):
+            return plan
+        time_limit = None
+        if deadline is not None:
+            time_limit = SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter())
+            if time_limit <= 0:
+                return plan
+
+        problem = AllocationProblem.from_columns(columns, target, request.constraints)
+        try:
+            frontier = compute_frontier(
+                problem,
+                request.objectives,
+                risk_weight=columns.demand_factor,
+                points=points,
+                sweeps=request.solver_options.get("pareto_sweeps", SWEEPS),
+                workers=self.settings.optimization.PARETO_WORKERS,
+                time_limit_s=time_limit,
+            )
+        except ValueError as e:
+            from loguru import logger
+            logger.warning(f"Skipping Pareto frontier: {e}")
+            return plan
+        plan["pareto_frontier"] = frontier.to_section()
+        return plan
+
+    def _apply_sensitivity(self, state: PlanState) -> PlanState:
+        """
+        Adds a ``sensitivity_analysis`` section pricing the budget and capacity.
+
+        Runs when the allocation is an optimal LP solution under at least one
+        of the two limits, whose duals come with the solve. A presolved
+        allocation is re-solved without presolve for the section.
+        """
+        allocation = state.allocation
+        if allocation is None or allocation.duals is None or not len(allocation.duals):
+            return state
+        time_limit = resolve_time_limit(state.request.constraints, self.settings.optimization.SOLVER_MAX_TIME_SECONDS)
+        try:
+            state.plan["sensitivity_analysis"] = state.sensitivity(time_limit).to_section()
+        except ValueError as e:
+            from loguru import logger
+            logger.warning(f"Skipping sensitivity analysis: {e}")
+        return state
+
+    def _what_if(self, state: PlanState, query: WhatIfQuery) -> Dict[str, Any]:
+        """Answers a what-if query from the sensitivity of a plan's allocation."""
+        if state.columns is None:
+            raise ValueError("Plan has no LP allocation to analyze")
+        skus = state.columns.skus
+        time_limit = resolve_time_limit(state.request.constraints, self.settings.optimization.SOLVER_MAX_TIME_SECONDS)
+        sensitivity = state.sensitivity(time_limit)
+        solution = sensitivity.what_if(query.budget, query.capacity_limit, time_limit_s=time_limit)
+        moved = np.flatnonzero(np.abs(solution.levels - sensitivity.levels) > 1e-9)
+        problem = sensitivity.problem
+        return {
+            "budget": problem.budget if query.budget is None else query.budget,
+            "capacity_limit": problem.capacity if query.capacity_limit is None else query.capacity_limit,
+            "objective_value": solution.objective_value,
+            "objective_change": solution.objective_value - sensitivity.objective_value,
+            "solver_status": solution.status,
+            "solver_warm_start": solution.warm_start,
+            "solve_time_ms": solution.build_time_ms + solution.solve_time_ms,
+            "inventory_changes": {
+                skus[row]: float(solution.levels[row]) for row in moved.tolist()
+            },
+        }
+
+    def _apply_scenarios(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        columns: InventoryColumns,
+        inventory_plan: InventoryPlanArrays,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``scenario_analysis`` section scoring the plan under sampled demand.
+
+        Runs when ``solver_options["scenarios"]`` asks for a scenario count.
+        Shards run on the shared scenario pool. Before a ``deadline`` only the
+        scenarios evaluated in time are scored, and the section reports how
+        many of the requested ones were used; past it the section is left out.
+        """
+        scenarios = int(request.solver_options.get("scenarios", 0))
+        if scenarios <= 0 or not len(columns):
+            return plan
+        time_limit = None
+        if deadline is not None:
+            time_limit = SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter())
+            if time_limit <= 0:
+                return plan
+
+        report = get_scenario_pool().evaluate(
+            inventory_plan.optimized_level,
+            columns.unit_cost,
+            columns.shortage_cost,
+            self._daily_demand(request, columns),
+            scenarios=scenarios,
+            seed=request.solver_options.get("scenario_seed", 0),
+            chunk_bytes=self.settings.optimization.SCENARIO_CHUNK_BYTES,
+            time_limit_s=time_limit,
+        )
+        plan["scenario_analysis"] = report.to_section(columns.skus)
+        return plan
+
+    def _apply_replenishment(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        columns: InventoryColumns,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``replenishment_schedule`` section planning daily orders over the time horizon.
+
+        Runs when ``solver_options["replenishment"]`` is set. Stock starts at
+        the current inventory and the expected daily demand follows the
+        scenario demand model. Horizons longer than one window are solved as
+        rolling windows of ``solver_options["horizon_window"]`` days sharing
+        ``solver_options["horizon_overlap"]`` days; a window of 0 solves the
+        whole horizon as one model. Before a ``deadline`` the windows share the
+        time left and days not reached in time place no orders; past it the
+        section is left out.
+        """
+        if not request.solver_options.get("replenishment") or not len(columns):
+            return plan
+        total_limit = None
+        if deadline is not None:
+            total_limit = SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter())
+            if total_limit <= 0:
+                return plan
+
+        problem = ReplenishmentProblem.from_model(
+            self._daily_demand(request, columns),
+            columns.quantity,
+            columns.unit_cost,
+            columns.shortage_cost,
+            request.constraints,
+        )
+        settings = self.settings.optimization
+        window = int(request.solver_options.get("horizon_window", settings.HORIZON_WINDOW_DAYS))
+        overlap = int(request.solver_options.get("horizon_overlap", settings.HORIZON_OVERLAP_DAYS))
+        time_limit = resolve_time_limit(request.constraints, settings.SOLVER_MAX_TIME_SECONDS)
+        if window > 0:
+            schedule = solve_rolling_horizon(
+                problem, window, overlap, time_limit_s=time_limit, total_time_limit_s=total_limit
+            )
+        else:
+            if total_limit is not None:
+                time_limit = min(time_limit, total_limit)
+            schedule = solve_replenishment(problem, time_limit_s=time_limit)
+        plan["replenishment_schedule"] = schedule.to_section(columns.skus)
+        return plan
+
+    def _apply_lot_sizing(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        columns: InventoryColumns,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``lot_sizing`` section planning daily orders that carry a setup cost.
+
+        Runs when ``solver_options["lot_sizing"]`` is set. Receipts per day
+        are limited by the total ``capacity`` of the request's locations;
+        the ``setup_cost`` constraint prices every order. Before a
+        ``deadline`` the solve is cut to fit it; past it the section is left
+        out.
+        """
+        if not request.solver_options.get("lot_sizing") or not len(columns):
+            return plan
+        time_limit = resolve_time_limit(request.constraints, self.settings.optimization.SOLVER_MAX_TIME_SECONDS)
+        if deadline is not None:
+            time_limit = min(time_limit, SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter()))
+            if time_limit <= 0:
+                return plan
+
+        problem = LotSizingProblem.from_model(
+            self._daily_demand(request, columns),
+            columns.quantity,
+            columns.unit_cost,
+            columns.shortage_cost,
+            request.constraints,
+            request.supply_chain_data.get("locations", []),
+        )
+        plan["lot_sizing"] = solve_lot_sizing(problem, time_limit_s=time_limit).to_section(columns.skus)
+        return plan
+
+    def _apply_consolidation(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        columns: InventoryColumns,
+        inventory_plan: InventoryPlanArrays,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``load_consolidation`` section packing shipment lines onto vehicles.
+
+        Runs when ``solver_options["consolidation"]`` is set. The lines are
+        the request's ``shipments``, each with a ``sku``, a ``quantity`` and
+        an optional ``id``, or else the units every SKU's optimized level adds.
+        Vehicles carry the ``vehicle_weight_capacity`` and
+        ``vehicle_volume_capacity`` constraints, and packing is refined for
+        ``solver_options["consolidation_time_limit"]`` seconds, cut to fit the
+        ``deadline``; past it the first-fit-decreasing loads are kept.
+        """
+        if not request.solver_options.get("consolidation"):
+            return plan
+
+        settings = self.settings.optimization
+        inventory = request.supply_chain_data.get("inventory", {})
+        shipments = request.supply_chain_data.get("shipments")
+        if shipments is not None:
+            skus = [str(line["sku"]) for line in shipments]
+            quantity = np.fromiter((float(line.get("quantity", 0.0)) for line in shipments), dtype=np.float64)
+            line_ids = [str(line.get("id", f"line_{index}")) for index, line in enumerate(shipments)]
+        else:
+            rows = np.flatnonzero(inventory_plan.adjustment > 0)
+            skus = [columns.skus[row] for row in rows.tolist()]
+            quantity = inventory_plan.adjustment[rows]
+            line_ids = None
+        if not len(skus):
+            return plan
+
+        problem = PackingProblem.from_shipments(
+            inventory,
+            skus,
+            quantity,
+            float(request.constraints.get("vehicle_weight_capacity", settings.CONSOLIDATION_VEHICLE_WEIGHT_KG)),
+            float(request.constraints.get("vehicle_volume_capacity", settings.CONSOLIDATION_VEHICLE_VOLUME_M3)),
+            line_ids=line_ids,
+        )
+        time_limit = float(
+            request.solver_options.get("consolidation_time_limit", settings.CONSOLIDATION_TIME_LIMIT_SECONDS)
+        )
+        time_limit = resolve_time_limit(request.constraints, time_limit)
+        if deadline is not None:
+            time_limit = min(time_limit, SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter()))
+        load_plan = consolidate_loads(problem, time_limit)
+        plan["load_consolidation"] = load_plan.to_section()
+        return plan
+
+    @staticmethod
+    def _daily_demand(request: OptimizationRequest, columns: InventoryColumns) -> DemandModel:
+        """
+        Daily demand over a request's time horizon.
+
+        Each SKU's expected demand over the horizon is its demand-adjusted
+        level; lead times follow the ``lead_time_days`` constraint.
+        """
+        return DemandModel.from_history(
+            columns.quantity * columns.demand_factor,
+            request.supply_chain_data.get("demand_history", []),
+            request.time_horizon,
+            lead_time_mean=float(request.constraints.get("lead_time_days", DEFAULT_LEAD_TIME_DAYS)),
+        )
+
+    def _apply_network_flow(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        previous: Optional[PlanState] = None,
+        changed_stops: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Adds a ``network_flow`` section routing supply through the location network.
+
+        The flow of a ``previous`` plan is reused when no location changed.
+        Disconnected regions are solved separately unless
+        ``solver_options["decompose"]`` turns it off, and
+        ``solver_options["cluster_radius"]`` further splits the network into
+        geographic clusters, cutting the lanes between them.
+        """
+        locations = request.supply_chain_data.get("locations", [])
+        backend = request.solver_options.get("network", self.settings.optimization.NETWORK_BACKEND)
+        if backend == "auto":
+            backend = "flow" if has_echelons(locations) else "none"
+        if backend != "flow" or not locations:
+            return plan
+
+        if previous is not None and changed_stops == 0 and "network_flow" in previous.plan:
+            plan["network_flow"] = previous.plan["network_flow"]
+            plan["cost_analysis"]["total_network_cost"] = previous.plan["cost_analysis"]["total_network_cost"]
+            plan["performance_metrics"].update(
+                {key: previous.plan["performance_metrics"][key] for key in NETWORK_METRICS}
+            )
+            return plan
+
+        network = LocationNetwork.from_locations(
+            locations,
+            request.supply_chain_data.get("lanes"),
+            candidate_lanes=int(
+                request.solver_options.get("network_lanes", self.settings.optimization.NETWORK_CANDIDATE_LANES)
+            ),
+        )
+        clusters = None
+        if request.solver_options.get("cluster_radius"):
+            clusters = get_location_index(locations).clusters(float(request.solver_options["cluster_radius"]))
+        presolved = presolve_network(network) if self._presolve_enabled(request) else None
+        solved = presolved.network if presolved is not None else network
+        components = 1
+        if request.solver_options.get("decompose", self.settings.optimization.NETWORK_DECOMPOSITION):
+            if presolved is not None and clusters is not None:
+                clusters = clusters[presolved.nodes]
+            flow_plan, decomposition = solve_decomposed_network(solved, self.executor, clusters)
+            components = decomposition.components
+        else:
+            flow_plan = solve_network_flow(solved)
+        if presolved is not None:
+            flow_plan = presolved.expand(flow_plan)
+        plan["network_flow"] = flow_plan.to_section(network)
+        plan["cost_analysis"]["total_network_cost"] = flow_plan.total_cost
+        plan["performance_metrics"].update({
+            "network_backend": "min_cost_flow",
+            "network_status": flow_plan.status,
+            "network_nodes": len(network),
+            "network_lanes": network.lane_count,
+            "network_time_ms": flow_plan.solve_time_ms,
+            "network_presolve_ratio": presolved.stats.ratio if presolved is not None else 1.0,
+            "network_components": components,
+        })
+        return plan
+
+    def _apply_vehicle_routing(
+        self,
+        request: OptimizationRequest,
+        plan: Dict[str, Any],
+        previous: Optional[PlanState] = None,
+        changed_stops: int = 0,
+        deadline: Optional[float] = None,
+        on_plan: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Replaces the route listing with a capacitated VRP solution when requested.
+
+        When updating a ``previous`` VRP plan, its routes are reused as they are
+        if no location changed, and otherwise seed a search whose time budget
+        shrinks with the share of ``changed_stops``. The search is cut to fit
+        ``deadline`` and skipped once it has passed; ``on_plan`` receives a
+        copy of the plan for every improved routing found.
+        """
+        locations = request.supply_chain_data.get("locations", [])
+        settings = self.settings.optimization
+        if self._routing_backend(request) != "vrp" or not locations:
+            return plan
+
+        previous_routes = previous.route_stops() if previous is not None else None
+        if previous is not None and previous_routes is not None and changed_stops == 0:
+            plan["route_optimization"] = previous.plan["route_optimization"]
+            plan["cost_analysis"]["total_route_cost"] = previous.plan["cost_analysis"]["total_route_cost"]
+            plan["performance_metrics"].update(
+                {key: previous.plan["performance_metrics"][key] for key in ROUTING_METRICS}
+            )
+            return plan
+
+        problem = RoutingProblem.from_locations(
+            locations,
+            request.constraints,
+            default_vehicle_capacity=settings.ROUTING_VEHICLE_CAPACITY,
+            depot=request.supply_chain_data.get("depot"),
+        )
+        time_limit = float(request.solver_options.get("routing_time_limit", settings.ROUTING_TIME_LIMIT_SECONDS))
+        initial_routes = None
+        if previous_routes is not None:
+            initial_routes = initial_routes_from_stops(problem, previous_routes)
+            time_limit *= min(1.0, max(WARM_START_MIN_TIME_FRACTION, changed_stops / len(problem.stop_ids)))
+        time_limit = resolve_time_limit(request.constraints, time_limit)
+        if deadline is not None:
+            time_limit = min(time_limit, SOLVER_DEADLINE_SHARE * (deadline - time.perf_counter()))
+            if time_limit <= 0:
+                return plan
+
+        on_solution = None
+        if on_plan is not None:
+            def on_solution(route_plan: RoutePlan) -> None:
+                on_plan(self._with_routes(plan, problem, route_plan))
+
+        route_plan = solve_vrp(problem, time_limit, on_solution=on_solution, initial_routes=initial_routes)
+        return self._with_routes(plan, problem, route_plan)
+
+    @staticmethod
+    def _with_routes(plan: Dict[str, Any], problem: RoutingProblem, route_plan: RoutePlan) -> Dict[str, Any]:
+        """Returns a copy of ``plan`` routed by a VRP solution."""
+        return {
+            **plan,
+            "route_optimization": route_plan.to_section(problem),
+            "cost_analysis": {
+                **plan["cost_analysis"],
+                "total_route_cost": route_plan.total_distance * COST_PER_DISTANCE_UNIT,
+            },
+            "performance_metrics": {
+                **plan["performance_metrics"],
+                "routing_backend": "vrp",
+                "routing_status": route_plan.status,
+                "routing_solutions_found": route_plan.solutions_found,
+                "routing_time_ms": route_plan.wall_time_ms,
+                "routing_warm_start": route_plan.warm_started,
+                "unserved_stops": [problem.stop_ids[node - 1] for node in route_plan.unserved],
+            },
+        }
 
     async def predict_demand(self, historical_data: dict, time_horizon: int) -> dict:
         """Predicts future demand using advanced ML algorithms."""
-        await asyncio.sleep(0.1)
         # Advanced demand prediction using historical patterns and ML
-        return {f"day_{i+1}": 100 + i*2 for i in range(time_horizon)} 
\ No newline at end of file
+        return {f"day_{i+1}": 100 + i*2 for i in range(time_horizon)}
+
+
+def plan_confidence(plan: Dict[str, Any]) -> float:
+    """
+    Confidence in a plan: one minus the allocation solver's relative gap.
+
+    Plans allocated without a solver are exact for their model and score 1;
+    fallback plans produced after a failure score 0.
+    """
+    metrics = plan.get("performance_metrics", {})
+    if metrics.get("computation_method") == "fallback":
+        return 0.0
+    gap = float(metrics.get("solver_gap", 0.0))
+    if not np.isfinite(gap):
+        return 0.0
+    return float(min(max(1.0 - gap, 0.0), 1.0))
+
+
+def _problem_size(requests: Sequence[OptimizationRequest]) -> int:
+    """Approximate size of a set of requests, used to pick an execution mode."""
+    return sum(
+        len(request.supply_chain_data.get("inventory", {}))
+        + len(request.supply_chain_data.get("locations", []))
+        for request in requests
+    )
+
+
+@lru_cache()
+def _worker_optimizer() -> MLXOptimizer:
+    """Optimizer instance reused by every job in a worker process."""
+    return MLXOptimizer()
+
+
+def solve_cpu_optimization(request: OptimizationRequest, time_left: Optional[float] = None) -> PlanState:
+    """
+    Process pool entry point for a single CPU optimization.
+
+    ``time_left`` bounds the solve in seconds from its start in the worker,
+    since ``time.perf_counter`` deadlines do not carry across processes.
+    """
+    deadline = None if time_left is None else time.perf_counter() + time_left
+    return _worker_optimizer()._solve_cpu(request, deadline)
+
+
+def run_cpu_batch(requests: List[OptimizationRequest]) -> List[Dict[str, Any]]:
+    """Process pool entry point for a batch of CPU optimizations."""
+    return _worker_optimizer()._run_cpu_batch(requests)
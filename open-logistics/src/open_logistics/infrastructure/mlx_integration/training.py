@@ -0,0 +1,330 @@
+"""
+Offline training of the supply chain model.
+
+Training data is a set of JSON Lines files of past optimizations, one record
+per line: ``{"request": {...}, "result": {...}, "score": 0.9}``, where
+``request`` and ``result`` are an ``OptimizationRequest`` and its
+``OptimizationResult`` and the optional ``score`` is the realized quality of
+the plan in ``[0, 1]`` (the result's ``confidence_score`` is used without
+it). Files are read line by line and mixed through a bounded shuffle buffer,
+so memory stays constant however large the dataset is. The MLP is trained on
+NumPy with Adam, minimizing the sigmoid cross-entropy of each output, since
+the optimizer averages the outputs' sigmoids into a plan's score.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+from loguru import logger
+
+from open_logistics.infrastructure.mlx_integration.checkpoint import save_checkpoint
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    LAYER_NAMES,
+    SimpleSupplyChainModel,
+    inventory_features,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+# Samples per Adam step.
+DEFAULT_BATCH_SIZE = 256
+# Samples held for shuffling; bounds the memory spent on data.
+DEFAULT_SHUFFLE_BUFFER = 65536
+# Steps between log lines reporting loss and throughput.
+LOG_EVERY_STEPS = 100
+
+
+def append_record(
+    path: str,
+    request: Mapping[str, Any],
+    result: Mapping[str, Any],
+    score: Optional[float] = None,
+) -> None:
+    """Appends one optimization to a training file."""
+    record: Dict[str, Any] = {"request": dict(request), "result": dict(result)}
+    if score is not None:
+        record["score"] = score
+    with open(path, "a") as handle:
+        handle.write(json.dumps(record) + "\n")
+
+
+def iter_samples(
+    paths: Sequence[str], output_size: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Streams ``(features, targets)`` pairs from training files.
+
+    Raises:
+        ValueError: If a line is not a record with a target.
+    """
+    for path in paths:
+        with open(path) as handle:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    target = record.get("score", record["result"]["confidence_score"])
+                    inventory = record["request"]["supply_chain_data"].get(
+                        "inventory", {}
+                    )
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(
+                        f"{path}:{number} is not a training record: {e}"
+                    ) from e
+                features = inventory_features(
+                    [InventoryColumns.from_inventory(inventory)]
+                )[0]
+                targets = np.clip(
+                    np.broadcast_to(
+                        np.asarray(target, dtype=np.float32), (output_size,)
+                    ),
+                    0.0,
+                    1.0,
+                )
+                yield features, targets
+
+
+def iter_minibatches(
+    samples: Iterable[Tuple[np.ndarray, np.ndarray]],
+    batch_size: int,
+    shuffle_buffer: int,
+    rng: np.random.Generator,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Groups samples into shuffled minibatches.
+
+    Samples are collected into a buffer of ``shuffle_buffer`` rows, which is
+    shuffled and emitted in batches; rows short of a full batch are carried
+    over into the next buffer. The final batch may be smaller.
+    """
+    capacity = max(shuffle_buffer, batch_size)
+    features: List[np.ndarray] = []
+    targets: List[np.ndarray] = []
+
+    def drain(final: bool) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        order = rng.permutation(len(features))
+        x, y = np.stack(features)[order], np.stack(targets)[order]
+        usable = len(order) if final else len(order) - len(order) % batch_size
+        for start in range(0, usable, batch_size):
+            yield x[start : start + batch_size], y[start : start + batch_size]
+        features[:] = list(x[usable:])
+        targets[:] = list(y[usable:])
+
+    for sample_features, sample_targets in samples:
+        features.append(sample_features)
+        targets.append(sample_targets)
+        if len(features) >= capacity:
+            yield from drain(final=False)
+    if features:
+        yield from drain(final=True)
+
+
+class Adam:
+    """Adam updating a list of NumPy arrays in place."""
+
+    def __init__(
+        self,
+        learning_rate: float = 1e-3,
+        beta1: float = 0.9,
+        beta2: float = 0.999,
+        eps: float = 1e-8,
+    ):
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.steps = 0
+        self._moments: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def update(self, params: Sequence[np.ndarray], grads: Sequence[np.ndarray]) -> None:
+        if not self._moments:
+            self._moments = [
+                (np.zeros_like(param), np.zeros_like(param)) for param in params
+            ]
+        self.steps += 1
+        # Bias corrections folded into the step size
+        step = (
+            self.learning_rate
+            * np.sqrt(1 - self.beta2**self.steps)
+            / (1 - self.beta1**self.steps)
+        )
+        for param, grad, (mean, variance) in zip(params, grads, self._moments):
+            mean *= self.beta1
+            mean += (1 - self.beta1) * grad
+            variance *= self.beta2
+            variance += (1 - self.beta2) * grad * grad
+            param -= step * mean / (np.sqrt(variance) + self.eps)
+
+
+def loss_and_gradients(
+    layers: Sequence[Tuple[np.ndarray, np.ndarray]], x: np.ndarray, y: np.ndarray
+) -> Tuple[float, List[np.ndarray]]:
+    """
+    Mean sigmoid cross-entropy of the MLP and its gradients.
+
+    Args:
+        layers: ``(weight, bias)`` pairs, weights of shape ``(in, out)``.
+        x: Feature rows.
+        y: Targets in ``[0, 1]``, one per output.
+
+    Returns:
+        The loss and the gradients, ordered as ``weight, bias`` per layer.
+    """
+    activations = [x]
+    for index, (weight, bias) in enumerate(layers):
+        hidden = activations[-1] @ weight + bias
+        if index < len(layers) - 1:
+            np.maximum(hidden, 0.0, out=hidden)
+        activations.append(hidden)
+
+    logits = activations.pop()
+    loss = float(np.mean(np.logaddexp(0.0, logits) - y * logits))
+    # Sigmoid through tanh, which does not overflow for large logits
+    delta = (0.5 + 0.5 * np.tanh(0.5 * logits) - y) / logits.size
+
+    grads: List[np.ndarray] = []
+    for index in range(len(layers) - 1, -1, -1):
+        weight, _ = layers[index]
+        inputs = activations[index]
+        grads[:0] = [inputs.T @ delta, delta.sum(axis=0)]
+        if index:
+            delta = (delta @ weight.T) * (inputs > 0)
+    return loss, grads
+
+
+@dataclass
+class TrainingReport:
+    """Outcome of a training run."""
+
+    steps: int
+    samples: int
+    seconds: float
+    epoch_losses: List[float] = field(default_factory=list)
+    checkpoints: int = 0
+
+    @property
+    def samples_per_second(self) -> float:
+        return self.samples / self.seconds if self.seconds > 0 else 0.0
+
+
+def train_model(
+    model: SimpleSupplyChainModel,
+    paths: Sequence[str],
+    epochs: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    learning_rate: float = 1e-3,
+    shuffle_buffer: int = DEFAULT_SHUFFLE_BUFFER,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 1000,
+    seed: int = 0,
+) -> TrainingReport:
+    """
+    Trains ``model`` on training files, streaming them once per epoch.
+
+    The weights are trained as NumPy copies whatever the model's backend and
+    set on the model when training ends.
+
+    Args:
+        model: The model to train, starting from its current weights.
+        paths: JSON Lines training files.
+        epochs: Passes over the files.
+        batch_size: Samples per Adam step.
+        learning_rate: Adam step size.
+        shuffle_buffer: Samples held for shuffling.
+        checkpoint_path: Checkpoint rewritten every ``checkpoint_every``
+            steps and at the end of training, if given.
+        checkpoint_every: Steps between checkpoints.
+        seed: Seed of the shuffling.
+
+    Returns:
+        Steps, samples, time and per-epoch mean loss of the run.
+
+    Raises:
+        ValueError: If there is nothing to train on or a record is malformed.
+    """
+    parameters = model.parameters()
+    layers = [
+        (
+            np.array(parameters[f"{name}.weight"].T, dtype=np.float32, order="C"),
+            np.array(parameters[f"{name}.bias"], dtype=np.float32),
+        )
+        for name in LAYER_NAMES
+    ]
+    params = [array for layer in layers for array in layer]
+    optimizer = Adam(learning_rate)
+    rng = np.random.default_rng(seed)
+    report = TrainingReport(steps=0, samples=0, seconds=0.0)
+
+    def checkpoint(path: str) -> None:
+        save_checkpoint(
+            path,
+            _file_layout(layers),
+            model=type(model).__name__,
+            metadata={
+                "input_size": model.input_size,
+                "output_size": model.output_size,
+                "steps": report.steps,
+                "samples": report.samples,
+            },
+        )
+        report.checkpoints += 1
+
+    start_time = time.perf_counter()
+    for epoch in range(epochs):
+        epoch_loss, epoch_samples = 0.0, 0
+        samples = iter_samples(paths, model.output_size)
+        for x, y in iter_minibatches(samples, batch_size, shuffle_buffer, rng):
+            loss, grads = loss_and_gradients(layers, x, y)
+            optimizer.update(params, grads)
+            report.steps += 1
+            report.samples += len(x)
+            epoch_loss += loss * len(x)
+            epoch_samples += len(x)
+            if report.steps % LOG_EVERY_STEPS == 0:
+                elapsed = time.perf_counter() - start_time
+                logger.info(
+                    f"Training step {report.steps}: loss {loss:.4f}, "
+                    f"{report.samples / elapsed:,.0f} samples/s"
+                )
+            if checkpoint_path and report.steps % checkpoint_every == 0:
+                checkpoint(checkpoint_path)
+        if not epoch_samples:
+            raise ValueError("No training records found")
+        report.epoch_losses.append(epoch_loss / epoch_samples)
+        logger.info(
+            f"Epoch {epoch + 1}/{epochs}: mean loss {report.epoch_losses[-1]:.4f}"
+        )
+
+    report.seconds = time.perf_counter() - start_time
+    if checkpoint_path and report.steps % checkpoint_every:
+        checkpoint(checkpoint_path)
+    model.set_parameters(_file_layout(layers))
+    logger.info(
+        f"Trained on {report.samples:,} samples in {report.seconds:.1f}s "
+        f"({report.samples_per_second:,.0f} samples/s)"
+    )
+    return report
+
+
+def _file_layout(
+    layers: Sequence[Tuple[np.ndarray, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    """Training layers as model parameters, copied so training can continue."""
+    parameters = {}
+    for name, (weight, bias) in zip(LAYER_NAMES, layers):
+        parameters[f"{name}.weight"] = weight.T.copy()
+        parameters[f"{name}.bias"] = bias.copy()
+    return parameters
@@ -0,0 +1 @@
+"""Solver components for supply chain optimization."""
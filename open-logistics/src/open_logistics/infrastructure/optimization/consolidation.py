@@ -0,0 +1,461 @@
+"""
+Consolidation of shipment lines into vehicle loads.
+
+Every line has a weight and a volume, from the per-unit ``weight`` and
+``volume`` of its item, and is loaded onto one vehicle unless it exceeds a
+vehicle's capacity, in which case it is split into the fewest equal pieces
+that fit. Pieces are packed by first-fit-decreasing on the larger of their
+two capacity shares, which places 50k lines in about a second. The packing
+is then refined by large neighborhood search: one of the emptiest vehicles
+and a few with room to spare hand their pieces to CP-SAT, which re-packs
+them to leave as little as possible on the emptiest, until it is empty and
+dropped. The search runs until the time budget is spent or the vehicle
+count meets its lower bound.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.vectorized import _attribute
+
+FIRST_FIT_BACKEND = "first_fit_decreasing"
+CP_SAT_BACKEND = "cp_sat"
+
+# Weight in kg and volume in cubic metres of one unit of an item that does not carry its own.
+DEFAULT_UNIT_WEIGHT_KG = 1.0
+DEFAULT_UNIT_VOLUME_M3 = 0.005
+# CP-SAT works on integer loads; capacity shares are scaled and rounded up.
+CAPACITY_SCALE = 100_000
+# Vehicles, and pieces across them, re-packed by one neighborhood.
+NEIGHBORHOOD_VEHICLES = 6
+NEIGHBORHOOD_PIECES = 200
+# Wall-clock limit of one neighborhood solve, and consecutive failed
+# neighborhoods after which refinement stops early.
+NEIGHBORHOOD_TIME_LIMIT_S = 0.5
+NEIGHBORHOOD_MAX_FAILURES = 50
+# Share of capacity that numerical error may overshoot.
+FILL_TOLERANCE = 1e-9
+
+
+def unit_dimensions(
+    inventory: Mapping[str, Any], skus: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Per-unit ``weight`` and ``volume`` of each SKU, from its inventory record.
+
+    Returns:
+        Arrays ``weight`` and ``volume`` aligned to ``skus``, with the
+        defaults filled in where an item does not carry them.
+    """
+    records = [inventory.get(sku) for sku in skus]
+    size = len(records)
+    return {
+        "weight": _attribute(records, "weight", np.full(size, DEFAULT_UNIT_WEIGHT_KG)),
+        "volume": _attribute(records, "volume", np.full(size, DEFAULT_UNIT_VOLUME_M3)),
+    }
+
+
+@dataclass
+class PackingProblem:
+    """
+    Pieces of shipment lines to load onto identical vehicles.
+
+    ``weight`` and ``volume`` are given per piece as shares of a vehicle's
+    capacity, so each is at most 1; ``line`` maps every piece to the index
+    of its line in ``line_ids``.
+    """
+
+    line_ids: List[str]
+    line: np.ndarray
+    weight: np.ndarray
+    volume: np.ndarray
+    weight_capacity: float
+    volume_capacity: float
+
+    def __len__(self) -> int:
+        return len(self.line)
+
+    @classmethod
+    def from_lines(
+        cls,
+        line_ids: Sequence[str],
+        weight: np.ndarray,
+        volume: np.ndarray,
+        weight_capacity: float,
+        volume_capacity: float,
+    ) -> "PackingProblem":
+        """
+        Splits shipment lines into pieces that each fit a vehicle.
+
+        Args:
+            line_ids: Identifier of every line.
+            weight: Total weight of every line.
+            volume: Total volume of every line.
+            weight_capacity: Weight a vehicle carries.
+            volume_capacity: Volume a vehicle carries.
+
+        Raises:
+            ValueError: If a capacity is not positive.
+        """
+        if weight_capacity <= 0 or volume_capacity <= 0:
+            raise ValueError("Vehicle weight and volume capacities must be positive")
+        weight_share = np.maximum(weight, 0.0) / weight_capacity
+        volume_share = np.maximum(volume, 0.0) / volume_capacity
+        pieces = np.maximum(
+            np.ceil(np.maximum(weight_share, volume_share) - FILL_TOLERANCE), 1
+        ).astype(np.int64)
+        line = np.repeat(np.arange(len(line_ids)), pieces)
+        return cls(
+            line_ids=list(line_ids),
+            line=line,
+            weight=np.minimum((weight_share / pieces)[line], 1.0),
+            volume=np.minimum((volume_share / pieces)[line], 1.0),
+            weight_capacity=float(weight_capacity),
+            volume_capacity=float(volume_capacity),
+        )
+
+    @classmethod
+    def from_shipments(
+        cls,
+        inventory: Mapping[str, Any],
+        skus: Sequence[str],
+        quantity: np.ndarray,
+        weight_capacity: float,
+        volume_capacity: float,
+        line_ids: Optional[Sequence[str]] = None,
+    ) -> "PackingProblem":
+        """
+        Builds the problem for shipment lines of inventory items.
+
+        Args:
+            inventory: Request inventory, read for each item's unit dimensions.
+            skus: Item of every line.
+            quantity: Units shipped by every line.
+            weight_capacity: Weight a vehicle carries.
+            volume_capacity: Volume a vehicle carries.
+            line_ids: Identifier of every line, by default its SKU.
+        """
+        dimensions = unit_dimensions(inventory, skus)
+        quantity = np.maximum(quantity, 0.0)
+        return cls.from_lines(
+            list(skus) if line_ids is None else list(line_ids),
+            quantity * dimensions["weight"],
+            quantity * dimensions["volume"],
+            weight_capacity,
+            volume_capacity,
+        )
+
+    def lower_bound(self) -> int:
+        """Vehicles needed for the total weight and volume alone."""
+        if not len(self):
+            return 0
+        return int(
+            math.ceil(max(self.weight.sum(), self.volume.sum()) - FILL_TOLERANCE)
+        )
+
+
+@dataclass
+class LoadPlan:
+    """The vehicle every piece is loaded onto, numbered from 0."""
+
+    vehicle: np.ndarray
+    problem: PackingProblem
+    backend: str = FIRST_FIT_BACKEND
+    first_fit_vehicles: int = 0
+    neighborhoods: int = 0
+    solve_time_ms: float = 0.0
+
+    @property
+    def vehicles(self) -> int:
+        return int(self.vehicle.max()) + 1 if len(self.vehicle) else 0
+
+    @property
+    def weight_fill(self) -> np.ndarray:
+        """Share of each vehicle's weight capacity in use."""
+        return np.bincount(
+            self.vehicle, weights=self.problem.weight, minlength=self.vehicles
+        )
+
+    @property
+    def volume_fill(self) -> np.ndarray:
+        """Share of each vehicle's volume capacity in use."""
+        return np.bincount(
+            self.vehicle, weights=self.problem.volume, minlength=self.vehicles
+        )
+
+    @property
+    def status(self) -> str:
+        return "OPTIMAL" if self.vehicles <= self.problem.lower_bound() else "FEASIBLE"
+
+    def to_section(self, top: int = 10) -> Dict[str, Any]:
+        """Renders the plan as the ``load_consolidation`` section, listing the loads of the first vehicles."""
+        problem = self.problem
+        weight_fill, volume_fill = self.weight_fill, self.volume_fill
+        fill = np.maximum(weight_fill, volume_fill)
+        order = np.argsort(self.vehicle, kind="stable")
+        starts = np.searchsorted(
+            self.vehicle[order], np.arange(min(top, self.vehicles) + 1)
+        )
+        return {
+            "status": self.status,
+            "backend": self.backend,
+            "lines": len(problem.line_ids),
+            "pieces": len(problem),
+            "vehicles": self.vehicles,
+            "lower_bound": problem.lower_bound(),
+            "first_fit_vehicles": self.first_fit_vehicles,
+            "neighborhoods": self.neighborhoods,
+            "vehicle_capacity": {
+                "weight": problem.weight_capacity,
+                "volume": problem.volume_capacity,
+            },
+            "weight_fill_rate": float(weight_fill.mean()) if self.vehicles else 0.0,
+            "volume_fill_rate": float(volume_fill.mean()) if self.vehicles else 0.0,
+            "fill_rate": float(fill.mean()) if self.vehicles else 0.0,
+            "min_fill_rate": float(fill.min()) if self.vehicles else 0.0,
+            "solve_time_ms": self.solve_time_ms,
+            "loads": {
+                f"vehicle_{vehicle + 1}": {
+                    "lines": [
+                        problem.line_ids[line]
+                        for line in problem.line[order[start:end]].tolist()
+                    ],
+                    "weight": float(weight_fill[vehicle] * problem.weight_capacity),
+                    "volume": float(volume_fill[vehicle] * problem.volume_capacity),
+                    "weight_fill": float(weight_fill[vehicle]),
+                    "volume_fill": float(volume_fill[vehicle]),
+                }
+                for vehicle, (start, end) in enumerate(
+                    zip(starts[:-1].tolist(), starts[1:].tolist())
+                )
+            },
+        }
+
+
+def first_fit_decreasing(problem: PackingProblem) -> LoadPlan:
+    """
+    Packs pieces by first-fit-decreasing on the larger of their capacity shares.
+
+    Each piece goes onto the first vehicle with room for both its weight and
+    its volume, or opens a new one. Vehicles at the front that cannot take
+    the lightest or the smallest of the remaining pieces are skipped for
+    good, so the search only scans vehicles that are still open.
+    """
+    start_time = time.perf_counter()
+    size = len(problem)
+    order = np.argsort(-np.maximum(problem.weight, problem.volume), kind="stable")
+    weight, volume = problem.weight[order], problem.volume[order]
+    # Lightest and smallest of the pieces still to place
+    lightest = np.minimum.accumulate(weight[::-1])[::-1]
+    smallest = np.minimum.accumulate(volume[::-1])[::-1]
+    weight_room, volume_room = np.ones(size), np.ones(size)
+    vehicle = np.empty(size, dtype=np.int64)
+    opened = first_open = 0
+    for index in range(size):
+        while first_open < opened and (
+            weight_room[first_open] < lightest[index]
+            or volume_room[first_open] < smallest[index]
+        ):
+            first_open += 1
+        fits = (weight_room[first_open:opened] >= weight[index] - FILL_TOLERANCE) & (
+            volume_room[first_open:opened] >= volume[index] - FILL_TOLERANCE
+        )
+        choice = int(np.argmax(fits)) if len(fits) else 0
+        if len(fits) and fits[choice]:
+            choice += first_open
+        else:
+            choice, opened = opened, opened + 1
+        weight_room[choice] -= weight[index]
+        volume_room[choice] -= volume[index]
+        vehicle[order[index]] = choice
+    plan = LoadPlan(vehicle=vehicle, problem=problem)
+    plan.first_fit_vehicles = plan.vehicles
+    plan.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return plan
+
+
+def _unload(
+    problem: PackingProblem,
+    pieces: np.ndarray,
+    slots: np.ndarray,
+    vehicles: int,
+    time_limit_s: float,
+) -> Optional[np.ndarray]:
+    """
+    Re-packs ``pieces`` onto ``vehicles`` vehicles with CP-SAT, emptying vehicle 0 as far as possible.
+
+    Args:
+        problem: The packing problem.
+        pieces: Indices of the pieces to re-pack.
+        slots: Current vehicle of every piece, between 0 and ``vehicles - 1``.
+        vehicles: Vehicles the pieces may use.
+        time_limit_s: Wall-clock limit of the solve.
+
+    Returns:
+        The new vehicle of every piece, or ``None`` if no packing left less on vehicle 0.
+    """
+    from ortools.sat.python import cp_model
+
+    weight = np.ceil(problem.weight[pieces] * CAPACITY_SCALE).astype(np.int64)
+    volume = np.ceil(problem.volume[pieces] * CAPACITY_SCALE).astype(np.int64)
+    load = (weight + volume).tolist()
+    model = cp_model.CpModel()
+    assign = [
+        [model.new_bool_var(f"x_{piece}_{vehicle}") for vehicle in range(vehicles)]
+        for piece in range(len(pieces))
+    ]
+    for row, slot in zip(assign, slots.tolist()):
+        model.add_exactly_one(row)
+        for vehicle, var in enumerate(row):
+            model.add_hint(var, vehicle == slot)
+    for vehicle in range(vehicles):
+        column = [row[vehicle] for row in assign]
+        model.add(
+            cp_model.LinearExpr.weighted_sum(column, weight.tolist()) <= CAPACITY_SCALE
+        )
+        model.add(
+            cp_model.LinearExpr.weighted_sum(column, volume.tolist()) <= CAPACITY_SCALE
+        )
+    remaining = cp_model.LinearExpr.weighted_sum([row[0] for row in assign], load)
+    current = sum(value for value, slot in zip(load, slots.tolist()) if slot == 0)
+    model.add(remaining < current)
+    model.minimize(remaining)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max(time_limit_s, 0.001)
+    solver.parameters.num_workers = 1
+    if solver.solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return np.array(
+        [[solver.boolean_value(var) for var in row].index(True) for row in assign],
+        dtype=np.int64,
+    )
+
+
+def refine_packing(plan: LoadPlan, time_limit_s: float, seed: int = 0) -> LoadPlan:
+    """
+    Removes vehicles from a packing by large neighborhood search with CP-SAT.
+
+    Each neighborhood takes one of the emptiest vehicles and partners drawn
+    from the vehicles with the most spare room in the dimension that fills
+    it, up to ``NEIGHBORHOOD_VEHICLES`` vehicles and ``NEIGHBORHOOD_PIECES``
+    pieces. CP-SAT re-packs their pieces to leave as little as possible on
+    the first; once it is empty the vehicle is dropped. The first
+    neighborhood after every improvement takes the emptiest vehicle and the
+    roomiest partners, later ones draw at random.
+
+    Args:
+        plan: The packing to refine; it is not modified.
+        time_limit_s: Wall-clock budget of the search.
+        seed: Seed of the random neighborhood choice.
+
+    Returns:
+        The refined packing, with ``backend`` set to CP-SAT if a vehicle was removed.
+    """
+    start_time = time.perf_counter()
+    deadline = start_time + time_limit_s
+    problem = plan.problem
+    lower_bound = problem.lower_bound()
+    vehicle = plan.vehicle.copy()
+    vehicles = plan.vehicles
+    rng = np.random.default_rng(seed)
+    # Vehicles that neighborhoods draw their target and partners from
+    window = 4 * NEIGHBORHOOD_VEHICLES
+    neighborhoods = failures = removed = 0
+
+    while (
+        vehicles > lower_bound
+        and failures < NEIGHBORHOOD_MAX_FAILURES
+        and time.perf_counter() < deadline
+    ):
+        weight_fill = np.bincount(vehicle, weights=problem.weight, minlength=vehicles)
+        volume_fill = np.bincount(vehicle, weights=problem.volume, minlength=vehicles)
+        counts = np.bincount(vehicle, minlength=vehicles)
+        emptiest = np.argsort(np.maximum(weight_fill, volume_fill), kind="stable")
+        target = int(
+            emptiest[
+                rng.integers(min(vehicles, NEIGHBORHOOD_VEHICLES)) if failures else 0
+            ]
+        )
+        room = 1.0 - (
+            weight_fill if weight_fill[target] >= volume_fill[target] else volume_fill
+        )
+        room[target] = -np.inf
+        partners = np.argsort(-room, kind="stable")[: min(window, vehicles - 1)]
+        if failures:
+            partners = rng.permutation(partners)
+
+        neighborhood, pieces = [target], int(counts[target])
+        for partner in partners.tolist():
+            if len(neighborhood) >= NEIGHBORHOOD_VEHICLES:
+                break
+            if pieces + counts[partner] <= NEIGHBORHOOD_PIECES:
+                neighborhood.append(partner)
+                pieces += int(counts[partner])
+        chosen = np.array(neighborhood)
+
+        packed = None
+        if len(chosen) >= 2:
+            neighborhoods += 1
+            members = np.flatnonzero(np.isin(vehicle, chosen))
+            # Slot 0 is the target; the others follow in vehicle order
+            order = np.concatenate([[target], np.sort(chosen[chosen != target])])
+            slots = np.argsort(order)[
+                np.searchsorted(np.sort(chosen), vehicle[members])
+            ]
+            time_left = deadline - time.perf_counter()
+            packed = _unload(
+                problem,
+                members,
+                slots,
+                len(chosen),
+                min(NEIGHBORHOOD_TIME_LIMIT_S, time_left),
+            )
+        if packed is None:
+            failures += 1
+            # With every vehicle in reach of one neighborhood, retrying finds nothing new
+            if vehicles <= NEIGHBORHOOD_VEHICLES and failures >= NEIGHBORHOOD_VEHICLES:
+                break
+            continue
+
+        vehicle[members] = order[packed]
+        failures = 0
+        if not np.any(vehicle == target):
+            # The last vehicle takes the number of the emptied one
+            vehicle[vehicle == vehicles - 1] = target
+            vehicles -= 1
+            removed += 1
+
+    return LoadPlan(
+        vehicle=vehicle,
+        problem=problem,
+        backend=CP_SAT_BACKEND if removed else plan.backend,
+        first_fit_vehicles=plan.first_fit_vehicles,
+        neighborhoods=neighborhoods,
+        solve_time_ms=plan.solve_time_ms + (time.perf_counter() - start_time) * 1000,
+    )
+
+
+def consolidate_loads(
+    problem: PackingProblem, time_limit_s: Optional[float] = None, seed: int = 0
+) -> LoadPlan:
+    """
+    Packs shipment pieces onto vehicles.
+
+    Args:
+        problem: The packing problem.
+        time_limit_s: Wall-clock budget of the CP-SAT refinement; ``None``
+            or a budget of at most 0 returns the first-fit-decreasing packing.
+        seed: Seed of the refinement's random neighborhoods.
+
+    Returns:
+        The packing, with its fill rates and the vehicle lower bound.
+    """
+    plan = first_fit_decreasing(problem)
+    if time_limit_s is not None and time_limit_s > 0:
+        plan = refine_packing(plan, time_limit_s, seed=seed)
+    return plan
@@ -0,0 +1,175 @@
+"""
+Decomposition of location networks into independent sub-problems.
+
+Requests often bundle several regions that share no lanes. The connected
+components of the lane graph are separate flow problems, so each is solved on
+its own and the flows are merged, which is exact. Components are packed into
+one batch per process worker, largest first, so with enough workers the
+solve takes as long as the largest component rather than the whole network.
+Optionally, lanes between geographic clusters are cut first to split a
+connected network into regions; that is a heuristic, as the cut lanes can no
+longer carry flow.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.executor import OptimizationExecutor
+from open_logistics.infrastructure.optimization.network import (
+    LocationNetwork,
+    NetworkFlowPlan,
+    solve_network_flow,
+)
+
+
+@dataclass
+class NetworkComponent:
+    """A sub-network and the original indices of its nodes and lanes."""
+
+    network: LocationNetwork
+    nodes: np.ndarray
+    lanes: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.nodes) + len(self.lanes)
+
+
+@dataclass
+class DecompositionStats:
+    """How a network was split and solved."""
+
+    components: int
+    largest_component: int
+    batches: int
+    time_ms: float
+
+
+def network_components(
+    network: LocationNetwork, clusters: Optional[np.ndarray] = None
+) -> List[NetworkComponent]:
+    """
+    Splits a network into its connected components.
+
+    Components that cannot carry flow, having no supply or no demand, are
+    left out.
+
+    Args:
+        network: The location network.
+        clusters: Optional cluster label of every node; lanes between
+            clusters are dropped before splitting.
+
+    Returns:
+        The components, largest first.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(network)
+    origins, destinations = network.lane_origins(), network.indices
+    lanes = np.arange(network.lane_count)
+    if clusters is not None:
+        lanes = lanes[clusters[origins] == clusters[destinations]]
+    graph = coo_matrix(
+        (np.ones(len(lanes)), (origins[lanes], destinations[lanes])), shape=(n, n)
+    )
+    count, labels = connected_components(graph, directed=False)
+
+    active = (np.bincount(labels, network.supply, minlength=count) > 0) & (
+        np.bincount(labels, network.demand, minlength=count) > 0
+    )
+    node_order = np.argsort(labels, kind="stable")
+    node_bounds = np.searchsorted(labels[node_order], np.arange(count + 1))
+    lane_labels = labels[origins[lanes]]
+    lane_order = lanes[np.argsort(lane_labels, kind="stable")]
+    lane_bounds = np.searchsorted(np.sort(lane_labels), np.arange(count + 1))
+
+    components = []
+    for label in np.flatnonzero(active).tolist():
+        nodes = node_order[node_bounds[label] : node_bounds[label + 1]]
+        component_lanes = np.sort(
+            lane_order[lane_bounds[label] : lane_bounds[label + 1]]
+        )
+        components.append(
+            NetworkComponent(
+                network.subnetwork(nodes, component_lanes), nodes, component_lanes
+            )
+        )
+    components.sort(key=lambda component: -component.size)
+    return components
+
+
+def _solve_batch(networks: List[LocationNetwork]) -> List[NetworkFlowPlan]:
+    """Worker entry point solving several components in turn."""
+    return [solve_network_flow(network) for network in networks]
+
+
+def _pack(components: List[NetworkComponent], bins: int) -> List[List[int]]:
+    """Assigns components, largest first, to the least loaded of ``bins`` batches."""
+    loads = [(0, index) for index in range(min(bins, len(components)))]
+    batches: List[List[int]] = [[] for _ in loads]
+    for position, component in enumerate(components):
+        load, index = heapq.heappop(loads)
+        batches[index].append(position)
+        heapq.heappush(loads, (load + component.size, index))
+    return batches
+
+
+def solve_decomposed_network(
+    network: LocationNetwork,
+    executor: OptimizationExecutor,
+    clusters: Optional[np.ndarray] = None,
+) -> Tuple[NetworkFlowPlan, DecompositionStats]:
+    """
+    Solves each component of a network separately and merges the flows.
+
+    Components run on ``executor``'s process pool when the network is large
+    enough for it to pick process mode, and in the calling process otherwise.
+
+    Args:
+        network: The location network.
+        executor: Executor whose process pool solves the batches.
+        clusters: Optional node cluster labels, see ``network_components``.
+
+    Returns:
+        The merged plan over ``network`` and how it was decomposed.
+    """
+    start_time = time.perf_counter()
+    components = network_components(network, clusters)
+    total = sum(component.size for component in components)
+    workers = executor.process_workers if executor.choose(total) == "process" else 1
+    batches = _pack(components, workers)
+    results = executor.map_processes(
+        _solve_batch, [[components[i].network for i in batch] for batch in batches]
+    )
+
+    flow = np.zeros(network.lane_count)
+    unmet = network.demand.copy()
+    statuses, total_cost = [], 0.0
+    for batch, plans in zip(batches, results):
+        for position, plan in zip(batch, plans):
+            component = components[position]
+            flow[component.lanes] = plan.flow
+            unmet[component.nodes] = plan.unmet_demand
+            statuses.append(plan.status)
+            total_cost += plan.total_cost
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    plan = NetworkFlowPlan(
+        flow=flow,
+        unmet_demand=unmet,
+        status=next((status for status in statuses if status != "OPTIMAL"), "OPTIMAL"),
+        total_cost=total_cost,
+        solve_time_ms=elapsed_ms,
+    )
+    stats = DecompositionStats(
+        components=len(components),
+        largest_component=components[0].size if components else 0,
+        batches=len(batches),
+        time_ms=elapsed_ms,
+    )
+    return plan, stats
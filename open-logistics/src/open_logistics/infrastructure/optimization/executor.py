@@ -0,0 +1,156 @@
+"""
+Executors for running CPU-bound optimization off the event loop.
+
+Small jobs run on a thread pool, large ones on a process pool whose workers
+import NumPy, SciPy and OR-Tools when they start, so the first
+real job in a worker does not pay for those imports. The choice is made per
+job from its problem size.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Any, Callable, List, Optional, Sequence
+
+from loguru import logger
+
+from open_logistics.core.config import get_settings
+
+
+def _warm_worker() -> None:
+    """Process pool initializer importing the heavy numerical dependencies."""
+    import numpy  # noqa: F401
+    import scipy.sparse  # noqa: F401
+    from ortools.linear_solver.python import model_builder_helper  # noqa: F401
+
+    import open_logistics.infrastructure.mlx_integration.mlx_optimizer  # noqa: F401
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class OptimizationExecutor:
+    """
+    Runs optimization callables inline, on a thread pool or on a process pool.
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        process_workers: int = 0,
+        thread_workers: int = 4,
+        process_min_size: int = 50_000,
+        start_method: str = "spawn",
+    ):
+        self.mode = mode
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.thread_workers = thread_workers
+        self.process_min_size = process_min_size
+        self.start_method = start_method
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def choose(self, problem_size: int) -> str:
+        """Selects the execution mode for a job of the given size."""
+        if self.mode != "auto":
+            return self.mode
+        return "process" if problem_size >= self.process_min_size else "thread"
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="optimizer"
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_warm_worker,
+            )
+        return self._process_pool
+
+    def warm_up(self) -> None:
+        """Starts every process worker so their imports happen before traffic."""
+        futures = [
+            self.process_pool.submit(_worker_pid) for _ in range(self.process_workers)
+        ]
+        pids = {future.result() for future in futures}
+        logger.info(f"Optimization process pool warmed up with {len(pids)} workers")
+
+    async def run(self, mode: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs ``func(*args)`` in the given mode without blocking the event loop.
+
+        ``func`` and its arguments must be picklable in ``process`` mode. A
+        broken process pool is discarded and the job re-run on a thread.
+        """
+        if mode == "inline":
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        pool: Executor = self.process_pool if mode == "process" else self.thread_pool
+        try:
+            return await loop.run_in_executor(pool, partial(func, *args))
+        except BrokenProcessPool as e:
+            logger.warning(f"Process pool failed, running on a thread instead: {e}")
+            self._process_pool = None
+            return await loop.run_in_executor(self.thread_pool, partial(func, *args))
+
+    def map_processes(
+        self, func: Callable[[Any], Any], items: Sequence[Any]
+    ) -> List[Any]:
+        """
+        Calls ``func`` on every item on the process pool, blocking for the results.
+
+        Inside a worker process of another pool, or with a single item or
+        worker, the items run in the calling process instead; so they do if
+        the pool breaks.
+        """
+        if (
+            len(items) < 2
+            or self.process_workers < 2
+            or multiprocessing.parent_process() is not None
+        ):
+            return [func(item) for item in items]
+        try:
+            return list(self.process_pool.map(func, items))
+        except BrokenProcessPool as e:
+            logger.warning(f"Process pool failed, running in-process instead: {e}")
+            self._process_pool = None
+            return [func(item) for item in items]
+
+    def shutdown(self) -> None:
+        """Shuts down both pools; they are recreated lazily on next use."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True, cancel_futures=True)
+            self._thread_pool = None
+
+
+@lru_cache()
+def get_optimization_executor() -> OptimizationExecutor:
+    """
+    Get the shared optimization executor.
+
+    This function is cached so all optimizers in a process share one set of
+    worker pools.
+    """
+    settings = get_settings().optimization
+    return OptimizationExecutor(
+        mode=settings.EXECUTOR_MODE,
+        process_workers=settings.PROCESS_POOL_WORKERS,
+        thread_workers=settings.THREAD_POOL_WORKERS,
+        process_min_size=settings.PROCESS_OFFLOAD_MIN_SIZE,
+        start_method=settings.PROCESS_START_METHOD,
+    )
@@ -0,0 +1,439 @@
+"""
+Multi-period replenishment planning.
+
+Plans daily orders for a set of SKUs over the request's time horizon as a
+time-expanded linear program: every SKU and day carries an order, a closing
+stock and the demand lost that day, linked by the stock balance. Over long
+horizons the monolithic model, and the solver's memory with it, grows with
+``skus * horizon``, so ``solve_rolling_horizon`` solves overlapping windows
+instead. Each window is planned in full, only its first
+``window - overlap`` days are committed, and the next window starts from the
+stock and open orders those days leave behind. The overlap keeps the end of
+each window, where the model stops valuing stock, out of the committed plan.
+A total time limit is shared out over the windows, and days no window
+reached in time are left without orders.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.lp_allocation import LP_SOLVER
+from open_logistics.infrastructure.optimization.scenarios import DemandModel
+
+# Daily cost of holding one unit in stock, as a share of its unit cost.
+HOLDING_COST_RATE = 0.002
+# Days planned by each rolling window and the days it shares with the next.
+DEFAULT_WINDOW_DAYS = 14
+DEFAULT_OVERLAP_DAYS = 7
+
+
+@dataclass
+class ReplenishmentProblem:
+    """
+    Daily replenishment of a set of SKUs.
+
+    On day ``t`` SKU ``i`` receives the order placed ``lead_time`` days
+    earlier, serves ``demand[i, t]`` from stock and loses the demand it
+    cannot serve. Orders cost ``unit_cost`` per unit, closing stock
+    ``holding_cost`` per unit and day, and lost demand ``shortage_cost`` per
+    unit. ``capacity`` limits the total closing stock of every day and
+    ``budget`` the total spent on orders. ``pipeline[:, k]`` holds orders
+    placed before the first day that arrive on day ``k``.
+    """
+
+    demand: np.ndarray
+    initial_stock: np.ndarray
+    unit_cost: np.ndarray
+    shortage_cost: np.ndarray
+    holding_cost: np.ndarray
+    lead_time: int = 0
+    capacity: Optional[float] = None
+    budget: Optional[float] = None
+    pipeline: Optional[np.ndarray] = None
+
+    @property
+    def skus(self) -> int:
+        return int(self.demand.shape[0])
+
+    @property
+    def horizon(self) -> int:
+        return int(self.demand.shape[1])
+
+    @classmethod
+    def from_model(
+        cls,
+        model: DemandModel,
+        initial_stock: np.ndarray,
+        unit_cost: np.ndarray,
+        shortage_cost: np.ndarray,
+        constraints: Mapping[str, Any],
+    ) -> "ReplenishmentProblem":
+        """
+        Builds the problem for a demand model's expected daily demand.
+
+        Orders arrive after the model's mean lead time, rounded to whole days;
+        the request's ``capacity_limit`` and ``budget`` constraints apply.
+        """
+        budget = constraints.get("budget")
+        capacity = constraints.get("capacity_limit")
+        return cls(
+            demand=model.daily_mean.astype(np.float64),
+            initial_stock=np.maximum(initial_stock, 0.0),
+            unit_cost=unit_cost,
+            shortage_cost=shortage_cost,
+            holding_cost=HOLDING_COST_RATE * unit_cost,
+            lead_time=max(int(round(model.lead_time_mean)), 0),
+            capacity=float(capacity) if capacity is not None else None,
+            budget=float(budget) if budget is not None else None,
+        )
+
+    def arrivals(self, orders: np.ndarray, start: int, days: int) -> np.ndarray:
+        """
+        Units arriving on days ``start`` to ``start + days``.
+
+        Args:
+            orders: Orders placed from the first day on, one column per day;
+                earlier orders come from ``pipeline``.
+            start: First arrival day.
+            days: Number of arrival days.
+        """
+        arriving = np.zeros((self.skus, days))
+        for offset in range(days):
+            placed = start + offset - self.lead_time
+            if placed < 0:
+                if (
+                    self.pipeline is not None
+                    and start + offset < self.pipeline.shape[1]
+                ):
+                    arriving[:, offset] = self.pipeline[:, start + offset]
+            elif placed < orders.shape[1]:
+                arriving[:, offset] = orders[:, placed]
+        return arriving
+
+    def window(
+        self,
+        start: int,
+        days: int,
+        stock: np.ndarray,
+        pipeline: Optional[np.ndarray],
+        budget: Optional[float],
+    ) -> "ReplenishmentProblem":
+        """The sub-problem of days ``start`` to ``start + days`` from a given state."""
+        return ReplenishmentProblem(
+            demand=self.demand[:, start : start + days],
+            initial_stock=stock,
+            unit_cost=self.unit_cost,
+            shortage_cost=self.shortage_cost,
+            holding_cost=self.holding_cost,
+            lead_time=self.lead_time,
+            capacity=self.capacity,
+            budget=budget,
+            pipeline=pipeline,
+        )
+
+    def simulate(self, orders: np.ndarray) -> "ReplenishmentPlan":
+        """Plays a set of orders against the demand, serving it first come first served."""
+        stock = np.zeros_like(self.demand)
+        lost = np.zeros_like(self.demand)
+        arriving = self.arrivals(orders, 0, self.horizon)
+        on_hand = self.initial_stock.astype(np.float64)
+        for day in range(self.horizon):
+            available = on_hand + arriving[:, day]
+            served = np.minimum(available, self.demand[:, day])
+            lost[:, day] = self.demand[:, day] - served
+            on_hand = stock[:, day] = available - served
+        return ReplenishmentPlan(
+            orders=orders, stock=stock, lost=lost, status="SIMULATED", problem=self
+        )
+
+
+@dataclass
+class ReplenishmentPlan:
+    """Daily orders, closing stock and lost demand of every SKU."""
+
+    orders: np.ndarray
+    stock: np.ndarray
+    lost: np.ndarray
+    status: str
+    problem: ReplenishmentProblem
+    windows: int = 1
+    largest_model: int = 0
+    solve_time_ms: float = 0.0
+    planned_days: Optional[int] = None
+
+    @property
+    def order_cost(self) -> float:
+        return float(self.problem.unit_cost @ self.orders.sum(axis=1))
+
+    @property
+    def holding_cost(self) -> float:
+        return float(self.problem.holding_cost @ self.stock.sum(axis=1))
+
+    @property
+    def shortage_cost(self) -> float:
+        return float(self.problem.shortage_cost @ self.lost.sum(axis=1))
+
+    @property
+    def total_cost(self) -> float:
+        return self.order_cost + self.holding_cost + self.shortage_cost
+
+    @property
+    def fill_rate(self) -> np.ndarray:
+        """Share of each SKU's demand served over the horizon."""
+        demand = self.problem.demand.sum(axis=1)
+        rate: np.ndarray = 1.0 - self.lost.sum(axis=1) / np.maximum(demand, 1e-12)
+        return rate
+
+    def to_section(self, skus: Sequence[str], top: int = 10) -> Dict[str, Any]:
+        """Renders the plan as the ``replenishment_schedule`` section, listing the largest orders."""
+        ordered = self.orders.sum(axis=1)
+        largest = np.argsort(-ordered, kind="stable")[:top]
+        fill_rate = self.fill_rate
+        return {
+            "horizon_days": self.problem.horizon,
+            "lead_time_days": self.problem.lead_time,
+            "status": self.status,
+            "windows": self.windows,
+            "planned_days": (
+                self.problem.horizon if self.planned_days is None else self.planned_days
+            ),
+            "total_cost": self.total_cost,
+            "order_cost": self.order_cost,
+            "holding_cost": self.holding_cost,
+            "shortage_cost": self.shortage_cost,
+            "fill_rate": float(fill_rate.mean()) if len(skus) else 1.0,
+            "daily_orders": self.orders.sum(axis=0).tolist(),
+            "items": {
+                skus[row]: {
+                    "total_ordered": float(ordered[row]),
+                    "first_order_day": int(np.argmax(self.orders[row] > 0)),
+                    "fill_rate": float(fill_rate[row]),
+                }
+                for row in largest.tolist()
+                if ordered[row] > 0
+            },
+        }
+
+
+def build_replenishment_model(problem: ReplenishmentProblem) -> Any:
+    """
+    Builds the time-expanded OR-Tools model of a replenishment problem.
+
+    Variables are laid out as orders, closing stock and lost demand, each
+    indexed ``sku * horizon + day``, so a solution reshapes into three
+    ``(skus, horizon)`` arrays. One balance row per SKU and day is followed
+    by the per-day capacity rows and the budget row.
+
+    Args:
+        problem: The replenishment problem.
+
+    Returns:
+        A populated ``ModelBuilderHelper``.
+    """
+    from ortools.linear_solver.python import model_builder_helper as mbh
+    from scipy import sparse
+
+    skus, horizon, lead_time = problem.skus, problem.horizon, problem.lead_time
+    size = skus * horizon
+    cells = np.arange(size)
+    day = cells % horizon
+
+    # stock[t] - stock[t - 1] - orders[t - lead_time] - lost[t] = arrivals[t] - demand[t]
+    placed = cells[day >= lead_time]
+    carried = cells[day > 0]
+    row_index = [cells, carried, placed, cells]
+    column_index = [
+        size + cells,
+        size + carried - 1,
+        placed - lead_time,
+        2 * size + cells,
+    ]
+    values = [
+        np.ones(size),
+        -np.ones(len(carried)),
+        -np.ones(len(placed)),
+        -np.ones(size),
+    ]
+    balance = problem.arrivals(np.zeros((skus, 0)), 0, horizon) - problem.demand
+    balance[:, 0] += problem.initial_stock
+    row_lower, row_upper = [balance.reshape(-1)], [balance.reshape(-1)]
+    rows = size
+
+    if problem.capacity is not None:
+        # Days already over capacity without any orders are held to that stock
+        floor = problem.simulate(np.zeros((skus, horizon))).stock.sum(axis=0)
+        row_index.append(rows + day)
+        column_index.append(size + cells)
+        values.append(np.ones(size))
+        row_lower.append(np.full(horizon, -np.inf))
+        row_upper.append(np.maximum(floor, problem.capacity))
+        rows += horizon
+    if problem.budget is not None:
+        row_index.append(np.full(size, rows))
+        column_index.append(cells)
+        values.append(np.repeat(problem.unit_cost, horizon))
+        row_lower.append(np.array([-np.inf]))
+        row_upper.append(np.array([problem.budget]))
+        rows += 1
+
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate(values),
+            (np.concatenate(row_index), np.concatenate(column_index)),
+        ),
+        shape=(rows, 3 * size),
+    )
+    # The helper's stubs mistype its array arguments, so it is used untyped
+    helper: Any = mbh.ModelBuilderHelper()
+    helper.fill_model_from_sparse_data(
+        np.zeros(3 * size),
+        np.concatenate([np.full(2 * size, np.inf), problem.demand.reshape(-1)]),
+        np.concatenate(
+            [
+                np.repeat(problem.unit_cost, horizon),
+                np.repeat(problem.holding_cost, horizon),
+                np.repeat(problem.shortage_cost, horizon),
+            ]
+        ),
+        np.concatenate(row_lower),
+        np.concatenate(row_upper),
+        matrix,
+    )
+    return helper
+
+
+def solve_replenishment(
+    problem: ReplenishmentProblem, time_limit_s: Optional[float] = None
+) -> ReplenishmentPlan:
+    """
+    Solves a replenishment problem as one model with GLOP.
+
+    Args:
+        problem: The replenishment problem.
+        time_limit_s: Wall-clock limit handed to the solver.
+
+    Returns:
+        The plan; without a solution, placing no orders is simulated instead.
+    """
+    from ortools.linear_solver.python import model_builder_helper as mbh
+
+    start_time = time.perf_counter()
+    model = build_replenishment_model(problem)
+    solver = mbh.ModelSolverHelper(LP_SOLVER)
+    if time_limit_s is not None:
+        solver.set_time_limit_in_seconds(time_limit_s)
+    solver.solve(model)
+    status = solver.status().name
+
+    shape = (problem.skus, problem.horizon)
+    if solver.has_solution():
+        values = np.asarray(solver.variable_values())
+        orders, stock, lost = (
+            np.maximum(part, 0.0).reshape(shape) for part in np.split(values, 3)
+        )
+        plan = ReplenishmentPlan(
+            orders=orders, stock=stock, lost=lost, status=status, problem=problem
+        )
+    else:
+        plan = problem.simulate(np.zeros(shape))
+        plan.status = status
+    plan.largest_model = model.num_variables()
+    plan.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return plan
+
+
+def solve_rolling_horizon(
+    problem: ReplenishmentProblem,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    overlap_days: int = DEFAULT_OVERLAP_DAYS,
+    time_limit_s: Optional[float] = None,
+    total_time_limit_s: Optional[float] = None,
+) -> ReplenishmentPlan:
+    """
+    Solves a replenishment problem as a sequence of overlapping windows.
+
+    Each window starts from the stock and open orders left by the days
+    committed before it, which is all a window inherits, so the solver's
+    memory is bounded by the window rather than the horizon. The committed
+    orders are replayed against the demand, so the returned stock and lost
+    demand are exact for them. A window may spend all of the budget that is
+    left when it is solved.
+
+    Args:
+        problem: The replenishment problem.
+        window_days: Days planned by each window.
+        overlap_days: Days each window shares with the next, re-planned
+            there; at least the lead time keeps orders for the next window's
+            first days in view.
+        time_limit_s: Wall-clock limit of every window.
+        total_time_limit_s: Wall-clock limit of the whole horizon, split
+            evenly over the windows still to solve. Once it has passed, the
+            remaining days place no orders, ``planned_days`` stops at the
+            last committed day and an otherwise optimal plan is ``FEASIBLE``.
+
+    Returns:
+        The full-horizon plan.
+
+    Raises:
+        ValueError: If the window does not extend past the overlap.
+    """
+    if overlap_days < 0 or window_days <= overlap_days:
+        raise ValueError(
+            f"Window of {window_days} days must be longer than its overlap of {overlap_days} days"
+        )
+
+    start_time = time.perf_counter()
+    commit_days = window_days - overlap_days
+    orders = np.zeros((problem.skus, problem.horizon))
+    stock = problem.initial_stock.astype(np.float64)
+    budget = problem.budget
+    statuses, windows, largest_model, planned_days = [], 0, 0, 0
+
+    for start in range(0, problem.horizon, commit_days):
+        window_limit = time_limit_s
+        if total_time_limit_s is not None:
+            remaining = total_time_limit_s - (time.perf_counter() - start_time)
+            if remaining <= 0:
+                statuses.append("FEASIBLE")
+                break
+            windows_left = 1 + max(
+                -(-(problem.horizon - start - window_days) // commit_days), 0
+            )
+            share = remaining / windows_left
+            window_limit = share if window_limit is None else min(window_limit, share)
+
+        days = min(window_days, problem.horizon - start)
+        pipeline = problem.arrivals(orders, start, problem.lead_time)
+        window = problem.window(start, days, stock, pipeline, budget)
+        plan = solve_replenishment(window, time_limit_s=window_limit)
+        statuses.append(plan.status)
+        windows += 1
+        largest_model = max(largest_model, plan.largest_model)
+
+        keep = days if start + days == problem.horizon else min(commit_days, days)
+        orders[:, start : start + keep] = plan.orders[:, :keep]
+        planned_days = start + keep
+        committed = window.simulate(
+            np.pad(plan.orders[:, :keep], ((0, 0), (0, days - keep)))
+        )
+        stock = committed.stock[:, keep - 1]
+        if budget is not None:
+            budget = max(
+                budget - float(problem.unit_cost @ plan.orders[:, :keep].sum(axis=1)),
+                0.0,
+            )
+        if start + days == problem.horizon:
+            break
+
+    result = problem.simulate(orders)
+    result.status = next(
+        (status for status in statuses if status != "OPTIMAL"), "OPTIMAL"
+    )
+    result.windows = windows
+    result.largest_model = largest_model
+    result.planned_days = planned_days
+    result.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return result
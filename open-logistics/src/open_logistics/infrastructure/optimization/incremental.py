@@ -0,0 +1,301 @@
+"""
+State for incremental re-optimization.
+
+Every optimization leaves behind a ``PlanState`` with the columns, target
+levels and solver solution it was built from. A later inventory or location
+delta is applied to copies of those arrays row by row, so only the changed
+rows have to be recomputed and the solvers can start from the previous
+solution instead of from scratch.
+"""
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    AllocationSolution,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.sensitivity import AllocationSensitivity
+from open_logistics.infrastructure.optimization.vectorized import (
+    DEFAULT_COST_PATTERN,
+    DEFAULT_DEMAND_PATTERN,
+    SHORTAGE_PENALTY_FACTOR,
+    InventoryColumns,
+    InventoryPlanArrays,
+)
+
+
+@dataclass
+class PlanState:
+    """
+    Everything needed to update a plan without re-solving it from scratch.
+
+    ``columns``, ``target`` and ``inventory_plan`` are only present for plans
+    produced in this process by the CPU engine; other plans can still be
+    re-optimized, but from scratch.
+    """
+
+    request: Any
+    plan: Dict[str, Any]
+    columns: Optional[InventoryColumns] = None
+    target: Optional[np.ndarray] = None
+    inventory_plan: Optional[InventoryPlanArrays] = None
+    allocation: Optional[AllocationSolution] = None
+    _row_index: Optional[Dict[str, int]] = field(default=None, repr=False)
+    _sensitivity: Optional[AllocationSensitivity] = field(default=None, repr=False)
+
+    @property
+    def is_incremental(self) -> bool:
+        """Whether the plan's arrays are available for row-level updates."""
+        return self.columns is not None and self.inventory_plan is not None
+
+    def row_index(self) -> Dict[str, int]:
+        """Maps each SKU to its row in ``columns``."""
+        if self._row_index is None:
+            skus = self.columns.skus if self.columns is not None else []
+            self._row_index = dict(zip(skus, range(len(skus))))
+        return self._row_index
+
+    def sensitivity(
+        self, time_limit_s: Optional[float] = None
+    ) -> AllocationSensitivity:
+        """
+        Sensitivity of the plan's allocation to its budget and capacity.
+
+        A presolved allocation is re-solved without presolve first: its
+        levels are spread over interchangeable items, so the items that move
+        with the limits, and with them the valid ranges, would not be those
+        of a vertex.
+
+        Args:
+            time_limit_s: Wall-clock limit of that re-solve.
+
+        Raises:
+            ValueError: If the plan has no optimal LP allocation.
+        """
+        if self._sensitivity is None:
+            if self.allocation is None or self.columns is None or self.target is None:
+                raise ValueError("Plan has no LP allocation to analyze")
+            problem = AllocationProblem.from_columns(
+                self.columns, self.target, self.request.constraints
+            )
+            allocation = self.allocation
+            if allocation.presolved and allocation.duals is not None:
+                allocation = solve_allocation(problem, time_limit_s=time_limit_s)
+            self._sensitivity = AllocationSensitivity(problem, allocation)
+        return self._sensitivity
+
+    def route_stops(self) -> Optional[List[List[str]]]:
+        """Stop ids of each vehicle route, if the plan was routed by the VRP."""
+        if self.plan.get("performance_metrics", {}).get("routing_backend") != "vrp":
+            return None
+        return [
+            route["stops"] for route in self.plan.get("route_optimization", {}).values()
+        ]
+
+
+class PlanStore:
+    """Size-bounded LRU store of plan states, keyed by plan id."""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, PlanState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def put(self, state: PlanState) -> str:
+        """Stores a plan state and returns its new plan id."""
+        plan_id = uuid.uuid4().hex
+        self._states[plan_id] = state
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+        return plan_id
+
+    def get(self, plan_id: str) -> Optional[PlanState]:
+        """Returns the state of a plan, or ``None`` if it is unknown or evicted."""
+        state = self._states.get(plan_id)
+        if state is not None:
+            self._states.move_to_end(plan_id)
+        return state
+
+
+@lru_cache()
+def get_plan_store() -> PlanStore:
+    """
+    Get the shared plan store.
+
+    This function is cached so plans produced by one optimizer instance can be
+    updated through any other in the same process.
+    """
+    return PlanStore(max_entries=get_settings().optimization.PLAN_STORE_MAX_ENTRIES)
+
+
+def merge_inventory(
+    inventory: Mapping[str, Any], changes: Mapping[str, Any], removed: Sequence[str]
+) -> Dict[str, Any]:
+    """
+    Applies SKU changes and removals to an inventory mapping.
+
+    A change to an existing SKU only overrides the attributes it names; a
+    plain number replaces the quantity.
+    """
+    merged = dict(inventory)
+    for sku in removed:
+        merged.pop(sku, None)
+    for sku, record in changes.items():
+        if sku in merged:
+            previous = merged[sku]
+            if not isinstance(previous, dict):
+                previous = {"quantity": previous}
+            if isinstance(record, dict):
+                record = {**previous, **record}
+            elif len(previous) > 1:
+                record = {**previous, "quantity": record}
+        merged[sku] = record
+    return merged
+
+
+def merge_locations(
+    locations: Sequence[Mapping[str, Any]],
+    changes: Sequence[Mapping[str, Any]],
+    removed: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Applies location updates, matched by ``id``, and removals to a location list."""
+    updates = {
+        str(location["id"]): location for location in changes if "id" in location
+    }
+    dropped = set(removed)
+    merged = []
+    for location in locations:
+        location_id = str(location.get("id"))
+        if location_id in dropped:
+            continue
+        merged.append({**location, **updates.pop(location_id, {})})
+    merged.extend(dict(location) for location in updates.values())
+    merged.extend(dict(location) for location in changes if "id" not in location)
+    return merged
+
+
+def update_columns(
+    columns: InventoryColumns,
+    row_index: Dict[str, int],
+    changes: Mapping[str, Any],
+    removed: Sequence[str],
+    inventory: Mapping[str, Any],
+) -> Tuple[InventoryColumns, Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Applies an inventory delta to a copy of the inventory columns.
+
+    Existing SKUs keep their attributes unless the change overrides them; new
+    SKUs are appended with the defaults their position would receive in
+    ``InventoryColumns.from_inventory``. Rows behind a removed SKU move up and
+    take the defaults of their new position too, and count as changed when
+    that alters them.
+
+    Args:
+        columns: The previous inventory columns.
+        row_index: Row of each SKU in ``columns``.
+        changes: Changed or added SKUs.
+        removed: Removed SKUs.
+        inventory: The previous inventory mapping ``columns`` was built from,
+            used to tell explicit attributes from positional defaults.
+
+    Returns:
+        ``(columns, row_index, changed_rows, removed_rows)``. ``row_index``
+        and ``changed_rows`` refer to the new columns, ``removed_rows`` to the
+        old ones. ``row_index`` is only copied when rows were added or removed.
+    """
+    removed_rows = np.array(
+        sorted(row_index[sku] for sku in set(removed) if sku in row_index),
+        dtype=np.int64,
+    )
+    skus = list(columns.skus)
+    arrays = [
+        columns.quantity,
+        columns.demand_factor,
+        columns.unit_cost,
+        columns.shortage_cost,
+    ]
+    shifted_rows = np.empty(0, dtype=np.int64)
+    if len(removed_rows):
+        keep = np.ones(len(skus), dtype=bool)
+        keep[removed_rows] = False
+        skus = [sku for sku, kept in zip(skus, keep.tolist()) if kept]
+        arrays = [array[keep] for array in arrays]
+        row_index = dict(zip(skus, range(len(skus))))
+
+        start = int(removed_rows[0])
+        shifted = InventoryColumns.from_inventory(
+            {sku: inventory[sku] for sku in skus[start:]}, offset=start
+        )
+        factors = [shifted.demand_factor, shifted.unit_cost, shifted.shortage_cost]
+        moved = np.zeros(len(shifted), dtype=bool)
+        for array, factor in zip(arrays[1:], factors):
+            moved |= array[start:] != factor
+            array[start:] = factor
+        shifted_rows = start + np.flatnonzero(moved)
+    else:
+        arrays = [array.copy() for array in arrays]
+
+    added = [sku for sku in changes if sku not in row_index]
+    if added:
+        positions = np.arange(len(skus), len(skus) + len(added))
+        demand_default = DEFAULT_DEMAND_PATTERN[positions % len(DEFAULT_DEMAND_PATTERN)]
+        cost_default = DEFAULT_COST_PATTERN[positions % len(DEFAULT_COST_PATTERN)]
+        arrays = [
+            np.concatenate([arrays[0], np.zeros(len(added))]),
+            np.concatenate([arrays[1], demand_default]),
+            np.concatenate([arrays[2], cost_default]),
+            np.concatenate([arrays[3], SHORTAGE_PENALTY_FACTOR * cost_default]),
+        ]
+        row_index = {
+            **row_index,
+            **{sku: int(row) for sku, row in zip(added, positions)},
+        }
+        skus.extend(added)
+
+    quantity, demand_factor, unit_cost, shortage_cost = arrays
+    changed_rows = np.fromiter(
+        (row_index[sku] for sku in changes), dtype=np.int64, count=len(changes)
+    )
+    for row, (sku, record) in zip(changed_rows.tolist(), changes.items()):
+        if not isinstance(record, dict):
+            quantity[row] = float(record)
+            continue
+        previous = inventory.get(sku)
+        if isinstance(previous, dict):
+            # As in merge_inventory, explicit attributes the change leaves out stay
+            record = {**previous, **record}
+        quantity[row] = float(record.get("quantity", quantity[row]))
+        demand_factor[row] = float(record.get("demand_factor", demand_factor[row]))
+        if "unit_cost" in record:
+            unit_cost[row] = float(record["unit_cost"])
+        if "shortage_cost" in record:
+            shortage_cost[row] = float(record["shortage_cost"])
+        elif "unit_cost" in record:
+            shortage_cost[row] = SHORTAGE_PENALTY_FACTOR * unit_cost[row]
+
+    if len(shifted_rows):
+        changed_rows = np.union1d(changed_rows, shifted_rows)
+    updated = InventoryColumns(skus, quantity, demand_factor, unit_cost, shortage_cost)
+    return updated, row_index, changed_rows, removed_rows
+
+
+def align_rows(values: np.ndarray, removed_rows: np.ndarray, size: int) -> np.ndarray:
+    """
+    Carries a per-row array of the old columns over to the updated ones.
+
+    Removed rows are dropped and appended rows are zero-filled.
+    """
+    aligned = np.delete(values, removed_rows) if len(removed_rows) else values.copy()
+    if len(aligned) < size:
+        aligned = np.concatenate([aligned, np.zeros(size - len(aligned))])
+    return aligned
@@ -0,0 +1,701 @@
+"""
+Capacitated lot sizing over the request's time horizon.
+
+Plans the daily receipts of every SKU when each order carries a fixed setup
+cost on top of its unit cost, so ordering less often trades setups against
+holding stock. Demand a SKU does not serve is lost at its shortage cost.
+
+Without a receiving capacity every SKU is planned on its own by the
+Wagner-Whitin dynamic program, which is exact and runs for all SKUs at once
+as array operations over the days. A capacity on the units received per day
+couples the SKUs; it is priced into their unit costs by Lagrangian
+relaxation, so every iteration is again one Wagner-Whitin pass and yields a
+lower bound, and overloaded days of the resulting plan are repaired by
+pulling receipts forward, then spare capacity is spent on demand the plan
+loses. Small problems are then solved exactly as a
+sparse time-expanded MIP, hinted with the repaired plan.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.horizon import HOLDING_COST_RATE
+from open_logistics.infrastructure.optimization.lp_allocation import MIP_SOLVER
+from open_logistics.infrastructure.optimization.scenarios import DemandModel
+
+WAGNER_WHITIN_BACKEND = "wagner_whitin"
+LAGRANGIAN_BACKEND = "lagrangian"
+
+# Fixed cost of placing an order, relative to the SKU's unit cost.
+SETUP_COST_FACTOR = 1.0
+# Subgradient iterations pricing the capacity, and the initial step scale.
+LAGRANGIAN_ITERATIONS = 30
+LAGRANGIAN_STEP = 1.0
+# Problems of at most this many SKU-days are also solved exactly as a MIP.
+MIP_MAX_CELLS = 500
+# Quantity below which a receipt counts as no order.
+ORDER_TOLERANCE = 1e-9
+
+
+@dataclass
+class LotSizingProblem:
+    """
+    Daily lot sizing of a set of SKUs.
+
+    SKU ``i`` receives its orders ``lead_time`` days after placing them,
+    serves ``demand[i, t]`` from stock and loses what it cannot serve.
+    Every day with a receipt costs ``setup_cost``; units cost ``unit_cost``,
+    closing stock ``holding_cost`` per unit and day and lost demand
+    ``shortage_cost`` per unit. ``capacity[t]``, if set, limits the units
+    received on day ``t`` across all SKUs.
+    """
+
+    demand: np.ndarray
+    initial_stock: np.ndarray
+    unit_cost: np.ndarray
+    shortage_cost: np.ndarray
+    holding_cost: np.ndarray
+    setup_cost: np.ndarray
+    lead_time: int = 0
+    capacity: Optional[np.ndarray] = None
+
+    @property
+    def skus(self) -> int:
+        return int(self.demand.shape[0])
+
+    @property
+    def horizon(self) -> int:
+        return int(self.demand.shape[1])
+
+    @classmethod
+    def from_model(
+        cls,
+        model: DemandModel,
+        initial_stock: np.ndarray,
+        unit_cost: np.ndarray,
+        shortage_cost: np.ndarray,
+        constraints: Mapping[str, Any],
+        locations: Sequence[Mapping[str, Any]] = (),
+    ) -> "LotSizingProblem":
+        """
+        Builds the problem for a demand model's expected daily demand.
+
+        Orders arrive after the model's mean lead time, rounded to whole days.
+        The ``setup_cost`` constraint sets the cost of every order, by default
+        ``SETUP_COST_FACTOR`` times the unit cost, and the daily receiving
+        capacity is the total ``capacity`` of the locations that list one.
+        """
+        setup_cost = constraints.get("setup_cost")
+        capacities = [
+            float(location["capacity"])
+            for location in locations
+            if location.get("capacity") is not None
+        ]
+        horizon = model.daily_mean.shape[1]
+        return cls(
+            demand=model.daily_mean.astype(np.float64),
+            initial_stock=np.maximum(initial_stock, 0.0),
+            unit_cost=unit_cost,
+            shortage_cost=shortage_cost,
+            holding_cost=HOLDING_COST_RATE * unit_cost,
+            setup_cost=(
+                np.full(len(unit_cost), float(setup_cost))
+                if setup_cost is not None
+                else SETUP_COST_FACTOR * unit_cost
+            ),
+            lead_time=max(int(round(model.lead_time_mean)), 0),
+            capacity=np.full(horizon, sum(capacities)) if capacities else None,
+        )
+
+    def net_demand(self) -> Tuple[np.ndarray, float]:
+        """
+        Demand left once the initial stock has served the first days.
+
+        Returns:
+            The remaining daily demand and the cost of holding the initial
+            stock until it is used, which no plan can change.
+        """
+        served = np.minimum(np.cumsum(self.demand, axis=1), self.initial_stock[:, None])
+        left = self.initial_stock[:, None] - served
+        net = self.demand - np.diff(served, axis=1, prepend=0.0)
+        return net, float(self.holding_cost @ left.sum(axis=1))
+
+    def simulate(self, receipts: np.ndarray) -> "LotSizingPlan":
+        """Plays a set of daily receipts against the demand, serving it first come first served."""
+        stock = np.zeros_like(self.demand)
+        lost = np.zeros_like(self.demand)
+        on_hand = self.initial_stock.astype(np.float64)
+        for day in range(self.horizon):
+            available = on_hand + receipts[:, day]
+            served = np.minimum(available, self.demand[:, day])
+            lost[:, day] = self.demand[:, day] - served
+            on_hand = stock[:, day] = available - served
+        return LotSizingPlan(
+            receipts=receipts, stock=stock, lost=lost, status="SIMULATED", problem=self
+        )
+
+
+@dataclass
+class LotSizingPlan:
+    """Daily receipts, closing stock and lost demand of every SKU."""
+
+    receipts: np.ndarray
+    stock: np.ndarray
+    lost: np.ndarray
+    status: str
+    problem: LotSizingProblem
+    backend: str = WAGNER_WHITIN_BACKEND
+    lower_bound: float = float("-inf")
+    iterations: int = 0
+    solve_time_ms: float = 0.0
+
+    @property
+    def setups(self) -> np.ndarray:
+        return self.receipts > ORDER_TOLERANCE
+
+    @property
+    def orders(self) -> np.ndarray:
+        """Receipts moved back by the lead time to the day they are ordered."""
+        lead_time = self.problem.lead_time
+        return np.pad(self.receipts[:, lead_time:], ((0, 0), (0, lead_time)))
+
+    @property
+    def order_cost(self) -> float:
+        return float(self.problem.unit_cost @ self.receipts.sum(axis=1))
+
+    @property
+    def setup_cost(self) -> float:
+        return float(self.problem.setup_cost @ self.setups.sum(axis=1))
+
+    @property
+    def holding_cost(self) -> float:
+        return float(self.problem.holding_cost @ self.stock.sum(axis=1))
+
+    @property
+    def shortage_cost(self) -> float:
+        return float(self.problem.shortage_cost @ self.lost.sum(axis=1))
+
+    @property
+    def total_cost(self) -> float:
+        return (
+            self.order_cost + self.setup_cost + self.holding_cost + self.shortage_cost
+        )
+
+    @property
+    def gap(self) -> float:
+        """Relative gap between the plan's cost and the lower bound."""
+        if not np.isfinite(self.lower_bound):
+            return 1.0
+        total_cost = self.total_cost
+        return max(total_cost - self.lower_bound, 0.0) / max(abs(total_cost), 1e-9)
+
+    @property
+    def fill_rate(self) -> np.ndarray:
+        """Share of each SKU's demand served over the horizon."""
+        demand = self.problem.demand.sum(axis=1)
+        rate: np.ndarray = 1.0 - self.lost.sum(axis=1) / np.maximum(demand, 1e-12)
+        return rate
+
+    def to_section(self, skus: Sequence[str], top: int = 10) -> Dict[str, Any]:
+        """Renders the plan as the ``lot_sizing`` section, listing the orders of the largest SKUs."""
+        orders = self.orders
+        ordered = orders.sum(axis=1)
+        largest = np.argsort(-ordered, kind="stable")[:top]
+        fill_rate = self.fill_rate
+        capacity = self.problem.capacity
+        return {
+            "horizon_days": self.problem.horizon,
+            "lead_time_days": self.problem.lead_time,
+            "status": self.status,
+            "backend": self.backend,
+            "total_cost": self.total_cost,
+            "order_cost": self.order_cost,
+            "setup_cost": self.setup_cost,
+            "holding_cost": self.holding_cost,
+            "shortage_cost": self.shortage_cost,
+            "lower_bound": self.lower_bound if np.isfinite(self.lower_bound) else None,
+            "gap": self.gap,
+            "orders_placed": int(self.setups.sum()),
+            "fill_rate": float(fill_rate.mean()) if len(skus) else 1.0,
+            "daily_receipts": self.receipts.sum(axis=0).tolist(),
+            "daily_capacity": capacity.tolist() if capacity is not None else None,
+            "items": {
+                skus[row]: {
+                    "orders": {
+                        int(day): float(orders[row, day])
+                        for day in np.flatnonzero(orders[row] > ORDER_TOLERANCE)
+                    },
+                    "fill_rate": float(fill_rate[row]),
+                }
+                for row in largest.tolist()
+                if ordered[row] > 0
+            },
+        }
+
+
+def _wagner_whitin(
+    problem: LotSizingProblem, demand: np.ndarray, receipt_cost: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cheapest receipts of every SKU on its own, by the Wagner-Whitin recursion.
+
+    ``cost[i, t]`` is the cheapest way to cover the first ``t`` days. A day
+    either loses its demand, or closes a run of days whose demand is served
+    by one receipt on the run's first day ``s``. Serving day ``k`` from it
+    costs ``receipt_cost[i, s]`` plus ``k - s`` days of holding, so the run
+    serves a prefix of its days, up to where losing the demand is cheaper,
+    and loses the rest. Each ``s`` extends every run starting there in one
+    pass over all SKUs.
+
+    Args:
+        problem: The lot sizing problem.
+        demand: Daily demand left after the initial stock.
+        receipt_cost: Cost of a unit received on each day, per SKU.
+
+    Returns:
+        ``(receipts, cost)``: the receipts and the cost of every SKU.
+    """
+    skus, horizon = demand.shape
+    holding, shortage = problem.holding_cost, problem.shortage_cost
+    # Days lead the arrays so every run's slice of them is contiguous
+    demand_by_day = np.ascontiguousarray(demand.T)
+    receipt_cost_by_day = np.ascontiguousarray(
+        np.broadcast_to(receipt_cost, demand.shape).T
+    )
+    aging = np.arange(horizon)[:, None] * holding[None, :]
+    cost = np.full((horizon + 1, skus), np.inf)
+    cost[0] = 0.0
+    # First day of the run ending before each day, -1 when that day's demand is lost
+    run_start = np.full((horizon + 1, skus), -1, dtype=np.int64)
+
+    for start in range(horizon):
+        lost = cost[start] + shortage * demand_by_day[start]
+        better = lost < cost[start + 1]
+        cost[start + 1][better] = lost[better]
+        run_start[start + 1][better] = -1
+        if start < problem.lead_time:
+            continue
+        runs = aging[: horizon - start] + receipt_cost_by_day[start]
+        np.minimum(runs, shortage, out=runs)
+        runs *= demand_by_day[start:]
+        np.cumsum(runs, axis=0, out=runs)
+        runs += cost[start] + problem.setup_cost
+        better = runs < cost[start + 1 :]
+        np.copyto(cost[start + 1 :], runs, where=better)
+        np.copyto(run_start[start + 1 :], start, where=better)
+
+    # Days of a run served before losing the demand becomes cheaper
+    margin = shortage[:, None] - receipt_cost
+    served_days = np.where(
+        margin < 0,
+        0,
+        np.floor(margin / np.maximum(holding[:, None], 1e-300)).clip(max=horizon) + 1,
+    ).astype(np.int64)
+    cumulative = np.concatenate(
+        [np.zeros((skus, 1)), np.cumsum(demand, axis=1)], axis=1
+    )
+    receipts = np.zeros((skus, horizon))
+    day = np.full(skus, horizon)
+    while True:
+        active = np.flatnonzero(day > 0)
+        if not len(active):
+            break
+        start = run_start[day[active], active]
+        runs = start >= 0
+        run_rows, run_start_day, run_end = active[runs], start[runs], day[active[runs]]
+        served_end = np.minimum(
+            run_end, run_start_day + served_days[run_rows, run_start_day]
+        )
+        receipts[run_rows, run_start_day] = (
+            cumulative[run_rows, served_end] - cumulative[run_rows, run_start_day]
+        )
+        day[active] = np.where(runs, start, day[active] - 1)
+    return receipts, cost[horizon]
+
+
+def _pull_forward(problem: LotSizingProblem, receipts: np.ndarray) -> np.ndarray:
+    """
+    Repairs receipts exceeding the daily capacity.
+
+    From the last day back, the excess of an overloaded day is either moved
+    to the day before, at one more day of holding per unit, or dropped, at
+    the shortage cost of the demand it would have served less the unit cost
+    and the holding already added by moving it. Units carried back from
+    later days are tracked per SKU with their average age. The units that
+    cost least to move or drop go first; on the first day receipts are
+    possible, the excess can only be dropped.
+    """
+    if problem.capacity is None:
+        raise ValueError("Lot sizing problem has no capacity")
+    receipts = receipts.copy()
+    first_day = problem.lead_time
+    holding = problem.holding_cost
+    margin = problem.shortage_cost - problem.unit_cost
+    carried = np.zeros(problem.skus)
+    age = np.zeros(problem.skus)
+    for day in range(problem.horizon - 1, first_day - 1, -1):
+        own = receipts[:, day].copy()
+        receipts[:, day] += carried
+        excess = receipts[:, day].sum() - problem.capacity[day]
+        if excess <= ORDER_TOLERANCE:
+            carried[:] = 0.0
+            continue
+
+        # Carried units first, then the day's own receipts, as segments to cut from
+        amount = np.concatenate([carried, own])
+        drop_cost = np.concatenate([margin - age * holding, margin])
+        move_cost = (
+            np.tile(holding, 2)
+            if day > first_day
+            else np.full(2 * problem.skus, np.inf)
+        )
+        order = np.argsort(np.minimum(move_cost, drop_cost), kind="stable")
+        cut = np.zeros(2 * problem.skus)
+        cut[order] = np.minimum(
+            amount[order],
+            np.maximum(excess - np.cumsum(amount[order]) + amount[order], 0.0),
+        )
+        moved = np.where(move_cost <= drop_cost, cut, 0.0)
+        receipts[:, day] -= cut[: problem.skus] + cut[problem.skus :]
+
+        moved_carried, moved_own = moved[: problem.skus], moved[problem.skus :]
+        carried = moved_carried + moved_own
+        age = np.where(
+            carried > 0,
+            (moved_carried * (age + 1) + moved_own) / np.maximum(carried, 1e-300),
+            0.0,
+        )
+    return receipts
+
+
+def _fill_up(problem: LotSizingProblem, receipts: np.ndarray) -> np.ndarray:
+    """
+    Spends spare daily capacity on demand a plan loses.
+
+    From the first day on, units received on a day with spare capacity
+    serve the SKU's lost demand up to its next receipt, earliest first, each
+    worth its shortage cost less the unit cost and the holding until it is
+    used. SKUs already receiving that day go by the average worth of the
+    units they can use; others must also cover a setup. The most valuable
+    go first, as far as the capacity allows.
+    """
+    if problem.capacity is None:
+        raise ValueError("Lot sizing problem has no capacity")
+    receipts = receipts.copy()
+    lost = problem.simulate(receipts).lost
+    margin = problem.shortage_cost - problem.unit_cost
+    # Days from each day until the SKU's next receipt, or the end of the horizon; filling a
+    # day never changes the receipts after it
+    next_receipt = np.zeros(receipts.shape, dtype=np.int64)
+    following = np.full(problem.skus, problem.horizon)
+    for day in range(problem.horizon - 1, -1, -1):
+        next_receipt[:, day] = following - day
+        following = np.where(receipts[:, day] > ORDER_TOLERANCE, day, following)
+
+    for day in range(problem.lead_time, problem.horizon):
+        spare = problem.capacity[day] - receipts[:, day].sum()
+        if spare <= ORDER_TOLERANCE:
+            continue
+        rows = np.flatnonzero(lost[:, day:].any(axis=1))
+        if not len(rows):
+            continue
+        age = np.arange(problem.horizon - day)
+        worth = margin[rows, None] - problem.holding_cost[rows, None] * age
+        usable = np.where(
+            (age < next_receipt[rows, day, None]) & (worth > 0), lost[rows, day:], 0.0
+        )
+        amount = usable.sum(axis=1)
+        setup = np.where(
+            receipts[rows, day] > ORDER_TOLERANCE, 0.0, problem.setup_cost[rows]
+        )
+        gain = (usable * worth).sum(axis=1) - setup
+        candidates = np.flatnonzero((amount > ORDER_TOLERANCE) & (gain > 0))
+        if not len(candidates):
+            continue
+        candidates = candidates[
+            np.argsort(-gain[candidates] / amount[candidates], kind="stable")
+        ]
+        added = np.minimum(
+            amount[candidates],
+            np.maximum(spare - np.cumsum(amount[candidates]) + amount[candidates], 0.0),
+        )
+        receipts[rows[candidates], day] += added
+        # The added units serve the usable lost demand in order
+        served = np.minimum(np.cumsum(usable[candidates], axis=1), added[:, None])
+        lost[rows[candidates], day:] -= np.diff(served, axis=1, prepend=0.0)
+    return receipts
+
+
+def wagner_whitin(problem: LotSizingProblem) -> LotSizingPlan:
+    """
+    Plans every SKU on its own, ignoring the capacity, with the Wagner-Whitin recursion.
+
+    Args:
+        problem: The lot sizing problem.
+
+    Returns:
+        The optimal plan of the uncapacitated problem.
+    """
+    start_time = time.perf_counter()
+    demand, fixed_cost = problem.net_demand()
+    receipts, cost = _wagner_whitin(
+        problem, demand, np.broadcast_to(problem.unit_cost[:, None], demand.shape)
+    )
+    plan = problem.simulate(receipts)
+    plan.status = "OPTIMAL"
+    plan.lower_bound = float(cost.sum()) + fixed_cost
+    plan.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return plan
+
+
+def solve_lagrangian(
+    problem: LotSizingProblem,
+    iterations: int = LAGRANGIAN_ITERATIONS,
+    deadline: Optional[float] = None,
+) -> LotSizingPlan:
+    """
+    Plans under the daily capacity by pricing it into the unit costs.
+
+    Every iteration plans all SKUs with the Wagner-Whitin recursion at unit
+    costs raised by the price of each day's capacity, which bounds the
+    optimal cost from below, and repairs the plan with ``_pull_forward`` and
+    ``_fill_up``.
+    Prices follow the subgradient of the days' excess, with a step scaled by
+    the gap between the best plan and the best bound and halved whenever the
+    bound stalls.
+
+    Args:
+        problem: The lot sizing problem; it must have a capacity.
+        iterations: Maximum number of iterations.
+        deadline: ``time.perf_counter`` timestamp after which no further
+            iteration is started.
+
+    Returns:
+        The cheapest repaired plan, with the best bound found.
+
+    Raises:
+        ValueError: If the problem has no capacity or ``iterations`` is below one.
+    """
+    if problem.capacity is None:
+        raise ValueError("Lot sizing problem has no capacity")
+    start_time = time.perf_counter()
+    demand, fixed_cost = problem.net_demand()
+    prices = np.zeros(problem.horizon)
+    scale, stalled = LAGRANGIAN_STEP, 0
+    best_plan: Optional[LotSizingPlan] = None
+    best_cost, best_bound = float("inf"), float("-inf")
+
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        receipts, cost = _wagner_whitin(
+            problem, demand, problem.unit_cost[:, None] + prices[None, :]
+        )
+        bound = float(cost.sum()) + fixed_cost - float(prices @ problem.capacity)
+        improved = best_plan is None or bound > best_bound + 1e-9 * max(
+            abs(best_bound), 1.0
+        )
+        if improved:
+            best_bound, stalled = bound, 0
+        else:
+            stalled += 1
+            if stalled >= 3:
+                scale, stalled = scale / 2, 0
+
+        # Repairing costs as much as the pass itself, so only plans of a better bound are repaired
+        if improved:
+            plan = problem.simulate(_fill_up(problem, _pull_forward(problem, receipts)))
+            if plan.total_cost < best_cost:
+                best_plan, best_cost = plan, plan.total_cost
+        excess = receipts.sum(axis=0) - problem.capacity
+        # Days below capacity whose price is already zero cannot move it
+        excess[(excess < 0) & (prices <= 0)] = 0.0
+        norm = float(excess @ excess)
+        if (
+            best_cost - best_bound <= 1e-6 * max(abs(best_bound), 1.0)
+            or norm <= ORDER_TOLERANCE
+        ):
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        prices = np.maximum(prices + scale * (best_cost - bound) / norm * excess, 0.0)
+
+    if best_plan is None:
+        raise ValueError("The Lagrangian needs at least one iteration")
+    best_plan.backend = LAGRANGIAN_BACKEND
+    best_plan.lower_bound = best_bound
+    best_plan.iterations = iteration
+    best_plan.status = "OPTIMAL" if best_plan.gap <= 1e-6 else "FEASIBLE"
+    best_plan.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return best_plan
+
+
+def _receipt_ceiling(problem: LotSizingProblem) -> np.ndarray:
+    """Largest useful receipt per SKU and day: the demand still to come, capped by capacity."""
+    remaining = np.cumsum(problem.demand[:, ::-1], axis=1)[:, ::-1].reshape(-1)
+    if problem.capacity is not None:
+        remaining = np.minimum(remaining, np.tile(problem.capacity, problem.skus))
+    return remaining
+
+
+def _open_setups(problem: LotSizingProblem) -> np.ndarray:
+    """Flat ``sku * horizon + day`` indices of the setups that can carry a receipt."""
+    day = np.arange(problem.skus * problem.horizon) % problem.horizon
+    return np.flatnonzero((day >= problem.lead_time) & (_receipt_ceiling(problem) > 0))
+
+
+def build_lot_sizing_model(problem: LotSizingProblem) -> Any:
+    """
+    Builds the time-expanded OR-Tools MIP of a lot sizing problem.
+
+    Variables are laid out as receipts, closing stock, lost demand and
+    setups, each indexed ``sku * horizon + day``. One balance row per SKU
+    and day is followed by one row per SKU and day tying receipts to their
+    setup, bounded by the demand still to come, and the per-day capacity
+    rows.
+
+    Args:
+        problem: The lot sizing problem.
+
+    Returns:
+        A populated ``ModelBuilderHelper``.
+    """
+    from ortools.linear_solver.python import model_builder_helper as mbh
+    from scipy import sparse
+
+    skus, horizon = problem.skus, problem.horizon
+    size = skus * horizon
+    cells = np.arange(size)
+    day = cells % horizon
+
+    # stock[t] - stock[t - 1] - receipts[t] - lost[t] = -demand[t]
+    carried = cells[day > 0]
+    row_index = [cells, carried, cells, cells]
+    column_index = [size + cells, size + carried - 1, cells, 2 * size + cells]
+    values = [np.ones(size), -np.ones(len(carried)), -np.ones(size), -np.ones(size)]
+    balance = -problem.demand.copy()
+    balance[:, 0] += problem.initial_stock
+    row_lower, row_upper = [balance.reshape(-1)], [balance.reshape(-1)]
+
+    # receipts[t] - remaining_demand[t] * setup[t] <= 0
+    remaining = _receipt_ceiling(problem)
+    row_index += [size + cells, size + cells]
+    column_index += [cells, 3 * size + cells]
+    values += [np.ones(size), -remaining]
+    row_lower.append(np.full(size, -np.inf))
+    row_upper.append(np.zeros(size))
+    rows = 2 * size
+
+    if problem.capacity is not None:
+        row_index.append(rows + day)
+        column_index.append(cells)
+        values.append(np.ones(size))
+        row_lower.append(np.full(horizon, -np.inf))
+        row_upper.append(problem.capacity)
+        rows += horizon
+
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate(values),
+            (np.concatenate(row_index), np.concatenate(column_index)),
+        ),
+        shape=(rows, 4 * size),
+    )
+    receipt_upper = np.where(day >= problem.lead_time, np.inf, 0.0)
+    # Setups that cannot carry a receipt are fixed at zero and need no flag
+    open_setups = _open_setups(problem)
+    setup_upper = np.zeros(size)
+    setup_upper[open_setups] = 1.0
+    # The helper's stubs mistype its array arguments, so it is used untyped
+    helper: Any = mbh.ModelBuilderHelper()
+    helper.fill_model_from_sparse_data(
+        np.zeros(4 * size),
+        np.concatenate(
+            [
+                receipt_upper,
+                np.full(size, np.inf),
+                problem.demand.reshape(-1),
+                setup_upper,
+            ]
+        ),
+        np.concatenate(
+            [
+                np.repeat(problem.unit_cost, horizon),
+                np.repeat(problem.holding_cost, horizon),
+                np.repeat(problem.shortage_cost, horizon),
+                np.repeat(problem.setup_cost, horizon),
+            ]
+        ),
+        np.concatenate(row_lower),
+        np.concatenate(row_upper),
+        matrix,
+    )
+    # The helper has no bulk integrality setter
+    for index in (3 * size + open_setups).tolist():
+        helper.set_var_integrality(index, True)
+    return helper
+
+
+def _solve_mip(
+    problem: LotSizingProblem, hint: LotSizingPlan, time_limit_s: Optional[float]
+) -> LotSizingPlan:
+    """Solves the lot sizing MIP with SCIP, starting from ``hint``."""
+    from ortools.linear_solver.python import model_builder_helper as mbh
+
+    model = build_lot_sizing_model(problem)
+    # Hinting the integral setups is enough; SCIP completes the continuous columns
+    columns = _open_setups(problem)
+    setups = hint.setups.reshape(-1)[columns].astype(np.float64)
+    for index, value in zip(
+        (3 * problem.skus * problem.horizon + columns).tolist(), setups.tolist()
+    ):
+        model.add_hint(index, value)
+    solver = mbh.ModelSolverHelper(MIP_SOLVER)
+    if time_limit_s is not None:
+        solver.set_time_limit_in_seconds(time_limit_s)
+    solver.solve(model)
+    if not solver.has_solution():
+        return hint
+
+    shape = (problem.skus, problem.horizon)
+    receipts = np.maximum(
+        np.asarray(solver.variable_values())[: problem.skus * problem.horizon], 0.0
+    )
+    plan = problem.simulate(receipts.reshape(shape))
+    plan.status = solver.status().name
+    plan.backend = MIP_SOLVER
+    plan.lower_bound = max(hint.lower_bound, float(solver.best_objective_bound()))
+    return plan if plan.total_cost <= hint.total_cost else hint
+
+
+def solve_lot_sizing(
+    problem: LotSizingProblem, time_limit_s: Optional[float] = None
+) -> LotSizingPlan:
+    """
+    Plans daily receipts for a lot sizing problem.
+
+    Without a capacity the Wagner-Whitin plan is optimal. With one, the
+    Lagrangian plan is returned with its bound, and problems of at most
+    ``MIP_MAX_CELLS`` SKU-days are then solved exactly with SCIP.
+
+    Args:
+        problem: The lot sizing problem.
+        time_limit_s: Wall-clock limit of the whole solve.
+
+    Returns:
+        The plan, with ``lower_bound`` and ``gap`` certifying its cost.
+    """
+    if problem.capacity is None:
+        return wagner_whitin(problem)
+
+    start_time = time.perf_counter()
+    deadline = start_time + time_limit_s if time_limit_s is not None else None
+    plan = solve_lagrangian(problem, deadline=deadline)
+    if problem.skus * problem.horizon <= MIP_MAX_CELLS and plan.status != "OPTIMAL":
+        time_left = deadline - time.perf_counter() if deadline is not None else None
+        if time_left is None or time_left > 0:
+            plan = _solve_mip(problem, plan, time_left)
+    plan.solve_time_ms = (time.perf_counter() - start_time) * 1000
+    return plan
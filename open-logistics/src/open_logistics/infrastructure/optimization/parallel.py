@@ -0,0 +1,263 @@
+"""
+Parallel scenario evaluation over shared memory.
+
+The arrays every shard reads (planned levels, costs and the daily demand
+profile) are copied once into ``multiprocessing.shared_memory`` blocks, and
+workers of a persistent process pool attach to them by name instead of
+receiving pickled copies. Each worker samples and scores its own shard of
+scenarios, returning only per-SKU totals, which the parent merges. Shards
+draw from the same spawned seed streams as serial chunks, so both paths
+agree for equal shard sizes.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.optimization.scenarios import (
+    DEFAULT_CHUNK_BYTES,
+    TIME_LIMITED_CHUNKS,
+    DemandModel,
+    ScenarioReport,
+    ScenarioTotals,
+    ShardTiming,
+    chunk_sizes,
+    evaluate_chunk,
+    evaluate_plan,
+)
+
+# Block name, shape and dtype of an array placed in shared memory.
+SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedArrays:
+    """
+    Arrays copied into shared memory blocks owned by this process.
+
+    ``specs`` is small and picklable; workers pass it to ``attach`` to get
+    zero-copy views. The blocks are unlinked on ``close``.
+    """
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.specs: Dict[str, SharedArraySpec] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+        try:
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                self._blocks.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+                self.specs[key] = (block.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def attach(
+    specs: Mapping[str, SharedArraySpec],
+) -> Tuple[List[shared_memory.SharedMemory], Dict[str, np.ndarray]]:
+    """Maps the blocks described by ``specs``, returning them and array views on them."""
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+
+def _evaluate_shard(
+    specs: Mapping[str, SharedArraySpec],
+    sigma: float,
+    lead_time_mean: float,
+    seed: np.random.SeedSequence,
+    scenarios: int,
+) -> Tuple[ScenarioTotals, ShardTiming]:
+    """Worker entry point scoring one shard against the shared arrays."""
+    start_time = time.perf_counter()
+    model: Optional[DemandModel] = None
+    arrays: Optional[Dict[str, np.ndarray]]
+    blocks, arrays = attach(specs)
+    try:
+        model = DemandModel(arrays["daily_mean"], sigma, lead_time_mean)
+        totals = evaluate_chunk(
+            arrays["levels"],
+            arrays["unit_cost"],
+            arrays["shortage_cost"],
+            model,
+            seed,
+            scenarios,
+        )
+    finally:
+        model = arrays = None
+        for block in blocks:
+            # Views kept alive by a traceback are released with it
+            with contextlib.suppress(BufferError):
+                block.close()
+    return totals, ShardTiming(
+        scenarios, os.getpid(), (time.perf_counter() - start_time) * 1000
+    )
+
+
+class ScenarioPool:
+    """
+    A persistent process pool evaluating scenario shards in parallel.
+
+    With one worker, or inside a worker process of another pool, plans are
+    evaluated serially in the calling process instead.
+    """
+
+    def __init__(self, workers: int = 0, start_method: str = "spawn"):
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1 and multiprocessing.parent_process() is None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Workers must share the parent's tracker, or exiting workers
+            # would unlink blocks the parent still owns
+            resource_tracker.ensure_running()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._pool
+
+    def evaluate(
+        self,
+        levels: np.ndarray,
+        unit_cost: np.ndarray,
+        shortage_cost: np.ndarray,
+        model: DemandModel,
+        scenarios: int = 1000,
+        seed: Optional[int] = 0,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        time_limit_s: Optional[float] = None,
+    ) -> ScenarioReport:
+        """
+        Scores an inventory plan like ``evaluate_plan``, one shard per task.
+
+        Shards are at least one per worker and each fits ``chunk_bytes``. A
+        broken pool is discarded and the plan evaluated serially. With
+        ``time_limit_s`` the report covers the shards finished by then, or
+        the first one to finish; the others are cancelled.
+
+        Raises:
+            ValueError: If fewer than one scenario is requested.
+        """
+        if not self.parallel:
+            return evaluate_plan(
+                levels,
+                unit_cost,
+                shortage_cost,
+                model,
+                scenarios,
+                seed,
+                chunk_bytes,
+                time_limit_s,
+            )
+        if scenarios < 1:
+            raise ValueError("At least one scenario is required")
+
+        deadline = None if time_limit_s is None else time.perf_counter() + time_limit_s
+        shards = (
+            self.workers
+            if time_limit_s is None
+            else max(self.workers, TIME_LIMITED_CHUNKS)
+        )
+        sizes = chunk_sizes(scenarios, model, chunk_bytes, shards=shards)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        arrays = {
+            "levels": np.asarray(levels, dtype=np.float64),
+            "unit_cost": np.asarray(unit_cost, dtype=np.float64),
+            "shortage_cost": np.asarray(shortage_cost, dtype=np.float64),
+            "daily_mean": model.daily_mean,
+        }
+        try:
+            with SharedArrays(arrays) as shared:
+                futures = [
+                    self.pool.submit(
+                        _evaluate_shard,
+                        shared.specs,
+                        model.sigma,
+                        model.lead_time_mean,
+                        shard_seed,
+                        size,
+                    )
+                    for shard_seed, size in zip(seeds, sizes)
+                ]
+                if deadline is not None:
+                    done, _ = wait(
+                        futures, timeout=max(deadline - time.perf_counter(), 0.0)
+                    )
+                    if not done:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in futures:
+                        future.cancel()
+                    futures = [future for future in futures if future in done]
+                results = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            logger.warning(f"Scenario pool failed, evaluating serially instead: {e}")
+            self._pool = None
+            return evaluate_plan(
+                levels,
+                unit_cost,
+                shortage_cost,
+                model,
+                scenarios,
+                seed,
+                chunk_bytes,
+                time_limit_s,
+            )
+
+        totals, timings = zip(*results)
+        return ScenarioReport.from_totals(
+            ScenarioTotals.merge(totals), timings, requested=scenarios
+        )
+
+    def shutdown(self) -> None:
+        """Shuts down the pool; it is recreated lazily on next use."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+@lru_cache()
+def get_scenario_pool() -> ScenarioPool:
+    """
+    Get the shared scenario pool.
+
+    This function is cached so all optimizers in a process share one pool.
+    """
+    settings = get_settings().optimization
+    return ScenarioPool(
+        workers=settings.SCENARIO_WORKERS, start_method=settings.PROCESS_START_METHOD
+    )
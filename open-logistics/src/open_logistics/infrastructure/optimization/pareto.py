@@ -0,0 +1,513 @@
+"""
+Pareto frontiers over the objectives of an optimization request.
+
+Every supported objective is linear in the allocated levels, so each point
+of the frontier is one LP over the allocation problem: a weighted sum of
+the range-normalized objectives, or the first objective with the others
+capped (epsilon constraints). The LP is built once with an epsilon row per
+secondary objective; full solves clone it and only rewrite the objective
+and row limits. Sweep points are solved in chains of neighbors, each
+point re-solving only a working set of items from the previous point's
+duals, and the chains run on parallel threads.
+"""
+
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    LP_SOLVER,
+    AllocationProblem,
+    _constraint_rows,
+    _row_matrix,
+    solve_working_set,
+)
+
+OBJECTIVES = ("minimize_cost", "maximize_efficiency", "minimize_risk")
+SWEEPS = ("weighted_sum", "epsilon_constraint")
+DEFAULT_FRONTIER_POINTS = 20
+# Weight of the other objectives in a single-objective solve, so that ties
+# are broken towards non-dominated points.
+TIE_BREAK_WEIGHT = 1e-4
+# Relative difference below which two frontier points are considered equal.
+POINT_TOLERANCE = 1e-6
+
+
+@dataclass
+class ObjectiveSet:
+    """
+    Objectives as linear functions ``coefficients @ x + offsets`` to minimize.
+
+    ``maximize`` objectives are stored negated and reported with their
+    natural sign by ``evaluate``.
+    """
+
+    names: List[str]
+    coefficients: np.ndarray
+    offsets: np.ndarray
+    maximize: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(
+        cls,
+        problem: AllocationProblem,
+        names: Sequence[str],
+        risk_weight: Optional[np.ndarray] = None,
+    ) -> "ObjectiveSet":
+        """
+        Builds the supported objectives among ``names``, in their order.
+
+        * ``minimize_cost``: stocking plus shortage cost, as allocated.
+        * ``maximize_efficiency``: share of the target stock not held.
+        * ``minimize_risk``: share of the ``risk_weight``-weighted target
+          left short (uniform weights by default).
+
+        Raises:
+            ValueError: If fewer than two supported objectives are named.
+        """
+        selected = list(dict.fromkeys(name for name in names if name in OBJECTIVES))
+        if len(selected) < 2:
+            raise ValueError(f"A Pareto frontier needs two of {', '.join(OBJECTIVES)}")
+
+        target = problem.target
+        weight = (
+            np.ones(len(problem))
+            if risk_weight is None
+            else np.asarray(risk_weight, dtype=np.float64)
+        )
+        total_stock = max(float(target.sum()), 1e-12)
+        total_risk = max(float(weight @ target), 1e-12)
+        forms = {
+            "minimize_cost": (
+                problem.unit_cost - problem.shortage_cost,
+                float(problem.shortage_cost @ target),
+            ),
+            "maximize_efficiency": (np.full(len(problem), 1.0 / total_stock), -1.0),
+            "minimize_risk": (-weight / total_risk, 1.0),
+        }
+        return cls(
+            names=selected,
+            coefficients=np.stack([forms[name][0] for name in selected]),
+            offsets=np.array([forms[name][1] for name in selected]),
+            maximize=np.array([name.startswith("maximize") for name in selected]),
+        )
+
+    @property
+    def scale(self) -> np.ndarray:
+        """Largest coefficient of each objective, to put them on a common scale."""
+        scale: np.ndarray = np.maximum(np.abs(self.coefficients).max(axis=1), 1e-12)
+        return scale
+
+    def minimized(self, levels: np.ndarray) -> np.ndarray:
+        values: np.ndarray = self.coefficients @ levels + self.offsets
+        return values
+
+    @property
+    def labels(self) -> List[str]:
+        """Objective names without their direction, e.g. ``cost``."""
+        return [name.split("_", 1)[1] for name in self.names]
+
+    def evaluate(self, levels: np.ndarray) -> Dict[str, float]:
+        """Objective values with their natural sign."""
+        values = np.where(self.maximize, -1.0, 1.0) * self.minimized(levels)
+        return dict(zip(self.labels, values.tolist()))
+
+
+@dataclass
+class FrontierPoint:
+    """
+    One solved sweep point.
+
+    ``parameters`` are the objective weights of a weighted sum, or the bound
+    an epsilon constraint puts on one objective, in its natural sign.
+    """
+
+    levels: np.ndarray
+    values: np.ndarray
+    method: str
+    parameters: Dict[str, float]
+
+
+@dataclass
+class ParetoFrontier:
+    """The non-dominated points of a sweep, ordered by the first objective."""
+
+    objectives: ObjectiveSet
+    points: List[FrontierPoint]
+    solves: int = 0
+    warm_solves: int = 0
+    skipped: int = 0
+    solve_time_ms: float = 0.0
+    chain_times_ms: List[float] = field(default_factory=list)
+
+    def to_section(self) -> Dict[str, Any]:
+        """Renders the frontier as the ``pareto_frontier`` section, without levels."""
+        return {
+            "objectives": list(self.objectives.names),
+            "points": [
+                {
+                    "objectives": self.objectives.evaluate(point.levels),
+                    "method": point.method,
+                    "parameters": point.parameters,
+                }
+                for point in self.points
+            ],
+            "solves": self.solves,
+            "warm_solves": self.warm_solves,
+            "skipped_points": self.skipped,
+            "solve_time_ms": self.solve_time_ms,
+        }
+
+
+@dataclass
+class _SweepJob:
+    """One sweep point to solve, warm-started from the previous point or ``anchor``."""
+
+    method: str
+    parameters: Dict[str, float]
+    objective: np.ndarray
+    row_upper: np.ndarray
+    anchor: int
+    restart: bool = False
+
+
+class _SweepModel:
+    """
+    The frontier LP: allocation rows plus one epsilon row per secondary objective.
+
+    The OR-Tools model is built once; full solves clone it and only rewrite
+    the objective and row limits, and warm solves go through the working set.
+    """
+
+    def __init__(self, problem: AllocationProblem, objectives: ObjectiveSet):
+        from ortools.linear_solver.python import model_builder_helper as mbh
+
+        allocation_rows, allocation_upper = _constraint_rows(problem)
+        self.rows = allocation_rows + list(
+            objectives.coefficients[1:] / objectives.scale[1:, None]
+        )
+        self.row_upper = np.concatenate(
+            [allocation_upper, np.full(len(objectives) - 1, np.inf)]
+        )
+        self.epsilon_rows = np.arange(len(allocation_rows), len(self.rows))
+        self.upper = problem.target
+        self.lower = np.minimum(problem.lower, self.upper)
+        self.variables = list(range(len(problem)))
+
+        # The helper's stubs mistype its array arguments, so it is used untyped
+        helper: Any = mbh.ModelBuilderHelper()
+        helper.fill_model_from_sparse_data(
+            self.lower,
+            self.upper,
+            np.zeros(len(problem)),
+            np.full(len(self.rows), -np.inf),
+            self.row_upper,
+            _row_matrix(self.rows, len(problem)),
+        )
+        self.model = helper
+
+    def solve_full(
+        self, objective: np.ndarray, row_upper: np.ndarray
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        from ortools.linear_solver.python import model_builder_helper as mbh
+
+        model: Any = mbh.ModelBuilderHelper()
+        model.overwrite_model(self.model)
+        model.set_objective_coefficients(self.variables, objective.tolist())
+        for row in self.epsilon_rows.tolist():
+            model.set_constraint_upper_bound(row, float(row_upper[row]))
+        solver = mbh.ModelSolverHelper(LP_SOLVER)
+        solver.solve(model)
+        if solver.status().name != "OPTIMAL":
+            return None
+        return np.asarray(solver.variable_values()), np.asarray(solver.dual_values())
+
+    def solve(
+        self,
+        objective: np.ndarray,
+        row_upper: np.ndarray,
+        warm: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> Tuple[Optional[Tuple[np.ndarray, np.ndarray]], bool]:
+        """
+        Solves one sweep point, returning ``(levels, duals)`` or ``None`` and whether it was warm.
+
+        The objective is rescaled to a largest coefficient of one, which keeps
+        it clear of the solver's absolute tolerances without moving the optimum.
+        """
+        objective = objective / max(float(np.abs(objective).max()), 1e-300)
+        if warm is not None:
+            solved = solve_working_set(
+                objective,
+                self.rows,
+                row_upper,
+                self.lower,
+                self.upper,
+                warm[0],
+                warm[1],
+                np.empty(0, dtype=np.int64),
+            )
+            if solved is not None:
+                return solved, True
+        return self.solve_full(objective, row_upper), False
+
+
+def _simplex_weights(dimensions: int, count: int) -> np.ndarray:
+    """``count`` weight vectors spread evenly over the simplex, corners excluded."""
+    if count <= 0:
+        return np.empty((0, dimensions))
+    resolution = dimensions
+    while math.comb(resolution - 1, dimensions - 1) < count:
+        resolution += 1
+    # Strictly positive lattice points: every objective keeps some weight
+    lattice = np.array(
+        [
+            point
+            for point in itertools.product(range(1, resolution), repeat=dimensions)
+            if sum(point) == resolution
+        ],
+        dtype=np.float64,
+    )
+    picks = np.unique(np.linspace(0, len(lattice) - 1, count).round().astype(int))
+    weights: np.ndarray = lattice[picks] / resolution
+    return weights
+
+
+def _epsilon_caps(
+    ideal: np.ndarray, nadir: np.ndarray, count: int
+) -> List[Tuple[int, float]]:
+    """
+    ``count`` caps as ``(objective, cap)``, spread over the secondary objectives.
+
+    Each secondary objective is capped alone, from near its nadir towards its
+    ideal, so every cap is feasible and each is close to the one before.
+    """
+    secondary = np.arange(1, len(ideal))
+    caps: List[Tuple[int, float]] = []
+    for index, share in zip(
+        secondary.tolist(), np.array_split(np.arange(count), len(secondary))
+    ):
+        steps = np.linspace(1.0, 0.0, len(share) + 2)[1:-1]
+        caps.extend(
+            (index, float(ideal[index] + step * (nadir[index] - ideal[index])))
+            for step in steps
+        )
+    return caps
+
+
+def _neighbor_order(parameters: np.ndarray) -> np.ndarray:
+    """Visits sweep points as a nearest-neighbor path, so each warm start is close."""
+    if not len(parameters):
+        return np.empty(0, dtype=np.int64)
+    order = [0]
+    remaining = np.ones(len(parameters), dtype=bool)
+    remaining[0] = False
+    for _ in range(len(parameters) - 1):
+        distance = np.linalg.norm(parameters - parameters[order[-1]], axis=1)
+        distance[~remaining] = np.inf
+        order.append(int(np.argmin(distance)))
+        remaining[order[-1]] = False
+    return np.array(order, dtype=np.int64)
+
+
+def _non_dominated(values: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Indices of points no other point dominates, duplicates removed."""
+    normalized = values / scale
+    keep: List[int] = []
+    for index in np.lexsort(normalized.T[::-1]).tolist():
+        point = normalized[index]
+        if keep:
+            others = normalized[keep]
+            if np.any(np.all(others <= point + POINT_TOLERANCE, axis=1)):
+                continue
+        keep.append(index)
+    return np.array(keep, dtype=np.int64)
+
+
+def _split(jobs: Sequence[Any], parts: int) -> List[List[Any]]:
+    """Splits jobs into at most ``parts`` contiguous, non-empty chains."""
+    parts = max(1, min(parts, len(jobs)))
+    bounds = np.linspace(0, len(jobs), parts + 1).round().astype(int)
+    return [
+        list(jobs[start:end])
+        for start, end in zip(bounds[:-1], bounds[1:])
+        if end > start
+    ]
+
+
+def compute_frontier(
+    problem: AllocationProblem,
+    names: Sequence[str],
+    risk_weight: Optional[np.ndarray] = None,
+    points: int = DEFAULT_FRONTIER_POINTS,
+    sweeps: Sequence[str] = SWEEPS,
+    workers: int = 0,
+    time_limit_s: Optional[float] = None,
+) -> ParetoFrontier:
+    """
+    Computes the Pareto frontier of an allocation problem over several objectives.
+
+    Each objective is first minimized alone, which gives the ideal and nadir
+    values used to normalize weights and place epsilon caps. The sweep
+    points are then split between the requested sweeps and solved in
+    ``workers`` chains on threads.
+
+    Args:
+        problem: The allocation problem.
+        names: Requested objectives; unsupported names are ignored.
+        risk_weight: Per-item weight of a unit short in ``minimize_risk``.
+        points: Sweep points to solve in addition to the single-objective ones.
+        sweeps: Any of ``weighted_sum`` and ``epsilon_constraint``.
+        workers: Solver threads; 0 uses one per CPU.
+        time_limit_s: Wall-clock limit of the sweep. The single-objective
+            anchors are always solved; sweep points not started by then are
+            skipped and counted in ``skipped``.
+
+    Returns:
+        The non-dominated points found.
+
+    Raises:
+        ValueError: If fewer than two supported objectives are named or a
+            sweep is unknown.
+    """
+    unknown = set(sweeps) - set(SWEEPS)
+    if unknown:
+        raise ValueError(f"Unknown frontier sweeps: {', '.join(sorted(unknown))}")
+    start_time = time.perf_counter()
+    deadline = None if time_limit_s is None else start_time + time_limit_s
+    objectives = ObjectiveSet.build(problem, names, risk_weight)
+    model = _SweepModel(problem, objectives)
+    workers = workers or os.cpu_count() or 1
+    dimensions = len(objectives)
+    labels = objectives.labels
+
+    def anchor_objective(index: int) -> np.ndarray:
+        weights = np.full(dimensions, TIE_BREAK_WEIGHT)
+        weights[index] = 1.0
+        objective: np.ndarray = (weights / objectives.scale) @ objectives.coefficients
+        return objective
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pareto") as pool:
+        solved_anchors = list(
+            pool.map(
+                lambda index: model.solve(anchor_objective(index), model.row_upper)[0],
+                range(dimensions),
+            )
+        )
+        anchors = [anchor for anchor in solved_anchors if anchor is not None]
+        if len(anchors) < dimensions:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            return ParetoFrontier(
+                objectives, [], solves=dimensions, solve_time_ms=elapsed_ms
+            )
+
+        payoff = np.array([objectives.minimized(levels) for levels, _ in anchors])
+        ideal, nadir = payoff.min(axis=0), payoff.max(axis=0)
+        scale = np.maximum(nadir - ideal, 1e-9)
+
+        jobs: List[_SweepJob] = []
+        counts = np.diff(np.linspace(0, points, len(sweeps) + 1).round().astype(int))
+        for sweep, count in zip(sweeps, counts.tolist()):
+            if sweep == "weighted_sum":
+                grid = _simplex_weights(dimensions, count)
+                for weights in grid[_neighbor_order(grid)]:
+                    objective = (weights / scale) @ objectives.coefficients
+                    parameters = dict(zip(labels, weights.tolist()))
+                    jobs.append(
+                        _SweepJob(
+                            sweep,
+                            parameters,
+                            objective,
+                            model.row_upper,
+                            int(np.argmax(weights)),
+                        )
+                    )
+            else:
+                primary = anchor_objective(0)
+                previous = None
+                for index, cap in _epsilon_caps(ideal, nadir, count):
+                    row_upper = model.row_upper.copy()
+                    row = model.epsilon_rows[index - 1]
+                    row_upper[row] = (
+                        cap - objectives.offsets[index]
+                    ) / objectives.scale[index]
+                    parameters = {
+                        labels[index]: -cap if objectives.maximize[index] else cap
+                    }
+                    # Capping a new objective starts again from the loose end
+                    jobs.append(
+                        _SweepJob(
+                            sweep,
+                            parameters,
+                            primary,
+                            row_upper,
+                            0,
+                            restart=index != previous,
+                        )
+                    )
+                    previous = index
+
+        def run_chain(
+            chain: Sequence[_SweepJob],
+        ) -> Tuple[List[FrontierPoint], int, int, float]:
+            chain_start = time.perf_counter()
+            solved: List[FrontierPoint] = []
+            warm: Optional[Tuple[np.ndarray, np.ndarray]] = None
+            warm_count, skipped = 0, 0
+            for attempted, job in enumerate(chain):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    skipped = len(chain) - attempted
+                    break
+                if warm is None or job.restart:
+                    warm = anchors[job.anchor]
+                result, was_warm = model.solve(job.objective, job.row_upper, warm)
+                warm_count += was_warm
+                if result is not None:
+                    warm = result
+                    solved.append(
+                        FrontierPoint(
+                            result[0],
+                            objectives.minimized(result[0]),
+                            job.method,
+                            job.parameters,
+                        )
+                    )
+            return (
+                solved,
+                warm_count,
+                skipped,
+                (time.perf_counter() - chain_start) * 1000,
+            )
+
+        results = list(pool.map(run_chain, _split(jobs, workers)))
+
+    candidates = [
+        FrontierPoint(
+            levels,
+            objectives.minimized(levels),
+            "single_objective",
+            {labels[index]: 1.0},
+        )
+        for index, (levels, _) in enumerate(anchors)
+    ]
+    for solved, _, _, _ in results:
+        candidates.extend(solved)
+    keep = _non_dominated(np.array([point.values for point in candidates]), scale)
+    skipped = sum(skipped for _, _, skipped, _ in results)
+    return ParetoFrontier(
+        objectives=objectives,
+        points=[candidates[index] for index in keep.tolist()],
+        solves=dimensions + len(jobs) - skipped,
+        warm_solves=sum(warm for _, warm, _, _ in results),
+        skipped=skipped,
+        solve_time_ms=(time.perf_counter() - start_time) * 1000,
+        chain_times_ms=[chain_time for _, _, _, chain_time in results],
+    )
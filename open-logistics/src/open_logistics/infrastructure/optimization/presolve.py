@@ -0,0 +1,355 @@
+"""
+Presolve reductions ahead of the allocation and network solvers.
+
+Allocation: items whose stocking costs them no less than their shortage are
+fixed at their lower bound; items with the same unit and shortage cost are
+interchangeable in the LP, so each such group becomes a single variable
+bounded by the sums of its members' bounds. Coupling rows that cannot bind
+are dropped; the others are kept as they are, so their duals carry over to
+the original problem. The reduced problem is an ``AllocationProblem`` of its own, and its
+solution is spread back over each group's members in proportion to their
+headroom.
+
+Network: nodes that can carry no flow (zero capacity, suppliers without
+supply, sites without demand, depots without inbound or outbound lanes) are
+removed, as are suppliers and depots that are farther and smaller than a
+peer able to carry the whole flow, since their flow can always be rerouted
+through that peer at no greater cost.
+
+Both reductions are exact: the expanded solution is optimal for the
+original problem, and the allocation's expanded row duals are its duals.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    AllocationSolution,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.network import (
+    SITE,
+    SUPPLIER,
+    LocationNetwork,
+    NetworkFlowPlan,
+    solve_network_flow,
+)
+
+
+@dataclass
+class PresolveStats:
+    """Sizes of a model before and after presolve."""
+
+    original_size: int
+    reduced_size: int
+    time_ms: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """How many times smaller the reduced model is."""
+        return self.original_size / max(self.reduced_size, 1)
+
+
+@dataclass
+class PresolvedAllocation:
+    """
+    A reduced allocation problem and the map back to the original items.
+
+    Reduced variable ``g`` stands for the original items with
+    ``group == g``; items with ``group == -1`` are fixed at ``fixed_levels``.
+    """
+
+    problem: AllocationProblem
+    original: AllocationProblem
+    group: np.ndarray
+    fixed_levels: np.ndarray
+    row_kept: List[bool]
+    integral: bool
+    stats: PresolveStats
+
+    def expand(self, levels: np.ndarray) -> np.ndarray:
+        """Spreads reduced levels over the original items."""
+        lower, upper = _item_bounds(self.original, self.integral)
+        expanded: np.ndarray = self.fixed_levels.copy()
+        free = np.flatnonzero(self.group >= 0)
+        if not len(free):
+            return expanded
+
+        group = self.group[free]
+        room = upper[free] - lower[free]
+        group_lower = np.bincount(group, lower[free], minlength=len(levels))
+        group_room = np.bincount(group, room, minlength=len(levels))
+        share = np.divide(
+            levels - group_lower,
+            group_room,
+            out=np.zeros(len(levels)),
+            where=group_room > 0,
+        )
+        values = lower[free] + np.clip(share, 0.0, 1.0)[group] * room
+        if self.integral:
+            # Whole units: floor every share, then hand each group's remaining
+            # units to its members with the largest fractional parts
+            floored = np.floor(values + 1e-9)
+            missing = np.rint(
+                np.bincount(group, values - floored, minlength=len(levels))
+            ).astype(np.int64)
+            order = np.lexsort((floored - values, group))
+            first = np.searchsorted(group[order], group[order])
+            rank = np.arange(len(order)) - first
+            bump = order[rank < missing[group[order]]]
+            floored[bump] += 1.0
+            values = np.minimum(floored, upper[free])
+        expanded[free] = values
+        return expanded
+
+    def expand_duals(self, duals: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Row duals of the original problem; dropped rows never bind and price at zero."""
+        if duals is None:
+            return None
+        full = np.zeros(len(self.row_kept))
+        full[np.flatnonzero(self.row_kept)] = duals
+        return full
+
+
+def _item_bounds(
+    problem: AllocationProblem, integral: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Item bounds as the solver sees them."""
+    upper = np.floor(problem.target) if integral else problem.target
+    return np.minimum(problem.lower, upper), upper
+
+
+def presolve_allocation(
+    problem: AllocationProblem, integral: bool = False
+) -> PresolvedAllocation:
+    """
+    Reduces an allocation problem; see the module docstring.
+
+    Args:
+        problem: The allocation problem.
+        integral: Whether stock levels must be whole units.
+
+    Returns:
+        The reduced problem and the map back to ``problem``'s items.
+    """
+    start_time = time.perf_counter()
+    lower, upper = _item_bounds(problem, integral)
+    budget, capacity = problem.budget, problem.capacity
+
+    # Items that only add cost, with non-negative row coefficients, stay at their lower bound
+    fixed = ((problem.unit_cost - problem.shortage_cost) >= 0) & (
+        problem.unit_cost >= 0
+    )
+    fixed |= upper <= lower
+    fixed_levels = np.where(fixed, lower, 0.0)
+    if budget is not None:
+        budget -= float(problem.unit_cost[fixed] @ lower[fixed])
+    if capacity is not None:
+        capacity -= float(lower[fixed].sum())
+
+    # Group free items by cost profile; a lexsort is much faster than a row-wise unique
+    free = np.flatnonzero(~fixed)
+    free_unit, free_shortage = problem.unit_cost[free], problem.shortage_cost[free]
+    order = np.lexsort((free_shortage, free_unit))
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (np.diff(free_unit[order]) != 0) | (np.diff(free_shortage[order]) != 0)
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(starts) - 1
+    group = np.full(len(problem), -1, dtype=np.int64)
+    group[free] = inverse
+    groups = int(starts.sum())
+    group_lower = np.bincount(inverse, lower[free], minlength=groups)
+    group_upper = np.bincount(inverse, upper[free], minlength=groups)
+    unit_cost, shortage_cost = free_unit[order][starts], free_shortage[order][starts]
+
+    # Rows the free items cannot fill are dropped. Kept rows do not tighten the
+    # group bounds: a bound that binds in their place would take over the
+    # row's shadow price, and the expanded duals would no longer be exact
+    if budget is not None:
+        positive = unit_cost > 0
+        if unit_cost @ np.where(positive, group_upper, group_lower) <= budget:
+            budget = None
+    if capacity is not None and group_upper.sum() <= capacity:
+        capacity = None
+    if integral:
+        group_upper = np.floor(group_upper + 1e-9)
+    row_kept = [
+        original is not None and reduced is not None
+        for original, reduced in (
+            (problem.budget, budget),
+            (problem.capacity, capacity),
+        )
+        if original is not None
+    ]
+
+    reduced = AllocationProblem(
+        target=group_upper,
+        lower=group_lower,
+        unit_cost=unit_cost,
+        shortage_cost=shortage_cost,
+        budget=budget,
+        capacity=capacity,
+    )
+    stats = PresolveStats(
+        len(problem), len(reduced), (time.perf_counter() - start_time) * 1000
+    )
+    return PresolvedAllocation(
+        reduced, problem, group, fixed_levels, row_kept, integral, stats
+    )
+
+
+def solve_presolved_allocation(
+    problem: AllocationProblem,
+    integral: bool = False,
+    time_limit_s: Optional[float] = None,
+) -> Tuple[AllocationSolution, PresolveStats]:
+    """
+    Presolves an allocation problem, solves the reduced one and expands it.
+
+    Returns:
+        The solution in terms of ``problem``'s items and the presolve sizes.
+    """
+    presolved = presolve_allocation(problem, integral)
+    reduced = presolved.problem
+    if len(reduced):
+        solution = solve_allocation(
+            reduced, integral=integral, time_limit_s=time_limit_s
+        )
+    else:
+        solution = AllocationSolution(
+            levels=np.empty(0),
+            status="OPTIMAL",
+            objective_value=0.0,
+            best_bound=0.0,
+            backend="presolve",
+            build_time_ms=0.0,
+            solve_time_ms=0.0,
+            duals=np.zeros(sum(presolved.row_kept)),
+        )
+    if not solution.has_solution:
+        return solution, presolved.stats
+
+    levels = presolved.expand(solution.levels)
+    objective_value = problem.objective(levels)
+    # Both objectives differ by a constant: the shortage of fixed items and rounded-off targets
+    offset = objective_value - reduced.objective(solution.levels)
+    expanded = AllocationSolution(
+        levels=levels,
+        status=solution.status,
+        objective_value=objective_value,
+        best_bound=solution.best_bound + offset,
+        backend=solution.backend,
+        build_time_ms=solution.build_time_ms + presolved.stats.time_ms,
+        solve_time_ms=solution.solve_time_ms,
+        duals=presolved.expand_duals(solution.duals),
+        warm_start=solution.warm_start,
+        presolved=True,
+    )
+    return expanded, presolved.stats
+
+
+@dataclass
+class PresolvedNetwork:
+    """A reduced location network and the nodes and lanes it kept."""
+
+    network: LocationNetwork
+    original: LocationNetwork
+    nodes: np.ndarray
+    lanes: np.ndarray
+    stats: PresolveStats
+
+    def expand(self, plan: NetworkFlowPlan) -> NetworkFlowPlan:
+        """The flow plan over the original network; removed lanes carry nothing."""
+        flow = np.zeros(self.original.lane_count)
+        flow[self.lanes] = plan.flow
+        unmet = self.original.demand.copy()
+        unmet[self.nodes] = plan.unmet_demand
+        return NetworkFlowPlan(
+            flow=flow,
+            unmet_demand=unmet,
+            status=plan.status,
+            total_cost=plan.total_cost,
+            solve_time_ms=plan.solve_time_ms + self.stats.time_ms,
+        )
+
+
+def presolve_network(network: LocationNetwork) -> PresolvedNetwork:
+    """
+    Removes nodes that never need to carry flow; see the module docstring.
+
+    A supplier or depot ``u`` is dominated by a peer ``v`` of its echelon
+    when ``v`` can pass the largest possible flow (its capacity, its supply
+    for a supplier, and the capacity of the lanes used) and, for every lane
+    into or out of ``u``, ``v`` has a lane to or from the same node that is
+    no more expensive.
+    """
+    start_time = time.perf_counter()
+    n = len(network)
+    origins, destinations = network.lane_origins(), network.indices
+    flow_bound = min(float(network.supply.sum()), float(network.demand.sum()))
+
+    keep = network.node_capacity > 0
+    keep &= (network.echelon != SUPPLIER) | (network.supply > 0)
+    keep &= (network.echelon != SITE) | (network.demand > 0)
+
+    # Cheapest lane between each pair able to carry the whole flow, per dominating candidate
+    wide = network.lane_capacity >= flow_bound
+    can_carry = keep & (network.node_capacity >= flow_bound) & (network.echelon != SITE)
+    can_carry &= (network.echelon != SUPPLIER) | (network.supply >= flow_bound)
+    for peer in np.flatnonzero(can_carry).tolist():
+        if not keep[peer]:
+            continue
+        out_cost = np.full(n, np.inf)
+        outbound = wide & (origins == peer)
+        np.minimum.at(out_cost, destinations[outbound], network.lane_cost[outbound])
+        in_cost = np.full(n, np.inf)
+        inbound = wide & (destinations == peer)
+        np.minimum.at(in_cost, origins[inbound], network.lane_cost[inbound])
+
+        out_worse = out_cost[destinations] > network.lane_cost
+        in_worse = in_cost[origins] > network.lane_cost
+        # A lane of u with no cheaper counterpart at the peer keeps u
+        undominated = np.bincount(origins[out_worse], minlength=n) + np.bincount(
+            destinations[in_worse], minlength=n
+        )
+        dominated = (
+            keep & (network.echelon == network.echelon[peer]) & (undominated == 0)
+        )
+        dominated[peer] = False
+        keep &= ~dominated
+
+    # Dropping nodes can strand others; repeat until no lane-less node is left
+    while True:
+        live = keep[origins] & keep[destinations]
+        has_in = np.bincount(destinations[live], minlength=n) > 0
+        has_out = np.bincount(origins[live], minlength=n) > 0
+        stranded = keep & (
+            ((network.echelon != SUPPLIER) & ~has_in)
+            | ((network.echelon != SITE) & ~has_out)
+        )
+        stranded &= network.echelon != SITE
+        if not stranded.any():
+            break
+        keep &= ~stranded
+
+    nodes = np.flatnonzero(keep)
+    lanes = np.flatnonzero(keep[origins] & keep[destinations])
+    reduced = network.subnetwork(nodes, lanes)
+    stats = PresolveStats(
+        n + network.lane_count,
+        len(reduced) + reduced.lane_count,
+        (time.perf_counter() - start_time) * 1000,
+    )
+    return PresolvedNetwork(reduced, network, nodes, lanes, stats)
+
+
+def solve_presolved_network(
+    network: LocationNetwork,
+) -> Tuple[NetworkFlowPlan, PresolveStats]:
+    """Presolves a network, solves the reduced one and expands its flows."""
+    presolved = presolve_network(network)
+    return presolved.expand(solve_network_flow(presolved.network)), presolved.stats
@@ -0,0 +1,124 @@
+"""
+Closed-form linear trend fitting for many demand series at once.
+
+Series of different lengths are stacked into a zero-padded 2D array with a
+validity mask, and ordinary least squares slopes and intercepts are computed
+for every row from masked sums in a single vectorized expression. Robust and
+regularized alternatives are fitted per series with scikit-learn, which is
+only imported when one of them is requested.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Prediction used for series too short to fit a trend.
+DEFAULT_DEMAND = 100.0
+
+# Trend models fitted with scikit-learn, by name, in addition to closed-form "ols".
+ADVANCED_MODELS = {
+    "huber": "HuberRegressor",
+    "ridge": "Ridge",
+    "theil_sen": "TheilSenRegressor",
+}
+
+
+def stack_series(series: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stacks ragged series into a zero-padded array and a validity mask.
+
+    Returns:
+        ``(values, mask)``, both of shape ``(len(series), longest)``.
+    """
+    lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+    width = int(lengths.max()) if len(lengths) else 0
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    values = np.zeros(mask.shape, dtype=np.float64)
+    if mask.any():
+        values[mask] = np.concatenate(
+            [np.asarray(s, dtype=np.float64) for s in series if len(s)]
+        )
+    return values, mask
+
+
+@dataclass
+class TrendFit:
+    """Per-series OLS fit of ``value = intercept + slope * t``."""
+
+    slope: np.ndarray
+    intercept: np.ndarray
+    count: np.ndarray
+
+    def predict(self, steps_ahead: int = 1) -> np.ndarray:
+        """Predicts each series ``steps_ahead`` periods past its last point."""
+        prediction = self.intercept + self.slope * (self.count - 1 + steps_ahead)
+        return np.where(self.count > 1, prediction, DEFAULT_DEMAND)
+
+
+def fit_linear_trends(
+    values: np.ndarray, mask: Optional[np.ndarray] = None
+) -> TrendFit:
+    """
+    Fits a linear trend to every row of ``values`` in closed form.
+
+    Args:
+        values: Array of shape ``(series, periods)``.
+        mask: Optional boolean array marking valid entries; rows are assumed to
+            be left-aligned, as produced by ``stack_series``.
+
+    Returns:
+        Slopes and intercepts per row. Rows with fewer than two points get a
+        zero slope.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if mask is None:
+        mask = np.ones(values.shape, dtype=bool)
+    weights = mask.astype(np.float64)
+    t = np.arange(values.shape[1], dtype=np.float64)[None, :]
+
+    n = weights.sum(axis=1)
+    sum_t = (weights * t).sum(axis=1)
+    sum_y = (weights * values).sum(axis=1)
+    sum_tt = (weights * t * t).sum(axis=1)
+    sum_ty = (weights * t * values).sum(axis=1)
+
+    denominator = n * sum_tt - sum_t**2
+    fitted = (n > 1) & (denominator > 0)
+    safe_denominator = np.where(fitted, denominator, 1.0)
+    slope = np.where(fitted, (n * sum_ty - sum_t * sum_y) / safe_denominator, 0.0)
+    intercept = np.where(n > 0, (sum_y - slope * sum_t) / np.maximum(n, 1.0), 0.0)
+    return TrendFit(slope=slope, intercept=intercept, count=n.astype(np.int64))
+
+
+def fit_trends(series: Sequence[Sequence[float]], model: str = "ols") -> TrendFit:
+    """
+    Fits a linear trend to every series with the named model.
+
+    Args:
+        series: Demand series, possibly of different lengths.
+        model: ``"ols"`` fits all series at once in closed form; the names in
+            ``ADVANCED_MODELS`` fit each series with scikit-learn.
+
+    Returns:
+        Slopes and intercepts per series.
+
+    Raises:
+        ValueError: If the model is unknown.
+    """
+    values, mask = stack_series(series)
+    if model == "ols":
+        return fit_linear_trends(values, mask)
+    if model not in ADVANCED_MODELS:
+        raise ValueError(f"Unknown trend model: {model}")
+
+    from sklearn import linear_model
+
+    estimator = getattr(linear_model, ADVANCED_MODELS[model])
+    count = mask.sum(axis=1)
+    slope, intercept = np.zeros(len(series)), np.zeros(len(series))
+    for i in np.flatnonzero(count > 1).tolist():
+        t = np.arange(count[i], dtype=np.float64).reshape(-1, 1)
+        fitted = estimator().fit(t, values[i, : count[i]])
+        slope[i], intercept[i] = float(fitted.coef_[0]), float(fitted.intercept_)
+    return TrendFit(slope=slope, intercept=intercept, count=count.astype(np.int64))
@@ -0,0 +1,375 @@
+"""
+Capacitated vehicle routing for delivery plans.
+
+Builds a distance matrix once per location set (cached by content hash) and
+solves a capacitated VRP with the OR-Tools routing library: a cheapest-arc
+first solution refined by guided local search under a wall-clock budget.
+Every improving solution can be streamed to a callback as it is found, and
+the search can start from the routes of a previous plan.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+COST_PER_DISTANCE_UNIT = 0.1
+DEFAULT_STOP_DEMAND = 1000
+# OR-Tools works on integer arc costs; distances are scaled before rounding.
+DISTANCE_SCALE = 1000
+MATRIX_CACHE_SIZE = 32
+# Penalty for leaving a stop unserved, in scaled distance units.
+DROP_PENALTY = 10**9
+# Smallest share of the time budget given to a search that starts from the
+# routes of a previous plan.
+WARM_START_MIN_TIME_FRACTION = 0.1
+
+# Shared by the thread-pool workers that solve requests concurrently.
+_matrix_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_matrix_cache_lock = threading.Lock()
+
+
+def location_coordinates(
+    locations: Sequence[Mapping[str, Any]],
+) -> Optional[np.ndarray]:
+    """Returns ``(n, 2)`` latitude/longitude pairs if every location has them."""
+    if not locations or not all("lat" in loc and "lon" in loc for loc in locations):
+        return None
+    return np.array([[loc["lat"], loc["lon"]] for loc in locations], dtype=np.float64)
+
+
+def haversine_matrix(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Great-circle distances in kilometres between two sets of lat/lon points."""
+    lat1, lon1 = np.radians(origins[:, 0])[:, None], np.radians(origins[:, 1])[:, None]
+    lat2, lon2 = (
+        np.radians(destinations[:, 0])[None, :],
+        np.radians(destinations[:, 1])[None, :],
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    distances: np.ndarray = (
+        2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    )
+    return distances
+
+
+def _location_key(
+    locations: Sequence[Mapping[str, Any]], depot: Optional[Mapping[str, Any]]
+) -> str:
+    """Content hash identifying a location set and its depot."""
+    digest = hashlib.sha1()
+    coordinates = location_coordinates(locations)
+    if coordinates is not None:
+        digest.update(b"geo")
+        digest.update(coordinates.tobytes())
+        if depot is not None:
+            digest.update(
+                np.array([depot["lat"], depot["lon"]], dtype=np.float64).tobytes()
+            )
+    else:
+        digest.update(b"radial")
+        digest.update(
+            np.array(
+                [loc.get("distance", 50) for loc in locations], dtype=np.float64
+            ).tobytes()
+        )
+    return digest.hexdigest()
+
+
+def distance_matrix(
+    locations: Sequence[Mapping[str, Any]],
+    depot: Optional[Mapping[str, Any]] = None,
+) -> np.ndarray:
+    """
+    Builds the depot-plus-stops distance matrix for a location set.
+
+    Locations carrying ``lat``/``lon`` use great-circle distances, with the
+    depot at ``depot`` or the centroid of the stops. Otherwise only the
+    ``distance`` from the depot is known and stops are treated as lying on a
+    ray from the depot, so ``d(i, j) = |distance_i - distance_j|``.
+
+    Results are cached per location set, so repeated requests over the same
+    network reuse the matrix. Index 0 is the depot.
+    """
+    key = _location_key(locations, depot)
+    with _matrix_cache_lock:
+        cached = _matrix_cache.get(key)
+        if cached is not None:
+            _matrix_cache.move_to_end(key)
+            return cached
+
+    coordinates = location_coordinates(locations)
+    if coordinates is not None:
+        origin = (
+            np.array([[depot["lat"], depot["lon"]]], dtype=np.float64)
+            if depot is not None
+            else coordinates.mean(axis=0, keepdims=True)
+        )
+        points = np.vstack([origin, coordinates])
+        matrix = haversine_matrix(points, points)
+    else:
+        radial = np.concatenate(
+            [[0.0], [float(loc.get("distance", 50)) for loc in locations]]
+        )
+        matrix = np.abs(radial[:, None] - radial[None, :])
+
+    matrix.setflags(write=False)
+    with _matrix_cache_lock:
+        _matrix_cache[key] = matrix
+        if len(_matrix_cache) > MATRIX_CACHE_SIZE:
+            _matrix_cache.popitem(last=False)
+    return matrix
+
+
+@dataclass
+class RoutingProblem:
+    """A capacitated VRP over a depot (index 0) and its stops."""
+
+    stop_ids: List[str]
+    matrix: np.ndarray
+    demands: np.ndarray
+    vehicle_count: int
+    vehicle_capacity: int
+
+    @classmethod
+    def from_locations(
+        cls,
+        locations: Sequence[Mapping[str, Any]],
+        constraints: Mapping[str, Any],
+        default_vehicle_capacity: int,
+        depot: Optional[Mapping[str, Any]] = None,
+    ) -> "RoutingProblem":
+        """
+        Builds a routing problem from request locations.
+
+        Each stop receives its ``demand``, or is replenished up to its
+        ``capacity`` when no demand is given. The fleet comes from the
+        ``vehicle_capacity`` and ``vehicle_count`` constraints; without a count
+        enough vehicles are provided to carry the total demand with slack.
+        """
+        demands = np.array(
+            [0]
+            + [
+                int(
+                    math.ceil(
+                        float(
+                            loc.get("demand", loc.get("capacity", DEFAULT_STOP_DEMAND))
+                        )
+                    )
+                )
+                for loc in locations
+            ],
+            dtype=np.int64,
+        )
+        vehicle_capacity = int(
+            constraints.get("vehicle_capacity", default_vehicle_capacity)
+        )
+        vehicle_count = constraints.get("vehicle_count")
+        if vehicle_count is None:
+            vehicle_count = max(
+                1, math.ceil(1.2 * demands.sum() / max(vehicle_capacity, 1))
+            )
+        return cls(
+            stop_ids=[
+                str(loc.get("id", f"dest_{i + 1}")) for i, loc in enumerate(locations)
+            ],
+            matrix=distance_matrix(locations, depot),
+            demands=demands,
+            vehicle_count=int(vehicle_count),
+            vehicle_capacity=vehicle_capacity,
+        )
+
+
+@dataclass
+class RoutePlan:
+    """A set of vehicle routes; stops are indices into ``stop_ids`` (1-based)."""
+
+    routes: List[List[int]]
+    distances: List[float]
+    loads: List[int]
+    status: str
+    wall_time_ms: float = 0.0
+    solutions_found: int = 0
+    unserved: List[int] = field(default_factory=list)
+    warm_started: bool = False
+
+    @property
+    def total_distance(self) -> float:
+        return float(sum(self.distances))
+
+    def to_section(self, problem: RoutingProblem) -> Dict[str, Dict[str, Any]]:
+        """Renders the plan as the ``route_optimization`` section."""
+        active = [i for i, route in enumerate(self.routes) if route]
+        return {
+            f"route_{rank + 1}": {
+                "destination": problem.stop_ids[self.routes[i][0] - 1],
+                "stops": [problem.stop_ids[node - 1] for node in self.routes[i]],
+                "capacity": problem.vehicle_capacity,
+                "load": self.loads[i],
+                "distance": self.distances[i],
+                "priority": "high" if rank < max(len(active) // 2, 1) else "medium",
+                "estimated_cost": self.distances[i] * COST_PER_DISTANCE_UNIT,
+            }
+            for rank, i in enumerate(active)
+        }
+
+
+def _extract_routes(
+    routing: Any,
+    manager: Any,
+    problem: RoutingProblem,
+    next_value: Callable[[int], int],
+) -> RoutePlan:
+    """Reads vehicle routes from the current solution."""
+    routes, distances, loads = [], [], []
+    served = set()
+    for vehicle in range(problem.vehicle_count):
+        index = routing.Start(vehicle)
+        route, distance, previous = [], 0.0, 0
+        while not routing.IsEnd(index):
+            index = next_value(index)
+            node = manager.IndexToNode(index)
+            distance += float(problem.matrix[previous, node])
+            previous = node
+            if node != 0:
+                route.append(node)
+        routes.append(route)
+        distances.append(distance)
+        loads.append(int(problem.demands[route].sum()) if route else 0)
+        served.update(route)
+    unserved = [node for node in range(1, len(problem.demands)) if node not in served]
+    return RoutePlan(routes, distances, loads, status="FEASIBLE", unserved=unserved)
+
+
+def initial_routes_from_stops(
+    problem: RoutingProblem, route_stops: Sequence[Sequence[str]]
+) -> List[List[int]]:
+    """
+    Maps the stop ids of previous routes onto a problem's node indices.
+
+    Stops that no longer exist, or whose demand grew beyond what their
+    vehicle can still carry, are left off so the search re-inserts them.
+    Routes beyond the fleet size are dropped and missing vehicles start empty.
+    """
+    nodes = {stop_id: node for node, stop_id in enumerate(problem.stop_ids, start=1)}
+    routes = []
+    for stops in list(route_stops)[: problem.vehicle_count]:
+        route, load = [], 0
+        for stop in stops:
+            node = nodes.get(stop)
+            if node is None or load + problem.demands[node] > problem.vehicle_capacity:
+                continue
+            route.append(node)
+            load += int(problem.demands[node])
+        routes.append(route)
+    return routes + [[] for _ in range(problem.vehicle_count - len(routes))]
+
+
+def solve_vrp(
+    problem: RoutingProblem,
+    time_limit_s: float,
+    on_solution: Optional[Callable[[RoutePlan], None]] = None,
+    initial_routes: Optional[List[List[int]]] = None,
+) -> RoutePlan:
+    """
+    Solves a capacitated VRP with guided local search.
+
+    Args:
+        problem: The routing problem.
+        time_limit_s: Wall-clock budget for the search.
+        on_solution: Called with the best-so-far plan on every improvement.
+        initial_routes: Node indices of each vehicle's route in a previous
+            plan. Stops not on any route start unserved. The search falls
+            back to a fresh first solution if the routes are infeasible.
+
+    Returns:
+        The best plan found. Stops that cannot be served by the fleet are
+        reported in ``unserved`` instead of making the problem infeasible.
+    """
+    from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+    start_time = time.perf_counter()
+    node_count = len(problem.demands)
+    manager = pywrapcp.RoutingIndexManager(node_count, problem.vehicle_count, 0)
+    routing = pywrapcp.RoutingModel(manager)
+
+    scaled = np.rint(problem.matrix * DISTANCE_SCALE).astype(np.int64)
+    transit = routing.RegisterTransitMatrix(scaled.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit)
+
+    demand = routing.RegisterUnaryTransitVector(problem.demands.tolist())
+    routing.AddDimensionWithVehicleCapacity(
+        demand, 0, [problem.vehicle_capacity] * problem.vehicle_count, True, "load"
+    )
+    for node in range(1, node_count):
+        routing.AddDisjunction([manager.NodeToIndex(node)], DROP_PENALTY)
+
+    solutions_found = 0
+    best_cost = math.inf
+
+    def record_solution() -> None:
+        # Guided local search also accepts non-improving moves; only stream
+        # solutions that beat the best cost seen so far.
+        nonlocal solutions_found, best_cost
+        cost = routing.CostVar().Value()
+        if cost >= best_cost:
+            return
+        best_cost = cost
+        solutions_found += 1
+        if on_solution is not None:
+            plan = _extract_routes(
+                routing, manager, problem, lambda index: routing.NextVar(index).Value()
+            )
+            plan.solutions_found = solutions_found
+            plan.wall_time_ms = (time.perf_counter() - start_time) * 1000
+            on_solution(plan)
+
+    routing.AddAtSolutionCallback(record_solution)
+
+    parameters = pywrapcp.DefaultRoutingSearchParameters()
+    parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    )
+    parameters.time_limit.FromMilliseconds(max(int(time_limit_s * 1000), 1))
+
+    assignment = None
+    if initial_routes is not None:
+        routing.CloseModelWithParameters(parameters)
+        initial = routing.ReadAssignmentFromRoutes(initial_routes, True)
+        if initial is not None:
+            assignment = routing.SolveFromAssignmentWithParameters(initial, parameters)
+    warm_started = assignment is not None
+    if assignment is None:
+        assignment = routing.SolveWithParameters(parameters)
+    if assignment is None:
+        return RoutePlan(
+            routes=[],
+            distances=[],
+            loads=[],
+            status="INFEASIBLE",
+            wall_time_ms=(time.perf_counter() - start_time) * 1000,
+            unserved=list(range(1, node_count)),
+        )
+
+    plan = _extract_routes(
+        routing,
+        manager,
+        problem,
+        lambda index: assignment.Value(routing.NextVar(index)),
+    )
+    plan.status = "FEASIBLE"
+    plan.solutions_found = solutions_found
+    plan.wall_time_ms = (time.perf_counter() - start_time) * 1000
+    plan.warm_started = warm_started
+    return plan
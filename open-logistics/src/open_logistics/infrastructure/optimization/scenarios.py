@@ -0,0 +1,327 @@
+"""
+Monte Carlo evaluation of inventory plans under uncertain demand.
+
+Daily demand per SKU is sampled as ``[scenarios, skus, horizon]`` lognormal
+arrays whose level and trend come from the inventory and ``demand_history``
+and whose volatility comes from the history's residuals. Each SKU and
+scenario also draws a replenishment lead time: stock starts at the planned
+level and is topped back up to it when the replenishment arrives. Scenarios
+are generated and scored in chunks sized to a memory budget, and each chunk
+reduces to small accumulators that merge, so chunks can also be evaluated
+in parallel.
+"""
+
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.regression import (
+    fit_linear_trends,
+    stack_series,
+)
+
+# Coefficient of variation of daily demand assumed when the history is too short.
+DEFAULT_DEMAND_CV = 0.25
+DEFAULT_LEAD_TIME_DAYS = 7.0
+# Memory budget for the sampled arrays of one chunk.
+DEFAULT_CHUNK_BYTES = 256 * 1024**2
+# Minimum number of chunks of a time-limited evaluation, so it can stop after
+# a small share of the requested scenarios.
+TIME_LIMITED_CHUNKS = 16
+
+
+@dataclass
+class DemandModel:
+    """
+    Stochastic daily demand and lead times for a set of SKUs.
+
+    ``daily_mean`` has shape ``(skus, horizon)``; daily demand is lognormal
+    around it with log-scale spread ``sigma``, and lead times are Poisson
+    with mean ``lead_time_mean`` days.
+    """
+
+    daily_mean: np.ndarray
+    sigma: float
+    lead_time_mean: float = DEFAULT_LEAD_TIME_DAYS
+
+    @property
+    def skus(self) -> int:
+        return int(self.daily_mean.shape[0])
+
+    @property
+    def horizon(self) -> int:
+        return int(self.daily_mean.shape[1])
+
+    @classmethod
+    def from_history(
+        cls,
+        expected_demand: np.ndarray,
+        demand_history: Sequence[float],
+        horizon: int,
+        lead_time_mean: float = DEFAULT_LEAD_TIME_DAYS,
+    ) -> "DemandModel":
+        """
+        Builds a demand model from per-SKU expected demand and a demand history.
+
+        Args:
+            expected_demand: Expected demand of each SKU over the horizon.
+            demand_history: Aggregate daily demand; its linear trend shapes
+                the daily profile and its residuals set the volatility.
+            horizon: Days to simulate.
+            lead_time_mean: Mean replenishment lead time in days.
+        """
+        horizon = max(int(horizon), 1)
+        history = np.asarray(demand_history, dtype=np.float64)
+        profile = np.ones(horizon)
+        cv = DEFAULT_DEMAND_CV
+        if len(history) > 2 and history.mean() > 0:
+            fit = fit_linear_trends(*stack_series([demand_history]))
+            level = fit.predict()[0]
+            if level > 0:
+                profile = np.maximum(
+                    1.0 + fit.slope[0] / level * np.arange(horizon), 0.0
+                )
+                profile = profile / max(profile.mean(), 1e-12)
+            residuals = history - (
+                fit.intercept[0] + fit.slope[0] * np.arange(len(history))
+            )
+            cv = float(residuals.std() / history.mean())
+        daily_mean = (
+            np.asarray(expected_demand, dtype=np.float64)[:, None]
+            / horizon
+            * profile[None, :]
+        )
+        return cls(
+            daily_mean=daily_mean.astype(np.float32),
+            sigma=math.sqrt(math.log1p(cv**2)),
+            lead_time_mean=lead_time_mean,
+        )
+
+    def sample(
+        self, rng: np.random.Generator, scenarios: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draws demand and lead-time scenarios.
+
+        Returns:
+            ``(demand, lead_time)`` of shapes ``(scenarios, skus, horizon)``
+            (float32) and ``(scenarios, skus)`` (whole days).
+        """
+        demand = rng.standard_normal(
+            (scenarios, self.skus, self.horizon), dtype=np.float32
+        )
+        demand *= np.float32(self.sigma)
+        demand -= np.float32(self.sigma**2 / 2)
+        np.exp(demand, out=demand)
+        demand *= self.daily_mean[None, :, :]
+        lead_time = rng.poisson(self.lead_time_mean, (scenarios, self.skus))
+        return demand, lead_time
+
+
+@dataclass
+class ScenarioTotals:
+    """Accumulated outcomes of a set of scenarios; totals of chunks add up."""
+
+    stockouts: np.ndarray
+    shortage: np.ndarray
+    demand: np.ndarray
+    cost: np.ndarray
+
+    @property
+    def scenarios(self) -> int:
+        return len(self.cost)
+
+    @classmethod
+    def merge(cls, parts: Sequence["ScenarioTotals"]) -> "ScenarioTotals":
+        return cls(
+            stockouts=np.sum([part.stockouts for part in parts], axis=0),
+            shortage=np.sum([part.shortage for part in parts], axis=0),
+            demand=np.sum([part.demand for part in parts], axis=0),
+            cost=np.concatenate([part.cost for part in parts]),
+        )
+
+
+@dataclass
+class ShardTiming:
+    """Wall time of one evaluated chunk and the process that evaluated it."""
+
+    scenarios: int
+    worker: int
+    time_ms: float
+
+
+def evaluate_chunk(
+    levels: np.ndarray,
+    unit_cost: np.ndarray,
+    shortage_cost: np.ndarray,
+    model: DemandModel,
+    seed: np.random.SeedSequence,
+    scenarios: int,
+) -> ScenarioTotals:
+    """
+    Samples and scores one chunk of scenarios.
+
+    Stock starts at ``levels``; the replenishment arriving after the sampled
+    lead time tops it back up to ``levels``. Demand that cannot be served
+    from stock is lost and costs ``shortage_cost`` per unit.
+    """
+    demand, lead_time = model.sample(np.random.default_rng(seed), scenarios)
+    cumulative = np.cumsum(demand, axis=2, out=demand)
+    total = cumulative[:, :, -1]
+    arrival = np.clip(lead_time, 0, model.horizon)
+    before = np.take_along_axis(
+        cumulative, np.maximum(arrival - 1, 0)[:, :, None], axis=2
+    )[:, :, 0]
+    before = np.where(arrival > 0, before, 0.0)
+
+    stock = levels.astype(np.float32)[None, :]
+    shortage = np.maximum(before - stock, 0.0) + np.maximum(total - before - stock, 0.0)
+    return ScenarioTotals(
+        stockouts=(shortage > 0).sum(axis=0),
+        shortage=shortage.sum(axis=0, dtype=np.float64),
+        demand=total.sum(axis=0, dtype=np.float64),
+        cost=float(levels @ unit_cost) + shortage.astype(np.float64) @ shortage_cost,
+    )
+
+
+def chunk_sizes(
+    scenarios: int,
+    model: DemandModel,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    shards: int = 1,
+) -> List[int]:
+    """
+    Splits a scenario count into chunks whose sampled arrays fit ``chunk_bytes``.
+
+    ``shards`` sets a minimum number of chunks, so parallel workers all get one.
+    """
+    per_scenario = max(model.skus * model.horizon * np.dtype(np.float32).itemsize, 1)
+    size = max(
+        1, min(scenarios, chunk_bytes // per_scenario, -(-scenarios // max(shards, 1)))
+    )
+    return [min(size, scenarios - start) for start in range(0, scenarios, size)]
+
+
+@dataclass
+class ScenarioReport:
+    """Risk profile of a plan across sampled scenarios."""
+
+    stockout_probability: np.ndarray
+    fill_rate: np.ndarray
+    cost: np.ndarray
+    shards: List[ShardTiming] = field(default_factory=list)
+    requested: int = 0
+
+    @classmethod
+    def from_totals(
+        cls,
+        totals: ScenarioTotals,
+        shards: Sequence[ShardTiming] = (),
+        requested: Optional[int] = None,
+    ) -> "ScenarioReport":
+        return cls(
+            stockout_probability=totals.stockouts / max(totals.scenarios, 1),
+            fill_rate=1.0 - totals.shortage / np.maximum(totals.demand, 1e-12),
+            cost=totals.cost,
+            shards=list(shards),
+            requested=totals.scenarios if requested is None else requested,
+        )
+
+    @property
+    def scenarios(self) -> int:
+        return len(self.cost)
+
+    def to_section(self, skus: Sequence[str], top: int = 10) -> Dict[str, Any]:
+        """Renders the ``scenario_analysis`` section, listing the riskiest SKUs."""
+        riskiest = np.argsort(-self.stockout_probability, kind="stable")[:top]
+        p5, p50, p95 = (
+            np.percentile(self.cost, [5, 50, 95]) if self.scenarios else (0.0, 0.0, 0.0)
+        )
+        return {
+            "scenarios": self.scenarios,
+            "scenarios_requested": self.requested,
+            "stockout_probability": (
+                float(self.stockout_probability.mean()) if len(skus) else 0.0
+            ),
+            "fill_rate": float(self.fill_rate.mean()) if len(skus) else 1.0,
+            "cost_distribution": {
+                "mean": float(self.cost.mean()) if self.scenarios else 0.0,
+                "std": float(self.cost.std()) if self.scenarios else 0.0,
+                "p5": float(p5),
+                "p50": float(p50),
+                "p95": float(p95),
+            },
+            "riskiest_items": {
+                skus[row]: {
+                    "stockout_probability": float(self.stockout_probability[row]),
+                    "fill_rate": float(self.fill_rate[row]),
+                }
+                for row in riskiest.tolist()
+                if self.stockout_probability[row] > 0
+            },
+            "shards": [asdict(shard) for shard in self.shards],
+        }
+
+
+def evaluate_plan(
+    levels: np.ndarray,
+    unit_cost: np.ndarray,
+    shortage_cost: np.ndarray,
+    model: DemandModel,
+    scenarios: int = 1000,
+    seed: Optional[int] = 0,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    time_limit_s: Optional[float] = None,
+) -> ScenarioReport:
+    """
+    Scores an inventory plan against sampled demand and lead-time scenarios.
+
+    Args:
+        levels: Planned stock per SKU.
+        unit_cost: Cost per stocked unit.
+        shortage_cost: Cost per unit of unmet demand.
+        model: The demand model.
+        scenarios: Number of scenarios to sample.
+        seed: Seed for reproducible sampling; chunks draw from independent
+            streams spawned from it.
+        chunk_bytes: Memory budget for the sampled arrays of one chunk.
+        time_limit_s: Wall-clock limit; once it has passed, no further chunk
+            is started and the report covers the scenarios evaluated so far.
+            At least one chunk is always evaluated.
+
+    Returns:
+        Per-SKU stockout probability and fill rate, the total cost of every
+        scenario and the timing of every chunk.
+
+    Raises:
+        ValueError: If fewer than one scenario is requested.
+    """
+    if scenarios < 1:
+        raise ValueError("At least one scenario is required")
+    sizes = chunk_sizes(
+        scenarios,
+        model,
+        chunk_bytes,
+        shards=1 if time_limit_s is None else TIME_LIMITED_CHUNKS,
+    )
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    deadline = None if time_limit_s is None else time.perf_counter() + time_limit_s
+    totals: List[ScenarioTotals] = []
+    shards: List[ShardTiming] = []
+    for chunk_seed, size in zip(seeds, sizes):
+        start_time = time.perf_counter()
+        if totals and deadline is not None and start_time >= deadline:
+            break
+        totals.append(
+            evaluate_chunk(levels, unit_cost, shortage_cost, model, chunk_seed, size)
+        )
+        shards.append(
+            ShardTiming(size, os.getpid(), (time.perf_counter() - start_time) * 1000)
+        )
+    return ScenarioReport.from_totals(
+        ScenarioTotals.merge(totals), shards, requested=scenarios
+    )
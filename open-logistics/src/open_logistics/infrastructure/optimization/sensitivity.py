@@ -0,0 +1,256 @@
+"""
+Sensitivity of LP allocations to their budget and capacity limits.
+
+At an optimal LP allocation the row duals price every item through its
+reduced cost, and the items strictly between their bounds are the ones that
+move when a binding row's limit changes. Moving them so the binding rows stay
+tight keeps the duals optimal, so until one of them reaches a bound or a
+slack row fills up, the optimum follows the limits linearly: the objective
+changes by the dual of each row times the change of its limit. Within those
+ranges a what-if question is answered from the solution alone; outside them
+the allocation is re-solved, warm-started from the previous duals.
+"""
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    LP_SOLVER,
+    AllocationProblem,
+    AllocationSolution,
+    AllocationWarmStart,
+    _constraint_rows,
+    solve_allocation,
+)
+
+# Distance from a bound, or slack, below which an item or row counts as at it.
+BOUND_TOLERANCE = 1e-9
+# Dual magnitude below which a row is priced at zero.
+DUAL_TOLERANCE = 1e-9
+
+
+@dataclass
+class LimitRange:
+    """
+    How the optimum follows one row's limit, the other limits held.
+
+    Between ``lower`` and ``upper`` the objective changes by
+    ``shadow_price`` per unit of the limit.
+    """
+
+    name: str
+    limit: float
+    slack: float
+    shadow_price: float
+    lower: float
+    upper: float
+
+    def to_section(self) -> Dict[str, Any]:
+        """Renders the range, with ``None`` for an unbounded end."""
+        return {
+            "limit": self.limit,
+            "slack": self.slack,
+            "shadow_price": self.shadow_price,
+            "valid_range": [
+                bound if np.isfinite(bound) else None
+                for bound in (self.lower, self.upper)
+            ],
+        }
+
+
+def _row_names(problem: AllocationProblem) -> List[str]:
+    """Names of the coupling rows, in the order ``_constraint_rows`` builds them."""
+    names = []
+    if problem.budget is not None:
+        names.append("budget")
+    if problem.capacity is not None:
+        names.append("capacity")
+    return names
+
+
+class AllocationSensitivity:
+    """
+    Answers budget and capacity what-if questions about an optimal LP allocation.
+
+    Built once from a solution, each question within the valid ranges costs
+    a few vector operations instead of a solve.
+    """
+
+    def __init__(self, problem: AllocationProblem, solution: AllocationSolution):
+        """
+        Prices the allocation's rows and finds the items that move with them.
+
+        Raises:
+            ValueError: If the solution is not an optimal LP solution with duals.
+        """
+        if solution.status != "OPTIMAL" or solution.duals is None:
+            raise ValueError(
+                "Sensitivity analysis needs an optimal LP allocation with duals"
+            )
+        rows, row_upper = _constraint_rows(problem)
+        if len(solution.duals) != len(rows):
+            raise ValueError(
+                f"Expected {len(rows)} row duals, got {len(solution.duals)}"
+            )
+
+        self.problem = problem
+        self.solution = solution
+        self.names = _row_names(problem)
+        self.rows = np.array(rows).reshape(len(rows), len(problem))
+        self.limits = row_upper
+        self.duals = np.asarray(solution.duals, dtype=np.float64)
+        self.levels = solution.levels
+        self.objective_value = problem.objective(solution.levels)
+        self.slacks = np.maximum(row_upper - self.rows @ solution.levels, 0.0)
+        self.reduced_costs = (
+            problem.unit_cost - problem.shortage_cost
+        ) - self.duals @ self.rows
+
+        self._lower = np.minimum(problem.lower, problem.target)
+        self._upper = problem.target
+        # Priced rows stay tight as limits move; the items between bounds absorb the change
+        self._binding = np.flatnonzero(np.abs(self.duals) > DUAL_TOLERANCE)
+        self._free = np.flatnonzero(
+            (solution.levels > self._lower + BOUND_TOLERANCE)
+            & (solution.levels < self._upper - BOUND_TOLERANCE)
+        )
+        self._moves = self._directions()
+        self.ranges = {name: self._range(row) for row, name in enumerate(self.names)}
+
+    def _directions(self) -> Optional[np.ndarray]:
+        """
+        Level change of the free items per unit of each binding row's limit.
+
+        The minimum-norm change keeping the binding rows tight; ``None`` when
+        the free items cannot follow every binding row.
+        """
+        if not len(self._binding):
+            return np.zeros((len(self._free), 0))
+        block = self.rows[np.ix_(self._binding, self._free)]
+        if np.linalg.matrix_rank(block) < len(self._binding):
+            return None
+        return np.linalg.pinv(block)
+
+    def _step(self, change: np.ndarray) -> Optional[np.ndarray]:
+        """Level change of the free items for a change of every limit, ``None`` if it cannot follow."""
+        if self._moves is None:
+            return None if np.any(change[self._binding]) else np.zeros(len(self._free))
+        step: np.ndarray = self._moves @ change[self._binding]
+        return step
+
+    def _range(self, row: int) -> LimitRange:
+        """Limits of ``row`` between which the current duals stay optimal."""
+        change = np.zeros(len(self.limits))
+        change[row] = 1.0
+        step = self._step(change)
+        limit = float(self.limits[row])
+        low, high = -np.inf, np.inf
+        if step is None:
+            low = high = 0.0
+            step = np.zeros(len(self._free))
+        levels = self.levels[self._free]
+        # Each free item stays within its bounds
+        for room, rate in (
+            (self._upper[self._free] - levels, step),
+            (levels - self._lower[self._free], -step),
+        ):
+            rising, falling = rate > 0, rate < 0
+            if rising.any():
+                high = min(high, float(np.min(room[rising] / rate[rising])))
+            if falling.any():
+                low = max(low, float(np.max(room[falling] / rate[falling])))
+        # Each slack row keeps a non-negative slack
+        for other in range(len(self.limits)):
+            if other in self._binding:
+                continue
+            use = float(self.rows[other, self._free] @ step) - change[other]
+            if use > 0:
+                high = min(high, float(self.slacks[other]) / use)
+            elif use < 0:
+                low = max(low, float(self.slacks[other]) / use)
+        return LimitRange(
+            name=self.names[row],
+            limit=limit,
+            slack=float(self.slacks[row]),
+            shadow_price=float(self.duals[row]),
+            lower=float(limit + low),
+            upper=float(limit + high),
+        )
+
+    def what_if(
+        self,
+        budget: Optional[float] = None,
+        capacity: Optional[float] = None,
+        time_limit_s: Optional[float] = None,
+    ) -> AllocationSolution:
+        """
+        The optimal allocation for changed budget and capacity limits.
+
+        Within the valid ranges, which for a change of both limits means the
+        moved items stay within their bounds and every slack row within its
+        limit, the answer is computed from the duals and carries
+        ``warm_start="sensitivity"``. Otherwise, or when a limit is added
+        that the problem did not have, the allocation is re-solved
+        warm-started from this solution.
+
+        Args:
+            budget: New budget; ``None`` keeps the current one.
+            capacity: New capacity limit; ``None`` keeps the current one.
+            time_limit_s: Wall-clock limit of a re-solve.
+
+        Returns:
+            The allocation under the new limits.
+        """
+        start_time = time.perf_counter()
+        changed = replace(
+            self.problem,
+            budget=self.problem.budget if budget is None else float(budget),
+            capacity=self.problem.capacity if capacity is None else float(capacity),
+        )
+        if _row_names(changed) == self.names:
+            _, limits = _constraint_rows(changed)
+            change = limits - self.limits
+            step = self._step(change)
+            if step is not None:
+                levels = self.levels.copy()
+                levels[self._free] += step
+                moved = levels[self._free]
+                within = np.all(
+                    moved >= self._lower[self._free] - BOUND_TOLERANCE
+                ) and np.all(moved <= self._upper[self._free] + BOUND_TOLERANCE)
+                if within and np.all(
+                    self.rows @ levels
+                    <= limits + BOUND_TOLERANCE * np.maximum(np.abs(limits), 1.0)
+                ):
+                    objective_value = self.objective_value + float(self.duals @ change)
+                    return AllocationSolution(
+                        levels=np.clip(levels, self._lower, self._upper),
+                        status="OPTIMAL",
+                        objective_value=objective_value,
+                        best_bound=objective_value,
+                        backend=LP_SOLVER,
+                        build_time_ms=0.0,
+                        solve_time_ms=(time.perf_counter() - start_time) * 1000,
+                        duals=self.duals,
+                        warm_start="sensitivity",
+                    )
+
+        warm_start = AllocationWarmStart(
+            self.levels, self.duals, np.empty(0, dtype=np.int64)
+        )
+        return solve_allocation(
+            changed, time_limit_s=time_limit_s, warm_start=warm_start
+        )
+
+    def to_section(self) -> Dict[str, Any]:
+        """Renders the analysis as the ``sensitivity_analysis`` section."""
+        return {
+            "objective_value": self.objective_value,
+            "limits": {
+                name: limit_range.to_section()
+                for name, limit_range in self.ranges.items()
+            },
+        }
@@ -0,0 +1,287 @@
+"""
+Pool of solved allocations for warm-starting similar problems.
+
+Many requests differ only slightly from one solved earlier. Every solved
+allocation is kept with a feature vector of its problem: the target levels
+and stocking costs of the inventory, each hashed by SKU into a fixed number
+of signed buckets so that the distance between two vectors approximates the
+distance between the per-SKU vectors they summarize, the budget and capacity
+relative to the cost and quantity of the targets, and the location ids
+hashed likewise. A new problem looks up its nearest neighbor; when it is
+close enough, the neighbor's levels and duals, aligned to the new SKUs by
+name, are the solver's initial solution.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationSolution,
+    AllocationWarmStart,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+# Signed hash buckets summarizing the inventory levels, and again its costs.
+INVENTORY_BUCKETS = 128
+# Signed hash buckets summarizing the location ids.
+LOCATION_BUCKETS = 32
+# Largest budget or capacity relative to the targets that still tells problems apart.
+LIMIT_RATIO_CAP = 2.0
+# Feature distance below which two problems count as the same one.
+DUPLICATE_DISTANCE = 1e-9
+
+
+def _signed_buckets(
+    keys: Sequence[str], weights: np.ndarray, buckets: int
+) -> np.ndarray:
+    """
+    Hashes weighted keys into signed buckets, normalized by the weights' norm.
+
+    The sign of each key comes from a hash bit independent of its bucket, so
+    the buckets of unrelated keys cancel out rather than accumulate and the
+    vectors of disjoint key sets end up nearly orthogonal.
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(key.encode("utf-8")) for key in keys),
+        dtype=np.uint32,
+        count=len(keys),
+    )
+    signs = np.where(hashes >> 31, -1.0, 1.0)
+    vector = np.bincount(hashes % buckets, weights=signs * weights, minlength=buckets)
+    norm = float(np.linalg.norm(weights))
+    return vector / norm if norm > 0 else vector
+
+
+def problem_features(
+    columns: InventoryColumns,
+    target: np.ndarray,
+    constraints: Mapping[str, Any],
+    locations: Sequence[Mapping[str, Any]] = (),
+) -> np.ndarray:
+    """
+    Feature vector of an allocation problem for nearest-neighbor search.
+
+    Args:
+        columns: The inventory.
+        target: Target level of every SKU.
+        constraints: Request constraints; ``budget`` and ``capacity_limit`` are read.
+        locations: Request locations, identified by ``id``.
+
+    Returns:
+        The features, of the same length for every problem.
+    """
+    target = np.maximum(target, 0.0)
+    target_cost = columns.unit_cost * target
+    limits = []
+    for name, scale in (
+        ("budget", target_cost.sum()),
+        ("capacity_limit", target.sum()),
+    ):
+        limit = constraints.get(name)
+        if limit is None:
+            limits += [0.0, 0.0]
+        else:
+            limits += [
+                min(float(limit) / max(float(scale), 1e-9), LIMIT_RATIO_CAP),
+                1.0,
+            ]
+    location_ids = [
+        str(location.get("id", index)) for index, location in enumerate(locations)
+    ]
+    return np.concatenate(
+        [
+            _signed_buckets(columns.skus, target, INVENTORY_BUCKETS),
+            _signed_buckets(columns.skus, target_cost, INVENTORY_BUCKETS),
+            np.asarray(limits),
+            _signed_buckets(location_ids, np.ones(len(location_ids)), LOCATION_BUCKETS),
+        ]
+    )
+
+
+@dataclass
+class PooledSolution:
+    """A solved allocation, with its item data sorted by SKU for alignment."""
+
+    skus: np.ndarray
+    target: np.ndarray
+    unit_cost: np.ndarray
+    shortage_cost: np.ndarray
+    levels: np.ndarray
+    duals: Optional[np.ndarray]
+
+    @classmethod
+    def from_solution(
+        cls, columns: InventoryColumns, target: np.ndarray, solution: AllocationSolution
+    ) -> "PooledSolution":
+        skus = np.asarray(columns.skus)
+        order = np.argsort(skus, kind="stable")
+        return cls(
+            skus=skus[order],
+            target=np.maximum(target, 0.0)[order],
+            unit_cost=columns.unit_cost[order],
+            shortage_cost=columns.shortage_cost[order],
+            levels=solution.levels[order],
+            duals=solution.duals,
+        )
+
+    def warm_start(
+        self, columns: InventoryColumns, target: np.ndarray
+    ) -> AllocationWarmStart:
+        """
+        Aligns the pooled solution to a problem's SKUs.
+
+        SKUs missing from the pool start at zero; they and every SKU whose
+        target or costs differ are listed as changed.
+        """
+        skus = np.asarray(columns.skus)
+        position = np.minimum(np.searchsorted(self.skus, skus), len(self.skus) - 1)
+        found = self.skus[position] == skus
+        levels = np.where(found, self.levels[position], 0.0)
+        same = (
+            found
+            & np.isclose(self.target[position], np.maximum(target, 0.0))
+            & (self.unit_cost[position] == columns.unit_cost)
+            & (self.shortage_cost[position] == columns.shortage_cost)
+        )
+        return AllocationWarmStart(levels, self.duals, np.flatnonzero(~same))
+
+
+class SolutionPool:
+    """
+    Size-bounded LRU pool of solved allocations, searched by feature distance.
+
+    The pool is small, so the nearest neighbor is found exactly, by one
+    distance computation against the matrix of stored feature vectors. Hit
+    and miss counters and the solve time per SKU of warm and cold solves
+    show what the pool saves.
+    """
+
+    def __init__(self, max_entries: int = 32, max_distance: float = 0.25):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, PooledSolution]]" = (
+            OrderedDict()
+        )
+        self._matrix: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._next_key = 0
+        # Solve count, milliseconds and SKUs of warm- and cold-started solves
+        self._solves = {warm: [0, 0.0, 0] for warm in (True, False)}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _nearest(self, features: np.ndarray) -> Optional[Tuple[int, float]]:
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            keys = np.fromiter(self._entries, dtype=np.int64, count=len(self._entries))
+            self._matrix = (
+                keys,
+                np.stack([entry[0] for entry in self._entries.values()]),
+            )
+        keys, matrix = self._matrix
+        distances = np.linalg.norm(matrix - features, axis=1)
+        best = int(np.argmin(distances))
+        return int(keys[best]), float(distances[best])
+
+    def nearest(self, features: np.ndarray) -> Optional[Tuple[PooledSolution, float]]:
+        """
+        Finds the pooled solution nearest to a problem, and records a hit or miss.
+
+        Returns:
+            ``(solution, distance)``, or ``None`` if no pooled solution is
+            within ``max_distance``.
+        """
+        with self._lock:
+            nearest = self._nearest(features)
+            if nearest is None or nearest[1] > self.max_distance:
+                self.misses += 1
+                return None
+            key, distance = nearest
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][1], distance
+
+    def add(self, features: np.ndarray, solution: PooledSolution) -> None:
+        """Pools a solution, replacing the one of an identical problem."""
+        with self._lock:
+            nearest = self._nearest(features)
+            if nearest is not None and nearest[1] <= DUPLICATE_DISTANCE:
+                del self._entries[nearest[0]]
+            self._entries[self._next_key] = (features, solution)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def record_solve(self, warm: bool, solve_ms: float, size: int) -> None:
+        """Records the time a solve of ``size`` SKUs took, warm-started from the pool or not."""
+        with self._lock:
+            solves = self._solves[warm]
+            solves[0] += 1
+            solves[1] += solve_ms
+            solves[2] += size
+
+    def clear(self) -> None:
+        """Drops every pooled solution and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self.hits = 0
+            self.misses = 0
+            self._solves = {warm: [0, 0.0, 0] for warm in (True, False)}
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit and miss counters and solve times since the pool was created or cleared.
+
+        ``solve_time_reduction`` compares the solve time per SKU of warm- and
+        cold-started solves, once there are both.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            per_sku = {
+                warm: solve_ms / size if size else None
+                for warm, (_, solve_ms, size) in self._solves.items()
+            }
+            warm_ms, cold_ms = per_sku[True], per_sku[False]
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "warm_solves": self._solves[True][0],
+                "cold_solves": self._solves[False][0],
+                "warm_solve_ms_per_sku": warm_ms or 0.0,
+                "cold_solve_ms_per_sku": cold_ms or 0.0,
+                "solve_time_reduction": (
+                    1.0 - warm_ms / cold_ms if warm_ms is not None and cold_ms else 0.0
+                ),
+            }
+
+
+@lru_cache()
+def get_solution_pool() -> Optional[SolutionPool]:
+    """
+    Get the shared solution pool, or ``None`` when pooling is disabled.
+
+    This function is cached so every optimizer instance in a process shares
+    one pool.
+    """
+    settings = get_settings().optimization
+    if not settings.SOLUTION_POOL_ENABLED:
+        return None
+    return SolutionPool(
+        max_entries=settings.SOLUTION_POOL_MAX_ENTRIES,
+        max_distance=settings.SOLUTION_POOL_MAX_DISTANCE,
+    )
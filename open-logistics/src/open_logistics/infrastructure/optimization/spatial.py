@@ -0,0 +1,167 @@
+"""
+Spatial index over request locations.
+
+Locations carrying ``lat``/``lon`` are mapped to points on the unit sphere,
+where Euclidean nearest neighbors are also great-circle nearest neighbors;
+without coordinates a location's ``distance`` from the depot is a point on a
+line. KD-trees over subsets of the points answer k-nearest-neighbor queries,
+which turn all-pairs candidate lanes into ``k`` lanes per location. Indexes
+are cached per location set, so requests over the same network reuse them.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.routing import (
+    EARTH_RADIUS_KM,
+    location_coordinates,
+)
+
+INDEX_CACHE_SIZE = 32
+
+# Shared by the thread-pool workers that solve requests concurrently.
+_index_cache: "OrderedDict[str, LocationIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def location_points(locations: Sequence[Mapping[str, Any]]) -> Tuple[np.ndarray, bool]:
+    """
+    Embeds locations as points for nearest-neighbor search.
+
+    Returns:
+        ``(points, geographic)``: unit-sphere ``(n, 3)`` points when every
+        location has ``lat``/``lon``, otherwise ``(n, 1)`` radial distances.
+    """
+    coordinates = location_coordinates(locations)
+    if coordinates is None:
+        radial = np.array(
+            [float(loc.get("distance", 50)) for loc in locations], dtype=np.float64
+        )
+        return radial[:, None], False
+    lat, lon = np.radians(coordinates[:, 0]), np.radians(coordinates[:, 1])
+    points = np.column_stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)]
+    )
+    return points, True
+
+
+class LocationIndex:
+    """
+    KD-trees over a location set, built lazily per queried subset.
+
+    Distances are great-circle kilometres for geographic points and absolute
+    differences of ``distance`` otherwise, matching ``routing.distance_matrix``.
+    """
+
+    def __init__(self, points: np.ndarray, geographic: bool):
+        self.points = points
+        self.geographic = geographic
+        self._trees: Dict[bytes, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _to_distance(self, euclidean: np.ndarray) -> np.ndarray:
+        if not self.geographic:
+            return euclidean
+        # Chord length on the unit sphere to great-circle distance
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(euclidean / 2, 0.0, 1.0))
+
+    def distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """Distance between each origin and destination node, pairwise."""
+        return self._to_distance(
+            np.linalg.norm(self.points[origins] - self.points[destinations], axis=1)
+        )
+
+    def clusters(self, radius: float) -> np.ndarray:
+        """
+        Labels nodes by geographic cluster.
+
+        Nodes within ``radius`` of each other share a cluster, transitively,
+        so clusters are separated by gaps wider than ``radius``.
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        # Great-circle radius to the matching chord on the unit sphere
+        chord = (
+            2 * np.sin(min(radius / (2 * EARTH_RADIUS_KM), np.pi / 2))
+            if self.geographic
+            else radius
+        )
+        pairs = self.tree(np.arange(len(self))).query_pairs(
+            chord, output_type="ndarray"
+        )
+        graph = coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])),
+            shape=(len(self), len(self)),
+        )
+        labels: np.ndarray = connected_components(graph, directed=False)[1]
+        return labels
+
+    def tree(self, nodes: np.ndarray) -> Any:
+        """KD-tree over the given nodes, reused for repeated queries."""
+        from scipy.spatial import cKDTree
+
+        key = np.ascontiguousarray(nodes, dtype=np.int64).tobytes()
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = cKDTree(self.points[nodes])
+            self._trees[key] = tree
+        return tree
+
+    def nearest(
+        self, queries: np.ndarray, candidates: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds the ``k`` nearest candidate nodes of every query node.
+
+        Args:
+            queries: Node indices to search from.
+            candidates: Node indices to search among.
+            k: Neighbors per query; capped at the number of candidates.
+
+        Returns:
+            ``(query_nodes, candidate_nodes, distances)``, one entry per pair,
+            grouped by query in order of increasing distance.
+        """
+        k = min(k, len(candidates))
+        if k == 0 or not len(queries):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+        euclidean, positions = self.tree(candidates).query(self.points[queries], k=k)
+        euclidean = np.asarray(euclidean).reshape(len(queries), k)
+        positions = np.asarray(positions).reshape(len(queries), k)
+        return (
+            np.repeat(np.asarray(queries, dtype=np.int64), k),
+            np.asarray(candidates, dtype=np.int64)[positions.ravel()],
+            self._to_distance(euclidean.ravel()),
+        )
+
+
+def get_location_index(locations: Sequence[Mapping[str, Any]]) -> LocationIndex:
+    """
+    Returns the spatial index of a location set.
+
+    Indexes are cached by a hash of the embedded points, so every request over
+    the same locations shares one index and its trees.
+    """
+    points, geographic = location_points(locations)
+    digest = hashlib.sha1(b"geo" if geographic else b"radial")
+    digest.update(points.tobytes())
+    key = digest.hexdigest()
+
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+        index = LocationIndex(points, geographic)
+        _index_cache[key] = index
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
@@ -0,0 +1,241 @@
+"""
+Columnar inventory engine for SKU-scale optimization.
+
+Inventory arrives as a ``{sku: quantity}`` mapping, or as ``{sku: {...}}`` with
+per-item attributes such as ``quantity``, ``demand_factor``, ``unit_cost`` and
+``shortage_cost``. This module converts it into contiguous NumPy columns once,
+computes every per-item quantity as a vectorized expression and only builds
+the nested plan dictionaries at the edge.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Demand and cost factors applied when an item does not carry its own. The
+# patterns repeat across the SKU axis so any number of items is supported.
+DEFAULT_DEMAND_PATTERN = np.array([1.0, 1.2, 0.8, 1.1])
+DEFAULT_COST_PATTERN = np.array([0.8, 1.2, 0.9, 1.1])
+
+# Cost of one unit of unmet demand, relative to the item's unit cost.
+SHORTAGE_PENALTY_FACTOR = 2.0
+
+
+def _tile(pattern: np.ndarray, size: int, offset: int = 0) -> np.ndarray:
+    """Repeats a factor pattern until it covers ``size`` items starting at position ``offset``."""
+    return np.resize(np.roll(pattern, -offset), size).astype(np.float64)
+
+
+def _attribute(records: Sequence[Any], key: str, default: np.ndarray) -> np.ndarray:
+    """Extracts an optional per-item attribute, filling gaps from ``default``."""
+    column = np.fromiter(
+        (
+            record.get(key, np.nan) if isinstance(record, dict) else np.nan
+            for record in records
+        ),
+        dtype=np.float64,
+        count=len(records),
+    )
+    missing = np.isnan(column)
+    column[missing] = default[missing]
+    return column
+
+
+@dataclass
+class InventoryColumns:
+    """Inventory data laid out as contiguous per-item arrays."""
+
+    skus: List[str]
+    quantity: np.ndarray
+    demand_factor: np.ndarray
+    unit_cost: np.ndarray
+    shortage_cost: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    @classmethod
+    def from_inventory(
+        cls, inventory: Mapping[str, Any], offset: int = 0
+    ) -> "InventoryColumns":
+        """
+        Builds the columnar representation of an inventory mapping.
+
+        Args:
+            inventory: Mapping of SKU to either a quantity or a dict of item
+                attributes (``quantity`` plus optional overrides).
+            offset: Position of the first SKU when the mapping is the tail of
+                a larger inventory; default factors depend on the position.
+
+        Returns:
+            The inventory as NumPy columns, in the mapping's iteration order.
+        """
+        skus = list(inventory.keys())
+        size = len(skus)
+        demand_default = _tile(DEFAULT_DEMAND_PATTERN, size, offset)
+        cost_default = _tile(DEFAULT_COST_PATTERN, size, offset)
+
+        try:
+            # Fast path: plain numeric quantities.
+            quantity = np.fromiter(inventory.values(), dtype=np.float64, count=size)
+            return cls(
+                skus,
+                quantity,
+                demand_default,
+                cost_default,
+                SHORTAGE_PENALTY_FACTOR * cost_default,
+            )
+        except (TypeError, ValueError):
+            pass
+
+        records = list(inventory.values())
+        quantity = np.fromiter(
+            (
+                record.get("quantity", 0.0) if isinstance(record, dict) else record
+                for record in records
+            ),
+            dtype=np.float64,
+            count=size,
+        )
+        unit_cost = _attribute(records, "unit_cost", cost_default)
+        return cls(
+            skus,
+            quantity,
+            _attribute(records, "demand_factor", demand_default),
+            unit_cost,
+            _attribute(records, "shortage_cost", SHORTAGE_PENALTY_FACTOR * unit_cost),
+        )
+
+    def take(self, rows: np.ndarray) -> "InventoryColumns":
+        """Selects a subset of rows."""
+        return InventoryColumns(
+            [self.skus[row] for row in rows.tolist()],
+            self.quantity[rows],
+            self.demand_factor[rows],
+            self.unit_cost[rows],
+            self.shortage_cost[rows],
+        )
+
+    @classmethod
+    def concatenate(
+        cls, segments: Sequence["InventoryColumns"]
+    ) -> Tuple["InventoryColumns", np.ndarray]:
+        """
+        Packs several inventories into one segmented set of columns.
+
+        Returns:
+            The packed columns and the start offset of every segment but the
+            first, suitable for ``np.split``.
+        """
+        sizes = np.fromiter((len(segment) for segment in segments), dtype=np.int64)
+        offsets = np.cumsum(sizes)[:-1]
+        packed = cls(
+            skus=[sku for segment in segments for sku in segment.skus],
+            quantity=np.concatenate([s.quantity for s in segments] or [np.empty(0)]),
+            demand_factor=np.concatenate(
+                [s.demand_factor for s in segments] or [np.empty(0)]
+            ),
+            unit_cost=np.concatenate([s.unit_cost for s in segments] or [np.empty(0)]),
+            shortage_cost=np.concatenate(
+                [s.shortage_cost for s in segments] or [np.empty(0)]
+            ),
+        )
+        return packed, offsets
+
+
+@dataclass
+class InventoryPlanArrays:
+    """Vectorized inventory plan, one entry per SKU."""
+
+    current_level: np.ndarray
+    optimized_level: np.ndarray
+    adjustment: np.ndarray
+    cost_impact: np.ndarray
+
+    @property
+    def total_cost(self) -> float:
+        """Total cost of holding the optimized levels."""
+        return float(self.cost_impact.sum())
+
+    @property
+    def efficiency_gain(self) -> float:
+        """Mean relative change of stocked items against current levels."""
+        stocked = self.current_level > 0
+        if not stocked.any():
+            return 0.0
+        ratio = self.optimized_level[stocked] / self.current_level[stocked]
+        return float(ratio.mean() - 1.0)
+
+    def take(self, rows: np.ndarray) -> "InventoryPlanArrays":
+        """Selects a subset of rows."""
+        return InventoryPlanArrays(
+            self.current_level[rows],
+            self.optimized_level[rows],
+            self.adjustment[rows],
+            self.cost_impact[rows],
+        )
+
+    def split(self, offsets: np.ndarray) -> List["InventoryPlanArrays"]:
+        """Splits a packed plan back into per-segment views."""
+        return [
+            InventoryPlanArrays(*parts)
+            for parts in zip(
+                np.split(self.current_level, offsets),
+                np.split(self.optimized_level, offsets),
+                np.split(self.adjustment, offsets),
+                np.split(self.cost_impact, offsets),
+            )
+        ]
+
+
+def optimize_inventory_levels(
+    columns: InventoryColumns, efficiency_target: float
+) -> InventoryPlanArrays:
+    """
+    Computes demand-adjusted inventory levels for every SKU at once.
+
+    Args:
+        columns: Columnar inventory data.
+        efficiency_target: Fraction of the demand-adjusted level to stock.
+
+    Returns:
+        The per-item plan as arrays.
+    """
+    return plan_from_levels(
+        columns,
+        columns.quantity * columns.demand_factor * efficiency_target,
+    )
+
+
+def plan_from_levels(
+    columns: InventoryColumns, optimized_level: np.ndarray
+) -> InventoryPlanArrays:
+    """Derives adjustments and cost impacts from a vector of target levels."""
+    return InventoryPlanArrays(
+        current_level=columns.quantity,
+        optimized_level=optimized_level,
+        adjustment=optimized_level - columns.quantity,
+        cost_impact=optimized_level * columns.unit_cost,
+    )
+
+
+def materialize_inventory_plan(
+    skus: Sequence[str], plan: InventoryPlanArrays
+) -> Dict[str, Dict[str, float]]:
+    """Converts the array plan into the ``inventory_optimization`` section."""
+    return {
+        sku: {
+            "current_level": current,
+            "optimized_level": optimized,
+            "adjustment": adjustment,
+            "cost_impact": cost,
+        }
+        for sku, current, optimized, adjustment, cost in zip(
+            skus,
+            plan.current_level.tolist(),
+            plan.optimized_level.tolist(),
+            plan.adjustment.tolist(),
+            plan.cost_impact.tolist(),
+        )
+    }
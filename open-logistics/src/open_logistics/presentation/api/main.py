@@ -5,14 +5,42 @@ This module defines the main FastAPI application, including API routers,
 middleware, and exception handlers.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from open_logistics.application.use_cases.optimize_supply_chain import OptimizeSupplyChainUseCase
-from open_logistics.infrastructure.mlx_integration.mlx_optimizer import OptimizationRequest, OptimizationResult
+from open_logistics.core.config import get_settings
+from open_logistics.infrastructure.cache.result_cache import get_result_cache
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    OptimizationDelta,
+    OptimizationRequest,
+    OptimizationResult,
+    WhatIfQuery,
+)
+from open_logistics.infrastructure.optimization.executor import get_optimization_executor
+from open_logistics.infrastructure.optimization.parallel import get_scenario_pool
+from open_logistics.infrastructure.optimization.solution_pool import get_solution_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warms up the optimization worker pool and shuts the worker pools down on exit."""
+    settings = get_settings().optimization
+    executor = get_optimization_executor()
+    if settings.PROCESS_POOL_WARM_UP and executor.mode in ("auto", "process"):
+        executor.warm_up()
+    yield
+    executor.shutdown()
+    get_scenario_pool().shutdown()
+
 
 app = FastAPI(
     title="Open Logistics API",
     description="AI-Driven Air Defense Supply Chain Optimization Platform",
     version="1.0.2",
+    lifespan=lifespan,
 )
 
 @app.get("/health")
@@ -27,4 +55,73 @@ async def optimize_supply_chain(request: OptimizationRequest):
     """
     use_case = OptimizeSupplyChainUseCase()
     result = await use_case.execute(request)
-    return result 
\ No newline at end of file
+    return result
+
+@app.post("/optimize/batch", response_model=List[OptimizationResult])
+async def optimize_supply_chain_batch(
+    requests: List[OptimizationRequest], store_plans: bool = False
+) -> List[OptimizationResult]:
+    """
+    Optimizes a batch of requests, e.g. one per depot, in a single pass.
+
+    Plans are only kept for later deltas and what-if queries with ``store_plans``.
+    """
+    use_case = OptimizeSupplyChainUseCase()
+    return await use_case.execute_many(requests, store_plans=store_plans)
+
+@app.post("/optimize/stream")
+async def optimize_supply_chain_stream(request: OptimizationRequest) -> StreamingResponse:
+    """
+    Streams improving plans as newline-delimited JSON until the request's deadline.
+    """
+    use_case = OptimizeSupplyChainUseCase()
+
+    async def results() -> AsyncIterator[str]:
+        async for result in use_case.execute_anytime(request):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.post("/optimize/{plan_id}/delta", response_model=OptimizationResult)
+async def reoptimize_supply_chain(plan_id: str, delta: OptimizationDelta) -> OptimizationResult:
+    """
+    Updates a previous plan for changed inventory or locations.
+    """
+    use_case = OptimizeSupplyChainUseCase()
+    try:
+        return await use_case.reoptimize(plan_id, delta)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown plan: {plan_id}")
+
+@app.post("/optimize/{plan_id}/what-if")
+async def what_if_supply_chain(plan_id: str, query: WhatIfQuery) -> Dict[str, Any]:
+    """
+    Re-prices a previous plan's allocation for a changed budget or capacity limit.
+    """
+    use_case = OptimizeSupplyChainUseCase()
+    try:
+        return await use_case.what_if(plan_id, query)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown plan: {plan_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/optimize/cache")
+async def result_cache_stats() -> Dict[str, Any]:
+    """
+    Reports hit/miss counters of the optimization result cache.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/optimize/pool")
+async def solution_pool_stats() -> Dict[str, Any]:
+    """
+    Reports the warm-start hit rate and solve-time reduction of the solution pool.
+    """
+    pool = get_solution_pool()
+    if pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **pool.stats()}
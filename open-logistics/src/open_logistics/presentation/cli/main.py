@@ -23,8 +23,12 @@ import uvicorn
 
 from open_logistics.core.config import get_settings
 from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    MODEL_INPUT_SIZE,
+    MODEL_OUTPUT_SIZE,
     OptimizationRequest,
+    SimpleSupplyChainModel,
 )
+from open_logistics.infrastructure.mlx_integration.training import train_model
 from open_logistics.application.use_cases.optimize_supply_chain import (
     OptimizeSupplyChainUseCase,
 )
@@ -151,6 +155,108 @@ def optimize(
         raise typer.Exit(1)
 
 
+@app.command("optimize-batch")
+def optimize_batch(
+    requests_file: Path = typer.Argument(
+        ..., help="JSON file containing a list of optimization requests"
+    ),
+    output_format: str = typer.Option(
+        "table", "--format", "-f",
+        help="Output format (table, json)"
+    ),
+    save_results: Optional[Path] = typer.Option(
+        None, "--save", "-s",
+        help="Save optimization results to file"
+    )
+) -> None:
+    """
+    Optimize a batch of supply chain requests in a single vectorized pass.
+    
+    Intended for planning cycles that submit one request per depot.
+    """
+    console.print("[bold blue]Starting Batch Supply Chain Optimization...[/bold blue]")
+    
+    try:
+        with open(requests_file, 'r') as f:
+            request_data = json.load(f)
+        
+        results = asyncio.run(_run_batch_optimization(request_data))
+        
+        if output_format == "json":
+            console.print(Syntax(json.dumps(results, indent=2), "json"))
+        else:
+            table = Table(title=f"Batch Optimization Results ({len(results)} requests)")
+            table.add_column("Request", style="cyan")
+            table.add_column("Inventory Cost", style="green")
+            table.add_column("Confidence", style="yellow")
+            for i, result in enumerate(results):
+                cost = result["optimized_plan"].get("cost_analysis", {}).get("total_inventory_cost", 0.0)
+                table.add_row(str(i + 1), f"{cost:,.2f}", f"{result['confidence_score']:.1%}")
+            console.print(table)
+            if results:
+                console.print(f"Batch execution time: {results[0]['execution_time_ms']:.1f}ms")
+        
+        if save_results:
+            _save_results(results, save_results)
+            console.print(f"[green]Results saved to {save_results}[/green]")
+            
+    except Exception as e:
+        console.print(f"[red]Batch optimization failed: {e}[/red]")
+        logger.error(f"Batch optimization command failed: {e}")
+        raise typer.Exit(1)
+
+
+@app.command()
+def train(
+    data_files: List[Path] = typer.Argument(
+        ..., help="JSON Lines files of past optimization requests and results"
+    ),
+    output: Path = typer.Option(
+        Path("model.olck"), "--output", "-o",
+        help="Checkpoint to write the trained weights to"
+    ),
+    epochs: int = typer.Option(1, "--epochs", "-e", help="Passes over the training data"),
+    batch_size: int = typer.Option(256, "--batch-size", "-b", help="Samples per training step"),
+    learning_rate: float = typer.Option(1e-3, "--learning-rate", help="Adam learning rate"),
+    checkpoint_every: int = typer.Option(1000, "--checkpoint-every", help="Steps between checkpoints"),
+) -> None:
+    """
+    Train the supply chain model offline on past optimizations.
+    
+    Training starts from the configured weights, if any, and streams the
+    data, so files larger than memory are fine.
+    """
+    console.print("[bold blue]Training Supply Chain Model...[/bold blue]")
+    
+    try:
+        model = SimpleSupplyChainModel(MODEL_INPUT_SIZE, MODEL_OUTPUT_SIZE, get_settings().mlx.MODEL_WEIGHTS_PATH)
+        report = train_model(
+            model,
+            [str(path) for path in data_files],
+            epochs=epochs,
+            batch_size=batch_size,
+            learning_rate=learning_rate,
+            checkpoint_path=str(output),
+            checkpoint_every=checkpoint_every,
+        )
+        
+        table = Table(title="Training Results")
+        table.add_column("Epoch", style="cyan")
+        table.add_column("Mean Loss", style="green")
+        for epoch, loss in enumerate(report.epoch_losses, start=1):
+            table.add_row(str(epoch), f"{loss:.4f}")
+        console.print(table)
+        console.print(
+            f"{report.samples:,} samples in {report.seconds:.1f}s "
+            f"({report.samples_per_second:,.0f} samples/s); weights saved to {output}"
+        )
+        
+    except Exception as e:
+        console.print(f"[red]Training failed: {e}[/red]")
+        logger.error(f"Training command failed: {e}")
+        raise typer.Exit(1)
+
+
 @app.command()
 def predict(
     data_source: str = typer.Option(
@@ -387,6 +493,14 @@ async def _run_optimization(
     }
 
 
+async def _run_batch_optimization(request_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run a batch of supply chain optimizations."""
+    use_case = OptimizeSupplyChainUseCase()
+    requests = [OptimizationRequest(**data) for data in request_data]
+    results = await use_case.execute_many(requests)
+    return [result.model_dump() for result in results]
+
+
 async def _run_predictions(
     data_source: str,
     prediction_type: str,
@@ -695,7 +809,7 @@ async def _setup_monitoring():
     await asyncio.sleep(1)
 
 
-def _save_results(result: Dict[str, Any], output_file: Path):
+def _save_results(result: Any, output_file: Path):
     """Save results to file."""
     with open(output_file, 'w') as f:
         json.dump(result, f, indent=2)
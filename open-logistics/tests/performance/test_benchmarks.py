@@ -4,6 +4,7 @@ Performance benchmarks for Open Logistics platform.
 
 import pytest
 import asyncio
+import gc
 import time
 from statistics import mean, stdev
 
@@ -172,3 +173,813 @@ class TestPerformanceBenchmarks:
         
         # Concurrent execution should be efficient
         assert total_time < concurrent_tasks * 3.0  # Better than sequential
+
+
+class TestVectorizedEngineBenchmarks:
+    """Scaling benchmarks for the columnar inventory engine."""
+
+    def test_inventory_scaling_curve(self):
+        """Columnar optimization scales linearly up to one million SKUs."""
+        from open_logistics.infrastructure.optimization.vectorized import (
+            InventoryColumns, optimize_inventory_levels
+        )
+
+        timings = {}
+        for size in (10_000, 100_000, 1_000_000):
+            inventory = {f"sku_{i}": float(i % 997) for i in range(size)}
+            start_time = time.perf_counter()
+            columns = InventoryColumns.from_inventory(inventory)
+            plan = optimize_inventory_levels(columns, efficiency_target=0.88)
+            plan.total_cost, plan.efficiency_gain
+            timings[size] = time.perf_counter() - start_time
+            print(f"{size:>9} SKUs: {timings[size] * 1000:.1f}ms")
+
+        assert timings[1_000_000] < 1.0
+
+    def test_batch_optimization_throughput(self):
+        """optimize_many's vectorized pass beats the per-request pipeline."""
+        optimizer = MLXOptimizer()
+        requests = [
+            OptimizationRequest(
+                supply_chain_data={
+                    "inventory": {f"item_{i}": 100 + i + depot for i in range(50)},
+                    "demand_history": [100 + (t * depot) % 7 for t in range(30)],
+                },
+                objectives=["minimize_cost"],
+                time_horizon=7,
+            )
+            for depot in range(300)
+        ]
+        optimizer._run_cpu_batch(requests[:2])  # warm imports
+        optimizer._run_cpu_optimization(requests[0])
+
+        gc.collect()
+        start_time = time.perf_counter()
+        for request in requests:
+            optimizer._run_cpu_optimization(request)
+        loop_time = time.perf_counter() - start_time
+
+        # Keep the loop's garbage from being collected on the batch's clock
+        gc.collect()
+        start_time = time.perf_counter()
+        optimizer._run_cpu_batch(requests)
+        batch_time = time.perf_counter() - start_time
+
+        print(f"Per-request loop: {loop_time:.3f}s, batch: {batch_time:.3f}s, "
+              f"speedup {loop_time / batch_time:.1f}x")
+        # Closed-form trend fits keep the per-request path itself cheap
+        assert loop_time / len(requests) < 0.002
+        assert batch_time < loop_time
+
+
+class TestAllocationBenchmarks:
+    """Benchmarks for the LP/MIP allocation and its warm starts."""
+
+    def test_lp_model_build_at_scale(self):
+        """Sparse construction builds a 100k-variable allocation LP in milliseconds."""
+        import numpy as np
+        from open_logistics.infrastructure.optimization.lp_allocation import (
+            AllocationProblem, build_allocation_model
+        )
+
+        size = 100_000
+        problem = AllocationProblem(
+            target=np.full(size, 90.0),
+            lower=np.zeros(size),
+            unit_cost=np.linspace(0.5, 2.0, size),
+            shortage_cost=np.linspace(1.0, 4.0, size),
+            budget=1_000_000.0,
+            capacity=5_000_000.0,
+        )
+        build_allocation_model(problem)  # warm imports
+
+        start_time = time.perf_counter()
+        model = build_allocation_model(problem)
+        build_time = time.perf_counter() - start_time
+        print(f"Built {model.num_variables()} variables in {build_time * 1000:.1f}ms")
+
+        assert model.num_variables() == size
+        assert build_time < 0.25
+
+    def test_presolve_shrinks_large_allocations(self):
+        """100k SKUs over twenty cost profiles solve far faster once presolved."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.lp_allocation import AllocationProblem, solve_allocation
+        from open_logistics.infrastructure.optimization.presolve import solve_presolved_allocation
+
+        rng = np.random.default_rng(3)
+        profile = rng.integers(0, 20, 100_000)
+        problem = AllocationProblem(
+            target=rng.uniform(10.0, 100.0, 100_000),
+            lower=np.zeros(100_000),
+            unit_cost=np.linspace(1.0, 5.0, 20)[profile],
+            shortage_cost=np.linspace(2.0, 9.0, 20)[::-1][profile] + 1.0,
+            budget=1e6,
+        )
+
+        start_time = time.perf_counter()
+        direct = solve_allocation(problem)
+        direct_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        presolved, stats = solve_presolved_allocation(problem)
+        presolved_time = time.perf_counter() - start_time
+
+        print(f"Presolve: {stats.original_size:,} -> {stats.reduced_size} variables, "
+              f"{presolved_time * 1000:.0f}ms vs {direct_time * 1000:.0f}ms direct")
+        assert presolved.objective_value == pytest.approx(direct.objective_value, rel=1e-6)
+        assert stats.ratio > 1000
+        assert presolved_time < direct_time / 3
+
+    def test_decomposition_scales_with_largest_region(self):
+        """Eight disconnected regions solve faster apart than as one network."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.decomposition import solve_decomposed_network
+        from open_logistics.infrastructure.optimization.executor import OptimizationExecutor
+        from open_logistics.infrastructure.optimization.network import LocationNetwork, solve_network_flow
+
+        rng = np.random.default_rng(0)
+        locations = []
+        for region in range(8):
+            lat, lon = 10.0 * region, -7.0 * region
+            for kind, count, extra in (("supplier", 10, {"supply": 2000}), ("depot", 10, {"capacity": 3000}),
+                                       ("site", 3000, {"demand": 10})):
+                locations += [
+                    {"id": f"{kind}_{region}_{i}", "type": kind, "lat": lat + float(rng.uniform(0, 1)),
+                     "lon": lon + float(rng.uniform(0, 1)), **extra}
+                    for i in range(count)
+                ]
+        network = LocationNetwork.from_locations(locations, candidate_lanes=4)
+
+        start_time = time.perf_counter()
+        whole = solve_network_flow(network)
+        whole_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        plan, stats = solve_decomposed_network(network, OptimizationExecutor(mode="inline"))
+        split_time = time.perf_counter() - start_time
+
+        print(f"Decomposition: {stats.components} regions in {split_time * 1000:.0f}ms "
+              f"vs {whole_time * 1000:.0f}ms as one network")
+        assert stats.components == 8
+        assert plan.total_cost == pytest.approx(whole.total_cost, rel=1e-6)
+        assert split_time < whole_time
+
+    def test_heuristic_tier_answers_within_latency_budget(self):
+        """The greedy tier answers 100k SKUs faster than the LP solves a tenth of them, with a certified gap."""
+        from dataclasses import replace
+
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.heuristics import greedy_allocation
+        from open_logistics.infrastructure.optimization.lp_allocation import AllocationProblem, solve_allocation
+
+        rng = np.random.default_rng(0)
+        size = 100_000
+        unit_cost = rng.uniform(0.5, 3.0, size)
+        problem = AllocationProblem(
+            target=rng.uniform(10.0, 100.0, size),
+            lower=np.zeros(size),
+            unit_cost=unit_cost,
+            shortage_cost=unit_cost * rng.uniform(0.8, 2.5, size),
+            budget=60.0 * size,
+            capacity=40.0 * size,
+        )
+        greedy_times = []
+        for _ in range(3):
+            start_time = time.perf_counter()
+            greedy = greedy_allocation(problem)
+            greedy_times.append(time.perf_counter() - start_time)
+        greedy_time = min(greedy_times)
+
+        # The exact LP on the full problem takes over a minute; a tenth of it is the yardstick
+        tenth = size // 10
+        sample = replace(
+            problem,
+            target=problem.target[:tenth],
+            lower=problem.lower[:tenth],
+            unit_cost=problem.unit_cost[:tenth],
+            shortage_cost=problem.shortage_cost[:tenth],
+            budget=problem.budget / 10,
+            capacity=problem.capacity / 10,
+        )
+        start_time = time.perf_counter()
+        solve_allocation(sample)
+        exact_time = time.perf_counter() - start_time
+
+        print(f"Heuristic tier: {greedy_time * 1000:.0f}ms with a {greedy.gap:.1e} gap, "
+              f"exact solve of {tenth} items in {exact_time * 1000:.0f}ms")
+        assert greedy_time < exact_time
+        assert problem.unit_cost @ greedy.levels <= problem.budget + 1e-6
+        assert greedy.levels.sum() <= problem.capacity + 1e-6
+        assert greedy.gap < 1e-3
+
+    def test_what_if_answers_from_duals(self):
+        """Dozens of budget and capacity what-ifs inside the valid ranges cost far less than re-solving each."""
+        from dataclasses import replace
+
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.lp_allocation import AllocationProblem, solve_allocation
+        from open_logistics.infrastructure.optimization.sensitivity import AllocationSensitivity
+
+        rng = np.random.default_rng(0)
+        size = 10_000
+        unit_cost = rng.uniform(0.5, 3.0, size)
+        problem = AllocationProblem(
+            target=rng.uniform(10.0, 100.0, size),
+            lower=np.zeros(size),
+            unit_cost=unit_cost,
+            shortage_cost=unit_cost * rng.uniform(1.1, 2.5, size),
+            budget=50.0 * size,
+            capacity=28.0 * size,
+        )
+        sensitivity = AllocationSensitivity(problem, solve_allocation(problem))
+
+        def within(limit_range, share):
+            # Half of each range, so that moving both limits at once stays within them
+            end = limit_range.upper if share > 0 else limit_range.lower
+            return limit_range.limit + 0.5 * abs(share) * (end - limit_range.limit)
+
+        budget, capacity = sensitivity.ranges["budget"], sensitivity.ranges["capacity"]
+        queries = [(within(budget, share), within(capacity, -share)) for share in np.linspace(-0.9, 0.9, 48)]
+
+        start_time = time.perf_counter()
+        answers = [sensitivity.what_if(budget=b, capacity=c) for b, c in queries]
+        analytic_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        solves = [solve_allocation(replace(problem, budget=b, capacity=c)) for b, c in queries[:4]]
+        solve_time = (time.perf_counter() - start_time) * len(queries) / 4
+
+        print(f"What-if: {len(queries)} queries in {analytic_time * 1000:.1f}ms from duals, "
+              f"{solve_time * 1000:.0f}ms re-solving")
+        assert all(answer.warm_start == "sensitivity" for answer in answers)
+        for answer, solved in zip(answers, solves):
+            assert answer.objective_value == pytest.approx(solved.objective_value, rel=1e-9)
+        assert analytic_time < 0.1 * solve_time
+
+    def test_solution_pool_warm_starts_similar_requests(self):
+        """A stream of requests that each change a few SKUs mostly hits the pool and solves far faster."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.lp_allocation import AllocationProblem, solve_allocation
+        from open_logistics.infrastructure.optimization.solution_pool import (
+            PooledSolution,
+            SolutionPool,
+            problem_features,
+        )
+        from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+        rng = np.random.default_rng(0)
+        size = 20_000
+        columns = InventoryColumns.from_inventory(
+            {f"sku_{i}": {"quantity": float(rng.integers(10, 100)), "unit_cost": float(rng.uniform(0.5, 3.0))}
+             for i in range(size)}
+        )
+        constraints = {"budget": 40.0 * size, "capacity_limit": 30.0 * size}
+        pool = SolutionPool()
+
+        objectives = []
+        for step in range(12):
+            target = columns.quantity * 1.2
+            changed = rng.choice(size, 50, replace=False)
+            target[changed] *= rng.uniform(0.8, 1.2, len(changed))
+            problem = AllocationProblem.from_columns(columns, target, constraints)
+            features = problem_features(columns, target, constraints)
+
+            start_time = time.perf_counter()
+            match = pool.nearest(features)
+            warm_start = match[0].warm_start(columns, target) if match is not None else None
+            solution = solve_allocation(problem, warm_start=warm_start)
+            pool.record_solve(match is not None, (time.perf_counter() - start_time) * 1000, size)
+            pool.add(features, PooledSolution.from_solution(columns, target, solution))
+            if step % 4 == 1:
+                objectives.append((solution.objective_value, solve_allocation(problem).objective_value))
+
+        stats = pool.stats()
+        print(f"Solution pool: {stats['hit_rate']:.0%} hits, {stats['warm_solve_ms_per_sku'] * size:.0f}ms warm "
+              f"vs {stats['cold_solve_ms_per_sku'] * size:.0f}ms cold per solve")
+        assert stats["hit_rate"] > 0.9
+        assert stats["solve_time_reduction"] > 0.5
+        for warm, cold in objectives:
+            assert warm == pytest.approx(cold, rel=1e-9)
+
+
+class TestServingBenchmarks:
+    """Latency benchmarks for caching, incremental updates and deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_result_cache_hit_latency(self):
+        """Repeated requests are answered from the cache without solving."""
+        from open_logistics.application.use_cases.optimize_supply_chain import (
+            OptimizeSupplyChainUseCase,
+        )
+        from open_logistics.infrastructure.cache.result_cache import (
+            InMemoryCacheBackend, ResultCache,
+        )
+
+        use_case = OptimizeSupplyChainUseCase(cache=ResultCache(InMemoryCacheBackend()))
+        request = OptimizationRequest(
+            supply_chain_data={"inventory": {f"item_{i}": 100 + i for i in range(20_000)}},
+            objectives=["minimize_cost"],
+            time_horizon=7,
+        )
+
+        start_time = time.perf_counter()
+        await use_case.execute(request)
+        miss_time = time.perf_counter() - start_time
+
+        hit_times = []
+        for _ in range(20):
+            start_time = time.perf_counter()
+            await use_case.execute(request)
+            hit_times.append(time.perf_counter() - start_time)
+
+        print(f"Miss: {miss_time * 1000:.1f}ms, hit: {mean(hit_times) * 1e6:.0f}us")
+        assert use_case.cache.stats()["hits"] == 20
+        assert mean(hit_times) * 10 < miss_time
+
+    def test_incremental_reoptimization_scales_with_delta(self):
+        """Re-optimizing 100 changed SKUs of a 100k plan beats a full re-solve."""
+        import numpy as np
+
+        from open_logistics.infrastructure.mlx_integration.mlx_optimizer import OptimizationDelta
+
+        rng = np.random.default_rng(0)
+        size = 100_000
+        optimizer = MLXOptimizer()
+        request = OptimizationRequest(
+            supply_chain_data={
+                "inventory": {
+                    f"sku_{i}": {"quantity": float(quantity), "unit_cost": float(cost)}
+                    for i, (quantity, cost) in enumerate(
+                        zip(rng.integers(50, 500, size), rng.uniform(0.5, 2.0, size))
+                    )
+                }
+            },
+            constraints={"budget": 2.0e7},
+            objectives=["minimize_cost"],
+            time_horizon=7,
+        )
+        state = optimizer._solve_cpu(request)
+        state.row_index()
+
+        deltas = [
+            OptimizationDelta(inventory={
+                f"sku_{i}": {"quantity": float(rng.integers(50, 500))}
+                for i in rng.choice(size, 100, replace=False)
+            })
+            for _ in range(3)
+        ]
+        incremental_times = []
+        for delta in deltas:
+            merged = delta.apply(state.request)
+            start_time = time.perf_counter()
+            state = optimizer._reoptimize_cpu(state, merged, delta)
+            incremental_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        full = optimizer._solve_cpu(state.request)
+        full_time = time.perf_counter() - start_time
+
+        metrics = state.plan["performance_metrics"]
+        print(f"Incremental: {mean(incremental_times) * 1000:.0f}ms "
+              f"({metrics['solver_warm_start']}), full: {full_time * 1000:.0f}ms")
+        assert metrics["solver_warm_start"] == "working_set"
+        assert state.allocation.objective_value == pytest.approx(full.allocation.objective_value, rel=1e-7)
+        assert mean(incremental_times) * 4 < full_time
+
+    @pytest.mark.asyncio
+    async def test_critical_priority_meets_deadline(self):
+        """A critical request with a hard LP gets its first plan within 200 ms."""
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        size = 10_000
+        optimizer = MLXOptimizer()
+        unit_cost = rng.uniform(0.5, 2.0, size)
+        shortage_cost = unit_cost * rng.uniform(1.1, 4.0, size)
+        request = OptimizationRequest(
+            supply_chain_data={
+                "inventory": {
+                    f"sku_{i}": {"quantity": float(quantity), "unit_cost": float(cost), "shortage_cost": float(shortage)}
+                    for i, (quantity, cost, shortage) in enumerate(
+                        zip(rng.integers(50, 500, size), unit_cost, shortage_cost)
+                    )
+                }
+            },
+            constraints={"budget": 1.0e6, "capacity_limit": 5.0e5},
+            objectives=["minimize_cost"],
+            time_horizon=7,
+            priority_level="critical",
+        )
+
+        gc.collect()
+        start_time = time.perf_counter()
+        stream = optimizer.optimize_anytime(request)
+        first = await stream.__anext__()
+        first_time = time.perf_counter() - start_time
+        results = [first] + [result async for result in stream]
+        total_time = time.perf_counter() - start_time
+
+        print(f"First plan: {first_time * 1000:.0f}ms (gap {1 - first.confidence_score:.4f}), "
+              f"{len(results)} plans in {total_time * 1000:.0f}ms")
+        assert first_time < 0.2
+        assert total_time < 0.4
+        assert first.confidence_score > 0.9
+        assert results[-1].confidence_score >= first.confidence_score
+
+
+class TestTransportBenchmarks:
+    """Benchmarks for routing, network flows and load consolidation."""
+
+    def test_vrp_500_locations(self):
+        """A 500-stop capacitated VRP returns a plan within five seconds."""
+        import numpy as np
+        from open_logistics.infrastructure.optimization.routing import (
+            RoutingProblem, solve_vrp
+        )
+
+        rng = np.random.default_rng(42)
+        locations = [
+            {"id": f"site_{i}", "lat": 48 + rng.random() * 2, "lon": 7 + rng.random() * 3,
+             "capacity": int(rng.integers(50, 300))}
+            for i in range(500)
+        ]
+        improvements = []
+
+        start_time = time.perf_counter()
+        problem = RoutingProblem.from_locations(locations, {}, default_vehicle_capacity=2000)
+        plan = solve_vrp(problem, time_limit_s=3.0, on_solution=improvements.append)
+        total_time = time.perf_counter() - start_time
+        print(f"500 stops: {total_time:.2f}s, {len(improvements)} streamed plans, "
+              f"{plan.total_distance:.0f}km")
+
+        assert total_time < 5.0
+        assert plan.unserved == []
+        assert improvements and improvements[-1].total_distance >= plan.total_distance - 1e-6
+
+    def test_network_flow_scales_to_thousands_of_nodes(self):
+        """A three-echelon network with thousands of sites builds in milliseconds and solves in one pass."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.network import (
+            LocationNetwork,
+            solve_network_flow,
+        )
+
+        rng = np.random.default_rng(0)
+
+        def located(count, **attributes):
+            return [
+                {"lat": float(lat), "lon": float(lon), **attributes}
+                for lat, lon in zip(rng.uniform(40, 45, count), rng.uniform(-80, -70, count))
+            ]
+
+        locations = (
+            [{"id": f"supplier_{i}", "type": "supplier", "supply": 8000, **loc} for i, loc in enumerate(located(20))]
+            + [{"id": f"depot_{i}", "type": "depot", "capacity": 2000, **loc} for i, loc in enumerate(located(100))]
+            + [{"id": f"site_{i}", "demand": 50, **loc} for i, loc in enumerate(located(2000))]
+        )
+
+        build_times = []
+        for _ in range(3):
+            start_time = time.perf_counter()
+            network = LocationNetwork.from_locations(locations)
+            build_times.append(time.perf_counter() - start_time)
+        plan = solve_network_flow(network)
+
+        print(f"Network: {len(network)} nodes, {network.lane_count} lanes, "
+              f"build {mean(build_times) * 1000:.0f}ms, solve {plan.solve_time_ms:.0f}ms")
+        assert plan.status == "OPTIMAL"
+        assert plan.unmet_demand.sum() == 0
+        assert mean(build_times) < 0.25
+
+    def test_candidate_lanes_scale_to_ten_thousand_locations(self):
+        """Nearest-neighbor lanes keep a 10k-location network linear in size."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.network import (
+            LocationNetwork,
+            solve_network_flow,
+        )
+
+        rng = np.random.default_rng(1)
+        counts = {"supplier": 50, "depot": 500, "site": 9450}
+        locations = [
+            {"id": f"{kind}_{i}", "type": kind, "lat": float(lat), "lon": float(lon),
+             **({"supply": 3000} if kind == "supplier" else {"capacity": 400} if kind == "depot" else {"demand": 10})}
+            for kind, count in counts.items()
+            for i, (lat, lon) in enumerate(zip(rng.uniform(30, 48, count), rng.uniform(-122, -70, count)))
+        ]
+
+        start_time = time.perf_counter()
+        network = LocationNetwork.from_locations(locations, candidate_lanes=8)
+        cold_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        network = LocationNetwork.from_locations(locations, candidate_lanes=8)
+        warm_time = time.perf_counter() - start_time
+        plan = solve_network_flow(network)
+
+        print(f"10k network: {network.lane_count} lanes, build {cold_time * 1000:.0f}ms cold / "
+              f"{warm_time * 1000:.0f}ms cached, solve {plan.solve_time_ms:.0f}ms, "
+              f"unmet {plan.unmet_demand.sum():.0f}")
+        assert network.lane_count == 8 * (counts["depot"] + counts["site"])
+        assert plan.status == "OPTIMAL"
+        assert plan.unmet_demand.sum() < 0.01 * network.demand.sum()
+        assert warm_time < 0.5
+
+    def test_consolidation_packs_fifty_thousand_lines_in_seconds(self):
+        """First-fit-decreasing plus CP-SAT refinement loads 50k shipment lines within seconds."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.consolidation import PackingProblem, consolidate_loads
+
+        rng = np.random.default_rng(0)
+        lines = 50_000
+        problem = PackingProblem.from_lines(
+            [f"line_{i}" for i in range(lines)],
+            rng.uniform(0.05, 0.5, lines) * 24000.0,
+            rng.uniform(0.05, 0.5, lines) * 67.0,
+            weight_capacity=24000.0,
+            volume_capacity=67.0,
+        )
+
+        start_time = time.perf_counter()
+        plan = consolidate_loads(problem, time_limit_s=2.0)
+        elapsed = time.perf_counter() - start_time
+        section = plan.to_section()
+
+        print(f"Consolidation of {lines} lines: {plan.vehicles} vehicles (first fit {plan.first_fit_vehicles}, "
+              f"bound {section['lower_bound']}), fill {section['fill_rate']:.1%} in {elapsed:.2f}s")
+        assert elapsed < 5.0
+        assert plan.vehicles <= plan.first_fit_vehicles
+        assert plan.vehicles <= 1.1 * section["lower_bound"]
+        assert np.all(plan.weight_fill <= 1.0 + 1e-9) and np.all(plan.volume_fill <= 1.0 + 1e-9)
+        assert section["fill_rate"] > 0.9
+
+
+class TestScenarioBenchmarks:
+    """Benchmarks for demand scenarios and the Pareto frontier."""
+
+    def test_scenario_evaluation_throughput(self):
+        """Chunked Monte Carlo evaluation keeps memory bounded at a steady sample rate."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.scenarios import (
+            DemandModel,
+            chunk_sizes,
+            evaluate_plan,
+        )
+
+        rng = np.random.default_rng(2)
+        skus, horizon, scenarios = 2000, 30, 500
+        expected = rng.uniform(50, 500, skus)
+        model = DemandModel.from_history(expected, 100 + rng.normal(0, 15, 60), horizon)
+        chunk_bytes = 32 * 1024**2
+
+        start_time = time.perf_counter()
+        report = evaluate_plan(1.2 * expected, rng.uniform(1, 10, skus), rng.uniform(10, 50, skus),
+                               model, scenarios=scenarios, chunk_bytes=chunk_bytes)
+        elapsed = time.perf_counter() - start_time
+
+        samples = scenarios * skus * horizon
+        print(f"Scenarios: {scenarios} x {skus} SKUs x {horizon} days in {elapsed:.2f}s "
+              f"({samples / elapsed / 1e6:.0f}M samples/s), "
+              f"{len(chunk_sizes(scenarios, model, chunk_bytes))} chunks")
+        assert len(chunk_sizes(scenarios, model, chunk_bytes)) > 1
+        assert report.scenarios == scenarios
+        assert samples / elapsed > 5e6
+
+    def test_parallel_scenarios_share_memory(self):
+        """Shards on the shared-memory pool cost no more than serial chunks."""
+        import os
+
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.parallel import ScenarioPool
+        from open_logistics.infrastructure.optimization.scenarios import (
+            DemandModel,
+            evaluate_plan,
+        )
+
+        rng = np.random.default_rng(3)
+        skus, horizon, scenarios = 2000, 30, 400
+        expected = rng.uniform(50, 500, skus)
+        model = DemandModel.from_history(expected, 100 + rng.normal(0, 15, 60), horizon)
+        args = (1.2 * expected, rng.uniform(1, 10, skus), rng.uniform(10, 50, skus), model)
+
+        pool = ScenarioPool(workers=max(os.cpu_count() or 1, 2))
+        try:
+            pool.evaluate(*args, scenarios=pool.workers)  # start the workers
+            start_time = time.perf_counter()
+            report = pool.evaluate(*args, scenarios=scenarios)
+            parallel_time = time.perf_counter() - start_time
+        finally:
+            pool.shutdown()
+        start_time = time.perf_counter()
+        evaluate_plan(*args, scenarios=scenarios)
+        serial_time = time.perf_counter() - start_time
+
+        print(f"Parallel scenarios: {pool.workers} workers {parallel_time:.2f}s vs serial {serial_time:.2f}s, "
+              f"shards {[round(shard.time_ms) for shard in report.shards]}ms")
+        assert len(report.shards) >= pool.workers
+        assert report.scenarios == scenarios
+        # Plan arrays are attached, not pickled, so even one core pays little for the pool
+        assert parallel_time < 1.5 * serial_time
+        if (os.cpu_count() or 1) >= 4:
+            assert parallel_time < serial_time / 2
+
+    def test_pareto_frontier_costs_a_few_solves(self):
+        """A 20-point frontier over 10k SKUs reuses one model and warm-starts its sweeps."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.lp_allocation import (
+            AllocationProblem,
+            solve_allocation,
+        )
+        from open_logistics.infrastructure.optimization.pareto import compute_frontier
+
+        rng = np.random.default_rng(6)
+        size = 10_000
+        unit_cost = rng.uniform(1, 10, size)
+        target = rng.uniform(10, 100, size)
+        problem = AllocationProblem(
+            target=target,
+            lower=np.zeros(size),
+            unit_cost=unit_cost,
+            shortage_cost=unit_cost * rng.uniform(1.5, 3.0, size),
+            budget=0.5 * float(unit_cost @ target),
+            capacity=0.6 * float(target.sum()),
+        )
+        solve_allocation(problem)
+        start_time = time.perf_counter()
+        solve_allocation(problem)
+        single_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        frontier = compute_frontier(problem, ["minimize_cost", "maximize_efficiency"], points=20)
+        frontier_time = time.perf_counter() - start_time
+
+        print(f"Pareto frontier: {len(frontier.points)} points from {frontier.solves} solves "
+              f"({frontier.warm_solves} warm) in {frontier_time:.2f}s, single solve {single_time:.2f}s")
+        assert len(frontier.points) >= 10
+        assert frontier.warm_solves >= frontier.solves // 2
+        assert frontier_time < 6 * single_time
+
+
+class TestPlanningHorizonBenchmarks:
+    """Benchmarks for multi-period replenishment and lot sizing."""
+
+    def test_rolling_horizon_scales_linearly(self):
+        """Rolling windows keep the model size fixed, so a year costs about four quarters."""
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.horizon import ReplenishmentProblem, solve_rolling_horizon
+
+        rng = np.random.default_rng(0)
+        skus = 200
+        timings, models = {}, set()
+        for horizon in (91, 182, 364):
+            problem = ReplenishmentProblem(
+                demand=rng.uniform(0.0, 10.0, (skus, horizon)) * (1.0 + 0.5 * np.sin(np.arange(horizon) / 6.0)),
+                initial_stock=rng.uniform(0.0, 30.0, skus),
+                unit_cost=rng.uniform(1.0, 5.0, skus),
+                shortage_cost=rng.uniform(5.0, 15.0, skus),
+                holding_cost=rng.uniform(0.01, 0.05, skus),
+                lead_time=3,
+                capacity=4.0 * skus,
+            )
+            solve_rolling_horizon(problem.window(0, 14, problem.initial_stock, None, None))
+            start_time = time.perf_counter()
+            plan = solve_rolling_horizon(problem)
+            timings[horizon] = time.perf_counter() - start_time
+            models.add(plan.largest_model)
+            assert plan.status == "OPTIMAL"
+
+        print("Rolling horizon: " + ", ".join(f"{days} days in {seconds * 1000:.0f}ms" for days, seconds in timings.items()))
+        assert models == {3 * skus * 14}
+        assert timings[364] < 6.0 * timings[91]
+
+    def test_lot_sizing_plans_a_thousand_skus_over_ninety_days(self):
+        """Lot sizing 1k SKUs over 90 days is exact uncapacitated and within 20% of its bound capacitated."""
+        from dataclasses import replace
+
+        import numpy as np
+
+        from open_logistics.infrastructure.optimization.lot_sizing import LotSizingProblem, solve_lot_sizing
+
+        rng = np.random.default_rng(0)
+        skus, horizon = 1_000, 90
+        demand = rng.gamma(2.0, 5.0, (skus, 1)) * rng.uniform(0.5, 1.5, (skus, horizon))
+        unit_cost = rng.uniform(1.0, 10.0, skus)
+        problem = LotSizingProblem(
+            demand=demand,
+            initial_stock=rng.uniform(0.0, 50.0, skus),
+            unit_cost=unit_cost,
+            shortage_cost=2.0 * unit_cost,
+            holding_cost=0.001 * unit_cost,
+            setup_cost=20.0 * unit_cost,
+            lead_time=3,
+        )
+
+        start_time = time.perf_counter()
+        uncapacitated = solve_lot_sizing(problem)
+        uncapacitated_s = time.perf_counter() - start_time
+        capacity = np.full(horizon, 0.8 * uncapacitated.receipts.sum(axis=0)[problem.lead_time:].mean())
+        start_time = time.perf_counter()
+        capacitated = solve_lot_sizing(replace(problem, capacity=capacity), time_limit_s=20.0)
+        capacitated_s = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        limited = solve_lot_sizing(replace(problem, capacity=capacity), time_limit_s=0.5)
+        limited_s = time.perf_counter() - start_time
+
+        print(f"Lot sizing 1k SKUs x 90 days: {uncapacitated_s * 1000:.0f}ms uncapacitated, {capacitated_s:.1f}s "
+              f"capacitated ({capacitated.iterations} iterations, gap {capacitated.gap:.1%}), "
+              f"{limited_s:.1f}s with a 0.5s limit (gap {limited.gap:.1%})")
+        assert uncapacitated.status == "OPTIMAL"
+        assert uncapacitated_s < 1.0 and capacitated_s < 20.0
+        assert np.all(capacitated.receipts.sum(axis=0) <= capacity + 1e-6)
+        assert uncapacitated.total_cost <= capacitated.lower_bound <= capacitated.total_cost
+        assert capacitated.gap < 0.2
+        # A short limit stops between iterations with a feasible plan
+        assert limited_s < 1.5
+        assert limited.iterations < capacitated.iterations
+        assert np.all(limited.receipts.sum(axis=0) <= capacity + 1e-6)
+
+
+class TestModelBenchmarks:
+    """Benchmarks for the demand model's inference, checkpoints and training."""
+
+    def test_numpy_model_batched_inference(self):
+        """The NumPy MLP scores 100k feature rows in tens of milliseconds."""
+        from unittest.mock import patch
+
+        import numpy as np
+
+        with patch("open_logistics.infrastructure.mlx_integration.mlx_optimizer.MLX_AVAILABLE", False):
+            from open_logistics.infrastructure.mlx_integration.mlx_optimizer import SimpleSupplyChainModel
+
+            model = SimpleSupplyChainModel(10, 5)
+        rows = np.random.default_rng(7).normal(size=(100_000, 10)).astype(np.float32)
+        model.predict(rows)
+
+        times = []
+        for _ in range(5):
+            start_time = time.perf_counter()
+            scores = model.predict(rows)
+            times.append(time.perf_counter() - start_time)
+
+        print(f"NumPy MLP: 100k rows in {mean(times) * 1000:.1f}ms")
+        assert scores.shape == (100_000, 5)
+        assert mean(times) < 0.25
+
+    def test_checkpoint_opens_without_reading_weights(self, tmp_path):
+        """Mapping a 64MB checkpoint is far quicker than loading the same .npz."""
+        import numpy as np
+
+        from open_logistics.infrastructure.mlx_integration.checkpoint import Checkpoint, save_checkpoint
+
+        tensors = {f"layer{i}": np.ones((2048, 2048), dtype=np.float32) for i in range(4)}
+        checkpoint_path, npz_path = str(tmp_path / "model.olck"), str(tmp_path / "model.npz")
+        save_checkpoint(checkpoint_path, tensors)
+        np.savez(npz_path, **tensors)
+
+        start_time = time.perf_counter()
+        checkpoint = Checkpoint(checkpoint_path)
+        open_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        with np.load(npz_path) as data:
+            loaded = {key: data[key] for key in data.files}
+        npz_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        checkpoint.verify()
+        verify_time = time.perf_counter() - start_time
+
+        print(f"Checkpoint: opened in {open_time * 1000:.2f}ms, verified in {verify_time * 1000:.1f}ms; "
+              f".npz loaded in {npz_time * 1000:.1f}ms")
+        assert checkpoint["layer3"].shape == loaded["layer3"].shape
+        assert open_time < npz_time / 5
+
+    def test_training_throughput(self, tmp_path):
+        """Streaming training sustains thousands of samples per second."""
+        import numpy as np
+
+        from open_logistics.infrastructure.mlx_integration.mlx_optimizer import SimpleSupplyChainModel
+        from open_logistics.infrastructure.mlx_integration.training import append_record, train_model
+
+        rng = np.random.default_rng(5)
+        path = str(tmp_path / "history.jsonl")
+        for _ in range(10_000):
+            quantities = rng.uniform(10.0, 1000.0, 10)
+            request = {"supply_chain_data": {"inventory": {f"SKU{i}": float(q) for i, q in enumerate(quantities)}}}
+            append_record(path, request, {"confidence_score": 0.8}, score=float(quantities.mean() / 1000.0))
+
+        report = train_model(SimpleSupplyChainModel(10, 5), [path], epochs=2, shuffle_buffer=4096)
+
+        print(f"Training: {report.samples:,} samples in {report.seconds:.2f}s "
+              f"({report.samples_per_second:,.0f} samples/s)")
+        assert report.samples == 20_000
+        assert report.samples_per_second > 2000
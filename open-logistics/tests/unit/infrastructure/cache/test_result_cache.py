@@ -0,0 +1,248 @@
+"""
+Unit tests for the optimization result cache.
+"""
+
+import time
+
+import pytest
+
+from open_logistics.application.use_cases.optimize_supply_chain import (
+    OptimizeSupplyChainUseCase,
+)
+from open_logistics.infrastructure.cache.result_cache import (
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    ResultCache,
+    request_cache_key,
+)
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    MLXOptimizer,
+    OptimizationDelta,
+    OptimizationRequest,
+    OptimizationResult,
+)
+
+
+def _request(**overrides):
+    fields = dict(
+        supply_chain_data={"inventory": {"item_1": 10, "item_2": 20}, "locations": []},
+        constraints={"budget": 500, "capacity_limit": 25},
+        objectives=["minimize_cost", "maximize_efficiency"],
+        time_horizon=7,
+    )
+    fields.update(overrides)
+    return OptimizationRequest(**fields)
+
+
+def _result(score=0.9, plan_id=None):
+    return OptimizationResult(
+        optimized_plan={"inventory_optimization": {}},
+        confidence_score=score,
+        execution_time_ms=1.0,
+        resource_utilization={"cpu_usage": 0.1},
+        plan_id=plan_id,
+    )
+
+
+class CountingOptimizer:
+    """Optimizer stand-in counting how often it is asked to solve."""
+
+    def __init__(self):
+        self.calls = 0
+        self.plans = set()
+
+    def _store(self):
+        self.calls += 1
+        self.plans.add(f"plan_{self.calls}")
+        return f"plan_{self.calls}"
+
+    def holds_plan(self, result):
+        return result.plan_id in self.plans
+
+    def restore_plan(self, request, result, store=True):
+        if self.holds_plan(result):
+            return result
+        plan_id = None
+        if store:
+            plan_id = f"restored_{len(self.plans)}"
+            self.plans.add(plan_id)
+        return result.model_copy(update={"plan_id": plan_id})
+
+    async def optimize_supply_chain(self, request):
+        return _result(plan_id=self._store())
+
+    async def optimize_many(self, requests, store_plans=False):
+        if store_plans:
+            return [_result(plan_id=self._store()) for _ in requests]
+        self.calls += len(requests)
+        return [_result() for _ in requests]
+
+
+class DictRedis:
+    """Minimal in-memory implementation of the async Redis commands used."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        if value is None or value[1] <= time.monotonic():
+            return None
+        return value[0]
+
+    async def set(self, key, value, px):
+        self.data[key] = (value, time.monotonic() + px / 1000)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_cache_key_ignores_ordering():
+    """Requests differing only in key or objective order share a key."""
+    reordered = _request(
+        supply_chain_data={"locations": [], "inventory": {"item_1": 10, "item_2": 20}},
+        constraints={"capacity_limit": 25, "budget": 500},
+        objectives=["maximize_efficiency", "minimize_cost"],
+    )
+    assert request_cache_key(reordered) == request_cache_key(_request())
+    assert request_cache_key(_request(time_horizon=14)) != request_cache_key(_request())
+    assert request_cache_key(_request(priority_level="high")) != request_cache_key(
+        _request()
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_key_keeps_inventory_order():
+    """Default factors follow inventory order, so a reordered inventory is a different plan."""
+    optimizer = MLXOptimizer()
+    use_case = OptimizeSupplyChainUseCase(
+        optimizer=optimizer, cache=ResultCache(InMemoryCacheBackend())
+    )
+    inventory = {f"item_{i}": 10 + i for i in range(4)}
+    request = _request(supply_chain_data={"inventory": inventory})
+    reordered = _request(
+        supply_chain_data={"inventory": dict(reversed(list(inventory.items())))}
+    )
+    assert request_cache_key(reordered) != request_cache_key(request)
+
+    await use_case.execute(request)
+    result = await use_case.execute(reordered)
+    expected = optimizer._run_cpu_optimization(reordered)
+    for sku, item in expected["inventory_optimization"].items():
+        assert result.optimized_plan["inventory_optimization"][sku] == pytest.approx(
+            item
+        )
+
+
+@pytest.mark.asyncio
+async def test_cached_results_refer_to_held_plans():
+    """A cached result whose plan left the plan store is served under a re-registered plan."""
+    optimizer = CountingOptimizer()
+    use_case = OptimizeSupplyChainUseCase(
+        optimizer=optimizer, cache=ResultCache(InMemoryCacheBackend())
+    )
+
+    first = await use_case.execute(_request())
+    assert (await use_case.execute(_request())).plan_id == first.plan_id
+    optimizer.plans.clear()
+    second = await use_case.execute(_request())
+    assert second.plan_id != first.plan_id
+    assert second.optimized_plan == first.optimized_plan
+    assert optimizer.holds_plan(second)
+
+    unstored = await use_case.execute_many([_request(time_horizon=30)])
+    assert unstored[0].plan_id is None
+    assert await use_case.execute_many([_request(time_horizon=30)]) == unstored
+    stored = await use_case.execute_many([_request(time_horizon=30)], store_plans=True)
+    assert optimizer.holds_plan(stored[0])
+    assert optimizer.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_more_results_than_the_plan_store_holds():
+    """Results outlive their plans in the store, and other processes' results get a local plan."""
+    optimizer = MLXOptimizer()
+    cache = ResultCache(RedisCacheBackend(DictRedis()))
+    use_case = OptimizeSupplyChainUseCase(optimizer=optimizer, cache=cache)
+    requests = [
+        _request(time_horizon=day)
+        for day in range(1, optimizer.plan_store.max_entries + 5)
+    ]
+    first = [await use_case.execute(request) for request in requests]
+
+    repeated = [await use_case.execute(request) for request in requests]
+    assert cache.stats()["hits"] == len(requests)
+    for result, previous in zip(repeated, first):
+        assert result.optimized_plan == previous.optimized_plan
+    assert not optimizer.holds_plan(first[-1])
+    assert repeated[-1].plan_id != first[-1].plan_id
+    updated = await use_case.reoptimize(
+        repeated[-1], OptimizationDelta(inventory={"item_1": 15})
+    )
+    assert (
+        updated.optimized_plan["inventory_optimization"]["item_1"]["current_level"]
+        == 15
+    )
+
+    # Another worker sharing the Redis server has none of these plans
+    worker = OptimizeSupplyChainUseCase(optimizer=MLXOptimizer(), cache=cache)
+    shared = await worker.execute(requests[-1])
+    assert shared.optimized_plan == first[-1].optimized_plan
+    assert worker.optimizer.holds_plan(shared)
+    assert cache.stats()["misses"] == len(requests)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_lru_and_ttl():
+    """Least recently used entries are evicted first and expired ones vanish."""
+    backend = InMemoryCacheBackend(max_entries=2)
+    await backend.set("a", _result(0.1), ttl_seconds=60)
+    await backend.set("b", _result(0.2), ttl_seconds=60)
+    assert await backend.get("a") is not None
+    await backend.set("c", _result(0.3), ttl_seconds=60)
+    assert await backend.get("b") is None
+    assert await backend.get("a") is not None
+
+    await backend.set("d", _result(0.4), ttl_seconds=0)
+    assert await backend.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_use_case_serves_repeats_from_cache():
+    """Only the first of several identical requests reaches the optimizer."""
+    optimizer = CountingOptimizer()
+    cache = ResultCache(InMemoryCacheBackend())
+    use_case = OptimizeSupplyChainUseCase(optimizer=optimizer, cache=cache)
+
+    first = await use_case.execute(_request())
+    second = await use_case.execute(
+        _request(objectives=["maximize_efficiency", "minimize_cost"])
+    )
+    results = await use_case.execute_many([_request(), _request(time_horizon=30)])
+
+    assert second is first
+    assert results[0] is first
+    assert optimizer.calls == 2
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trip():
+    """The Redis backend stores results as JSON with a server-side TTL."""
+    client = DictRedis()
+    cache = ResultCache(RedisCacheBackend(client, key_prefix="test:"), ttl_seconds=60)
+    await cache.put(_request(), _result(0.75))
+
+    cached = await cache.get(_request())
+    assert cached == _result(0.75)
+    assert all(key.startswith("test:") for key in client.data)
+
+    await cache.clear()
+    assert client.data == {}
+    assert await cache.get(_request()) is None
@@ -0,0 +1,88 @@
+"""
+Unit tests for memory-mapped model checkpoints.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.mlx_integration.checkpoint import (
+    FORMAT_VERSION,
+    MAGIC,
+    Checkpoint,
+    is_checkpoint,
+    save_checkpoint,
+)
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    SimpleSupplyChainModel,
+)
+
+
+@pytest.fixture
+def tensors():
+    """Tensors of mixed dtypes and sizes that need alignment padding."""
+    return {
+        "weight": np.arange(15, dtype=np.float32).reshape(3, 5),
+        "bias": np.array([1.5, -2.0, 0.25]),
+        "counts": np.arange(7, dtype=np.int16),
+    }
+
+
+def test_checkpoint_round_trip(tmp_path, tensors):
+    """Tensors come back as aligned, read-only views with their metadata."""
+    path = str(tmp_path / "model.olck")
+    save_checkpoint(path, tensors, model="Example", metadata={"horizon": 30})
+    checkpoint = Checkpoint(path)
+
+    assert is_checkpoint(path)
+    assert checkpoint.version == FORMAT_VERSION
+    assert checkpoint.model == "Example"
+    assert checkpoint.metadata == {"horizon": 30}
+    for name, value in tensors.items():
+        np.testing.assert_array_equal(checkpoint[name], value)
+        assert checkpoint[name].dtype == value.dtype
+        assert not checkpoint[name].flags.writeable
+        assert checkpoint[name].ctypes.data % 64 == 0
+    checkpoint.verify()
+
+
+def test_checkpoint_rejects_bad_files(tmp_path, tensors):
+    """Foreign files and newer versions fail at open; corrupt data fails verify."""
+    path = tmp_path / "model.olck"
+    save_checkpoint(str(path), tensors)
+    data = bytearray(path.read_bytes())
+
+    foreign = tmp_path / "weights.npz"
+    np.savez(foreign, **tensors)
+    assert not is_checkpoint(str(foreign))
+    with pytest.raises(ValueError, match="not a model checkpoint"):
+        Checkpoint(str(foreign))
+
+    newer = tmp_path / "newer.olck"
+    newer.write_bytes(MAGIC + (FORMAT_VERSION + 1).to_bytes(4, "little") + bytes(data[12:]))
+    with pytest.raises(ValueError, match="version"):
+        Checkpoint(str(newer))
+
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    corrupt = Checkpoint(str(path))
+    with pytest.raises(ValueError, match="checksum"):
+        corrupt.verify()
+
+    path.write_bytes(bytes(data[:-8]))
+    with pytest.raises(ValueError, match="truncated"):
+        Checkpoint(str(path))
+
+
+def test_model_serves_from_checkpoint(tmp_path):
+    """A model loaded from a checkpoint scores like the one that saved it."""
+    model = SimpleSupplyChainModel(10, 5, seed=3)
+    path = str(tmp_path / "model.olck")
+    model.save_weights(path)
+    features = np.random.default_rng(0).random((20, 10), dtype=np.float32)
+
+    loaded = SimpleSupplyChainModel(10, 5, weights_path=path)
+    np.testing.assert_allclose(loaded(features), model(features), rtol=1e-6)
+    if not loaded.mlx_enabled:
+        assert all(isinstance(weight.base, np.ndarray) for weight, _ in loaded.layers)
+
+    with pytest.raises(ValueError):
+        SimpleSupplyChainModel(12, 5, weights_path=path)
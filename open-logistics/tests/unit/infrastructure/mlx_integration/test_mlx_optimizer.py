@@ -1,9 +1,25 @@
 """
 Unit tests for MLX optimizer.
 """
+import asyncio
+import threading
+import time
+
+import numpy as np
 import pytest
 from unittest.mock import patch
-from open_logistics.infrastructure.mlx_integration.mlx_optimizer import MLXOptimizer, OptimizationRequest
+from open_logistics.infrastructure.mlx_integration.checkpoint import Checkpoint
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    MODEL_INPUT_SIZE,
+    MODEL_OUTPUT_SIZE,
+    MLXOptimizer,
+    OptimizationDelta,
+    OptimizationRequest,
+    SimpleSupplyChainModel,
+    WhatIfQuery,
+    get_supply_chain_model,
+)
+from open_logistics.infrastructure.optimization.lot_sizing import solve_lot_sizing
 
 @pytest.mark.asyncio
 async def test_optimizer_with_mlx_enabled():
@@ -28,6 +44,7 @@ async def test_optimizer_with_mlx_disabled():
     with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.MLX_AVAILABLE', False):
         with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.get_settings') as mock_get_settings:
             mock_get_settings.return_value.mlx.MLX_ENABLED = False
+            mock_get_settings.return_value.mlx.MODEL_WEIGHTS_PATH = None
             optimizer = MLXOptimizer()
             assert optimizer.use_mlx is False
             request = OptimizationRequest(
@@ -46,4 +63,755 @@ async def test_predict_demand():
     historical_data = {"demand_history": [10, 20, 30]}
     time_horizon = 5
     result = await optimizer.predict_demand(historical_data, time_horizon)
-    assert len(result) == time_horizon 
\ No newline at end of file
+    assert len(result) == time_horizon 
+
+@pytest.mark.asyncio
+async def test_optimizer_lp_allocation_honors_budget():
+    """Budget constraints route the CPU path through the LP backend."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {f"item_{i}": 100 for i in range(10)}},
+        constraints={"budget": 500, "solver_time_limit_s": 5},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    result = await optimizer.optimize_supply_chain(request)
+    metrics = result.optimized_plan["performance_metrics"]
+    assert metrics["solver_backend"] == "glop"
+    assert metrics["solver_status"] == "OPTIMAL"
+    assert result.optimized_plan["cost_analysis"]["total_inventory_cost"] <= 500 + 1e-6
+
+
+@pytest.mark.asyncio
+async def test_optimizer_vrp_routing():
+    """The VRP backend replaces the top-five route listing."""
+    optimizer = MLXOptimizer()
+    locations = [{"id": f"loc_{i}", "capacity": 100, "distance": 10 * i} for i in range(1, 9)]
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10}, "locations": locations},
+        constraints={"vehicle_capacity": 300},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        solver_options={"routing": "vrp", "routing_time_limit": 0.3}
+    )
+    result = await optimizer.optimize_supply_chain(request)
+    plan = result.optimized_plan
+    stops = [stop for route in plan["route_optimization"].values() for stop in route["stops"]]
+    assert sorted(stops) == sorted(loc["id"] for loc in locations)
+    assert plan["performance_metrics"]["routing_backend"] == "vrp"
+
+
+@pytest.mark.asyncio
+async def test_optimize_many_matches_individual_plans():
+    """Batched optimization returns the same plans as individual requests."""
+    optimizer = MLXOptimizer()
+    requests = [
+        OptimizationRequest(
+            supply_chain_data={
+                "inventory": {f"item_{i}": 10 * (i + depot) for i in range(depot + 1)},
+                "demand_history": [100 + depot * t for t in range(depot + 1)],
+            },
+            objectives=["minimize_cost"],
+            time_horizon=7
+        )
+        for depot in range(5)
+    ]
+    requests.append(OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 100, "item_2": 200}},
+        constraints={"budget": 100},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    ))
+
+    results = await optimizer.optimize_many(requests)
+
+    assert len(results) == len(requests)
+    for request, result in zip(requests, results):
+        expected = optimizer._run_cpu_optimization(request)
+        plan = result.optimized_plan
+        for sku, item in expected["inventory_optimization"].items():
+            assert plan["inventory_optimization"][sku] == pytest.approx(item)
+        assert plan["performance_metrics"]["demand_trend"] == pytest.approx(
+            expected["performance_metrics"]["demand_trend"]
+        )
+    assert results[-1].optimized_plan["performance_metrics"]["solver_backend"] == "glop"
+
+
+@pytest.mark.asyncio
+async def test_optimize_many_keeps_interactive_plans():
+    """Batch plans only enter the plan store on request, so they cannot evict interactive plans."""
+    optimizer = MLXOptimizer()
+    interactive = await optimizer.optimize_supply_chain(
+        OptimizationRequest(
+            supply_chain_data={"inventory": {"item_1": 100}}, objectives=["minimize_cost"], time_horizon=7
+        )
+    )
+    requests = [
+        OptimizationRequest(
+            supply_chain_data={"inventory": {f"item_{depot}": 10 * depot}},
+            objectives=["minimize_cost"],
+            time_horizon=7,
+        )
+        for depot in range(2 * optimizer.plan_store.max_entries)
+    ]
+
+    results = await optimizer.optimize_many(requests)
+    assert all(result.plan_id is None for result in results)
+    assert optimizer.plan_store.get(interactive.plan_id) is not None
+
+    stored = await optimizer.optimize_many(requests[:2], store_plans=True)
+    assert all(optimizer.plan_store.get(result.plan_id) is not None for result in stored)
+
+
+@pytest.mark.asyncio
+async def test_optimizer_runs_off_event_loop():
+    """CPU optimization is dispatched through the executor."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10}},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    solve_threads = []
+    solve_cpu = optimizer._solve_cpu
+
+    def spy(*args):
+        solve_threads.append(threading.get_ident())
+        return solve_cpu(*args)
+
+    with patch.object(optimizer, "_solve_cpu", spy), patch.object(
+        optimizer.executor, "run", wraps=optimizer.executor.run
+    ) as run:
+        result = await optimizer.optimize_supply_chain(request)
+
+    assert result.optimized_plan["performance_metrics"]["execution_mode"] == "thread"
+    assert run.call_args.args[:2] == ("thread", spy)
+    assert solve_threads and threading.get_ident() not in solve_threads
+
+
+@pytest.mark.asyncio
+async def test_reoptimize_matches_full_optimization():
+    """Applying a delta incrementally gives the plan of the merged request."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {f"item_{i}": 10.0 + i for i in range(50)}},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    previous = await optimizer.optimize_supply_chain(request)
+    delta = OptimizationDelta(inventory={"item_3": 99.0, "item_7": {"unit_cost": 2.5}, "item_new": 40.0})
+
+    result = await optimizer.reoptimize(previous, delta)
+    expected = optimizer._run_cpu_optimization(delta.apply(request))
+
+    plan = result.optimized_plan
+    assert result.plan_id != previous.plan_id
+    assert list(plan["inventory_optimization"]) == list(expected["inventory_optimization"])
+    for sku, item in expected["inventory_optimization"].items():
+        assert plan["inventory_optimization"][sku] == pytest.approx(item)
+    assert plan["performance_metrics"]["rows_recomputed"] == 3
+
+    # Removing a SKU moves the rows behind it onto other default factors
+    removal = OptimizationDelta(removed_skus=["item_0"])
+    trimmed = await optimizer.reoptimize(result, removal)
+    expected = optimizer._run_cpu_optimization(removal.apply(delta.apply(request)))
+    inventory = trimmed.optimized_plan["inventory_optimization"]
+    assert "item_0" in plan["inventory_optimization"]
+    assert list(inventory) == list(expected["inventory_optimization"])
+    for sku, item in expected["inventory_optimization"].items():
+        assert inventory[sku] == pytest.approx(item)
+
+
+@pytest.mark.asyncio
+async def test_reoptimize_keeps_explicit_shortage_costs():
+    """A unit cost change leaves explicit shortage costs in place, matching a full solve."""
+    optimizer = MLXOptimizer()
+    inventory = {
+        f"priced_{i}": {"quantity": 20.0 + i, "unit_cost": 2.0, "shortage_cost": 8.0 if i == 2 else 4.5}
+        for i in range(5)
+    }
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        constraints={"budget": 120},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        solver_options={"allocation": "lp"},
+    )
+    previous = await optimizer.optimize_supply_chain(request)
+    delta = OptimizationDelta(inventory={"priced_2": {"unit_cost": 3.0}})
+
+    result = await optimizer.reoptimize(previous, delta)
+    expected = optimizer._run_cpu_optimization(delta.apply(request))
+
+    for sku, item in expected["inventory_optimization"].items():
+        assert result.optimized_plan["inventory_optimization"][sku] == pytest.approx(item)
+
+
+@pytest.mark.asyncio
+async def test_reoptimize_warm_starts_solvers():
+    """Constrained plans re-solve on a working set and keep previous routes."""
+    optimizer = MLXOptimizer()
+    locations = [{"id": f"loc_{i}", "capacity": 100, "distance": 10 * i} for i in range(1, 7)]
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {f"item_{i}": 100.0 + i for i in range(400)},
+            "locations": locations,
+        },
+        constraints={"budget": 20000, "capacity_limit": 30000, "vehicle_capacity": 300},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        solver_options={"routing": "vrp", "routing_time_limit": 0.3}
+    )
+    previous = await optimizer.optimize_supply_chain(request)
+
+    inventory_only = await optimizer.reoptimize(
+        previous.plan_id, OptimizationDelta(inventory={"item_5": 150.0, "item_9": 20.0})
+    )
+    metrics = inventory_only.optimized_plan["performance_metrics"]
+    assert metrics["solver_warm_start"] == "working_set"
+    assert inventory_only.optimized_plan["route_optimization"] == previous.optimized_plan["route_optimization"]
+
+    rerouted = await optimizer.reoptimize(
+        inventory_only, OptimizationDelta(locations=[{"id": "loc_7", "capacity": 50, "distance": 25}])
+    )
+    stops = [stop for route in rerouted.optimized_plan["route_optimization"].values() for stop in route["stops"]]
+    assert "loc_7" in stops
+    assert rerouted.optimized_plan["performance_metrics"]["routing_warm_start"]
+
+    with pytest.raises(KeyError):
+        await optimizer.reoptimize("missing", OptimizationDelta())
+
+
+@pytest.mark.asyncio
+async def test_optimize_anytime_streams_improving_plans():
+    """Anytime mode yields the greedy plan first, then the solver plan."""
+    optimizer = MLXOptimizer()
+    locations = [{"id": f"loc_{i}", "capacity": 100, "distance": 10 * i} for i in range(1, 9)]
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {f"item_{i}": {"quantity": 100.0, "unit_cost": 0.5 + (i % 7) * 0.3} for i in range(300)},
+            "locations": locations,
+        },
+        constraints={"budget": 15000, "capacity_limit": 12000, "vehicle_capacity": 300},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        priority_level="high",
+        solver_options={"routing": "vrp", "routing_time_limit": 0.3}
+    )
+    results = [result async for result in optimizer.optimize_anytime(request)]
+
+    first, last = results[0], results[-1]
+    assert first.optimized_plan["performance_metrics"]["solver_backend"] == "greedy"
+    assert "routing_backend" not in first.optimized_plan["performance_metrics"]
+    assert first.plan_id and last.plan_id
+    assert last.optimized_plan["performance_metrics"]["solver_backend"] == "glop"
+    assert last.optimized_plan["performance_metrics"]["routing_backend"] == "vrp"
+    assert last.confidence_score == pytest.approx(1.0)
+    assert first.confidence_score <= last.confidence_score
+    assert all(a.execution_time_ms <= b.execution_time_ms for a, b in zip(results, results[1:]))
+
+
+@pytest.mark.asyncio
+async def test_optimize_anytime_detaches_late_process_solve(monkeypatch):
+    """A process solve gets the stream's time left and is cancelled at the deadline."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {f"item_{i}": {"quantity": 100.0, "unit_cost": 0.5 + (i % 7) * 0.3} for i in range(300)},
+            "locations": [{"id": f"loc_{i}", "capacity": 100, "distance": 10 * i} for i in range(1, 9)],
+        },
+        constraints={"budget": 15000, "capacity_limit": 12000, "vehicle_capacity": 300, "solver_time_limit_s": 0.2},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        priority_level="high",
+        solver_options={"routing": "vrp"}
+    )
+    run = optimizer.executor.run
+    calls = []
+
+    async def slow_process_run(mode, func, *args):
+        if mode != "process":
+            return await run(mode, func, *args)
+        calls.append(args)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+
+    monkeypatch.setattr(optimizer.executor, "choose", lambda size: "process")
+    monkeypatch.setattr(optimizer.executor, "run", slow_process_run)
+    started = time.perf_counter()
+    results = [result async for result in optimizer.optimize_anytime(request)]
+    await asyncio.sleep(0)
+
+    assert time.perf_counter() - started < 2.0
+    assert [r.optimized_plan["performance_metrics"]["solver_backend"] for r in results] == ["greedy"]
+    (_, time_left), cancelled = calls
+    assert 0.0 < time_left <= 0.2
+    assert cancelled == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_confidence_reflects_solver_gap():
+    """Confidence is one minus the reported solver gap, not a random draw."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {f"item_{i}": 100 for i in range(10)}},
+        constraints={"budget": 500},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        priority_level="critical"
+    )
+    first = await optimizer.optimize_supply_chain(request)
+    second = await optimizer.optimize_supply_chain(request)
+    gap = first.optimized_plan["performance_metrics"]["solver_gap"]
+    assert first.confidence_score == pytest.approx(1.0 - gap)
+    assert first.confidence_score == second.confidence_score
+
+
+@pytest.mark.asyncio
+async def test_optimizer_adds_network_flow_for_echelons():
+    """Locations with suppliers and depots get a network flow section."""
+    optimizer = MLXOptimizer()
+    locations = [
+        {"id": "plant", "type": "supplier", "supply": 500, "distance": 0},
+        {"id": "hub", "type": "depot", "capacity": 400, "distance": 40},
+    ] + [{"id": f"site_{i}", "demand": 100, "distance": 40 + 10 * i} for i in range(1, 5)]
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10}, "locations": locations},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    result = await optimizer.optimize_supply_chain(request)
+    plan = result.optimized_plan
+    assert plan["network_flow"]["delivered"] == 400
+    assert plan["network_flow"]["lanes"]["plant->hub"]["flow"] == 400
+    assert plan["cost_analysis"]["total_network_cost"] == pytest.approx(plan["network_flow"]["total_cost"])
+    assert plan["performance_metrics"]["network_status"] == "OPTIMAL"
+
+    flat = request.model_copy(update={"supply_chain_data": {"inventory": {"item_1": 10}, "locations": locations[2:]}})
+    assert "network_flow" not in (await optimizer.optimize_supply_chain(flat)).optimized_plan
+
+
+@pytest.mark.asyncio
+async def test_optimizer_scores_plan_against_scenarios():
+    """Requesting scenarios adds a scenario analysis of the inventory plan."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {"item_1": 100, "item_2": 40},
+            "demand_history": [90, 100, 110, 95, 105, 120],
+        },
+        objectives=["minimize_cost"],
+        time_horizon=14,
+        constraints={"lead_time_days": 3},
+        solver_options={"scenarios": 200, "scenario_seed": 5},
+    )
+    plan = (await optimizer.optimize_supply_chain(request)).optimized_plan
+    analysis = plan["scenario_analysis"]
+    assert analysis["scenarios"] == 200
+    assert 0.0 <= analysis["stockout_probability"] <= 1.0
+    assert 0.0 <= analysis["fill_rate"] <= 1.0
+    assert analysis["cost_distribution"]["p50"] > 0
+
+    plain = request.model_copy(update={"solver_options": {}})
+    assert "scenario_analysis" not in (await optimizer.optimize_supply_chain(plain)).optimized_plan
+
+    # A critical request scores only the scenarios that fit its deadline
+    critical = request.model_copy(
+        update={"priority_level": "critical", "solver_options": {"scenarios": 2_000_000, "scenario_seed": 5}}
+    )
+    analysis = (await optimizer.optimize_supply_chain(critical)).optimized_plan["scenario_analysis"]
+    assert analysis["scenarios_requested"] == 2_000_000
+    assert 0 < analysis["scenarios"] < 2_000_000
+
+
+@pytest.mark.asyncio
+async def test_optimizer_computes_pareto_frontier():
+    """Requesting frontier points adds a frontier over the requested objectives."""
+    optimizer = MLXOptimizer()
+    inventory = {f"item_{i}": {"quantity": 50 + i, "unit_cost": 1 + i % 7} for i in range(60)}
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        objectives=["minimize_cost", "maximize_efficiency", "minimize_risk"],
+        time_horizon=7,
+        constraints={"budget": 1500},
+        solver_options={"allocation": "lp", "pareto_points": 8},
+    )
+    plan = (await optimizer.optimize_supply_chain(request)).optimized_plan
+    frontier = plan["pareto_frontier"]
+    assert frontier["objectives"] == ["minimize_cost", "maximize_efficiency", "minimize_risk"]
+    assert frontier["points"]
+    assert set(frontier["points"][0]["objectives"]) == {"cost", "efficiency", "risk"}
+
+    single = request.model_copy(update={"objectives": ["minimize_cost"]})
+    assert "pareto_frontier" not in (await optimizer.optimize_supply_chain(single)).optimized_plan
+
+    # Batched requests, vectorized ones included, keep the frontier
+    vectorized = request.model_copy(
+        update={"solver_options": {"allocation": "vectorized", "pareto_points": 8}}
+    )
+    for result in await optimizer.optimize_many([request, vectorized]):
+        assert result.optimized_plan["pareto_frontier"]["points"]
+
+
+def test_numpy_model_matches_saved_weights(tmp_path):
+    """The NumPy backend scores batches row by row and round-trips its weights."""
+    with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.MLX_AVAILABLE', False):
+        model = SimpleSupplyChainModel(10, 5, seed=1)
+        rows = np.random.default_rng(2).normal(size=(9000, 10)).astype(np.float32)
+        scores = model.predict(rows)
+        assert scores.shape == (9000, 5)
+        assert scores.dtype == np.float32
+        np.testing.assert_allclose(model(rows[3]), scores[3], rtol=1e-5)
+
+        params = model.parameters()
+        assert params["fc1.weight"].shape == (128, 10)
+        hidden = np.maximum(rows[:2] @ params["fc1.weight"].T + params["fc1.bias"], 0)
+        hidden = np.maximum(hidden @ params["fc2.weight"].T + params["fc2.bias"], 0)
+        np.testing.assert_allclose(hidden @ params["fc3.weight"].T + params["fc3.bias"], scores[:2], rtol=1e-4, atol=1e-5)
+
+        path = str(tmp_path / "model.npz")
+        model.save_weights(path)
+        loaded = SimpleSupplyChainModel(10, 5, weights_path=path, seed=7)
+        np.testing.assert_array_equal(loaded.predict(rows), scores)
+        with pytest.raises(ValueError):
+            SimpleSupplyChainModel(12, 5, weights_path=path)
+
+
+def test_optimizers_share_configured_model(tmp_path):
+    """Optimizers built per request reuse one model and open its checkpoint once."""
+    path = str(tmp_path / "model.olck")
+    get_supply_chain_model.cache_clear()
+    with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.MLX_AVAILABLE', False):
+        SimpleSupplyChainModel(MODEL_INPUT_SIZE, MODEL_OUTPUT_SIZE, seed=3).save_weights(path)
+        with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.get_settings') as mock_get_settings:
+            mock_get_settings.return_value.mlx.MLX_ENABLED = False
+            mock_get_settings.return_value.mlx.MODEL_WEIGHTS_PATH = path
+            with patch(
+                'open_logistics.infrastructure.mlx_integration.mlx_optimizer.Checkpoint', wraps=Checkpoint
+            ) as opened:
+                models = [MLXOptimizer().model for _ in range(3)]
+    get_supply_chain_model.cache_clear()
+
+    assert models[0] is not None
+    assert all(model is models[0] for model in models)
+    assert opened.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_cpu_plan_scored_by_configured_weights(tmp_path):
+    """Configured weights turn on neural scoring for single and batched CPU plans."""
+    path = str(tmp_path / "model.npz")
+    with patch('open_logistics.infrastructure.mlx_integration.mlx_optimizer.MLX_AVAILABLE', False):
+        SimpleSupplyChainModel(10, 5, seed=3).save_weights(path)
+        optimizer = MLXOptimizer()
+        optimizer.model = SimpleSupplyChainModel(10, 5, weights_path=path)
+        requests = [
+            OptimizationRequest(
+                supply_chain_data={"inventory": {f"item_{i}": 10 * (i + k) for i in range(12)}},
+                objectives=["minimize_cost"],
+                time_horizon=7,
+            )
+            for k in range(3)
+        ]
+        single = (await optimizer.optimize_supply_chain(requests[1])).optimized_plan
+        batch = [result.optimized_plan for result in await optimizer.optimize_many(requests)]
+
+    score = single["performance_metrics"]["optimization_score"]
+    assert 0.0 < score < 1.0 and score != 0.82
+    assert batch[1]["performance_metrics"]["optimization_score"] == pytest.approx(score)
+    assert batch[0]["performance_metrics"]["optimization_score"] != pytest.approx(score)
+
+
+@pytest.mark.asyncio
+async def test_presolve_shrinks_allocation_without_changing_plan():
+    """SKUs sharing a cost profile are solved as one variable, giving the same plan."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {f"item_{i}": 100 + i for i in range(300)}},
+        constraints={"budget": 15000},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        solver_options={"allocation": "lp"},
+    )
+    presolved = (await optimizer.optimize_supply_chain(request)).optimized_plan
+    direct_request = request.model_copy(update={"solver_options": {"allocation": "lp", "presolve": False}})
+    direct = (await optimizer.optimize_supply_chain(direct_request)).optimized_plan
+
+    assert presolved["performance_metrics"]["presolve_ratio"] >= 10
+    assert direct["performance_metrics"]["presolve_ratio"] == 1.0
+    assert presolved["performance_metrics"]["solver_status"] == "OPTIMAL"
+    assert presolved["cost_analysis"]["total_inventory_cost"] == pytest.approx(
+        direct["cost_analysis"]["total_inventory_cost"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_network_flow_solves_regions_separately():
+    """Regions sharing no lanes are solved as separate components."""
+    optimizer = MLXOptimizer()
+    locations, lanes = [], []
+    for region in ("west", "east"):
+        locations += [
+            {"id": f"{region}_plant", "type": "supplier", "supply": 300},
+            {"id": f"{region}_site_1", "demand": 100},
+            {"id": f"{region}_site_2", "demand": 100},
+        ]
+        lanes += [{"from": f"{region}_plant", "to": f"{region}_site_{i}", "distance": 10 * i} for i in (1, 2)]
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10}, "locations": locations, "lanes": lanes},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    plan = (await optimizer.optimize_supply_chain(request)).optimized_plan
+    single = request.model_copy(update={"solver_options": {"decompose": False}})
+    whole = (await optimizer.optimize_supply_chain(single)).optimized_plan
+
+    assert plan["performance_metrics"]["network_components"] == 2
+    assert whole["performance_metrics"]["network_components"] == 1
+    assert plan["network_flow"]["delivered"] == whole["network_flow"]["delivered"] == 400
+    assert plan["network_flow"]["total_cost"] == pytest.approx(whole["network_flow"]["total_cost"])
+
+
+@pytest.mark.asyncio
+async def test_optimizer_plans_replenishment_over_long_horizons():
+    """Long horizons are planned in rolling windows covering every day."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {f"item_{i}": 20 + i for i in range(12)},
+            "demand_history": [90, 100, 110, 95, 105, 120],
+        },
+        objectives=["minimize_cost"],
+        time_horizon=90,
+        constraints={"lead_time_days": 2},
+        solver_options={"replenishment": True, "horizon_window": 21, "horizon_overlap": 7},
+    )
+    schedule = (await optimizer.optimize_supply_chain(request)).optimized_plan["replenishment_schedule"]
+    assert schedule["horizon_days"] == 90
+    assert schedule["windows"] == 6
+    assert schedule["lead_time_days"] == 2
+    assert len(schedule["daily_orders"]) == 90
+    assert schedule["status"] == "OPTIMAL"
+    assert 0.0 <= schedule["fill_rate"] <= 1.0
+
+    whole = request.model_copy(update={"solver_options": {"replenishment": True, "horizon_window": 0}})
+    monolithic = (await optimizer.optimize_supply_chain(whole)).optimized_plan["replenishment_schedule"]
+    assert monolithic["windows"] == 1
+    assert schedule["total_cost"] == pytest.approx(monolithic["total_cost"], rel=0.01)
+
+    # A critical request stops planning windows at its deadline
+    critical = OptimizationRequest(
+        supply_chain_data={"inventory": {f"item_{i}": 20 + i % 50 for i in range(2000)}},
+        objectives=["minimize_cost"],
+        time_horizon=60,
+        priority_level="critical",
+        solver_options={"replenishment": True},
+    )
+    plan = (await optimizer.optimize_supply_chain(critical)).optimized_plan
+    if "replenishment_schedule" in plan:
+        assert plan["replenishment_schedule"]["planned_days"] < 60
+        assert plan["replenishment_schedule"]["status"] != "OPTIMAL"
+
+
+@pytest.mark.asyncio
+async def test_heuristic_tier_answers_critical_and_overdue_requests():
+    """Critical requests and solves estimated past the deadline use the greedy tier and report its gap."""
+    optimizer = MLXOptimizer()
+    inventory = {f"item_{i}": {"quantity": 100.0, "unit_cost": 0.5 + (i % 7) * 0.3} for i in range(2000)}
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        constraints={"budget": 90000, "capacity_limit": 120000},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        priority_level="critical",
+    )
+    metrics = (await optimizer.optimize_supply_chain(request)).optimized_plan["performance_metrics"]
+    assert metrics["solver_backend"] == "greedy"
+    assert metrics["solver_tier"] == "heuristic"
+    assert 0.0 <= metrics["solver_gap"] < 0.01
+
+    high = request.model_copy(update={"priority_level": "high"})
+    assert (await optimizer.optimize_supply_chain(high)).optimized_plan["performance_metrics"]["solver_tier"] == "exact"
+
+    overdue = high.model_copy(update={
+        "constraints": {**request.constraints, "solver_time_limit_s": 0.05},
+        "solver_options": {"allocation": "mip"},
+    })
+    metrics = (await optimizer.optimize_supply_chain(overdue)).optimized_plan["performance_metrics"]
+    assert metrics["estimated_solve_ms"] > 50
+    assert metrics["solver_tier"] == "heuristic"
+
+
+@pytest.mark.asyncio
+async def test_what_if_reprices_plan_from_duals():
+    """LP plans report shadow prices, and what-if queries inside their ranges are answered without a solve."""
+    optimizer = MLXOptimizer()
+    inventory = {f"item_{i}": {"quantity": 20.0 + i % 30, "unit_cost": 1.0 + (i % 9) * 0.4} for i in range(300)}
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        constraints={"budget": 5000, "capacity_limit": 3000},
+        objectives=["minimize_cost"],
+        time_horizon=30,
+        solver_options={"allocation": "lp"},
+    )
+    result = await optimizer.optimize_supply_chain(request)
+    budget = result.optimized_plan["sensitivity_analysis"]["limits"]["budget"]
+    assert budget["shadow_price"] < 0
+    lower, upper = budget["valid_range"]
+    assert lower <= 5000 <= upper
+
+    inside = await optimizer.what_if(result.plan_id, WhatIfQuery(budget=(5000 + upper) / 2))
+    assert inside["solver_warm_start"] == "sensitivity"
+    assert inside["objective_change"] == pytest.approx(budget["shadow_price"] * (upper - 5000) / 2)
+    outside = await optimizer.what_if(result, WhatIfQuery(budget=50000))
+    assert outside["solver_warm_start"] != "sensitivity"
+    assert outside["objective_change"] < inside["objective_change"]
+    assert outside["inventory_changes"]
+
+    with pytest.raises(KeyError):
+        await optimizer.what_if("unknown", WhatIfQuery(budget=1))
+
+
+@pytest.mark.asyncio
+async def test_sensitivity_of_presolved_plan_matches_direct_solve():
+    """With presolve on by default, shadow prices, ranges and what-if answers match an unpresolved plan."""
+    optimizer = MLXOptimizer()
+    rng = np.random.default_rng(1)
+    inventory = {
+        f"profiled_{i}": {
+            "quantity": float(rng.integers(5, 60)),
+            "unit_cost": float(rng.integers(1, 4)),
+            "shortage_cost": float(rng.integers(2, 9)),
+        }
+        for i in range(60)
+    }
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        constraints={"budget": 2500, "capacity_limit": 470},
+        objectives=["minimize_cost"],
+        time_horizon=7,
+        solver_options={"allocation": "lp"},
+    )
+    presolved = await optimizer.optimize_supply_chain(request)
+    direct_request = request.model_copy(update={"solver_options": {"allocation": "lp", "presolve": False}})
+    direct = await optimizer.optimize_supply_chain(direct_request)
+
+    assert presolved.optimized_plan["performance_metrics"]["presolve_ratio"] > 1
+    section = presolved.optimized_plan["sensitivity_analysis"]
+    expected = direct.optimized_plan["sensitivity_analysis"]
+    assert section["objective_value"] == pytest.approx(expected["objective_value"])
+    for name, limit in expected["limits"].items():
+        assert section["limits"][name]["shadow_price"] == pytest.approx(limit["shadow_price"])
+        assert section["limits"][name]["valid_range"] == pytest.approx(limit["valid_range"])
+
+    lower, upper = section["limits"]["capacity"]["valid_range"]
+    query = WhatIfQuery(capacity_limit=(lower + 470) / 2)
+    inside = await optimizer.what_if(presolved, query)
+    assert inside["solver_warm_start"] == "sensitivity"
+    assert inside["objective_value"] == pytest.approx((await optimizer.what_if(direct, query))["objective_value"])
+
+
+
+@pytest.mark.asyncio
+async def test_similar_requests_warm_start_from_solution_pool():
+    """A request close to one solved before starts from its solution and reaches the same plan."""
+    optimizer = MLXOptimizer()
+    inventory = {f"pooled_{i}": {"quantity": 20.0 + i % 30, "unit_cost": 1.0 + (i % 9) * 0.4} for i in range(500)}
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory},
+        constraints={"budget": 8000, "capacity_limit": 5000},
+        objectives=["minimize_cost"],
+        time_horizon=30,
+        solver_options={"allocation": "lp"},
+    )
+    first = (await optimizer.optimize_supply_chain(request)).optimized_plan["performance_metrics"]
+    assert first["solution_pool"] == "miss"
+
+    nudged = {**inventory, "pooled_7": {"quantity": 45.0, "unit_cost": 1.2}}
+    similar = request.model_copy(update={"supply_chain_data": {"inventory": nudged}})
+    plan = (await optimizer.optimize_supply_chain(similar)).optimized_plan
+    metrics = plan["performance_metrics"]
+    assert metrics["solution_pool"] == "hit"
+    assert 0.0 < metrics["solution_pool_distance"] < 0.25
+    assert metrics["solver_warm_start"] == "working_set"
+
+    unpooled = similar.model_copy(update={"solver_options": {"allocation": "lp", "solution_pool": False}})
+    cold = (await optimizer.optimize_supply_chain(unpooled)).optimized_plan
+    assert "solution_pool" not in cold["performance_metrics"]
+    assert plan["cost_analysis"]["total_inventory_cost"] == pytest.approx(
+        cold["cost_analysis"]["total_inventory_cost"], rel=1e-9
+    )
+
+
+@pytest.mark.asyncio
+async def test_optimizer_plans_lot_sizes_under_location_capacity():
+    """Lot sizing orders less often than daily and keeps receipts within the locations' capacity."""
+    optimizer = MLXOptimizer()
+    request = OptimizationRequest(
+        supply_chain_data={
+            "inventory": {f"item_{i}": {"quantity": 20 + i, "demand_factor": 4.0} for i in range(12)},
+            "demand_history": [90, 100, 110, 95, 105, 120],
+            "locations": [{"id": "dock_a", "capacity": 12}, {"id": "dock_b", "capacity": 8}],
+        },
+        objectives=["minimize_cost"],
+        time_horizon=60,
+        constraints={"lead_time_days": 2, "setup_cost": 10.0},
+        solver_options={"lot_sizing": True},
+    )
+    section = (await optimizer.optimize_supply_chain(request)).optimized_plan["lot_sizing"]
+    assert section["horizon_days"] == 60
+    assert section["lead_time_days"] == 2
+    assert section["daily_capacity"] == [20.0] * 60
+    assert max(section["daily_receipts"]) <= 20.0 + 1e-6
+    assert 0 < section["orders_placed"] < 12 * 58
+    assert section["lower_bound"] <= section["total_cost"] + 1e-6
+    assert section["items"]
+
+    # A critical request gives the solve at most its deadline, and none once it has passed
+    critical = request.model_copy(update={"priority_level": "critical"})
+    with patch(
+        "open_logistics.infrastructure.mlx_integration.mlx_optimizer.solve_lot_sizing", wraps=solve_lot_sizing
+    ) as solve:
+        await optimizer.optimize_supply_chain(critical)
+        assert 0 < solve.call_args.kwargs["time_limit_s"] <= optimizer.settings.optimization.DEADLINE_CRITICAL_SECONDS
+
+        solve.reset_mock()
+        state = optimizer._solve_cpu(critical, deadline=time.perf_counter())
+        assert "lot_sizing" not in state.plan
+        solve.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_optimizer_consolidates_shipment_lines_onto_vehicles():
+    """Shipment lines are packed by weight and volume; without lines, the planned additions are shipped."""
+    optimizer = MLXOptimizer()
+    inventory = {f"item_{i}": {"quantity": 10 + i, "weight": 40.0 + i, "volume": 0.2} for i in range(20)}
+    shipments = [{"id": f"order_{i}", "sku": f"item_{i % 20}", "quantity": 5 + i % 7} for i in range(120)]
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": inventory, "shipments": shipments},
+        objectives=["minimize_cost"],
+        time_horizon=30,
+        constraints={"vehicle_weight_capacity": 2000.0, "vehicle_volume_capacity": 10.0},
+        solver_options={"consolidation": True, "consolidation_time_limit": 1.0},
+    )
+    section = (await optimizer.optimize_supply_chain(request)).optimized_plan["load_consolidation"]
+    assert section["lines"] == 120
+    assert section["vehicle_capacity"] == {"weight": 2000.0, "volume": 10.0}
+    assert section["lower_bound"] <= section["vehicles"] <= section["first_fit_vehicles"]
+    assert 0.0 < section["fill_rate"] <= 1.0
+    assert all(load["weight"] <= 2000.0 + 1e-6 for load in section["loads"].values())
+    assert all(line.startswith("order_") for line in section["loads"]["vehicle_1"]["lines"])
+
+    # Past the deadline the first-fit-decreasing loads are kept without refinement
+    section = optimizer._solve_cpu(request, deadline=time.perf_counter()).plan["load_consolidation"]
+    assert section["backend"] == "first_fit_decreasing"
+    assert section["neighborhoods"] == 0
+    assert section["vehicles"] == section["first_fit_vehicles"]
+
+    planned = request.model_copy(update={"supply_chain_data": {"inventory": inventory}})
+    section = (await optimizer.optimize_supply_chain(planned)).optimized_plan["load_consolidation"]
+    assert section["lines"] > 0
+    assert all(line.startswith("item_") for line in section["loads"]["vehicle_1"]["lines"])
@@ -0,0 +1,119 @@
+"""
+Unit tests for offline model training.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.mlx_integration.checkpoint import Checkpoint
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    SimpleSupplyChainModel,
+)
+from open_logistics.infrastructure.mlx_integration.training import (
+    append_record,
+    iter_minibatches,
+    iter_samples,
+    loss_and_gradients,
+    train_model,
+)
+
+
+@pytest.fixture
+def history(tmp_path):
+    """Two files of past optimizations scored by their mean stock level."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for part in range(2):
+        path = str(tmp_path / f"history{part}.jsonl")
+        for _ in range(300):
+            quantities = rng.uniform(0.0, 10.0, rng.integers(3, 12))
+            request = {
+                "supply_chain_data": {
+                    "inventory": {f"SKU{i}": float(q) for i, q in enumerate(quantities)}
+                }
+            }
+            append_record(
+                path,
+                request,
+                {"confidence_score": 0.8},
+                score=float(quantities[:10].mean() / 10.0),
+            )
+        paths.append(path)
+    return paths
+
+
+def test_minibatches_stream_every_sample_once(history):
+    """Batches cover the files exactly, whatever the shuffle buffer size."""
+    samples = list(iter_samples(history, output_size=5))
+    assert len(samples) == 600
+    assert samples[0][0].shape == (10,) and samples[0][1].shape == (5,)
+
+    batches = list(
+        iter_minibatches(
+            iter_samples(history, 5),
+            64,
+            shuffle_buffer=100,
+            rng=np.random.default_rng(1),
+        )
+    )
+    assert sum(len(x) for x, _ in batches) == 600
+    assert all(len(x) == 64 for x, _ in batches[:-1])
+    streamed = np.sort(np.concatenate([x for x, _ in batches]).sum(axis=1))
+    np.testing.assert_allclose(
+        streamed, np.sort([features.sum() for features, _ in samples]), rtol=1e-6
+    )
+
+
+def test_gradients_match_finite_differences():
+    """Backpropagation agrees with a numerical derivative of the loss."""
+    rng = np.random.default_rng(2)
+    layers = [
+        (rng.normal(size=(4, 6)), rng.normal(size=6)),
+        (rng.normal(size=(6, 3)), rng.normal(size=3)),
+    ]
+    x, y = rng.normal(size=(8, 4)), rng.random((8, 3))
+    loss, grads = loss_and_gradients(layers, x, y)
+
+    layers[0][0][2, 1] += 1e-6
+    shifted, _ = loss_and_gradients(layers, x, y)
+    assert (shifted - loss) / 1e-6 == pytest.approx(grads[0][2, 1], rel=1e-4)
+    assert [grad.shape for grad in grads] == [(4, 6), (6,), (6, 3), (3,)]
+
+
+def test_training_lowers_loss_and_checkpoints(history, tmp_path):
+    """Training improves the fit and leaves a loadable checkpoint."""
+    model = SimpleSupplyChainModel(10, 5)
+    path = str(tmp_path / "model.olck")
+    report = train_model(
+        model,
+        history,
+        epochs=4,
+        batch_size=32,
+        learning_rate=3e-3,
+        checkpoint_path=path,
+        checkpoint_every=20,
+    )
+
+    assert report.samples == 2400
+    assert report.epoch_losses[-1] < report.epoch_losses[0]
+    assert report.samples_per_second > 0
+    assert report.checkpoints == report.steps // 20 + 1
+    assert Checkpoint(path).metadata["steps"] == report.steps
+
+    served = SimpleSupplyChainModel(10, 5, weights_path=path)
+    features = np.random.default_rng(3).uniform(0.0, 10.0, (4, 10)).astype(np.float32)
+    np.testing.assert_allclose(served(features), model(features), rtol=1e-5)
+
+
+def test_malformed_records_are_reported(tmp_path):
+    """A line without a target names its file and line."""
+    path = tmp_path / "bad.jsonl"
+    path.write_text(
+        json.dumps({"request": {"supply_chain_data": {}}, "result": {}}) + "\n"
+    )
+    with pytest.raises(ValueError, match="bad.jsonl:1"):
+        train_model(SimpleSupplyChainModel(10, 5), [str(path)])
+    with pytest.raises(ValueError, match="No training records"):
+        train_model(SimpleSupplyChainModel(10, 5), [])
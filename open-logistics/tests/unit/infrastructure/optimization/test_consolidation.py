@@ -0,0 +1,80 @@
+"""
+Unit tests for shipment load consolidation.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.consolidation import (
+    CP_SAT_BACKEND,
+    DEFAULT_UNIT_WEIGHT_KG,
+    FIRST_FIT_BACKEND,
+    PackingProblem,
+    consolidate_loads,
+    first_fit_decreasing,
+)
+
+
+def make_problem(lines, seed=0):
+    rng = np.random.default_rng(seed)
+    return PackingProblem.from_lines(
+        [f"line_{i}" for i in range(lines)],
+        rng.uniform(0.05, 0.5, lines) * 1000.0,
+        rng.uniform(0.05, 0.5, lines) * 10.0,
+        weight_capacity=1000.0,
+        volume_capacity=10.0,
+    )
+
+
+def assert_fits(plan):
+    assert np.all(plan.weight_fill <= 1.0 + 1e-9)
+    assert np.all(plan.volume_fill <= 1.0 + 1e-9)
+    assert np.array_equal(np.unique(plan.vehicle), np.arange(plan.vehicles))
+
+
+def test_lines_split_into_pieces_that_fit():
+    """Lines larger than a vehicle become equal pieces; dimensions come per unit from the inventory."""
+    inventory = {"pallet": {"quantity": 5, "weight": 400.0, "volume": 1.0}, "box": 10}
+    problem = PackingProblem.from_shipments(inventory, ["pallet", "box"], np.array([6.0, 20.0]), 1000.0, 10.0)
+
+    assert problem.line_ids == ["pallet", "box"]
+    np.testing.assert_array_equal(problem.line, [0, 0, 0, 1])
+    np.testing.assert_allclose(problem.weight, [0.8, 0.8, 0.8, 20 * DEFAULT_UNIT_WEIGHT_KG / 1000.0])
+    np.testing.assert_allclose(problem.volume[:3], [0.2, 0.2, 0.2])
+    assert problem.lower_bound() == 3
+
+    with pytest.raises(ValueError):
+        PackingProblem.from_lines(["a"], np.ones(1), np.ones(1), 0.0, 1.0)
+
+
+def test_first_fit_decreasing_respects_both_capacities():
+    """Every vehicle stays within weight and volume, and the count is between the bound and twice it."""
+    problem = make_problem(300)
+    plan = first_fit_decreasing(problem)
+    assert plan.backend == FIRST_FIT_BACKEND
+    assert plan.first_fit_vehicles == plan.vehicles
+    assert_fits(plan)
+    assert problem.lower_bound() <= plan.vehicles <= 2 * problem.lower_bound()
+
+
+def test_refinement_removes_vehicles_and_renders_section():
+    """CP-SAT neighborhoods reach the bound first-fit misses, and the section reports the fill rates."""
+    problem = make_problem(60)
+    first_fit = first_fit_decreasing(problem)
+    plan = consolidate_loads(problem, time_limit_s=5.0)
+    assert first_fit.vehicles > problem.lower_bound()
+    assert plan.backend == CP_SAT_BACKEND
+    assert plan.vehicles == problem.lower_bound()
+    assert plan.status == "OPTIMAL"
+    assert_fits(plan)
+
+    section = plan.to_section(top=3)
+    assert section["vehicles"] == plan.vehicles
+    assert section["first_fit_vehicles"] == first_fit.vehicles
+    assert section["fill_rate"] == pytest.approx(np.maximum(plan.weight_fill, plan.volume_fill).mean())
+    assert section["min_fill_rate"] <= section["fill_rate"] <= 1.0
+    assert list(section["loads"]) == ["vehicle_1", "vehicle_2", "vehicle_3"]
+    load = section["loads"]["vehicle_1"]
+    assert load["weight"] == pytest.approx(
+        problem.weight[plan.vehicle == 0].sum() * problem.weight_capacity
+    )
+    assert len(load["lines"]) == int((plan.vehicle == 0).sum())
@@ -0,0 +1,85 @@
+"""
+Unit tests for network decomposition.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.decomposition import (
+    network_components,
+    solve_decomposed_network,
+)
+from open_logistics.infrastructure.optimization.executor import OptimizationExecutor
+from open_logistics.infrastructure.optimization.network import (
+    LocationNetwork,
+    solve_network_flow,
+)
+from open_logistics.infrastructure.optimization.spatial import get_location_index
+
+
+def _region(name, lat, lon, sites, rng):
+    """A supplier, a depot and some sites around one point."""
+    def jitter():
+        return {"lat": lat + float(rng.uniform(0.0, 0.5)), "lon": lon + float(rng.uniform(0.0, 0.5))}
+
+    return (
+        [{"id": f"{name}_plant", "type": "supplier", "supply": 30 * sites, **jitter()},
+         {"id": f"{name}_dc", "type": "depot", "capacity": 25 * sites, **jitter()}]
+        + [{"id": f"{name}_site_{i}", "demand": 30, **jitter()} for i in range(sites)]
+    )
+
+
+@pytest.fixture
+def locations():
+    """Three regions far apart, with explicit lanes inside each region only."""
+    rng = np.random.default_rng(4)
+    return _region("north", 60.0, 10.0, 20, rng) + _region("south", 40.0, 15.0, 10, rng) + _region("east", 50.0, 30.0, 5, rng)
+
+
+def _regional_lanes(locations):
+    """Lanes from each plant to its depot and from the depot to its sites."""
+    lanes = []
+    for loc in locations:
+        region = loc["id"].split("_")[0]
+        if loc.get("type") == "depot":
+            lanes.append({"from": f"{region}_plant", "to": loc["id"]})
+        elif "type" not in loc:
+            lanes.append({"from": f"{region}_dc", "to": loc["id"]})
+    return lanes
+
+
+def test_components_follow_the_lanes(locations):
+    """Each region is a component, largest first, holding only its own nodes."""
+    network = LocationNetwork.from_locations(locations, _regional_lanes(locations))
+    components = network_components(network)
+
+    assert [len(component.nodes) for component in components] == [22, 12, 7]
+    assert sum(len(component.lanes) for component in components) == network.lane_count
+    assert all(node_id.startswith("north") for node_id in components[0].network.node_ids)
+
+
+def test_decomposed_flow_matches_full_solve(locations):
+    """Solving regions separately gives the same flows and cost as one solve."""
+    network = LocationNetwork.from_locations(locations, _regional_lanes(locations))
+    direct = solve_network_flow(network)
+    plan, stats = solve_decomposed_network(network, OptimizationExecutor(mode="inline"))
+
+    assert stats.components == 3
+    assert stats.largest_component == 22 + 21
+    assert plan.status == "OPTIMAL"
+    assert plan.total_cost == pytest.approx(direct.total_cost)
+    np.testing.assert_array_equal(plan.flow, direct.flow)
+    np.testing.assert_array_equal(plan.unmet_demand, direct.unmet_demand)
+
+
+def test_geographic_clusters_split_connected_networks(locations):
+    """Cutting lanes between clusters splits an all-pairs network into regions."""
+    network = LocationNetwork.from_locations(locations)
+    assert len(network_components(network)) == 1
+
+    clusters = get_location_index(locations).clusters(300.0)
+    assert len(np.unique(clusters)) == 3
+    components = network_components(network, clusters)
+    assert len(components) == 3
+    plan, _ = solve_decomposed_network(network, OptimizationExecutor(mode="inline"), clusters)
+    assert plan.status == "OPTIMAL"
+    assert network.demand.sum() - plan.unmet_demand.sum() == pytest.approx(25 * 35)
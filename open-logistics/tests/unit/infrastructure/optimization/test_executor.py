@@ -0,0 +1,96 @@
+"""
+Unit tests for the optimization executor.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from open_logistics.infrastructure.mlx_integration.mlx_optimizer import (
+    OptimizationRequest,
+    solve_cpu_optimization,
+)
+from open_logistics.infrastructure.optimization.executor import OptimizationExecutor
+
+
+def test_choose_by_problem_size():
+    """Auto mode sends large problems to the process pool."""
+    executor = OptimizationExecutor(mode="auto", process_min_size=1000)
+    assert executor.choose(10) == "thread"
+    assert executor.choose(1000) == "process"
+    assert OptimizationExecutor(mode="inline").choose(10**6) == "inline"
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_keeps_event_loop_responsive():
+    """Blocking work on the thread pool does not stall other coroutines."""
+    executor = OptimizationExecutor(thread_workers=1)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    try:
+        result, _ = await asyncio.gather(
+            executor.run("thread", lambda: time.sleep(0.2) or "done"),
+            ticker(),
+        )
+    finally:
+        executor.shutdown()
+    assert result == "done"
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_in_warm_worker():
+    """Jobs run in pre-started worker processes."""
+    executor = OptimizationExecutor(process_workers=1)
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10, "item_2": 20}},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    try:
+        executor.warm_up()
+        state = await executor.run("process", solve_cpu_optimization, request)
+        worker_pid = await executor.run("process", os.getpid)
+    finally:
+        executor.shutdown()
+    assert set(state.plan["inventory_optimization"]) == {"item_1", "item_2"}
+    assert state.is_incremental
+    assert worker_pid != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_keeps_deadline():
+    """A worker given no time left falls back to the greedy allocation."""
+    executor = OptimizationExecutor(process_workers=1)
+    request = OptimizationRequest(
+        supply_chain_data={"inventory": {"item_1": 10, "item_2": 20}},
+        constraints={"budget": 15},
+        objectives=["minimize_cost"],
+        time_horizon=7
+    )
+    try:
+        state = await executor.run("process", solve_cpu_optimization, request, 0.0)
+    finally:
+        executor.shutdown()
+    assert state.plan["performance_metrics"]["solver_backend"] == "greedy"
+
+
+def test_map_processes_keeps_order():
+    """Items mapped on the pool come back in order; one worker stays in-process."""
+    executor = OptimizationExecutor(process_workers=2)
+    try:
+        assert executor.map_processes(abs, [-3, 1, -2]) == [3, 1, 2]
+        assert executor._process_pool is not None
+    finally:
+        executor.shutdown()
+
+    serial = OptimizationExecutor(process_workers=1)
+    assert serial.map_processes(abs, [-1, -2]) == [1, 2]
+    assert serial._process_pool is None
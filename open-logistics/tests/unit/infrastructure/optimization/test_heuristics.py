@@ -0,0 +1,71 @@
+"""
+Unit tests for the greedy allocation heuristic.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.heuristics import (
+    _fill,
+    greedy_allocation,
+    improve_allocation,
+)
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+
+@pytest.fixture
+def problem():
+    """Allocation problem with random costs, bound by budget and capacity."""
+    rng = np.random.default_rng(7)
+    columns = InventoryColumns.from_inventory({f"item_{i}": 100.0 for i in range(300)})
+    columns.unit_cost = rng.uniform(0.5, 3.0, 300)
+    columns.shortage_cost = columns.unit_cost * rng.uniform(0.8, 2.5, 300)
+    return AllocationProblem.from_columns(columns, columns.quantity, {"budget": 20000.0, "capacity_limit": 15000.0})
+
+
+def test_greedy_is_feasible_and_bounds_the_optimum(problem):
+    """The greedy plan is feasible and its bound brackets the LP optimum."""
+    greedy = greedy_allocation(problem)
+    optimum = solve_allocation(problem)
+    assert greedy.backend == "greedy"
+    assert greedy.has_solution
+    assert problem.unit_cost @ greedy.levels <= 20000.0 + 1e-6
+    assert greedy.levels.sum() <= 15000.0 + 1e-6
+    assert np.all((greedy.levels >= 0) & (greedy.levels <= problem.target + 1e-9))
+    assert greedy.best_bound <= optimum.objective_value + 1e-6 <= greedy.objective_value + 2e-6
+    assert 0.0 <= greedy.gap < 0.05
+
+
+def test_greedy_is_exact_with_a_single_row(problem):
+    """With one coupling row the greedy solves the LP exactly."""
+    problem.capacity = None
+    greedy = greedy_allocation(problem)
+    assert greedy.status == "OPTIMAL"
+    assert greedy.objective_value == pytest.approx(solve_allocation(problem).objective_value)
+
+
+def test_greedy_integral_and_infeasible(problem):
+    """Integral allocations stock whole units; broken lower bounds are reported."""
+    greedy = greedy_allocation(problem, integral=True)
+    np.testing.assert_allclose(greedy.levels, np.round(greedy.levels))
+
+    problem.lower = problem.target.copy()
+    assert greedy_allocation(problem).status == "INFEASIBLE"
+
+
+def test_exchange_pass_closes_the_gap(problem):
+    """One exchange pass along the binding row lifts a both-row fill to the LP optimum."""
+    saving = problem.shortage_cost - problem.unit_cost
+    priority = saving / (problem.unit_cost / problem.budget + 1.0 / problem.capacity)
+    filled = _fill(problem, priority, problem.budget, problem.capacity, False)
+    improved = improve_allocation(problem, filled)
+
+    optimum = solve_allocation(problem).objective_value
+    assert problem.objective(filled) > optimum * (1 + 1e-3)
+    assert problem.objective(improved) == pytest.approx(optimum, rel=1e-9)
+    assert problem.unit_cost @ improved <= problem.budget + 1e-6
+    assert improved.sum() <= problem.capacity + 1e-6
+    assert greedy_allocation(problem).status == "OPTIMAL"
@@ -0,0 +1,91 @@
+"""
+Unit tests for multi-period replenishment planning.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization import horizon
+from open_logistics.infrastructure.optimization.horizon import (
+    ReplenishmentProblem,
+    solve_replenishment,
+    solve_rolling_horizon,
+)
+
+
+@pytest.fixture
+def problem():
+    """Thirty SKUs over sixty days of seasonal demand, three days of lead time and a shared store."""
+    rng = np.random.default_rng(0)
+    season = 1.0 + 0.5 * np.sin(np.arange(60) / 6.0)
+    return ReplenishmentProblem(
+        demand=rng.uniform(0.0, 10.0, (30, 60)) * season,
+        initial_stock=rng.uniform(0.0, 30.0, 30),
+        unit_cost=rng.uniform(1.0, 5.0, 30),
+        shortage_cost=rng.uniform(5.0, 15.0, 30),
+        holding_cost=rng.uniform(0.01, 0.05, 30),
+        lead_time=3,
+        capacity=150.0,
+        pipeline=np.full((30, 3), 2.0),
+    )
+
+
+def test_monolithic_plan_balances_stock(problem):
+    """Replaying the solved orders reproduces the solved stock, and orders never overfill the store."""
+    plan = solve_replenishment(problem)
+    assert plan.status == "OPTIMAL"
+    assert plan.windows == 1
+
+    replay = problem.simulate(plan.orders)
+    np.testing.assert_allclose(replay.stock, plan.stock, atol=1e-6)
+    np.testing.assert_allclose(replay.lost, plan.lost, atol=1e-6)
+    # The opening stock overfills the store until demand draws it down
+    floor = problem.simulate(np.zeros_like(plan.orders)).stock.sum(axis=0)
+    assert floor[0] > problem.capacity
+    assert np.all(plan.stock.sum(axis=0) <= np.maximum(floor, problem.capacity) + 1e-6)
+    assert np.all(plan.orders[:, -problem.lead_time:] < 1e-9)
+
+
+def test_rolling_horizon_matches_monolithic(problem):
+    """Windows overlapping by more than the lead time recover the monolithic cost with small models."""
+    monolithic = solve_replenishment(problem)
+    rolling = solve_rolling_horizon(problem, window_days=14, overlap_days=7)
+
+    assert rolling.status == "OPTIMAL"
+    assert rolling.windows == 8
+    assert rolling.largest_model == 3 * 30 * 14
+    assert rolling.orders.shape == (30, 60)
+    assert rolling.total_cost == pytest.approx(monolithic.total_cost, rel=0.01)
+    floor = problem.simulate(np.zeros_like(rolling.orders)).stock.sum(axis=0)
+    assert np.all(rolling.stock.sum(axis=0) <= np.maximum(floor, problem.capacity) + 1e-6)
+
+
+def test_rolling_horizon_spends_budget_once(problem):
+    """The budget is shared across windows, and the window must outlast its overlap."""
+    problem.budget = 500.0
+    plan = solve_rolling_horizon(problem)
+    assert problem.unit_cost @ plan.orders.sum(axis=1) <= 500.0 + 1e-6
+    assert 0.0 < plan.fill_rate.mean() < 1.0
+
+    with pytest.raises(ValueError):
+        solve_rolling_horizon(problem, window_days=7, overlap_days=7)
+
+
+def test_rolling_horizon_shares_the_total_time_limit(problem):
+    """Windows split the time left between them and days past the limit place no orders."""
+    with patch.object(horizon, "solve_replenishment", wraps=solve_replenishment) as solve:
+        plan = solve_rolling_horizon(problem, window_days=14, overlap_days=7, total_time_limit_s=80.0)
+    limits = [call.kwargs["time_limit_s"] for call in solve.call_args_list]
+    assert len(limits) == 8
+    assert limits[0] == pytest.approx(10.0, rel=0.01)
+    # Time a window leaves unused passes on to the ones after it
+    assert limits == sorted(limits) and limits[-1] <= 80.0
+    assert plan.status == "OPTIMAL"
+    assert plan.planned_days == 60
+
+    expired = solve_rolling_horizon(problem, total_time_limit_s=0.0)
+    assert expired.status == "FEASIBLE"
+    assert expired.windows == 0
+    assert not expired.orders.any()
+    assert expired.to_section([f"sku_{i}" for i in range(30)])["planned_days"] == 0
@@ -0,0 +1,115 @@
+"""
+Unit tests for incremental re-optimization state.
+"""
+
+import numpy as np
+
+from open_logistics.infrastructure.optimization.incremental import (
+    PlanState,
+    PlanStore,
+    align_rows,
+    merge_inventory,
+    merge_locations,
+    update_columns,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+
+def test_update_columns_matches_rebuild():
+    """Updating and appending rows gives the columns of the merged inventory."""
+    inventory = {"a": 10, "b": {"quantity": 20, "unit_cost": 3.0}, "c": 30}
+    changes = {
+        "b": {"quantity": 25},
+        "c": 35,
+        "d": 40,
+        "e": {"quantity": 5, "demand_factor": 2.0},
+    }
+    columns = InventoryColumns.from_inventory(inventory)
+    state = PlanState(request=None, plan={}, columns=columns)
+
+    updated, row_index, changed, removed = update_columns(
+        columns, state.row_index(), changes, [], inventory
+    )
+    expected = InventoryColumns.from_inventory(merge_inventory(inventory, changes, []))
+
+    assert updated.skus == expected.skus
+    for name in ("quantity", "demand_factor", "unit_cost", "shortage_cost"):
+        np.testing.assert_allclose(getattr(updated, name), getattr(expected, name))
+    assert changed.tolist() == [1, 2, 3, 4]
+    assert row_index["e"] == 4
+    assert len(removed) == 0
+    assert columns.quantity.tolist() == [10, 20, 30]
+
+
+def test_update_columns_removes_rows():
+    """Removed SKUs disappear and later rows shift and take their new defaults."""
+    inventory = {
+        "a": 10,
+        "b": 20,
+        "c": {"quantity": 30, "demand_factor": 1.5, "unit_cost": 2.0},
+        "d": 40,
+    }
+    columns = InventoryColumns.from_inventory(inventory)
+    state = PlanState(request=None, plan={}, columns=columns)
+    updated, row_index, changed, removed = update_columns(
+        columns, state.row_index(), {"c": 31}, ["a"], inventory
+    )
+    expected = InventoryColumns.from_inventory(
+        merge_inventory(inventory, {"c": 31}, ["a"])
+    )
+
+    assert updated.skus == expected.skus == ["b", "c", "d"]
+    for name in ("quantity", "demand_factor", "unit_cost", "shortage_cost"):
+        np.testing.assert_allclose(getattr(updated, name), getattr(expected, name))
+    assert row_index == {"b": 0, "c": 1, "d": 2}
+    assert changed.tolist() == [0, 1, 2]
+    np.testing.assert_allclose(
+        align_rows(np.array([1.0, 2.0, 3.0]), removed, 3), [2.0, 3.0, 0.0]
+    )
+
+    # Rows keeping their explicit attributes are not marked as changed
+    _, _, changed, _ = update_columns(columns, state.row_index(), {}, ["a"], inventory)
+    assert changed.tolist() == [0, 2]
+
+
+def test_update_columns_keeps_explicit_shortage_cost():
+    """A new unit cost leaves a SKU's explicit shortage cost alone, as merging does."""
+    inventory = {
+        "a": {"quantity": 10, "unit_cost": 2.0, "shortage_cost": 5.0},
+        "b": {"quantity": 20, "unit_cost": 2.0},
+    }
+    changes = {"a": {"unit_cost": 3.0}, "b": {"unit_cost": 3.0}}
+    columns = InventoryColumns.from_inventory(inventory)
+    state = PlanState(request=None, plan={}, columns=columns)
+
+    updated, _, _, _ = update_columns(
+        columns, state.row_index(), changes, [], inventory
+    )
+    expected = InventoryColumns.from_inventory(merge_inventory(inventory, changes, []))
+
+    np.testing.assert_allclose(updated.unit_cost, expected.unit_cost)
+    np.testing.assert_allclose(updated.shortage_cost, expected.shortage_cost)
+    assert updated.shortage_cost.tolist() == [5.0, 6.0]
+
+
+def test_merge_locations_by_id():
+    """Locations are updated in place, appended or dropped by id."""
+    locations = [{"id": "x", "distance": 10}, {"id": "y", "distance": 20}]
+    merged = merge_locations(
+        locations, [{"id": "y", "demand": 5}, {"id": "z", "distance": 30}], ["x"]
+    )
+    assert merged == [
+        {"id": "y", "distance": 20, "demand": 5},
+        {"id": "z", "distance": 30},
+    ]
+
+
+def test_plan_store_evicts_least_recent():
+    """The store keeps its most recently used plans."""
+    store = PlanStore(max_entries=2)
+    first = store.put(PlanState(request=None, plan={"n": 1}))
+    second = store.put(PlanState(request=None, plan={"n": 2}))
+    store.get(first)
+    store.put(PlanState(request=None, plan={"n": 3}))
+    assert store.get(second) is None
+    assert store.get(first).plan == {"n": 1}
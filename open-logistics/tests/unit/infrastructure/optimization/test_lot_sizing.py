@@ -0,0 +1,93 @@
+"""
+Unit tests for capacitated lot sizing.
+"""
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.lot_sizing import (
+    LAGRANGIAN_BACKEND,
+    LotSizingProblem,
+    _solve_mip,
+    solve_lagrangian,
+    solve_lot_sizing,
+    wagner_whitin,
+)
+from open_logistics.infrastructure.optimization.scenarios import DemandModel
+
+
+def make_problem(skus, horizon, seed=0, capacity=None):
+    rng = np.random.default_rng(seed)
+    unit_cost = rng.uniform(1.0, 5.0, skus)
+    return LotSizingProblem(
+        demand=rng.uniform(0.0, 10.0, (skus, horizon)),
+        initial_stock=rng.uniform(0.0, 15.0, skus),
+        unit_cost=unit_cost,
+        shortage_cost=unit_cost * rng.uniform(1.5, 3.0, skus),
+        holding_cost=unit_cost * 0.02,
+        setup_cost=unit_cost * rng.uniform(5.0, 20.0, skus),
+        lead_time=2,
+        capacity=None if capacity is None else np.full(horizon, capacity),
+    )
+
+
+@pytest.fixture
+def problem():
+    """Six SKUs over twenty days, two days of lead time and no capacity."""
+    return make_problem(6, 20)
+
+
+def test_wagner_whitin_matches_the_mip(problem):
+    """Every SKU's dynamic program reaches the exact MIP optimum, and its plan replays to its cost."""
+    plan = wagner_whitin(problem)
+    assert plan.status == "OPTIMAL"
+    assert plan.total_cost == pytest.approx(plan.lower_bound, rel=1e-9)
+    assert not plan.receipts[:, : problem.lead_time].any()
+
+    exact = _solve_mip(problem, plan, time_limit_s=20.0)
+    assert exact.total_cost == pytest.approx(plan.total_cost, rel=1e-6)
+    assert exact.lower_bound == pytest.approx(plan.total_cost, rel=1e-6)
+
+
+def test_capacitated_plan_respects_capacity_and_bound():
+    """The Lagrangian plan fits every day's capacity and costs at least its bound; the MIP closes the gap."""
+    problem = make_problem(5, 12, seed=1, capacity=18.0)
+    assert wagner_whitin(problem).receipts.sum(axis=0).max() > 18.0
+
+    heuristic = solve_lagrangian(problem)
+    assert heuristic.backend == LAGRANGIAN_BACKEND
+    assert np.all(heuristic.receipts.sum(axis=0) <= 18.0 + 1e-6)
+    assert heuristic.lower_bound <= heuristic.total_cost
+    assert heuristic.lower_bound >= wagner_whitin(replace(problem, capacity=None)).total_cost - 1e-6
+
+    plan = solve_lot_sizing(problem, time_limit_s=5.0)
+    assert plan.status == "OPTIMAL"
+    assert np.all(plan.receipts.sum(axis=0) <= 18.0 + 1e-6)
+    assert plan.lower_bound == pytest.approx(plan.total_cost, rel=1e-6)
+    assert plan.total_cost <= heuristic.total_cost + 1e-6
+
+
+def test_problem_from_model_and_section():
+    """Setup costs and the daily capacity come from the request; the section lists orders by order day."""
+    model = DemandModel.from_history(np.array([60.0, 120.0]), [], 30, lead_time_mean=3.0)
+    locations = [{"id": "a", "capacity": 4.0}, {"id": "b", "capacity": 2.0}, {"id": "c"}]
+    problem = LotSizingProblem.from_model(
+        model, np.zeros(2), np.array([1.0, 2.0]), np.array([4.0, 8.0]), {"setup_cost": 5.0}, locations
+    )
+    assert problem.lead_time == 3
+    np.testing.assert_array_equal(problem.setup_cost, [5.0, 5.0])
+    np.testing.assert_array_equal(problem.capacity, np.full(30, 6.0))
+
+    plan = solve_lot_sizing(problem, time_limit_s=10.0)
+    section = plan.to_section(["small", "large"])
+    assert section["horizon_days"] == 30
+    assert section["orders_placed"] == int(plan.setups.sum())
+    assert max(section["daily_receipts"]) <= 6.0 + 1e-6
+    orders = section["items"]["large"]["orders"]
+    assert min(orders) >= 0 and max(orders) < 30 - problem.lead_time
+    assert sum(orders.values()) == pytest.approx(plan.receipts[1].sum())
+
+    uncapacitated = LotSizingProblem.from_model(model, np.zeros(2), np.ones(2), np.full(2, 4.0), {})
+    assert uncapacitated.capacity is None
+    np.testing.assert_array_equal(uncapacitated.setup_cost, np.ones(2))
@@ -0,0 +1,88 @@
+"""
+Unit tests for solver-backed inventory allocation.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    AllocationWarmStart,
+    resolve_time_limit,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+
+@pytest.fixture
+def columns():
+    """Columnar inventory with varied unit costs."""
+    return InventoryColumns.from_inventory({f"item_{i}": 100.0 + i for i in range(40)})
+
+
+def test_unconstrained_allocation_reaches_targets(columns):
+    """Without binding constraints every item is stocked at its target."""
+    problem = AllocationProblem.from_columns(columns, columns.quantity, {})
+    solution = solve_allocation(problem)
+    assert solution.status == "OPTIMAL"
+    np.testing.assert_allclose(solution.levels, columns.quantity)
+    assert solution.gap == pytest.approx(0.0)
+
+
+def test_lp_honors_budget_and_capacity(columns):
+    """Budget and capacity rows bound the allocation."""
+    problem = AllocationProblem.from_columns(
+        columns, columns.quantity, {"budget": 2000.0, "capacity_limit": 1800.0}
+    )
+    solution = solve_allocation(problem)
+    assert solution.has_solution
+    assert problem.unit_cost @ solution.levels <= 2000.0 + 1e-6
+    assert solution.levels.sum() <= 1800.0 + 1e-6
+    assert np.all(solution.levels >= -1e-9)
+    assert np.all(solution.levels <= columns.quantity + 1e-9)
+    assert solution.objective_value == pytest.approx(problem.objective(solution.levels))
+
+
+def test_mip_returns_whole_units(columns):
+    """The MIP backend stocks whole units within the budget."""
+    problem = AllocationProblem.from_columns(columns, columns.quantity + 0.5, {"budget": 1234.5})
+    solution = solve_allocation(problem, integral=True, time_limit_s=5.0)
+    assert solution.backend == "scip"
+    assert solution.has_solution
+    np.testing.assert_allclose(solution.levels, np.round(solution.levels))
+    assert problem.unit_cost @ solution.levels <= 1234.5 + 1e-6
+
+
+def test_resolve_time_limit():
+    """Solver time limits are clamped to the configured ceiling; the planning horizon is ignored."""
+    assert resolve_time_limit({"solver_time_limit_s": 5}, ceiling=30.0) == 5.0
+    assert resolve_time_limit({"solver_time_limit_s": 120}, ceiling=30.0) == 30.0
+    assert resolve_time_limit({"time_limit": 5}, ceiling=30.0) == 30.0
+    assert resolve_time_limit({}, ceiling=30.0) == 30.0
+
+
+def test_warm_start_working_set_matches_cold_solve():
+    """Re-solving a few changed items from the previous duals stays optimal."""
+    rng = np.random.default_rng(3)
+    size = 3000
+    problem = AllocationProblem(
+        target=rng.uniform(50, 150, size),
+        lower=np.zeros(size),
+        unit_cost=rng.uniform(0.5, 1.5, size),
+        shortage_cost=rng.uniform(1.0, 3.0, size),
+        budget=40.0 * size,
+        capacity=45.0 * size,
+    )
+    previous = solve_allocation(problem)
+
+    changed = rng.choice(size, 50, replace=False)
+    problem.target = problem.target.copy()
+    problem.target[changed] = rng.uniform(50, 150, len(changed))
+    warm = solve_allocation(
+        problem, warm_start=AllocationWarmStart(previous.levels, previous.duals, changed)
+    )
+    cold = solve_allocation(problem)
+
+    assert warm.warm_start == "working_set"
+    assert warm.objective_value == pytest.approx(cold.objective_value, rel=1e-7)
+    assert problem.unit_cost @ warm.levels <= problem.budget * (1 + 1e-9)
+    assert warm.levels.sum() <= problem.capacity * (1 + 1e-9)
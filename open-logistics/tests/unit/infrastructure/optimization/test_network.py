@@ -0,0 +1,75 @@
+"""
+Unit tests for multi-echelon network flow.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.network import (
+    LocationNetwork,
+    has_echelons,
+    solve_network_flow,
+)
+
+
+@pytest.fixture
+def locations():
+    """Two suppliers feeding three sites through two depots, on a radial layout."""
+    return [
+        {"id": "s1", "type": "supplier", "supply": 60, "distance": 0},
+        {"id": "s2", "type": "supplier", "supply": 60, "distance": 100},
+        {"id": "d1", "type": "depot", "capacity": 50, "distance": 10},
+        {"id": "d2", "type": "depot", "capacity": 100, "distance": 90},
+        {"id": "c1", "demand": 30, "distance": 20},
+        {"id": "c2", "demand": 30, "distance": 50},
+        {"id": "c3", "demand": 40, "distance": 80},
+    ]
+
+
+def test_network_is_built_in_csr_form(locations):
+    """Default lanes join consecutive echelons and are grouped by origin."""
+    network = LocationNetwork.from_locations(locations)
+    assert has_echelons(locations)
+    assert network.lane_count == 2 * 2 + 2 * 3
+    assert network.indptr.tolist() == [0, 2, 4, 7, 10, 10, 10, 10]
+    origins = network.lane_origins()
+    assert np.all(network.echelon[network.indices] == network.echelon[origins] + 1)
+    radial = np.array([loc["distance"] for loc in locations], dtype=float)
+    np.testing.assert_allclose(network.lane_distance, np.abs(radial[origins] - radial[network.indices]))
+
+
+def test_flow_meets_demand_within_capacities(locations):
+    """Flow is conserved, respects depot capacity and serves every site."""
+    network = LocationNetwork.from_locations(locations)
+    plan = solve_network_flow(network)
+    assert plan.status == "OPTIMAL"
+
+    origins = network.lane_origins()
+    inflow = np.bincount(network.indices, weights=plan.flow, minlength=len(network))
+    outflow = np.bincount(origins, weights=plan.flow, minlength=len(network))
+    depots = network.echelon == 1
+    np.testing.assert_allclose(inflow[depots], outflow[depots])
+    assert np.all(inflow[depots] <= network.node_capacity[depots])
+    np.testing.assert_allclose(inflow[network.demand > 0], network.demand[network.demand > 0])
+    assert plan.unmet_demand.sum() == 0
+
+    section = plan.to_section(network)
+    assert section["delivered"] == pytest.approx(100.0)
+    assert section["total_cost"] == pytest.approx(plan.flow @ network.lane_cost)
+    assert all(lane["flow"] > 0 for lane in section["lanes"].values())
+
+
+def test_explicit_lanes_and_unmet_demand(locations):
+    """Explicit lanes override costs, and missing supply is reported as unmet."""
+    lanes = [
+        {"from": "s1", "to": "d1", "cost": 1.0},
+        {"from": "d1", "to": "c1", "capacity": 20},
+        {"from": "d1", "to": "c2"},
+        {"from": "d1", "to": "unknown"},
+    ]
+    network = LocationNetwork.from_locations(locations, lanes)
+    assert network.lane_count == 3
+    plan = solve_network_flow(network)
+    section = plan.to_section(network)
+    assert section["lanes"]["d1->c1"]["flow"] == 20
+    assert section["delivered"] == pytest.approx(50.0)
+    assert section["unmet_demand"] == {"c1": 10.0, "c3": 40.0}
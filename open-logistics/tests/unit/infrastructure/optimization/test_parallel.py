@@ -0,0 +1,78 @@
+"""
+Unit tests for shared-memory parallel scenario evaluation.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.parallel import (
+    ScenarioPool,
+    SharedArrays,
+    attach,
+)
+from open_logistics.infrastructure.optimization.scenarios import (
+    DemandModel,
+    evaluate_plan,
+)
+
+
+@pytest.fixture
+def plan():
+    """A thirty-SKU plan and its demand model."""
+    expected = np.linspace(50.0, 300.0, 30)
+    model = DemandModel.from_history(expected, [100, 104, 98, 110, 107, 115], horizon=20)
+    return expected * 1.1, np.ones(30), np.full(30, 4.0), model
+
+
+def test_shared_arrays_round_trip():
+    """Attached views see the parent's data without copying it."""
+    data = np.arange(12, dtype=np.float32).reshape(3, 4)
+    with SharedArrays({"data": data}) as shared:
+        blocks, arrays = attach(shared.specs)
+        np.testing.assert_array_equal(arrays["data"], data)
+        assert arrays["data"].base is not None
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def test_pool_matches_serial_evaluation(plan):
+    """Shards on the pool reproduce the serial result for the same chunking."""
+    levels, unit_cost, shortage_cost, model = plan
+    pool = ScenarioPool(workers=2)
+    try:
+        report = pool.evaluate(levels, unit_cost, shortage_cost, model, scenarios=100, seed=9)
+    finally:
+        pool.shutdown()
+    per_shard = 50 * model.skus * model.horizon * 4
+    serial = evaluate_plan(levels, unit_cost, shortage_cost, model, scenarios=100, seed=9, chunk_bytes=per_shard)
+
+    assert [shard.scenarios for shard in report.shards] == [50, 50]
+    assert all(shard.time_ms > 0 for shard in report.shards)
+    np.testing.assert_allclose(report.cost, serial.cost)
+    np.testing.assert_array_equal(report.stockout_probability, serial.stockout_probability)
+    assert len(report.to_section([f"SKU{i}" for i in range(30)])["shards"]) == 2
+
+
+def test_pool_stops_at_the_time_limit(plan):
+    """A time-limited evaluation keeps the shards finished in time, at least one."""
+    levels, unit_cost, shortage_cost, model = plan
+    pool = ScenarioPool(workers=2)
+    try:
+        report = pool.evaluate(levels, unit_cost, shortage_cost, model, scenarios=1600, seed=9, time_limit_s=0.0)
+    finally:
+        pool.shutdown()
+
+    assert report.requested == 1600
+    assert 0 < report.scenarios < 1600
+    assert report.scenarios == sum(shard.scenarios for shard in report.shards)
+
+
+def test_single_worker_evaluates_in_process(plan):
+    """One worker never starts a pool."""
+    levels, unit_cost, shortage_cost, model = plan
+    pool = ScenarioPool(workers=1)
+    report = pool.evaluate(levels, unit_cost, shortage_cost, model, scenarios=10)
+    assert report.scenarios == 10
+    assert pool._pool is None
+    with pytest.raises(ValueError):
+        ScenarioPool(workers=2).evaluate(levels, unit_cost, shortage_cost, model, scenarios=0)
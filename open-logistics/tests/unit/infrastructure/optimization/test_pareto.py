@@ -0,0 +1,83 @@
+"""
+Unit tests for Pareto frontier sweeps.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.pareto import (
+    ObjectiveSet,
+    compute_frontier,
+)
+
+
+@pytest.fixture
+def problem():
+    """A budget-bound problem where cost and risk rank items differently."""
+    rng = np.random.default_rng(4)
+    unit_cost = rng.uniform(1, 10, 500)
+    target = rng.uniform(10, 100, 500)
+    return AllocationProblem(
+        target=target,
+        lower=np.zeros(500),
+        unit_cost=unit_cost,
+        shortage_cost=unit_cost * rng.uniform(1.5, 3.0, 500),
+        budget=0.5 * float(unit_cost @ target),
+    )
+
+
+def test_objectives_are_linear_in_levels(problem):
+    """Cost matches the allocation objective and shares stay in [0, 1]."""
+    objectives = ObjectiveSet.build(problem, ["minimize_cost", "unknown", "maximize_efficiency", "minimize_risk"])
+    assert objectives.names == ["minimize_cost", "maximize_efficiency", "minimize_risk"]
+
+    values = objectives.evaluate(problem.target)
+    assert values["cost"] == pytest.approx(problem.objective(problem.target))
+    assert values["efficiency"] == pytest.approx(0.0)
+    assert values["risk"] == pytest.approx(0.0)
+    assert objectives.evaluate(np.zeros(500))["risk"] == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        ObjectiveSet.build(problem, ["minimize_cost"])
+
+
+def test_frontier_is_non_dominated_and_spans_the_anchors(problem):
+    """Every point is non-dominated and the cost anchor is the allocation optimum."""
+    weight = np.random.default_rng(5).uniform(0.5, 2.0, 500)
+    frontier = compute_frontier(problem, ["minimize_cost", "minimize_risk"], risk_weight=weight, points=10, workers=2)
+
+    values = np.array([point.values for point in frontier.points])
+    assert len(values) >= 3
+    for i, point in enumerate(values):
+        others = np.delete(values, i, axis=0)
+        assert not np.any(np.all(others <= point, axis=1) & np.any(others < point - 1e-9, axis=1))
+    assert values[:, 0].min() == pytest.approx(solve_allocation(problem).objective_value, rel=1e-6)
+    assert frontier.solves == 12
+    assert frontier.warm_solves > 0
+    assert {point["method"] for point in frontier.to_section()["points"]} >= {"weighted_sum", "epsilon_constraint"}
+
+
+def test_epsilon_caps_bound_secondary_objectives(problem):
+    """Epsilon-constraint points respect their caps."""
+    frontier = compute_frontier(
+        problem, ["minimize_cost", "maximize_efficiency"], points=6, sweeps=["epsilon_constraint"]
+    )
+    capped = [point for point in frontier.points if point.method == "epsilon_constraint"]
+    assert capped
+    for point in capped:
+        assert frontier.objectives.evaluate(point.levels)["efficiency"] >= point.parameters["efficiency"] - 1e-6
+
+    with pytest.raises(ValueError):
+        compute_frontier(problem, ["minimize_cost", "minimize_risk"], sweeps=["random"])
+
+
+def test_time_limit_skips_unreached_sweep_points(problem):
+    """Sweep points not started within the time limit are skipped and counted."""
+    frontier = compute_frontier(problem, ["minimize_cost", "minimize_risk"], points=10, workers=2, time_limit_s=0.0)
+    assert frontier.solves == 2
+    assert frontier.skipped == 10
+    assert {point.method for point in frontier.points} == {"single_objective"}
+    assert frontier.to_section()["skipped_points"] == 10
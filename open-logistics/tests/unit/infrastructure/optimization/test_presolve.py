@@ -0,0 +1,113 @@
+"""
+Unit tests for allocation and network presolve.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.network import (
+    LocationNetwork,
+    solve_network_flow,
+)
+from open_logistics.infrastructure.optimization.presolve import (
+    presolve_allocation,
+    presolve_network,
+    solve_presolved_allocation,
+    solve_presolved_network,
+)
+
+
+@pytest.fixture
+def problem():
+    """Six hundred SKUs drawn from six cost profiles, one of them never worth stocking."""
+    rng = np.random.default_rng(0)
+    profile = rng.integers(0, 6, 600)
+    return AllocationProblem(
+        target=rng.uniform(5.0, 50.0, 600),
+        lower=np.zeros(600),
+        unit_cost=np.array([1.0, 2.0, 2.0, 3.0, 5.0, 4.0])[profile],
+        shortage_cost=np.array([4.0, 4.0, 6.0, 9.0, 8.0, 3.0])[profile],
+        budget=20000.0,
+        capacity=9000.0,
+    )
+
+
+def test_identical_profiles_collapse(problem):
+    """Each profile becomes one variable and the costly one is fixed at zero."""
+    presolved = presolve_allocation(problem)
+    assert len(presolved.problem) == 5
+    assert presolved.stats.ratio == pytest.approx(120.0)
+    assert np.all(presolved.fixed_levels[problem.unit_cost == 4.0] == 0.0)
+    np.testing.assert_allclose(presolved.problem.target.sum(), problem.target[problem.unit_cost != 4.0].sum())
+
+    loose = AllocationProblem(problem.target, problem.lower, problem.unit_cost, problem.shortage_cost, budget=1e9)
+    assert presolve_allocation(loose).problem.budget is None
+
+
+@pytest.mark.parametrize("integral", [False, True])
+def test_presolved_allocation_is_optimal(problem, integral):
+    """The expanded solution matches a direct solve and respects every bound and row."""
+    direct = solve_allocation(problem, integral=integral)
+    solution, stats = solve_presolved_allocation(problem, integral=integral)
+
+    assert solution.status == "OPTIMAL"
+    assert solution.objective_value == pytest.approx(direct.objective_value, rel=1e-4)
+    upper = np.floor(problem.target) if integral else problem.target
+    assert np.all(solution.levels >= 0.0) and np.all(solution.levels <= upper + 1e-9)
+    assert problem.unit_cost @ solution.levels <= problem.budget * (1 + 1e-6)
+    assert solution.levels.sum() <= problem.capacity * (1 + 1e-6)
+    if integral:
+        np.testing.assert_array_equal(solution.levels, np.round(solution.levels))
+    else:
+        np.testing.assert_allclose(solution.duals, direct.duals, atol=1e-6)
+
+
+def test_presolve_keeps_row_duals():
+    """Small problems with tight rows price them the same with and without presolve."""
+    for seed in range(400):
+        rng = np.random.default_rng(seed)
+        size = int(rng.integers(2, 12))
+        target = rng.uniform(1.0, 20.0, size)
+        unit_cost = rng.integers(1, 8, size).astype(float)
+        problem = AllocationProblem(
+            target=target,
+            lower=np.zeros(size),
+            unit_cost=unit_cost,
+            shortage_cost=rng.integers(1, 12, size).astype(float),
+            budget=float(rng.uniform(0.0, 1.0) * (unit_cost @ target)),
+            capacity=float(rng.uniform(0.0, 1.0) * target.sum()),
+        )
+        direct = solve_allocation(problem)
+        solution, _ = solve_presolved_allocation(problem)
+        np.testing.assert_allclose(solution.duals, direct.duals, atol=1e-6, err_msg=f"seed {seed}")
+
+
+def test_network_drops_dominated_and_idle_nodes():
+    """Small far suppliers and depots behind an unlimited hub are removed without changing the flow."""
+    locations = (
+        [{"id": "hub", "type": "supplier", "supply": 10000, "lat": 0.0, "lon": 0.0}]
+        + [{"id": f"plant_{i}", "type": "supplier", "supply": 50, "capacity": 50, "lat": 0.0, "lon": 0.5 + i}
+           for i in range(3)]
+        + [{"id": "dc", "type": "depot", "lat": 0.1, "lon": 0.1},
+           {"id": "far_dc", "type": "depot", "capacity": 300, "lat": 0.1, "lon": -0.3},
+           {"id": "closed_dc", "type": "depot", "capacity": 0, "lat": 0.1, "lon": 0.0}]
+        + [{"id": f"site_{i}", "demand": 0 if i == 0 else 40, "lat": 0.2, "lon": 0.05 * i} for i in range(6)]
+    )
+    network = LocationNetwork.from_locations(locations)
+    presolved = presolve_network(network)
+
+    kept = set(presolved.network.node_ids)
+    assert {"hub", "dc"} <= kept
+    assert not kept & {"plant_0", "plant_1", "plant_2", "far_dc", "closed_dc", "site_0"}
+    assert presolved.stats.ratio > 2
+
+    direct = solve_network_flow(network)
+    plan, _ = solve_presolved_network(network)
+    assert plan.total_flow == direct.total_flow
+    assert network.demand.sum() - plan.unmet_demand.sum() == 200
+    assert plan.total_cost == pytest.approx(direct.total_cost)
+    assert len(plan.flow) == network.lane_count
+    np.testing.assert_array_equal(plan.unmet_demand, direct.unmet_demand)
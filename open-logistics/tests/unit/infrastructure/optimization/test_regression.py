@@ -0,0 +1,51 @@
+"""
+Unit tests for closed-form trend fitting.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.regression import (
+    DEFAULT_DEMAND,
+    fit_linear_trends,
+    fit_trends,
+    stack_series,
+)
+
+
+def test_fit_matches_polyfit_for_ragged_series():
+    """Masked OLS on stacked series matches a per-series polynomial fit."""
+    rng = np.random.default_rng(3)
+    series = [rng.normal(100, 10, size) for size in (5, 30, 12)]
+    fit = fit_linear_trends(*stack_series(series))
+
+    for i, values in enumerate(series):
+        slope, intercept = np.polyfit(np.arange(len(values)), values, 1)
+        assert fit.slope[i] == pytest.approx(slope)
+        assert fit.intercept[i] == pytest.approx(intercept)
+        assert fit.predict()[i] == pytest.approx(intercept + slope * len(values))
+
+
+def test_short_series_fall_back_to_default():
+    """Series with fewer than two points have no trend."""
+    fit = fit_linear_trends(*stack_series([[], [42.0], [1.0, 3.0]]))
+    np.testing.assert_allclose(fit.slope, [0.0, 0.0, 2.0])
+    np.testing.assert_allclose(fit.predict(), [DEFAULT_DEMAND, DEFAULT_DEMAND, 5.0])
+
+
+def test_named_trend_models():
+    """OLS uses the closed form; robust models resist outliers; unknown names fail."""
+    t = np.arange(20, dtype=float)
+    clean = 50.0 + 2.0 * t
+    spiked = clean.copy()
+    spiked[-1] += 500.0
+
+    ols = fit_trends([clean, spiked, [7.0]])
+    np.testing.assert_allclose(ols.slope, fit_linear_trends(*stack_series([clean, spiked, [7.0]])).slope)
+
+    huber = fit_trends([clean, spiked, [7.0]], model="huber")
+    assert huber.slope[0] == pytest.approx(2.0, rel=1e-3)
+    assert abs(huber.slope[1] - 2.0) < abs(ols.slope[1] - 2.0)
+    assert huber.predict()[2] == DEFAULT_DEMAND
+
+    with pytest.raises(ValueError):
+        fit_trends([clean], model="cubic")
@@ -0,0 +1,103 @@
+"""
+Unit tests for capacitated vehicle routing.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization import routing
+from open_logistics.infrastructure.optimization.routing import (
+    RoutingProblem,
+    distance_matrix,
+    initial_routes_from_stops,
+    solve_vrp,
+)
+
+
+@pytest.fixture
+def locations():
+    """Twelve stops scattered around a depot."""
+    rng = np.random.default_rng(7)
+    return [
+        {"id": f"site_{i}", "lat": 50 + rng.random(), "lon": 8 + rng.random(), "capacity": 40}
+        for i in range(12)
+    ]
+
+
+def test_radial_distance_matrix():
+    """Without coordinates stops lie on a ray from the depot."""
+    matrix = distance_matrix([{"distance": 10}, {"distance": 25}])
+    np.testing.assert_allclose(matrix, [[0, 10, 25], [10, 0, 15], [25, 15, 0]])
+
+
+def test_distance_matrix_is_cached(locations):
+    """The same location set reuses the cached matrix."""
+    first = distance_matrix(locations)
+    second = distance_matrix([dict(loc) for loc in locations])
+    assert first is second
+    assert first.shape == (13, 13)
+    assert not first.flags.writeable
+
+
+def test_distance_matrix_cache_is_thread_safe():
+    """Concurrent workers share the cache without exceeding its size."""
+    networks = [[{"distance": 10 + i}, {"distance": 30 + i}] for i in range(4 * routing.MATRIX_CACHE_SIZE)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        matrices = list(pool.map(distance_matrix, networks * 4))
+    assert all(matrix[0, 1] == network[0]["distance"] for matrix, network in zip(matrices, networks * 4))
+    assert len(routing._matrix_cache) <= routing.MATRIX_CACHE_SIZE
+
+
+def test_vrp_respects_vehicle_capacity(locations):
+    """Every stop is served and no route exceeds the vehicle capacity."""
+    problem = RoutingProblem.from_locations(locations, {"vehicle_capacity": 100}, 5000)
+    plan = solve_vrp(problem, time_limit_s=0.5)
+
+    assert plan.status == "FEASIBLE"
+    assert plan.unserved == []
+    assert sorted(node for route in plan.routes for node in route) == list(range(1, 13))
+    assert max(plan.loads) <= 100
+
+    section = plan.to_section(problem)
+    assert sum(len(route["stops"]) for route in section.values()) == 12
+
+
+def test_vrp_streams_improving_solutions(locations):
+    """The callback receives best-so-far plans with non-increasing distance."""
+    problem = RoutingProblem.from_locations(locations, {"vehicle_capacity": 100}, 5000)
+    seen = []
+    solve_vrp(problem, time_limit_s=0.5, on_solution=lambda plan: seen.append(plan.total_distance))
+    assert seen
+    assert all(later <= earlier + 1e-6 for earlier, later in zip(seen, seen[1:]))
+
+
+def test_vrp_reports_unservable_stops():
+    """Stops larger than any vehicle are dropped instead of failing the solve."""
+    problem = RoutingProblem.from_locations(
+        [{"id": "small", "distance": 10, "demand": 5}, {"id": "huge", "distance": 20, "demand": 500}],
+        {"vehicle_capacity": 50, "vehicle_count": 1},
+        5000,
+    )
+    plan = solve_vrp(problem, time_limit_s=0.2)
+    assert [problem.stop_ids[node - 1] for node in plan.unserved] == ["huge"]
+
+
+def test_vrp_warm_start_from_previous_routes(locations):
+    """A changed network is solved starting from the previous plan's routes."""
+    problem = RoutingProblem.from_locations(locations, {"vehicle_capacity": 100}, 5000)
+    previous = solve_vrp(problem, time_limit_s=0.3)
+    route_stops = [[problem.stop_ids[node - 1] for node in route] for route in previous.routes]
+
+    changed = [dict(loc) for loc in locations[1:]]
+    changed[0]["capacity"] = 90
+    changed.append({"id": "site_new", "lat": 50.5, "lon": 8.5, "capacity": 10})
+    updated = RoutingProblem.from_locations(changed, {"vehicle_capacity": 100}, 5000)
+    initial = initial_routes_from_stops(updated, route_stops)
+    plan = solve_vrp(updated, time_limit_s=0.2, initial_routes=initial)
+
+    assert len(initial) == updated.vehicle_count
+    assert all(updated.demands[route].sum() <= 100 for route in initial if route)
+    assert plan.warm_started
+    assert plan.unserved == []
+    assert max(plan.loads) <= 100
@@ -0,0 +1,125 @@
+"""
+Unit tests for Monte Carlo plan evaluation.
+"""
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.scenarios import (
+    TIME_LIMITED_CHUNKS,
+    DemandModel,
+    ScenarioTotals,
+    chunk_sizes,
+    evaluate_chunk,
+    evaluate_plan,
+)
+
+
+@pytest.fixture
+def model():
+    """Twenty SKUs with a rising demand history."""
+    expected = np.linspace(100.0, 500.0, 20)
+    history = 100.0 + 2.0 * np.arange(30) + np.random.default_rng(1).normal(0, 10, 30)
+    return DemandModel.from_history(expected, history, horizon=30, lead_time_mean=5.0)
+
+
+def test_sampled_demand_matches_model(model):
+    """Samples have the scenario-SKU-day shape and average to the expected demand."""
+    demand, lead_time = model.sample(np.random.default_rng(0), 2000)
+    assert demand.shape == (2000, 20, 30)
+    assert lead_time.shape == (2000, 20)
+    np.testing.assert_allclose(
+        demand.sum(axis=2).mean(axis=0), np.linspace(100.0, 500.0, 20), rtol=0.02
+    )
+    # The rising history tilts the daily profile upwards
+    assert model.daily_mean[:, -1].sum() > model.daily_mean[:, 0].sum()
+
+
+def test_chunks_merge_to_the_same_totals(model):
+    """Totals are additive across chunks, so chunking only bounds memory."""
+    levels = np.full(20, 300.0)
+    unit_cost, shortage_cost = np.ones(20), np.full(20, 5.0)
+    seeds = np.random.SeedSequence(7).spawn(3)
+    parts = [
+        evaluate_chunk(levels, unit_cost, shortage_cost, model, seed, 40)
+        for seed in seeds
+    ]
+    merged = ScenarioTotals.merge(parts)
+
+    assert merged.scenarios == 120
+    np.testing.assert_array_equal(
+        merged.stockouts, sum(part.stockouts for part in parts)
+    )
+    assert chunk_sizes(100, model, chunk_bytes=20 * 30 * 4 * 30) == [30, 30, 30, 10]
+
+    small = evaluate_plan(
+        levels,
+        unit_cost,
+        shortage_cost,
+        model,
+        scenarios=100,
+        seed=3,
+        chunk_bytes=20 * 30 * 4 * 30,
+    )
+    again = evaluate_plan(
+        levels,
+        unit_cost,
+        shortage_cost,
+        model,
+        scenarios=100,
+        seed=3,
+        chunk_bytes=20 * 30 * 4 * 30,
+    )
+    np.testing.assert_array_equal(small.cost, again.cost)
+
+
+def test_understocked_plan_is_riskier(model):
+    """Stocking below expected demand raises stockouts and lowers the fill rate."""
+    expected = np.linspace(100.0, 500.0, 20)
+    unit_cost, shortage_cost = np.ones(20), np.full(20, 5.0)
+    lean = evaluate_plan(0.6 * expected, unit_cost, shortage_cost, model, scenarios=500)
+    ample = evaluate_plan(
+        2.0 * expected, unit_cost, shortage_cost, model, scenarios=500
+    )
+
+    assert lean.stockout_probability.mean() > ample.stockout_probability.mean()
+    assert lean.fill_rate.mean() < ample.fill_rate.mean()
+    assert np.all(ample.fill_rate <= 1.0)
+
+    section = lean.to_section([f"SKU{i}" for i in range(20)], top=3)
+    assert section["scenarios"] == 500
+    assert len(section["riskiest_items"]) == 3
+    assert section["cost_distribution"]["p5"] <= section["cost_distribution"]["p95"]
+
+    with pytest.raises(ValueError):
+        evaluate_plan(expected, unit_cost, shortage_cost, model, scenarios=0)
+
+
+def test_time_limit_stops_after_the_first_chunk(model):
+    """An expired time limit still scores one chunk and reports the scenarios used."""
+    levels, unit_cost, shortage_cost = np.full(20, 300.0), np.ones(20), np.full(20, 5.0)
+    report = evaluate_plan(
+        levels,
+        unit_cost,
+        shortage_cost,
+        model,
+        scenarios=1600,
+        seed=3,
+        time_limit_s=0.0,
+    )
+
+    assert report.scenarios == 1600 // TIME_LIMITED_CHUNKS
+    assert report.requested == 1600
+    section = report.to_section([f"SKU{i}" for i in range(20)])
+    assert (section["scenarios"], section["scenarios_requested"]) == (100, 1600)
+
+    unlimited = evaluate_plan(
+        levels,
+        unit_cost,
+        shortage_cost,
+        model,
+        scenarios=1600,
+        seed=3,
+        time_limit_s=60.0,
+    )
+    assert unlimited.scenarios == unlimited.requested == 1600
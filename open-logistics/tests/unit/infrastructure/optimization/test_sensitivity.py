@@ -0,0 +1,104 @@
+"""
+Unit tests for LP allocation sensitivity analysis.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.heuristics import greedy_allocation
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.sensitivity import AllocationSensitivity
+
+
+@pytest.fixture
+def problem():
+    """Five hundred items under a budget and a capacity that both bind."""
+    rng = np.random.default_rng(3)
+    unit_cost = rng.uniform(0.5, 4.0, 500)
+    return AllocationProblem(
+        target=rng.uniform(5.0, 50.0, 500),
+        lower=np.zeros(500),
+        unit_cost=unit_cost,
+        shortage_cost=unit_cost * rng.uniform(1.1, 3.0, 500),
+        budget=12000.0,
+        capacity=5500.0,
+    )
+
+
+@pytest.fixture
+def sensitivity(problem):
+    return AllocationSensitivity(problem, solve_allocation(problem))
+
+
+def test_ranges_price_both_limits(problem, sensitivity):
+    """Binding rows carry their dual as shadow price, and reduced costs agree with the levels."""
+    budget, capacity = sensitivity.ranges["budget"], sensitivity.ranges["capacity"]
+    assert budget.shadow_price < 0 and capacity.shadow_price < 0
+    assert budget.slack == pytest.approx(
+        0.0, abs=1e-6
+    ) and capacity.slack == pytest.approx(0.0, abs=1e-6)
+    assert budget.lower < problem.budget < budget.upper
+    assert capacity.lower < problem.capacity < capacity.upper
+
+    at_target = sensitivity.levels >= problem.target - 1e-9
+    at_zero = sensitivity.levels <= 1e-9
+    assert np.all(sensitivity.reduced_costs[at_target] <= 1e-7)
+    assert np.all(sensitivity.reduced_costs[at_zero] >= -1e-7)
+
+    section = sensitivity.to_section()
+    assert section["limits"]["budget"]["valid_range"] == [budget.lower, budget.upper]
+
+
+def test_what_if_within_range_needs_no_solve(problem, sensitivity):
+    """Changes inside the valid ranges match a full re-solve without solving."""
+    budget, capacity = sensitivity.ranges["budget"], sensitivity.ranges["capacity"]
+    for new_budget, new_capacity in [
+        (budget.upper - 1e-3, None),
+        (None, capacity.lower + 1e-3),
+        (
+            problem.budget + 0.25 * (budget.upper - problem.budget),
+            problem.capacity + 0.25 * (capacity.upper - problem.capacity),
+        ),
+    ]:
+        answer = sensitivity.what_if(budget=new_budget, capacity=new_capacity)
+        changed = replace(
+            problem,
+            budget=new_budget or problem.budget,
+            capacity=new_capacity or problem.capacity,
+        )
+        assert answer.warm_start == "sensitivity"
+        assert answer.objective_value == pytest.approx(
+            solve_allocation(changed).objective_value, rel=1e-9
+        )
+        assert answer.objective_value == pytest.approx(
+            changed.objective(answer.levels), rel=1e-9
+        )
+        assert changed.unit_cost @ answer.levels <= changed.budget + 1e-6
+        assert answer.levels.sum() <= changed.capacity + 1e-6
+
+
+def test_what_if_outside_range_re_solves(problem, sensitivity):
+    """Changes past a range, or to a limit the plan did not have, are re-solved from the duals."""
+    outside = sensitivity.what_if(budget=2.0 * problem.budget)
+    assert outside.warm_start != "sensitivity"
+    assert outside.objective_value == pytest.approx(
+        solve_allocation(replace(problem, budget=2.0 * problem.budget)).objective_value,
+        rel=1e-9,
+    )
+
+    uncapped = replace(problem, capacity=None)
+    added = AllocationSensitivity(uncapped, solve_allocation(uncapped)).what_if(
+        capacity=problem.capacity
+    )
+    assert added.warm_start != "sensitivity"
+    assert added.objective_value == pytest.approx(
+        solve_allocation(problem).objective_value, rel=1e-9
+    )
+
+    with pytest.raises(ValueError):
+        AllocationSensitivity(problem, greedy_allocation(problem))
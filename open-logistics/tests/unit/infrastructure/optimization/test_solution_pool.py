@@ -0,0 +1,139 @@
+"""
+Unit tests for the nearest-neighbor solution pool.
+"""
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.lp_allocation import (
+    AllocationProblem,
+    solve_allocation,
+)
+from open_logistics.infrastructure.optimization.solution_pool import (
+    PooledSolution,
+    SolutionPool,
+    problem_features,
+)
+from open_logistics.infrastructure.optimization.vectorized import InventoryColumns
+
+CONSTRAINTS = {"budget": 3000.0, "capacity_limit": 1500.0}
+
+
+def make_columns(skus, seed=0):
+    rng = np.random.default_rng(seed)
+    return InventoryColumns.from_inventory(
+        {
+            sku: {
+                "quantity": float(rng.integers(10, 60)),
+                "unit_cost": float(rng.uniform(1.0, 4.0)),
+            }
+            for sku in skus
+        }
+    )
+
+
+@pytest.fixture
+def columns():
+    """Four hundred SKUs with random quantities and costs."""
+    return make_columns([f"sku_{i}" for i in range(400)])
+
+
+def solve(columns, target, constraints=CONSTRAINTS):
+    return solve_allocation(
+        AllocationProblem.from_columns(columns, target, constraints)
+    )
+
+
+def test_features_separate_unrelated_problems(columns):
+    """Small changes keep problems close; other SKUs, limits or locations move them apart."""
+    target = columns.quantity * 1.5
+    features = problem_features(columns, target, CONSTRAINTS, [{"id": "depot_a"}])
+    nudged = target.copy()
+    nudged[::40] *= 1.1
+
+    assert (
+        np.linalg.norm(
+            problem_features(columns, nudged, CONSTRAINTS, [{"id": "depot_a"}])
+            - features
+        )
+        < 0.05
+    )
+    other = make_columns([f"other_{i}" for i in range(400)])
+    assert (
+        np.linalg.norm(
+            problem_features(other, target, CONSTRAINTS, [{"id": "depot_a"}]) - features
+        )
+        > 1.0
+    )
+    uncapped = {"budget": CONSTRAINTS["budget"]}
+    assert (
+        np.linalg.norm(
+            problem_features(columns, target, uncapped, [{"id": "depot_a"}]) - features
+        )
+        >= 1.0
+    )
+    assert (
+        np.linalg.norm(
+            problem_features(columns, target, CONSTRAINTS, [{"id": "depot_b"}])
+            - features
+        )
+        > 1.0
+    )
+
+
+def test_pool_finds_nearest_and_counts_hits(columns):
+    """Lookups hit within the distance, identical problems replace each other and old entries are evicted."""
+    pool = SolutionPool(max_entries=2, max_distance=0.25)
+    target = columns.quantity * 1.5
+    features = problem_features(columns, target, CONSTRAINTS)
+    pooled = PooledSolution.from_solution(columns, target, solve(columns, target))
+
+    assert pool.nearest(features) is None
+    pool.add(features, pooled)
+    pool.add(features, pooled)
+    assert len(pool) == 1
+    match, distance = pool.nearest(features + 0.01)
+    assert match is pooled and distance == pytest.approx(0.01 * np.sqrt(len(features)))
+
+    for seed in (1, 2):
+        other = make_columns([f"other_{seed}_{i}" for i in range(50)], seed)
+        pool.add(problem_features(other, other.quantity, CONSTRAINTS), pooled)
+    assert len(pool) == 2
+    assert pool.nearest(features) is None
+
+    pool.record_solve(False, 40.0, 400)
+    pool.record_solve(True, 4.0, 400)
+    stats = pool.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["solve_time_reduction"] == pytest.approx(0.9)
+
+
+def test_warm_start_aligns_by_sku(columns):
+    """A pooled solution warm-starts a problem with reordered, changed and new SKUs to the same optimum."""
+    target = columns.quantity * 1.5
+    pooled = PooledSolution.from_solution(columns, target, solve(columns, target))
+
+    skus = list(reversed(columns.skus[:380])) + [f"new_{i}" for i in range(20)]
+    changed = make_columns(skus)
+    new_target = changed.quantity * 1.5
+    new_target[:10] *= 1.2
+    warm_start = pooled.warm_start(changed, new_target)
+
+    assert set(range(380, 400)) <= set(warm_start.changed_rows.tolist())
+    index = dict(zip(columns.skus, range(len(columns))))
+    kept = [
+        row for row in range(380) if row not in set(warm_start.changed_rows.tolist())
+    ]
+    np.testing.assert_array_equal(
+        warm_start.levels[kept],
+        pooled.levels[np.searchsorted(pooled.skus, [skus[row] for row in kept])],
+    )
+    assert all(skus[row] in index for row in kept)
+
+    problem = AllocationProblem.from_columns(changed, new_target, CONSTRAINTS)
+    warm = solve_allocation(problem, warm_start=warm_start)
+    assert warm.warm_start == "working_set"
+    assert warm.objective_value == pytest.approx(
+        solve_allocation(problem).objective_value, rel=1e-9
+    )
@@ -0,0 +1,72 @@
+"""
+Unit tests for the location spatial index.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization import spatial
+from open_logistics.infrastructure.optimization.network import LocationNetwork
+from open_logistics.infrastructure.optimization.routing import haversine_matrix
+from open_logistics.infrastructure.optimization.spatial import get_location_index
+
+
+@pytest.fixture
+def geo_locations():
+    """Random locations with coordinates."""
+    rng = np.random.default_rng(3)
+    return [
+        {"id": f"loc_{i}", "lat": float(lat), "lon": float(lon)}
+        for i, (lat, lon) in enumerate(zip(rng.uniform(35, 50, 300), rng.uniform(-120, -70, 300)))
+    ]
+
+
+def test_nearest_matches_brute_force(geo_locations):
+    """KD-tree neighbors and distances agree with the great-circle matrix."""
+    index = get_location_index(geo_locations)
+    queries, candidates = np.arange(0, 40), np.arange(40, 300)
+    origins, neighbors, distances = index.nearest(queries, candidates, k=5)
+
+    coordinates = np.array([[loc["lat"], loc["lon"]] for loc in geo_locations])
+    matrix = haversine_matrix(coordinates[queries], coordinates[candidates])
+    expected = candidates[np.argsort(matrix, axis=1)[:, :5]]
+    assert origins.tolist() == np.repeat(queries, 5).tolist()
+    assert neighbors.tolist() == expected.ravel().tolist()
+    np.testing.assert_allclose(distances, np.sort(matrix, axis=1)[:, :5].ravel(), rtol=1e-9)
+
+
+def test_index_is_cached_per_location_set(geo_locations):
+    """Equal location sets share an index and its trees."""
+    index = get_location_index(geo_locations)
+    tree = index.tree(np.arange(10))
+    copies = [dict(loc) for loc in geo_locations]
+    assert get_location_index(copies) is index
+    assert index.tree(np.arange(10)) is tree
+    assert get_location_index(copies[:-1]) is not index
+
+    radial = get_location_index([{"distance": d} for d in (5.0, 40.0, 12.0)])
+    _, neighbors, distances = radial.nearest(np.array([0]), np.array([1, 2]), k=1)
+    assert neighbors.tolist() == [2] and distances.tolist() == [7.0]
+
+
+def test_index_cache_is_thread_safe():
+    """Concurrent workers share the cache without exceeding its size."""
+    networks = [[{"distance": 10 + i}, {"distance": 30 + i}] for i in range(4 * spatial.INDEX_CACHE_SIZE)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        indexes = list(pool.map(get_location_index, networks * 4))
+    assert all(index.points[0, 0] == network[0]["distance"] for index, network in zip(indexes, networks * 4))
+    assert len(spatial._index_cache) <= spatial.INDEX_CACHE_SIZE
+
+
+def test_candidate_lanes_keep_networks_sparse(geo_locations):
+    """Each node is fed by its k nearest upstream nodes only."""
+    locations = (
+        [{**loc, "type": "supplier"} for loc in geo_locations[:10]]
+        + [{**loc, "type": "depot"} for loc in geo_locations[10:60]]
+        + geo_locations[60:]
+    )
+    network = LocationNetwork.from_locations(locations, candidate_lanes=4)
+    assert network.lane_count == 4 * 50 + 4 * 240
+    inbound = np.bincount(network.indices, minlength=len(network))
+    assert np.all(inbound[10:] == 4)
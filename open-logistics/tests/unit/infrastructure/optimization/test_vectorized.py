@@ -0,0 +1,73 @@
+"""
+Unit tests for the columnar inventory engine.
+"""
+import numpy as np
+import pytest
+
+from open_logistics.infrastructure.optimization.vectorized import (
+    InventoryColumns,
+    materialize_inventory_plan,
+    optimize_inventory_levels,
+)
+
+
+def test_columns_from_numeric_inventory():
+    """Numeric inventories take the fast path and tile default factors."""
+    columns = InventoryColumns.from_inventory({f"item_{i}": 10 * i for i in range(6)})
+    assert len(columns) == 6
+    assert columns.quantity.dtype == np.float64
+    np.testing.assert_allclose(columns.demand_factor, [1.0, 1.2, 0.8, 1.1, 1.0, 1.2])
+    np.testing.assert_allclose(columns.unit_cost, [0.8, 1.2, 0.9, 1.1, 0.8, 1.2])
+
+
+def test_columns_from_attribute_inventory():
+    """Per-item attributes override the default factors."""
+    columns = InventoryColumns.from_inventory({
+        "a": {"quantity": 100, "demand_factor": 2.0},
+        "b": {"quantity": 50, "unit_cost": 3.0},
+        "c": 25,
+    })
+    np.testing.assert_allclose(columns.quantity, [100, 50, 25])
+    np.testing.assert_allclose(columns.demand_factor, [2.0, 1.2, 0.8])
+    np.testing.assert_allclose(columns.unit_cost, [0.8, 3.0, 0.9])
+
+
+def test_plan_covers_every_sku():
+    """Plans are no longer limited to the first four items."""
+    inventory = {f"item_{i}": 100 + i for i in range(1000)}
+    columns = InventoryColumns.from_inventory(inventory)
+    plan = optimize_inventory_levels(columns, efficiency_target=0.88)
+    section = materialize_inventory_plan(columns.skus, plan)
+
+    assert list(section) == list(inventory)
+    item = section["item_5"]
+    assert item["optimized_level"] == pytest.approx(105 * 1.2 * 0.88)
+    assert item["adjustment"] == pytest.approx(item["optimized_level"] - 105)
+    assert item["cost_impact"] == pytest.approx(item["optimized_level"] * 1.2)
+    assert plan.total_cost == pytest.approx(sum(v["cost_impact"] for v in section.values()))
+
+
+def test_empty_inventory():
+    """An empty inventory yields an empty plan with neutral metrics."""
+    columns = InventoryColumns.from_inventory({})
+    plan = optimize_inventory_levels(columns, efficiency_target=0.88)
+    assert materialize_inventory_plan(columns.skus, plan) == {}
+    assert plan.total_cost == 0.0
+    assert plan.efficiency_gain == 0.0
+
+
+def test_concatenate_and_split_roundtrip():
+    """Packed segments split back into per-request plans."""
+    segments = [
+        InventoryColumns.from_inventory({"a": 10, "b": 20}),
+        InventoryColumns.from_inventory({}),
+        InventoryColumns.from_inventory({"c": 30, "d": 40, "e": 50}),
+    ]
+    packed, offsets = InventoryColumns.concatenate(segments)
+    assert len(packed) == 5
+
+    plans = optimize_inventory_levels(packed, efficiency_target=0.9).split(offsets)
+    assert [len(plan.current_level) for plan in plans] == [2, 0, 3]
+    for segment, plan in zip(segments, plans):
+        expected = optimize_inventory_levels(segment, efficiency_target=0.9)
+        np.testing.assert_allclose(plan.optimized_level, expected.optimized_level)
@@ -114,6 +114,45 @@ class TestCLICommandsCoverage:
             result = self.runner.invoke(app, ["optimize", "--config", str(config_file)])
             assert result.exit_code == 0
 
+    def test_optimize_batch_command(self, tmp_path):
+        """Test batch optimize command with a requests file."""
+        requests_file = tmp_path / "requests.json"
+        requests = [
+            {
+                "supply_chain_data": {"inventory": {"item1": 100 + i}},
+                "objectives": ["minimize_cost"],
+                "time_horizon": 7,
+            }
+            for i in range(3)
+        ]
+        with open(requests_file, 'w') as f:
+            json.dump(requests, f)
+
+        result = self.runner.invoke(app, ["optimize-batch", str(requests_file), "--format", "json"])
+        assert result.exit_code == 0
+        assert "inventory_optimization" in result.stdout
+
+    def test_train_command(self, tmp_path):
+        """Test training the model on a history file into a checkpoint."""
+        history_file = tmp_path / "history.jsonl"
+        records = [
+            {
+                "request": {"supply_chain_data": {"inventory": {"item1": 100 + i}}},
+                "result": {"confidence_score": 0.8},
+            }
+            for i in range(10)
+        ]
+        history_file.write_text("".join(json.dumps(record) + "\n" for record in records))
+        output = tmp_path / "model.olck"
+
+        result = self.runner.invoke(app, ["train", str(history_file), "--output", str(output), "--batch-size", "4"])
+        assert result.exit_code == 0
+        assert "samples/s" in result.stdout
+        assert output.exists()
+
+        result = self.runner.invoke(app, ["train", str(tmp_path / "missing.jsonl")])
+        assert result.exit_code == 1
+
     def test_optimize_command_with_data_file(self, tmp_path):
         """Test optimize command with data file."""
         data_file = tmp_path / "data.json"